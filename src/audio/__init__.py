@@ -0,0 +1,10 @@
+"""
+VPA Audio
+Public names are resolved lazily (PEP 562) so importing the package stays cheap.
+"""
+
+from vpa.core.lazy_import import attach_lazy, lazy_attributes
+
+__getattr__, __dir__, __all__ = attach_lazy(__name__, lazy_attributes(
+    ("voice_system", ["AudioSystem", "VoiceProfile", "VoiceQuality", "audio_system"]),
+))
@@ -5,9 +5,10 @@ Target: <2 second voice response time with high fidelity audio (44.1kHz/16-bit).
 """
 
 import asyncio
+import re
 import time
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterable, AsyncIterator, Union
 from dataclasses import dataclass
 from enum import Enum
 import threading
@@ -16,7 +17,11 @@ import threading
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from vpa.core.container import container
+from vpa.core.cache_manager import cache_manager
+from vpa.core.config_service import config_service
 from vpa.core.events import PerformanceMonitor, event_bus
+from vpa.core.tracing import startup_tracer
 
 
 class VoiceQuality(Enum):
@@ -38,6 +43,8 @@ class VoiceProfile:
     description: str
     sample_rate: int = 44100  # High fidelity 44.1kHz
     bit_depth: int = 16       # 16-bit depth
+    rate: int = 200           # Words per minute
+    volume: float = 0.9
     enabled: bool = True
     priority: int = 0
 
@@ -48,8 +55,11 @@ class AudioSystem:
     Maintains voice processing pipeline integrity with performance optimization.
     """
     
-    def __init__(self):
+    def __init__(self, synthesis_cache=None):
         self.logger = logging.getLogger(__name__)
+        # Optional VPACacheManager; synthesized audio is kept in its persistent "tts" namespace
+        self.synthesis_cache = synthesis_cache
+        self.synthesis_cache_ttl = 7 * 24 * 3600.0
         self.voice_profiles: Dict[str, VoiceProfile] = {}
         self.current_voice: Optional[VoiceProfile] = None
         self.audio_settings = {
@@ -59,19 +69,55 @@ class AudioSystem:
             "buffer_size": 1024
         }
         self._response_time_target = 2.0  # seconds
+        self._max_pending_chars = 240  # Flush streamed text without a sentence end past this
         self._metrics = {
             "voice_responses": 0,
             "total_response_time": 0.0,
             "average_response_time": 0.0,
-            "synthesis_errors": 0
+            "synthesis_errors": 0,
+            "synthesis_cache_hits": 0
         }
         
         # Initialize the 13-voice catalog
-        self._initialize_voice_catalog()
+        with startup_tracer.span("audio_voice_catalog", category="audio"):
+            self._initialize_voice_catalog()
         
         # Subscribe to voice-related events
         event_bus.subscribe("voice_change_request", self._handle_voice_change)
         event_bus.subscribe("tts_request", self._handle_tts_request, async_callback=True)
+        event_bus.subscribe("config_changed", self._handle_config_change, async_callback=True)
+        
+        # Settings come from the configuration snapshot once it is loaded
+        if config_service.snapshot.version:
+            self.apply_config(config_service.snapshot)
+    
+    def apply_config(self, snapshot) -> None:
+        """Apply the audio and voice sections of a configuration snapshot."""
+        audio = snapshot.get("audio") or {}
+        for setting in ("sample_rate", "bit_depth", "channels", "buffer_size"):
+            if setting in audio:
+                self.audio_settings[setting] = audio[setting]
+        
+        voice_settings = snapshot.get("voice") or {}
+        for voice_id, settings in (voice_settings.get("voices") or {}).items():
+            voice = self.voice_profiles.get(voice_id)
+            if voice is None:
+                continue
+            voice.rate = settings.get("rate", voice.rate)
+            voice.volume = settings.get("volume", voice.volume)
+        for voice in self.voice_profiles.values():
+            voice.sample_rate = self.audio_settings["sample_rate"]
+            voice.bit_depth = self.audio_settings["bit_depth"]
+        
+        current = voice_settings.get("current_voice")
+        if current and (self.current_voice is None or current != self.current_voice.voice_id):
+            if not self.set_voice(current):
+                self.logger.warning(f"Configured voice '{current}' is not available")
+    
+    async def _handle_config_change(self, event) -> None:
+        """Re-apply settings when the audio or voice configuration changed."""
+        if any(key.startswith(("audio.", "voice.")) for key in event.data.get("keys", ())):
+            self.apply_config(config_service.snapshot)
     
     def _initialize_voice_catalog(self) -> None:
         """Initialize the complete 13-voice catalog based on LOGBOOK specification."""
@@ -125,8 +171,7 @@ class AudioSystem:
             if not text or len(text.strip()) == 0:
                 raise ValueError("Empty text provided for synthesis")
             
-            # Simulate speech synthesis (placeholder for actual TTS implementation)
-            synthesis_result = await self._perform_synthesis(text, voice)
+            synthesis_result = await self._cached_synthesis(text, voice)
             
             # Calculate response time
             response_time = time.perf_counter() - start_time
@@ -177,6 +222,62 @@ class AudioSystem:
                 "voice_id": voice_id
             }
     
+    async def synthesize_stream(self, chunks: AsyncIterable[Union[str, Dict[str, Any]]],
+                                voice_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Synthesize streamed text incrementally, one sentence at a time.
+        Accepts plain strings or partial plugin results carrying "text"
+        (or "response"), so speech starts before the full response exists.
+        """
+        pending = ""
+        async for chunk in chunks:
+            if isinstance(chunk, dict):
+                chunk = chunk.get("text", chunk.get("response", ""))
+            pending += str(chunk or "")
+            
+            sentences, pending = self._split_complete_sentences(pending)
+            for sentence in sentences:
+                yield await self.synthesize_speech(sentence, voice_id)
+        
+        if pending.strip():
+            yield await self.synthesize_speech(pending.strip(), voice_id)
+    
+    def _split_complete_sentences(self, text: str) -> Tuple[List[str], str]:
+        """Split off complete sentences, bounding the unspoken remainder."""
+        sentences = []
+        boundary = re.compile(r"(?<=[.!?;:])\s+")
+        parts = boundary.split(text)
+        remainder = parts.pop() if parts else ""
+        sentences.extend(part.strip() for part in parts if part.strip())
+        
+        # Long runs without punctuation are flushed at the last word boundary
+        while len(remainder) > self._max_pending_chars:
+            cut = remainder.rfind(" ", 0, self._max_pending_chars)
+            if cut <= 0:
+                cut = self._max_pending_chars
+            sentences.append(remainder[:cut].strip())
+            remainder = remainder[cut:].lstrip()
+        
+        return sentences, remainder
+    
+    async def _cached_synthesis(self, text: str, voice: VoiceProfile) -> Dict[str, Any]:
+        """Reuse previously synthesized audio for the same voice and text."""
+        if self.synthesis_cache is None:
+            return await self._perform_synthesis(text, voice)
+        
+        key = self.synthesis_cache.cache_key(
+            voice.voice_id, voice.sample_rate, voice.bit_depth, voice.rate, voice.volume, text
+        )
+        cached = await self.synthesis_cache.aget(key, namespace="tts")
+        if cached is not None:
+            self._metrics["synthesis_cache_hits"] += 1
+            return cached
+        
+        # Simulate speech synthesis (placeholder for actual TTS implementation)
+        result = await self._perform_synthesis(text, voice)
+        self.synthesis_cache.set(key, result, namespace="tts", ttl=self.synthesis_cache_ttl)
+        return result
+    
     async def _perform_synthesis(self, text: str, voice: VoiceProfile) -> Dict[str, Any]:
         """Perform actual speech synthesis (placeholder implementation)."""
         # Simulate synthesis time based on text length
@@ -192,7 +293,9 @@ class AudioSystem:
             "format": {
                 "sample_rate": voice.sample_rate,
                 "bit_depth": voice.bit_depth,
-                "channels": self.audio_settings["channels"]
+                "channels": self.audio_settings["channels"],
+                "rate": voice.rate,
+                "volume": voice.volume
             }
         }
     
@@ -352,5 +455,5 @@ class AudioSystem:
         }
 
 
-# Global audio system instance
-audio_system = AudioSystem()
\ No newline at end of file
+# Global audio system instance, constructed on first access
+audio_system = container.register("audio_system", lambda: AudioSystem(synthesis_cache=cache_manager))
\ No newline at end of file
@@ -3,18 +3,55 @@ VPA Main Entry Point
 Application launcher with performance monitoring and comprehensive startup.
 """
 
+import argparse
 import asyncio
 import logging
+import os
 import sys
 from pathlib import Path
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from vpa.core.app import app
-from vpa.core.events import event_bus
-from vpa.core.plugins import plugin_manager
-from audio.voice_system import audio_system
+from vpa.core.tracing import startup_tracer
+
+# Record startup spans until the application or worker supervisor reports ready
+startup_tracer.start(deadline=float(os.environ.get("VPA_TRACE_DEADLINE_S", "60")))
+
+# Optional function-level profiling: VPA_TRACE_PROFILE_MS=<min duration in ms>
+if os.environ.get("VPA_TRACE_PROFILE_MS"):
+    startup_tracer.start_profiling(float(os.environ["VPA_TRACE_PROFILE_MS"]))
+
+with startup_tracer.span("imports", category="import"):
+    with startup_tracer.span("import:vpa.core.container", category="import"):
+        from vpa.core.container import container
+    with startup_tracer.span("import:vpa.core.app", category="import"):
+        from vpa.core.app import app
+    with startup_tracer.span("import:vpa.core.events", category="import"):
+        from vpa.core.events import event_bus
+    with startup_tracer.span("import:vpa.core.plugins", category="import"):
+        from vpa.core.plugins import plugin_manager
+    with startup_tracer.span("import:audio.voice_system", category="import"):
+        from audio.voice_system import audio_system
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="VPA - Virtual Personal Assistant")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve utterances over localhost HTTP and a Unix socket")
+    parser.add_argument("--http-port", type=int, default=8765, help="localhost HTTP port (0 = ephemeral)")
+    parser.add_argument("--unix-socket", default=None, help="Unix domain socket path")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="concurrent requests served")
+    parser.add_argument("--health-port", type=int, default=None,
+                        help="serve /livez and /readyz on this localhost port (single process only)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="pre-forked worker processes for --serve (supervisor mode when > 1)")
+    parser.add_argument("--worker-max-uss-mb", type=float, default=500.0,
+                        help="recycle a worker once its unique memory (USS, MB) exceeds this")
+    parser.add_argument("--shared-cache-mb", type=float, default=None,
+                        help="host-wide cache tier shared by --workers processes (off by default)")
+    return parser.parse_args(argv)
 
 
 def setup_logging():
@@ -29,10 +66,37 @@ def setup_logging():
     )
 
 
-async def main():
+def serve_workers(args) -> int:
+    """Serve from pre-forked worker processes under a supervisor."""
+    from vpa.core.server import ServerConfig
+    from vpa.core.workers import WorkerSupervisor, WorkerConfig
+    
+    setup_logging()
+    if args.health_port is not None:
+        logging.getLogger(__name__).warning("--health-port is only served in single-process mode; "
+                                            "ignored with --workers")
+    supervisor = WorkerSupervisor(
+        ServerConfig(
+            http_port=args.http_port,
+            unix_socket_path=args.unix_socket,
+            max_concurrency=args.max_concurrency
+        ),
+        WorkerConfig(
+            workers=args.workers,
+            max_uss_mb=args.worker_max_uss_mb,
+            shared_cache_bytes=int(args.shared_cache_mb * 1024 * 1024) if args.shared_cache_mb else None
+        )
+    )
+    return supervisor.run()
+
+
+async def main(argv=None):
     """Main application entry point."""
+    args = parse_args(argv)
     setup_logging()
     logger = logging.getLogger(__name__)
+    server = None
+    health_server = None
     
     try:
         logger.info("🚀 Starting VPA - Virtual Personal Assistant")
@@ -40,6 +104,10 @@ async def main():
         # Start the application
         success = await app.startup()
         
+        # Export the startup span tree: VPA_TRACE_STARTUP=<trace file>
+        if os.environ.get("VPA_TRACE_STARTUP"):
+            app.export_startup_trace(os.environ["VPA_TRACE_STARTUP"])
+        
         if not success:
             logger.error("❌ Application startup failed")
             return 1
@@ -56,10 +124,25 @@ async def main():
         logger.info(f"   🔌 Services ready: {len(status['services_ready'])}")
         logger.info(f"   ✅ Performance targets achieved: {status['performance_targets']['startup_time_achieved']}")
         
+        # Liveness and readiness for orchestrators
+        if args.health_port is not None:
+            from vpa.core.health import HealthServer
+            health_server = HealthServer(port=args.health_port)
+            await health_server.start()
+        
+        # Serve requests through the measured front end
+        if args.serve:
+            from vpa.core.server import AssistantServer, ServerConfig
+            server = AssistantServer(ServerConfig(
+                http_port=args.http_port,
+                unix_socket_path=args.unix_socket,
+                max_concurrency=args.max_concurrency
+            ))
+            await server.start()
+        
         # Keep application running
         logger.info("🟢 VPA is ready and running...")
         
-        # Simulate some activity
         while app._running:
             await asyncio.sleep(1)
             
@@ -69,14 +152,25 @@ async def main():
         logger.error(f"💥 Application error: {e}")
         return 1
     finally:
-        # Graceful shutdown
+        # Drain in-flight work first, or wait for the drain a signal already started
         await app.shutdown()
+        if server is not None:
+            await server.stop()
+        if health_server is not None:
+            await health_server.stop()
+        
+        # Graceful shutdown of every constructed component
+        await container.stop()
         logger.info("🛑 VPA shutdown complete")
     
     return 0
 
 
 if __name__ == "__main__":
+    cli_args = parse_args()
+    if cli_args.serve and cli_args.workers > 1:
+        sys.exit(serve_workers(cli_args))
+    
     try:
         exit_code = asyncio.run(main())
         sys.exit(exit_code)
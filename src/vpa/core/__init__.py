@@ -0,0 +1,22 @@
+"""
+VPA Core
+Public names are resolved lazily (PEP 562) so importing the package stays cheap.
+Service instances named like their submodule (app, container, cache_manager, ...) are imported from the submodule.
+"""
+
+from .lazy_import import attach_lazy, lazy_attributes
+
+__getattr__, __dir__, __all__ = attach_lazy(__name__, lazy_attributes(
+    ("app", ["VPAApplication", "StartupPhase"]),
+    ("events", ["Event", "EventBus", "PerformanceMonitor", "event_bus"]),
+    ("plugins", ["Plugin", "PluginManager", "PluginMetadata", "plugin_manager"]),
+    ("plugin_cache", ["PluginCachePolicy"]),
+    ("services", ["ServiceRegistry", "ServiceSpec", "ServiceStatus", "ServiceStartupError"]),
+    ("container", ["ServiceContainer"]),
+    ("tracing", ["StartupTracer", "startup_tracer"]),
+    ("importtime", ["profile_imports", "parse_importtime"]),
+    ("cache_manager", ["VPACacheManager"]),
+    ("config_service", ["ConfigService", "ConfigSnapshot"]),
+    ("response_optimizer", ["VPAResponseOptimizer"]),
+    ("performance_monitor", ["VPAPerformanceMonitor"]),
+))
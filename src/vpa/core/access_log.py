@@ -0,0 +1,232 @@
+"""
+VPA Cache Access Log
+Compact, sampled record of hot cache keys and the recipe needed to recompute each of them.
+Target: Replay the hottest entries after a restart so caches are warm before traffic reaches them.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import dataclasses
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, asdict
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are still atomic, but concurrent savers may drop each other's counts
+    fcntl = None
+
+ACCESS_LOG_FILE = "access_log.json"
+
+# Changed records paired with the hits they gained since the previous snapshot
+LogChanges = List[Tuple["AccessRecord", int]]
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock on path + ".lock" between processes (a no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@dataclass
+class AccessRecord:
+    """Sampled accesses of one cache key."""
+    kind: str
+    key: str
+    recipe: Any
+    hits: int = 0
+    last_seen: float = 0.0
+
+
+class CacheAccessLog:
+    """
+    Sampled access log persisted alongside the disk cache tier.
+
+    Each access is recorded with probability sample_rate, together with a
+    JSON-serializable recipe the kind's warmer can recompute the entry from.
+    Entries are ranked by hit count decayed by age, and the log is pruned to
+    max_entries so it stays small regardless of traffic. Keys replayed by a
+    warmup are remembered until their first real access, which gives the
+    warmup hit ratio: the share of warmed entries that were actually used.
+
+    Every worker process saves to the same file: a save merges the hits
+    gained since the previous save into the file's records under a file
+    lock and replaces the file atomically.
+    """
+
+    def __init__(self, log_file: str = ACCESS_LOG_FILE, sample_rate: float = 0.1,
+                 max_entries: int = 500, half_life: float = 24 * 3600.0):
+        self.logger = logging.getLogger(__name__)
+        self.log_file = log_file
+        self.log_version = "1.0"
+        self.sample_rate = sample_rate
+        self.max_entries = max_entries
+        self.half_life = half_life
+        self.records: Dict[Tuple[str, str], AccessRecord] = {}
+        self._warmed: set = set()
+        self._unsaved: Dict[Tuple[str, str], int] = {}
+        self._dirty = False
+        self._metrics = {
+            "accesses": 0,
+            "sampled": 0,
+            "pruned": 0,
+            "warmed": 0,
+            "warm_hits": 0
+        }
+
+    def record(self, kind: str, key: str, recipe: Any, timestamp: Optional[float] = None) -> None:
+        """Count an access of a warmed entry and sample it into the log."""
+        self._metrics["accesses"] += 1
+        if self._warmed and (kind, key) in self._warmed:
+            self._warmed.discard((kind, key))
+            self._metrics["warm_hits"] += 1
+
+        if random.random() >= self.sample_rate:
+            return
+
+        self._metrics["sampled"] += 1
+        record = self.records.get((kind, key))
+        if record is None:
+            record = self.records[(kind, key)] = AccessRecord(kind, key, recipe)
+        record.hits += 1
+        record.last_seen = timestamp or time.time()
+        self._unsaved[(kind, key)] = self._unsaved.get((kind, key), 0) + 1
+        self._dirty = True
+
+        if len(self.records) > self.max_entries:
+            self._prune()
+
+    def score(self, record: AccessRecord, now: Optional[float] = None) -> float:
+        """Hit count halved for every half_life since the key was last seen."""
+        age = max(0.0, (now or time.time()) - record.last_seen)
+        return record.hits * 0.5 ** (age / self.half_life)
+
+    def top(self, limit: int) -> List[AccessRecord]:
+        """The limit hottest records, hottest first."""
+        return self._rank(self.records.values(), limit)
+
+    def _rank(self, records: Iterable[AccessRecord], limit: int) -> List[AccessRecord]:
+        now = time.time()
+        return sorted(records, key=lambda record: self.score(record, now), reverse=True)[:limit]
+
+    def _prune(self) -> None:
+        # Drop down to 90% so pruning is amortized over many records
+        keep = {(record.kind, record.key) for record in self.top(int(self.max_entries * 0.9))}
+        dropped = [ident for ident in self.records if ident not in keep]
+        for ident in dropped:
+            del self.records[ident]
+            self._unsaved.pop(ident, None)
+        self._metrics["pruned"] += len(dropped)
+
+    def mark_warmed(self, kind: str, key: str) -> None:
+        """Remember a key replayed by warmup until its first real access."""
+        self._warmed.add((kind, key))
+        self._metrics["warmed"] += 1
+
+    def _read_file(self) -> Dict[Tuple[str, str], AccessRecord]:
+        if not os.path.exists(self.log_file):
+            return {}
+
+        with open(self.log_file, 'r') as f:
+            log_data = json.load(f)
+
+        if log_data.get("version") != self.log_version:
+            return {}
+
+        records = {}
+        for record_data in log_data.get("records", []):
+            record = AccessRecord(**record_data)
+            records[(record.kind, record.key)] = record
+        return records
+
+    def load(self) -> bool:
+        """Load the persisted log."""
+        try:
+            records = self._read_file()
+        except Exception as e:
+            self.logger.debug(f"Failed to load cache access log: {e}")
+            return False
+
+        self.records.update(records)
+        self._unsaved.clear()
+        self._dirty = False
+        return bool(records)
+
+    def snapshot(self) -> Optional[LogChanges]:
+        """
+        Copy the records changed since the previous snapshot, or None if none did.
+
+        Call this on the thread that records accesses (the event loop); the
+        result can then be passed to write() on any thread.
+        """
+        if not self._dirty:
+            return None
+
+        changes = [
+            (dataclasses.replace(self.records[ident]), hits)
+            for ident, hits in self._unsaved.items() if ident in self.records
+        ]
+        self._unsaved = {}
+        self._dirty = False
+        return changes
+
+    def write(self, changes: Optional[LogChanges]) -> None:
+        """Merge a snapshot into the persisted log, replacing the file atomically."""
+        if not changes:
+            return
+
+        try:
+            with file_lock(self.log_file):
+                try:
+                    merged = self._read_file()
+                except ValueError as e:
+                    self.logger.warning(f"Replacing unreadable cache access log: {e}")
+                    merged = {}
+
+                for record, hits in changes:
+                    existing = merged.get((record.kind, record.key))
+                    if existing is None:
+                        merged[(record.kind, record.key)] = dataclasses.replace(record, hits=hits)
+                    else:
+                        existing.hits += hits
+                        existing.last_seen = max(existing.last_seen, record.last_seen)
+                        existing.recipe = record.recipe
+
+                log_data = {
+                    "version": self.log_version,
+                    "saved_at": time.time(),
+                    "records": [asdict(record) for record in self._rank(merged.values(), self.max_entries)]
+                }
+
+                temp_file = f"{self.log_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'w') as f:
+                    json.dump(log_data, f)
+                os.replace(temp_file, self.log_file)
+
+        except Exception as e:
+            self.logger.warning(f"Failed to save cache access log: {e}")
+
+    def save(self) -> None:
+        """Persist the records changed since the last save."""
+        self.write(self.snapshot())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Sampling counters, log size and the warmup hit ratio."""
+        warmed = self._metrics["warmed"]
+        return {
+            **self._metrics,
+            "entries": len(self.records),
+            "warm_pending": len(self._warmed),
+            "warmup_hit_ratio": self._metrics["warm_hits"] / warmed if warmed else 0.0
+        }
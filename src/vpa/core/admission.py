@@ -0,0 +1,377 @@
+"""
+VPA Admission Control
+Decides per request whether to admit, queue, degrade or reject based on live resource strain.
+Target: Shed low-priority work before interactive latency or the 2GB memory target suffer.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from enum import Enum
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+from collections import deque
+
+from .events import event_bus
+from .lazy_import import lazy_module
+from .supervisor import task_supervisor
+
+# psutil is only needed once resource sampling starts
+psutil = lazy_module("psutil")
+
+
+class RequestClass(Enum):
+    """Request classes in priority order (lower value is served first)."""
+    INTERACTIVE = 0
+    STANDARD = 1
+    BACKGROUND = 2
+
+    @classmethod
+    def parse(cls, value: Any, default: "RequestClass" = None) -> "RequestClass":
+        """Parse a request class name, falling back to default (STANDARD)."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls[str(value).upper()]
+        except KeyError:
+            return default or cls.STANDARD
+
+
+class AdmissionDecision(Enum):
+    ADMIT = "admit"
+    QUEUE = "queue"
+    DEGRADE = "degrade"
+    REJECT = "reject"
+
+
+class StrainLevel(Enum):
+    NORMAL = 0
+    ELEVATED = 1
+    CRITICAL = 2
+
+
+@dataclass
+class AdmissionPolicy:
+    """
+    Strain thresholds and per-class queueing limits.
+    Crossing any degrade_* threshold raises strain to ELEVATED, any reject_*
+    threshold to CRITICAL.
+    """
+    degrade_loop_lag_ms: float = 50.0
+    reject_loop_lag_ms: float = 250.0
+    degrade_rss_mb: float = 1536.0
+    reject_rss_mb: float = 2048.0
+    degrade_cpu_percent: float = 85.0
+    reject_cpu_percent: float = 98.0
+    max_queue_depth: Dict[RequestClass, int] = field(default_factory=lambda: {
+        RequestClass.INTERACTIVE: 64,
+        RequestClass.STANDARD: 32,
+        RequestClass.BACKGROUND: 8
+    })
+    queue_timeout: Dict[RequestClass, float] = field(default_factory=lambda: {
+        RequestClass.INTERACTIVE: 2.0,
+        RequestClass.STANDARD: 5.0,
+        RequestClass.BACKGROUND: 10.0
+    })
+    retry_after: float = 1.0
+
+
+@dataclass
+class ResourceSignals:
+    """Latest resource observations."""
+    loop_lag_ms: float = 0.0
+    rss_mb: float = 0.0
+    cpu_percent: float = 0.0
+    queue_depth: int = 0
+    in_flight: int = 0
+    sampled_at: float = 0.0
+
+
+@dataclass
+class AdmissionTicket:
+    """Granted request slot; degraded requests skip TTS and prefer cached results."""
+    request_class: RequestClass
+    decision: AdmissionDecision
+    degraded: bool
+    queued_ms: float = 0.0
+
+
+class AdmissionRejected(Exception):
+    """Request refused by admission control."""
+
+    def __init__(self, reason: str, request_class: RequestClass, retry_after: float):
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.request_class = request_class
+        self.retry_after = retry_after
+
+
+# Decision per strain level and class before slot availability is considered
+_DECISION_TABLE = {
+    StrainLevel.NORMAL: {
+        RequestClass.INTERACTIVE: AdmissionDecision.ADMIT,
+        RequestClass.STANDARD: AdmissionDecision.ADMIT,
+        RequestClass.BACKGROUND: AdmissionDecision.ADMIT
+    },
+    StrainLevel.ELEVATED: {
+        RequestClass.INTERACTIVE: AdmissionDecision.ADMIT,
+        RequestClass.STANDARD: AdmissionDecision.DEGRADE,
+        RequestClass.BACKGROUND: AdmissionDecision.REJECT
+    },
+    StrainLevel.CRITICAL: {
+        RequestClass.INTERACTIVE: AdmissionDecision.DEGRADE,
+        RequestClass.STANDARD: AdmissionDecision.REJECT,
+        RequestClass.BACKGROUND: AdmissionDecision.REJECT
+    }
+}
+
+# Numbers each controller's supervised sampler; unlike id(), never reused
+_controller_ids = itertools.count(1)
+
+
+class AdmissionController:
+    """
+    Concurrency slots guarded by resource-aware admission decisions.
+
+    Event-loop lag, RSS and CPU are sampled in the background; queue depth
+    and in-flight counts are tracked directly. Waiters are served by request
+    class priority, then arrival order, and give up at their class deadline.
+    """
+
+    def __init__(self, max_concurrency: int = 8, policy: Optional[AdmissionPolicy] = None,
+                 sample_interval: float = 0.5):
+        self.logger = logging.getLogger(__name__)
+        self.max_concurrency = max_concurrency
+        self.policy = policy or AdmissionPolicy()
+        self.sample_interval = sample_interval
+        self.signals = ResourceSignals()
+        self.strain = StrainLevel.NORMAL
+        self._strain_reasons: List[str] = []
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._queued: Dict[RequestClass, int] = {cls: 0 for cls in RequestClass}
+        self._sequence = itertools.count()
+        self._sampler: Optional[asyncio.Task] = None
+        # One sampler per controller; servers in tests and workers each own one
+        self._sampler_name = f"admission_sampler:{next(_controller_ids)}"
+        self._process = None
+        self._queue_waits_ms: deque = deque(maxlen=1000)
+        self._decisions: Dict[str, Dict[str, int]] = {
+            cls.name.lower(): {decision.value: 0 for decision in AdmissionDecision}
+            for cls in RequestClass
+        }
+        self._metrics = {
+            "queue_timeouts": 0,
+            "strain_changes": 0
+        }
+
+    def start(self) -> None:
+        """Start background sampling of loop lag, RSS and CPU under the task supervisor."""
+        if self._sampler is None or self._sampler.done():
+            self._sampler = task_supervisor.supervise(self._sampler_name, self._sample_loop).task
+
+    async def stop(self) -> None:
+        """Stop background sampling and drop the sampler from the supervisor."""
+        if self._sampler is not None:
+            await task_supervisor.stop(self._sampler_name, remove=True)
+            self._sampler = None
+
+    async def _sample_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            lag_ms = max(0.0, (loop.time() - scheduled - self.sample_interval) * 1000)
+            try:
+                self.sample(lag_ms)
+            except Exception as e:
+                self.logger.warning(f"Resource sampling failed: {e}")
+
+    def sample(self, loop_lag_ms: float) -> None:
+        """Read process RSS and CPU and record them with the measured loop lag."""
+        if self._process is None:
+            self._process = psutil.Process()
+            # First cpu_percent call only primes the counter
+            self._process.cpu_percent(None)
+        self.observe(
+            loop_lag_ms=loop_lag_ms,
+            rss_mb=self._process.memory_info().rss / 1024 / 1024,
+            cpu_percent=self._process.cpu_percent(None)
+        )
+
+    def observe(self, loop_lag_ms: Optional[float] = None, rss_mb: Optional[float] = None,
+                cpu_percent: Optional[float] = None) -> StrainLevel:
+        """Record resource observations and re-evaluate strain."""
+        if loop_lag_ms is not None:
+            # Smooth lag so a single slow callback does not flip the strain level
+            self.signals.loop_lag_ms = 0.5 * self.signals.loop_lag_ms + 0.5 * loop_lag_ms
+        if rss_mb is not None:
+            self.signals.rss_mb = rss_mb
+        if cpu_percent is not None:
+            self.signals.cpu_percent = cpu_percent
+        self.signals.sampled_at = time.time()
+        return self._evaluate_strain()
+
+    def _evaluate_strain(self) -> StrainLevel:
+        policy, signals = self.policy, self.signals
+        checks = [
+            ("loop_lag_ms", signals.loop_lag_ms, policy.degrade_loop_lag_ms, policy.reject_loop_lag_ms),
+            ("rss_mb", signals.rss_mb, policy.degrade_rss_mb, policy.reject_rss_mb),
+            ("cpu_percent", signals.cpu_percent, policy.degrade_cpu_percent, policy.reject_cpu_percent)
+        ]
+
+        level = StrainLevel.NORMAL
+        reasons = []
+        for name, value, degrade_at, reject_at in checks:
+            if value >= reject_at:
+                level = StrainLevel.CRITICAL
+                reasons.append(f"{name}={value:.1f}>={reject_at}")
+            elif value >= degrade_at:
+                level = max(level, StrainLevel.ELEVATED, key=lambda s: s.value)
+                reasons.append(f"{name}={value:.1f}>={degrade_at}")
+
+        if level != self.strain:
+            previous, self.strain = self.strain, level
+            self._metrics["strain_changes"] += 1
+            log = self.logger.warning if level.value > previous.value else self.logger.info
+            log(f"Resource strain {previous.name} -> {level.name} ({', '.join(reasons) or 'recovered'})")
+            event_bus.emit("resource.strain.detected", {
+                "strain_level": level.name.lower(),
+                "previous_level": previous.name.lower(),
+                "reasons": reasons,
+                "signals": self._signals_snapshot()
+            })
+        self._strain_reasons = reasons
+        return level
+
+    def decide(self, request_class: RequestClass) -> AdmissionDecision:
+        """Decision for a new request of the given class under current strain and load."""
+        decision = _DECISION_TABLE[self.strain][request_class]
+        if decision == AdmissionDecision.REJECT:
+            return decision
+
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            return decision
+        if self._queued[request_class] >= self.policy.max_queue_depth[request_class]:
+            return AdmissionDecision.REJECT
+        return AdmissionDecision.QUEUE
+
+    async def acquire(self, request_class: RequestClass = RequestClass.STANDARD) -> AdmissionTicket:
+        """
+        Obtain a request slot, waiting in the priority queue if necessary.
+        Raises AdmissionRejected when shed or when the class deadline passes.
+        """
+        decision = self.decide(request_class)
+        self._record(request_class, decision)
+
+        if decision == AdmissionDecision.REJECT:
+            reason = (f"{self.strain.name.lower()} strain ({', '.join(self._strain_reasons)})"
+                      if self.strain != StrainLevel.NORMAL else "queue full")
+            raise self._reject(request_class, reason)
+
+        queued_ms = 0.0
+        if decision == AdmissionDecision.QUEUE:
+            queued_ms = await self._wait_for_slot(request_class)
+            # Strain may have changed while waiting
+            decision = _DECISION_TABLE[self.strain][request_class]
+            if decision == AdmissionDecision.REJECT:
+                self._release_slot()
+                raise self._reject(request_class, f"{self.strain.name.lower()} strain after queueing")
+        else:
+            self._in_flight += 1
+
+        self.signals.in_flight = self._in_flight
+        return AdmissionTicket(request_class, decision,
+                               degraded=decision == AdmissionDecision.DEGRADE, queued_ms=queued_ms)
+
+    async def _wait_for_slot(self, request_class: RequestClass) -> float:
+        future = asyncio.get_running_loop().create_future()
+        entry = (request_class.value, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self._queued[request_class] += 1
+        self.signals.queue_depth = len(self._waiters)
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.policy.queue_timeout[request_class])
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._metrics["queue_timeouts"] += 1
+                raise self._reject(request_class, "queue deadline exceeded")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was already handed over; pass it on
+                self._release_slot()
+            else:
+                future.cancel()
+            raise
+        finally:
+            self._queued[request_class] -= 1
+            self._discard_cancelled_waiters()
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        self._queue_waits_ms.append(waited_ms)
+        return waited_ms
+
+    def release(self, ticket: AdmissionTicket) -> None:
+        """Return a slot obtained from acquire()."""
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self._discard_cancelled_waiters()
+        if self._waiters:
+            # Hand the slot straight to the highest-priority waiter
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+        else:
+            self._in_flight -= 1
+        self.signals.in_flight = self._in_flight
+        self.signals.queue_depth = len(self._waiters)
+
+    def _discard_cancelled_waiters(self) -> None:
+        if any(future.done() for _, _, future in self._waiters):
+            self._waiters = [entry for entry in self._waiters if not entry[2].done()]
+            heapq.heapify(self._waiters)
+        self.signals.queue_depth = len(self._waiters)
+
+    def _record(self, request_class: RequestClass, decision: AdmissionDecision) -> None:
+        self._decisions[request_class.name.lower()][decision.value] += 1
+        if decision in (AdmissionDecision.DEGRADE, AdmissionDecision.REJECT):
+            event_bus.emit("admission_decision", {
+                "request_class": request_class.name.lower(),
+                "decision": decision.value,
+                "strain_level": self.strain.name.lower(),
+                "reasons": list(self._strain_reasons)
+            })
+
+    def _reject(self, request_class: RequestClass, reason: str) -> AdmissionRejected:
+        return AdmissionRejected(reason, request_class, self.policy.retry_after)
+
+    def _signals_snapshot(self) -> Dict[str, Any]:
+        return {
+            "loop_lag_ms": self.signals.loop_lag_ms,
+            "rss_mb": self.signals.rss_mb,
+            "cpu_percent": self.signals.cpu_percent,
+            "queue_depth": self.signals.queue_depth,
+            "in_flight": self.signals.in_flight
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get admission decisions, queueing delay and current resource signals."""
+        waits = sorted(self._queue_waits_ms)
+        return {
+            **self._metrics,
+            "strain_level": self.strain.name.lower(),
+            "strain_reasons": list(self._strain_reasons),
+            "signals": self._signals_snapshot(),
+            "max_concurrency": self.max_concurrency,
+            "decisions": {cls: dict(counts) for cls, counts in self._decisions.items()},
+            "queue_wait_ms": {
+                "p50": waits[len(waits) // 2] if waits else 0.0,
+                "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            }
+        }
+
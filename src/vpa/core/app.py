@@ -13,15 +13,29 @@ from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
 
+from .container import container
 from .events import PerformanceMonitor, event_bus
+from .memory_governor import memory_governor
+from .health import (
+    HealthProbe, HealthStatus, health_registry, event_loop_lag_probe, executor_saturation_probe,
+    plugin_errors_probe, audio_backend_probe, disk_space_probe, supervised_tasks_probe
+)
 from .plugins import plugin_manager
+from .services import ServiceRegistry, ServiceSpec
+from .tracing import startup_tracer
+from .tasks import task_tracker, DrainReport
+from .supervisor import task_supervisor, RestartPolicy
+from .executors import executor_service
+from .config_service import config_service
 
 
 class StartupPhase(Enum):
-    """Application startup phases for monitoring."""
+    """
+    Application startup phases for monitoring.
+    Services start concurrently during STARTING_SERVICES; their individual
+    progress is reported under "services" in get_status().
+    """
     INITIALIZING = "initializing"
-    LOADING_PLUGINS = "loading_plugins"  
-    CONFIGURING = "configuring"
     STARTING_SERVICES = "starting_services"
     READY = "ready"
     FAILED = "failed"
@@ -56,40 +70,49 @@ class VPAApplication:
         self._shutdown_callbacks: List[Callable] = []
         self._health_check_interval = 30.0  # seconds
         self._max_startup_time = 10.0  # seconds
+        self._drain_timeout = 10.0  # seconds in-flight work gets at shutdown
+        self._cache_compaction_interval = 300.0  # seconds between disk cache compactions
+        self._cache_warmup_entries = 50  # hottest recorded cache entries replayed after startup
+        self.last_warmup: Optional[Dict[str, Any]] = None
+        self.last_drain: Optional[DrainReport] = None
+        self._shutdown_done: Optional[asyncio.Event] = None  # set once an in-progress shutdown finishes
+        
+        # Startup services declared as a dependency graph
+        self.services = ServiceRegistry()
+        self._register_core_services()
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
         # Subscribe to critical events
-        event_bus.subscribe("critical_error", self._handle_critical_error)
-        event_bus.subscribe("plugin_load_failed", self._handle_plugin_error)
+        event_bus.subscribe("critical_error", self._handle_critical_error, async_callback=True)
+        event_bus.subscribe("plugin_load_failed", self._handle_plugin_error, async_callback=True)
+        event_bus.subscribe("config_changed", self._handle_config_change, async_callback=True)
     
     @PerformanceMonitor.track_execution_time("application_startup")
     async def startup(self) -> bool:
         """Execute complete application startup sequence with monitoring."""
+        with startup_tracer.span("app_startup", category="app"):
+            success = await self._run_startup()
+        
+        # Startup tracing ends once the application reports ready
+        startup_tracer.stop()
+        return success
+    
+    async def _run_startup(self) -> bool:
+        """Run the startup sequence inside the startup trace span."""
         try:
             self.logger.info("🚀 Starting VPA application...")
             
-            # Phase 1: Initialize core systems
-            if not await self._initialize_core_systems():
-                return False
-            
-            # Phase 2: Load plugins with timeout protection
-            if not await self._load_plugins_with_timeout():
-                return False
+            # Start independent services concurrently along the dependency graph
+            self.state.startup_phase = StartupPhase.STARTING_SERVICES
+            await self.services.start_all()
             
-            # Phase 3: Configure application
-            if not await self._configure_application():
-                return False
-            
-            # Phase 4: Start services
-            if not await self._start_services():
-                return False
-            
-            # Phase 5: Final readiness check
-            if not await self._final_readiness_check():
-                return False
+            # Final readiness check
+            with startup_tracer.span("final_readiness_check", category="app"):
+                if not await self._final_readiness_check():
+                    return False
             
             # Calculate and validate startup time
             self.state.startup_time = time.time() - self.start_time
@@ -99,7 +122,19 @@ class VPAApplication:
             self._running = True
             
             # Start background monitoring
-            asyncio.create_task(self._health_monitor_loop())
+            self._register_health_probes()
+            task_supervisor.supervise("health_monitor", self._health_monitor_loop)
+            self.state.services_ready.append("health_monitor")
+            memory_governor.start()
+            self.state.services_ready.append("memory_governor")
+            task_supervisor.supervise("executor_tuning", executor_service.tune_loop)
+            self.state.services_ready.append("executor_tuning")
+            task_supervisor.supervise("cache_compaction", self._cache_compaction_loop)
+            task_supervisor.supervise("config_watch", config_service.watch)
+            
+            # Preload plugins the usage profile expects to be needed soon
+            task_supervisor.supervise("plugin_preload", plugin_manager.preload_likely_plugins,
+                                      restart=RestartPolicy.NEVER)
             
             self.logger.info(f"✅ VPA application ready in {self.state.startup_time:.2f}s")
             
@@ -109,6 +144,9 @@ class VPAApplication:
                 "memory_usage": self.state.memory_usage_mb
             })
             
+            # Warm caches from the access log only once the application is ready
+            task_supervisor.supervise("cache_warmup", self._cache_warmup, restart=RestartPolicy.NEVER)
+            
             return True
             
         except Exception as e:
@@ -117,9 +155,23 @@ class VPAApplication:
             self.state.error_count += 1
             return False
     
+    def _register_core_services(self) -> None:
+        """Declare built-in startup services, their dependencies and criticality."""
+        self.services.register(ServiceSpec(
+            "core_systems", self._initialize_core_systems, critical=True
+        ))
+        self.services.register(ServiceSpec(
+            "configuration", self._configure_application, critical=True
+        ))
+        # Plugin loading applies its own per-phase timeouts and degrades internally;
+        # plugins read the configuration, so they load after it
+        self.services.register(ServiceSpec(
+            "plugins", self._load_plugins_with_timeout, dependencies=("configuration",),
+            critical=False, timeout=12.0
+        ))
+    
     async def _initialize_core_systems(self) -> bool:
         """Initialize core system components."""
-        self.state.startup_phase = StartupPhase.INITIALIZING
         self.logger.info("Initializing core systems...")
         
         try:
@@ -141,7 +193,6 @@ class VPAApplication:
     
     async def _load_plugins_with_timeout(self) -> bool:
         """Load plugins with timeout protection."""
-        self.state.startup_phase = StartupPhase.LOADING_PLUGINS
         self.logger.info("Loading plugins...")
         
         try:
@@ -154,11 +205,12 @@ class VPAApplication:
                 timeout=plugin_timeout
             )
             
-            # Load priority plugins first
-            await asyncio.wait_for(
-                plugin_manager.load_all_plugins(),
-                timeout=plugin_timeout
-            )
+            # Load priority plugins first; lazy mode defers to usage-driven preload
+            if not plugin_manager.lazy_loading:
+                await asyncio.wait_for(
+                    plugin_manager.load_all_plugins(),
+                    timeout=plugin_timeout
+                )
             
             plugin_metrics = plugin_manager.get_metrics()
             self.logger.info(f"Loaded {plugin_metrics['plugins_loaded']} plugins")
@@ -180,13 +232,16 @@ class VPAApplication:
     
     async def _configure_application(self) -> bool:
         """Configure application settings and preferences."""
-        self.state.startup_phase = StartupPhase.CONFIGURING
         self.logger.info("Configuring application...")
         
         try:
-            # Configuration would go here - placeholder for now
-            await asyncio.sleep(0.1)  # Simulate configuration time
-            
+            # Parse every layer once; later reads go to the in-memory snapshot
+            snapshot = await config_service.aload()
+            self.logger.info(f"Configuration snapshot v{snapshot.version} loaded with {len(snapshot)} sections")
+            self._apply_ui_settings(snapshot)
+            # Components built before the first load pick it up here; later loads arrive as config_changed
+            if container.is_initialized("audio_system"):
+                container.get("audio_system").apply_config(snapshot)
             self.state.services_ready.append("configuration")
             return True
             
@@ -194,25 +249,22 @@ class VPAApplication:
             self.logger.error(f"Application configuration failed: {e}")
             return False
     
-    async def _start_services(self) -> bool:
-        """Start application services."""
-        self.state.startup_phase = StartupPhase.STARTING_SERVICES
-        self.logger.info("Starting services...")
-        
-        try:
-            # Service startup would go here - placeholder for now
-            services_to_start = ["event_system", "plugin_system", "health_monitor"]
-            
-            for service in services_to_start:
-                await asyncio.sleep(0.05)  # Simulate service startup
-                self.state.services_ready.append(service)
-                self.logger.debug(f"Service '{service}' started")
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Service startup failed: {e}")
-            return False
+    def _apply_ui_settings(self, snapshot) -> None:
+        """Apply the backend side of the UI settings: the log level chosen under ui.advanced."""
+        advanced = snapshot.get_path("ui.advanced") or {}
+        level_name = "DEBUG" if advanced.get("debug_mode") else advanced.get("log_level")
+        if not level_name:
+            return
+        level = logging.getLevelName(str(level_name).upper())
+        if isinstance(level, int):
+            logging.getLogger().setLevel(level)
+        else:
+            self.logger.warning(f"Ignoring unknown log level in UI settings: {level_name}")
+    
+    async def _handle_config_change(self, event) -> None:
+        """Re-apply UI settings when they changed on disk."""
+        if any(key.startswith("ui.advanced.") for key in event.data.get("keys", ())):
+            self._apply_ui_settings(config_service.snapshot)
     
     async def _final_readiness_check(self) -> bool:
         """Perform final readiness checks."""
@@ -249,6 +301,24 @@ class VPAApplication:
         else:
             self.logger.warning(f"⚠️ Memory usage target missed: {self.state.memory_usage_mb:.1f}MB > {memory_target_mb}MB")
     
+    def _register_health_probes(self) -> None:
+        """Register the probes behind the health loop and the /livez and /readyz endpoints."""
+        async def startup_phase() -> tuple:
+            ready = self.state.startup_phase == StartupPhase.READY and self._running
+            status = HealthStatus.PASS if ready else HealthStatus.FAIL
+            return status, self.state.startup_phase.value, {"services_ready": len(self.state.services_ready)}
+        
+        health_registry.register(HealthProbe("startup_phase", startup_phase, cache_ttl=0.0))
+        health_registry.register(event_loop_lag_probe())
+        health_registry.register(executor_saturation_probe(executor_service))
+        health_registry.register(plugin_errors_probe(plugin_manager))
+        health_registry.register(disk_space_probe([".", "cache"]))
+        health_registry.register(supervised_tasks_probe(task_supervisor))
+        try:
+            health_registry.register(audio_backend_probe(container.proxy("audio_system")))
+        except KeyError:
+            self.logger.debug("Audio system not registered; skipping audio health probe")
+    
     async def _health_monitor_loop(self) -> None:
         """Background health monitoring loop."""
         while self._running:
@@ -258,25 +328,59 @@ class VPAApplication:
             except Exception as e:
                 self.logger.error(f"Health check failed: {e}")
     
+    async def _cache_compaction_loop(self) -> None:
+        """Periodically compact the disk cache tier once something has used the cache."""
+        while self._running:
+            await asyncio.sleep(self._cache_compaction_interval)
+            if container.is_initialized("cache_manager"):
+                result = await container.get("cache_manager").compact()
+                self.logger.debug(f"Disk cache compacted: {result}")
+    
+    async def _cache_warmup(self) -> None:
+        """Replay the hottest cache entries recorded before the last restart."""
+        manager = container.get("cache_manager")
+        if not manager.access_log.records:
+            return
+        # Constructing the response optimizer registers its prompt warmer
+        container.get("response_optimizer")
+        self.last_warmup = await manager.warm_up(self._cache_warmup_entries)
+        self.logger.info(f"Cache warmup replayed {self.last_warmup['warmed']} of "
+                         f"{self.last_warmup['candidates']} entries in {self.last_warmup['duration']:.2f}s")
+        await event_bus.emit_async("cache_warmup_complete", self.last_warmup, source="app")
+    
+    def _warmup_status(self) -> Optional[Dict[str, Any]]:
+        if self.last_warmup is None or not container.is_initialized("cache_manager"):
+            return self.last_warmup
+        # The hit ratio grows as real requests reach the warmed entries
+        access_log = container.get("cache_manager").access_log.get_metrics()
+        return {**self.last_warmup, "warmup_hit_ratio": access_log["warmup_hit_ratio"]}
+    
     async def _perform_health_check(self) -> None:
         """Perform comprehensive health check."""
         try:
-            # Update system metrics
-            memory_info = PerformanceMonitor.monitor_memory_usage()
-            self.state.memory_usage_mb = memory_info["memory_mb"]
+            # Reuse the governor's frequent RSS sample
+            self.state.memory_usage_mb = memory_governor.sample()
             self.state.last_health_check = time.time()
             
-            # Get component metrics
-            event_metrics = event_bus.get_metrics()
-            plugin_metrics = plugin_manager.get_metrics()
+            # Probes run concurrently, each bounded by its own deadline
+            report = await health_registry.run()
+            
+            # Component counters only; memory was sampled above
+            event_metrics = event_bus.get_metrics(include_memory=False)
+            plugin_metrics = plugin_manager.get_metrics(include_memory=False)
+            
+            # Idle plugins are unloaded by the memory governor under pressure
+            plugin_manager.usage_profile.save()
             
             # Log health summary
-            self.logger.debug(f"Health check: {memory_info['memory_mb']:.1f}MB, "
+            self.logger.debug(f"Health check: {report.status.value}, {self.state.memory_usage_mb:.1f}MB, "
                             f"{event_metrics['events_dispatched']} events, "
                             f"{plugin_metrics['plugins_loaded']} plugins")
             
             # Emit health status
             await event_bus.emit_async("health_check", {
+                "status": report.status.value,
+                "probes": {name: result.status.value for name, result in report.probes.items()},
                 "memory_usage_mb": self.state.memory_usage_mb,
                 "uptime": time.time() - self.start_time,
                 "services_ready": self.state.services_ready,
@@ -309,21 +413,34 @@ class VPAApplication:
     def _signal_handler(self, signum, frame) -> None:
         """Handle system signals for graceful shutdown."""
         self.logger.info(f"Received signal {signum} - initiating shutdown")
-        asyncio.create_task(self.shutdown())
+        try:
+            task_tracker.spawn(self.shutdown(), kind="shutdown", name="signal_shutdown")
+        except RuntimeError:
+            # No running loop: nothing is in flight, stop directly
+            self._running = False
     
     def add_shutdown_callback(self, callback: Callable) -> None:
         """Add callback to be executed during shutdown."""
         self._shutdown_callbacks.append(callback)
     
     async def shutdown(self) -> None:
-        """Graceful application shutdown with cleanup."""
+        """Graceful application shutdown with cleanup; later callers wait for the one in progress."""
+        if self._shutdown_done is not None:
+            await self._shutdown_done.wait()
+            return
         if not self._running:
             return
         
         self.logger.info("🛑 Shutting down VPA application...")
         self._running = False
+        self._shutdown_done = asyncio.Event()
+        deadline = time.monotonic() + self._drain_timeout
         
         try:
+            # Stop admitting work and let in-flight requests, TTS and events finish
+            task_tracker.begin_drain()
+            self.last_drain = await task_tracker.drain(self._drain_timeout)
+            
             # Execute shutdown callbacks
             for callback in self._shutdown_callbacks:
                 try:
@@ -340,14 +457,27 @@ class VPAApplication:
                 "error_count": self.state.error_count
             })
             
+            # Events raised by shutdown handlers get whatever time is left
+            final_drain = await task_tracker.drain(max(0.0, deadline - time.monotonic()))
+            self.last_drain = self.last_drain.merge(final_drain)
+            
             # Cleanup components
             plugin_manager.cleanup_all_plugins()
             event_bus.cleanup()
             
-            self.logger.info("✅ VPA application shutdown complete")
+            self.logger.info(f"✅ VPA application shutdown complete "
+                             f"({self.last_drain.completed_total} tasks completed, "
+                             f"{self.last_drain.cancelled_total} background cancelled, "
+                             f"{self.last_drain.abandoned_total} abandoned)")
             
         except Exception as e:
             self.logger.error(f"Shutdown failed: {e}")
+        finally:
+            self._shutdown_done.set()
+    
+    def export_startup_trace(self, filename: str = "startup_trace.json") -> str:
+        """Export the recorded startup span tree as Chrome trace JSON."""
+        return startup_tracer.export_chrome_trace(filename)
     
     def get_status(self) -> Dict[str, Any]:
         """Get comprehensive application status."""
@@ -360,6 +490,14 @@ class VPAApplication:
             "error_count": self.state.error_count,
             "services_ready": self.state.services_ready,
             "last_health_check": self.state.last_health_check,
+            "services": self.services.get_status(),
+            "health": health_registry.last_results(),
+            "tasks": task_tracker.get_metrics(),
+            "supervisor": task_supervisor.get_status(),
+            "executors": executor_service.get_metrics(),
+            "config": config_service.get_metrics(),
+            "cache_warmup": self._warmup_status(),
+            "last_drain": self.last_drain.to_dict() if self.last_drain else None,
             "performance_targets": {
                 "startup_time_target": self._max_startup_time,
                 "startup_time_achieved": self.state.startup_time < self._max_startup_time,
@@ -369,5 +507,10 @@ class VPAApplication:
         }
 
 
-# Global application instance
-app = VPAApplication()
\ No newline at end of file
+# Global application instance, constructed on first access
+app = container.register(
+    "app", VPAApplication, on_stop=lambda application: application.shutdown(),
+    # The drain runs while everything serving requests is still up
+    depends_on=("event_bus", "executor_service", "task_supervisor", "memory_governor", "cache_manager",
+                "response_optimizer", "plugin_manager", "audio_system")
+)
\ No newline at end of file
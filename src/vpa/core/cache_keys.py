@@ -0,0 +1,319 @@
+"""
+VPA Cache Keys
+Canonical, type-tagged encoding of call arguments hashed with blake2b.
+Target: Cache keys that are stable across dict ordering, distinguish values whose repr() hides state, and are no slower than repr() keys for small arguments and far faster for large ones.
+"""
+
+import sys
+import json
+import time
+import enum
+import struct
+import hashlib
+import dataclasses
+from pathlib import PurePath
+from typing import Dict, Any, Callable, List, Optional
+
+KEY_DIGEST_SIZE = 16
+# Longest top-level string keyed through repr(); longer ones hash faster through the canonical encoder
+SHORT_STR_LENGTH = 256
+
+_LENGTH = struct.Struct("<Q")
+_FLOAT = struct.Struct("<d")
+
+
+def _put_bytes(out: bytearray, tag: bytes, data) -> None:
+    out += tag
+    out += _LENGTH.pack(len(data))
+    out += data
+
+
+def _encode_none(value, out: bytearray) -> None:
+    out += b"N"
+
+
+def _encode_bool(value, out: bytearray) -> None:
+    out += b"T" if value else b"F"
+
+
+def _encode_int(value, out: bytearray) -> None:
+    _put_bytes(out, b"i", value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True))
+
+
+def _encode_float(value, out: bytearray) -> None:
+    out += b"f"
+    out += _FLOAT.pack(value)
+
+
+def _encode_str(value, out: bytearray) -> None:
+    data = value.encode("utf-8", "surrogatepass")
+    out += b"s"
+    out += _LENGTH.pack(len(data))
+    out += data
+
+
+def _encode_bytes(value, out: bytearray) -> None:
+    _put_bytes(out, b"b", memoryview(value).cast("B"))
+
+
+def _encode_sequence(tag: bytes):
+    def encode(value, out: bytearray) -> None:
+        out += tag
+        out += _LENGTH.pack(len(value))
+        lookup = _ENCODERS.get
+        for item in value:
+            (lookup(type(item)) or _encode)(item, out)
+    return encode
+
+
+_encode_tuple = _encode_sequence(b"t")
+
+
+def _encode_mapping(value, out: bytearray) -> None:
+    out += b"d"
+    out += _LENGTH.pack(len(value))
+    lookup = _ENCODERS.get
+    if all(type(key) is str for key in value):
+        # String keys have a total order, so sort them directly
+        for key in sorted(value):
+            _encode_str(key, out)
+            item = value[key]
+            (lookup(type(item)) or _encode)(item, out)
+        return
+
+    # Otherwise order entries by their encoding so insertion order does not matter
+    entries = []
+    for key, item in value.items():
+        entry = bytearray()
+        _encode(key, entry)
+        _encode(item, entry)
+        entries.append(entry)
+    entries.sort()
+    for entry in entries:
+        out += entry
+
+
+def _encode_set(value, out: bytearray) -> None:
+    members = []
+    for item in value:
+        member = bytearray()
+        _encode(item, member)
+        members.append(member)
+    members.sort()
+    out += b"S"
+    out += _LENGTH.pack(len(members))
+    for member in members:
+        out += member
+
+
+def _type_name(value) -> bytes:
+    cls = type(value)
+    return f"{cls.__module__}.{cls.__qualname__}".encode()
+
+
+_ENCODERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    tuple: _encode_tuple,
+    list: _encode_sequence(b"l"),
+    dict: _encode_mapping,
+    set: _encode_set,
+    frozenset: _encode_set,
+}
+
+
+def _is_ndarray(value) -> bool:
+    # numpy is only consulted when something has already imported it
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _encode(value, out: bytearray) -> None:
+    # Exact built-in types cannot carry __cache_key__, so they dispatch first
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        encoder(value, out)
+        return
+
+    hook = getattr(type(value), "__cache_key__", None)
+    if hook is not None:
+        _put_bytes(out, b"K", _type_name(value))
+        _encode(hook(value), out)
+    elif isinstance(value, enum.Enum):
+        _put_bytes(out, b"E", _type_name(value))
+        _encode(value.value, out)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        _put_bytes(out, b"D", _type_name(value))
+        fields = dataclasses.fields(value)
+        out += _LENGTH.pack(len(fields))
+        for field in fields:
+            _encode_str(field.name, out)
+            _encode(getattr(value, field.name), out)
+    elif _is_ndarray(value):
+        numpy = sys.modules["numpy"]
+        _put_bytes(out, b"A", value.dtype.str.encode())
+        _encode_tuple(value.shape, out)
+        _put_bytes(out, b"b", memoryview(numpy.ascontiguousarray(value)).cast("B"))
+    elif isinstance(value, PurePath):
+        _put_bytes(out, b"P", str(value).encode("utf-8", "surrogatepass"))
+    else:
+        # Subclasses of the built-in types encode like their base. Anything
+        # else is rejected: its repr() cannot be trusted to include its state,
+        # and its identity is reused once it is freed and means nothing in
+        # another process. Such types can define __cache_key__ instead.
+        for base, base_encoder in _ENCODERS.items():
+            if isinstance(value, base):
+                _put_bytes(out, b"C", _type_name(value))
+                base_encoder(value, out)
+                return
+        raise TypeError(
+            f"Cannot build a cache key from {_type_name(value).decode()}; "
+            f"define __cache_key__ to return the state that identifies it"
+        )
+
+
+_PRIMITIVES = frozenset((type(None), bool, int, float, str))
+_STR_ONLY = frozenset((str,))
+_JSON_ENCODE = json.JSONEncoder(check_circular=False, sort_keys=True, separators=(",", ":")).encode
+
+
+def _json_shaped(value) -> bool:
+    """True for primitives, lists and str-keyed dicts nesting only those; JSON keeps them all apart."""
+    value_type = type(value)
+    if value_type is dict:
+        if not _STR_ONLY.issuperset(map(type, value)):
+            return False
+        items = value.values()
+    elif value_type is list:
+        items = value
+    else:
+        return value_type in _PRIMITIVES
+    return _PRIMITIVES.issuperset(map(type, items)) or all(map(_json_shaped, items))
+
+
+def _fast_material(args: tuple, kwargs: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Key material for the common argument shapes, built by the C-level
+    repr() and json encoders instead of the canonical encoder; None otherwise.
+
+    Short primitives are keyed by their repr(), which tells 1, 1.0, True and
+    "1" apart. Lists and str-keyed dicts of primitives are keyed by sorted
+    JSON. Each form is tagged, so it never matches another form's material.
+    """
+    values = args + tuple(kwargs.values()) if kwargs else args
+    flat = True
+    for value in values:
+        value_type = type(value)
+        if value_type is str:
+            if len(value) > SHORT_STR_LENGTH:
+                return None
+        elif value_type not in _PRIMITIVES:
+            if value_type is not dict and value_type is not list:
+                return None
+            flat = False
+    try:
+        if flat:
+            material = repr((args, sorted(kwargs.items())) if kwargs else args)
+            return b"r" + material.encode("utf-8", "surrogatepass")
+        if all(map(_json_shaped, values)):
+            return b"j" + _JSON_ENCODE([args, kwargs]).encode("ascii")
+    except ValueError:
+        # Integers past the interpreter's digit limit have no repr()
+        pass
+    return None
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """Deterministic, type-tagged encoding of value."""
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def make_key(*args, **kwargs) -> str:
+    """
+    Cache key for a call: blake2b over the canonical encoding of args and kwargs.
+
+    Handles primitives, bytes, lists, tuples, dicts and sets (order
+    independent), enums, dataclasses, paths and numpy arrays. Objects can
+    supply their own key material with a __cache_key__(self) method; other
+    objects raise TypeError. Short primitive and JSON-shaped arguments take
+    a faster path with its own, equally stable material (see _fast_material).
+    """
+    material = _fast_material(args, kwargs)
+    if material is None:
+        material = bytearray()
+        _encode_tuple(args, material)
+        _encode_mapping(kwargs, material)
+    return hashlib.blake2b(material, digest_size=KEY_DIGEST_SIZE).hexdigest()
+
+
+def legacy_key(*args, **kwargs) -> str:
+    """The previous repr-based key, kept as the benchmark baseline."""
+    key_data = str(args) + str(sorted(kwargs.items()))
+    return hashlib.md5(key_data.encode()).hexdigest()
+
+
+def _benchmark_payloads() -> Dict[str, tuple]:
+    return {
+        "small": (("voice_01", 22050, 16, "Hello there."), {}),
+        "nested": (({"prompt": "summarize", "options": {"temperature": 0.7, "stop": ["\n"] * 8},
+                     "history": [{"role": "user", "content": "x" * 200}] * 20},), {"model": "default"}),
+        "large_bytes": ((b"\x00\x01" * 256 * 1024,), {}),
+        "large_text": (("lorem ipsum " * 20000,), {"voice": "voice_01"}),
+    }
+
+
+def benchmark(iterations: int = 2000, min_seconds: float = 0.0) -> Dict[str, Dict[str, float]]:
+    """
+    Keys per second of make_key and legacy_key for representative argument shapes.
+    Nested dicts stay slower than legacy_key, which skips sorting their keys.
+    """
+    results = {}
+    for name, (args, kwargs) in _benchmark_payloads().items():
+        row = {}
+        for label, fn in (("canonical", make_key), ("legacy", legacy_key)):
+            count = 0
+            started = time.perf_counter()
+            while True:
+                for _ in range(iterations):
+                    fn(*args, **kwargs)
+                count += iterations
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_seconds:
+                    break
+            row[f"{label}_keys_per_second"] = count / elapsed
+        row["speedup"] = row["canonical_keys_per_second"] / row["legacy_keys_per_second"]
+        results[name] = row
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: python -m vpa.core.cache_keys."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cache key generation throughput")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per timing batch")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="minimum time per measurement")
+    parser.add_argument("--json", action="store_true", help="emit the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.iterations, args.min_seconds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'payload':<12} {'canonical/s':>14} {'legacy/s':>14} {'speedup':>8}")
+        for name, row in results.items():
+            print(f"{name:<12} {row['canonical_keys_per_second']:>14,.0f} "
+                  f"{row['legacy_keys_per_second']:>14,.0f} {row['speedup']:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,37 @@ Implements intelligent caching for frequent operations
 
 import time
 import json
-import hashlib
-from typing import Any, Optional, Dict
-from functools import wraps, lru_cache
+import asyncio
+import logging
+import inspect
+import weakref
+import dataclasses
+from typing import Any, Callable, Optional, Dict, Mapping, NamedTuple, Tuple
+from functools import wraps
 from pathlib import Path
 
+from .container import container
+from .lazy_import import optional_module, require_module
+from .memory_cache import BoundedMemoryCache, EvictionPolicy
+from .disk_cache import DiskCache
+from .executors import executor_service
+from .tasks import task_tracker
+from .cache_keys import make_key
+from .freshness import FreshnessPolicy, StampedValue, BackgroundRefresher, FRESH, STALE, EXPIRED
+from .access_log import CacheAccessLog, ACCESS_LOG_FILE
+from .config_service import config_service
+
+# Optional dependency for YAML configuration files, loaded on first use
+yaml = optional_module("yaml")
+
+_MISSING = object()
+
+
+class _Failure(NamedTuple):
+    """Exception raised by a single-flight computation, re-raised in each of its callers"""
+    error: Exception
+
+
 class VPACacheManager:
     """
     Intelligent cache manager for VPA performance optimization
@@ -19,98 +45,417 @@ class VPACacheManager:
     - Event handler caching
     - Plugin metadata caching
     - LLM response caching
+    - Byte-bounded memory tier with per-namespace quotas (config, plugin, llm, tts)
+    - Persistent disk tier in cache_dir for namespaces that should survive restarts
+    - Stale-while-revalidate and refresh-ahead for decorated functions
+    - Optional cross-process shared-memory tier between memory and disk
+    - Sampled access log of hot keys, replayed by warm_up() after a restart
     """
     
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str = "cache", max_memory_bytes: int = 64 * 1024 * 1024,
+                 eviction_policy: str = "w-tinylfu", namespace_quotas: Optional[Dict[str, int]] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024, persistent_namespaces=("llm", "tts"),
+                 promote_after_hits: int = 2, max_concurrent_refreshes: int = 4,
+                 access_sample_rate: float = 0.1):
+        self.logger = logging.getLogger(__name__)
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self._memory_cache: Dict[str, Any] = {}
-        self._cache_timestamps: Dict[str, float] = {}
+        self._memory_cache = BoundedMemoryCache(
+            max_bytes=max_memory_bytes,
+            policy=EvictionPolicy.parse(eviction_policy),
+            namespace_quotas=namespace_quotas
+        )
+        self.disk_cache = DiskCache(self.cache_dir / "cache.db", max_bytes=max_disk_bytes)
+        self.persistent_namespaces = set(persistent_namespaces)
+        self.promote_after_hits = promote_after_hits
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._refresher = BackgroundRefresher(max_concurrent=max_concurrent_refreshes)
+        self.shared_cache = None
+        self.shared_namespaces = set()
+        self.access_log = CacheAccessLog(str(self.cache_dir / ACCESS_LOG_FILE), sample_rate=access_sample_rate)
+        self.access_log.load()
+        self._warmers: Dict[str, Callable[[Any], Any]] = {
+            "config": self._warm_config,
+            "plugin": lambda recipe: self._load_plugin_metadata(recipe["path"])
+        }
+        self._unkeyable_funcs = weakref.WeakSet()
+        self._metrics = {
+            "async_hits": 0,
+            "async_misses": 0,
+            "coalesced": 0,
+            "bypassed": 0,
+            "stale_hits": 0,
+            "refresh_ahead": 0,
+            "unkeyable": 0
+        }
         
     def cache_key(self, *args, **kwargs) -> str:
-        """Generate cache key from arguments"""
-        key_data = str(args) + str(sorted(kwargs.items()))
-        return hashlib.md5(key_data.encode()).hexdigest()
+        """Generate cache key from arguments (canonical encoding, see cache_keys.make_key)"""
+        return make_key(*args, **kwargs)
+    
+    def attach_shared_cache(self, shared_cache, namespaces=("llm", "tts")) -> None:
+        """Use a SharedMemoryCache, owned by the caller, as a tier between memory and disk"""
+        self.shared_cache = shared_cache
+        self.shared_namespaces = set(namespaces)
+    
+    def get(self, key: str, namespace: str = "default", default: Any = None) -> Any:
+        """Look up memory, then the shared tier, then disk; hot entries move to the faster tiers"""
+        value = self._get_in_memory(key, namespace)
+        if value is not _MISSING:
+            return value
+        if namespace not in self.persistent_namespaces:
+            return default
+        return self._promote_disk_hit(key, namespace, self.disk_cache.get(namespace, key), default)
+    
+    async def aget(self, key: str, namespace: str = "default", default: Any = None) -> Any:
+        """get() for async callers: a disk tier read runs on the io pool instead of the event loop"""
+        value = self._get_in_memory(key, namespace)
+        if value is not _MISSING:
+            return value
+        if namespace not in self.persistent_namespaces:
+            return default
+        return self._promote_disk_hit(key, namespace, await self.disk_cache.aget(namespace, key), default)
+    
+    def _get_in_memory(self, key: str, namespace: str) -> Any:
+        """Look up the memory and shared tiers; _MISSING on a miss"""
+        value = self._memory_cache.get(key, _MISSING, namespace=namespace)
+        if value is not _MISSING:
+            return value
+        
+        if self.shared_cache is not None and namespace in self.shared_namespaces:
+            hit = self.shared_cache.get(namespace, key)
+            if hit is not None:
+                ttl = hit.expires_at - time.time() if hit.expires_at is not None else None
+                self._memory_cache.set(key, hit.value, namespace=namespace, ttl=ttl)
+                return hit.value
+        return _MISSING
+    
+    def _promote_disk_hit(self, key: str, namespace: str, hit, default: Any) -> Any:
+        """Copy a disk hit into the shared tier, and into memory once it is hot"""
+        if hit is None:
+            return default
+        ttl = hit.expires_at - time.time() if hit.expires_at is not None else None
+        if self.shared_cache is not None and namespace in self.shared_namespaces:
+            self.shared_cache.set(namespace, key, hit.value, ttl=ttl)
+        if hit.hits >= self.promote_after_hits:
+            self._memory_cache.set(key, hit.value, namespace=namespace, ttl=ttl)
+        return hit.value
     
-    def cached_config_load(self, config_path: str) -> Dict[str, Any]:
-        """Cache configuration loading with file change detection"""
+    def set(self, key: str, value: Any, namespace: str = "default", ttl: Optional[float] = None,
+            persist: Optional[bool] = None) -> None:
+        """Store in the memory tier, the shared tier if attached, and queue a disk write for persistent namespaces"""
+        self._memory_cache.set(key, value, namespace=namespace, ttl=ttl)
+        if self.shared_cache is not None and namespace in self.shared_namespaces:
+            self.shared_cache.set(namespace, key, value, ttl=ttl)
+        if persist if persist is not None else namespace in self.persistent_namespaces:
+            self.disk_cache.put(namespace, key, value, ttl=ttl)
+    
+    def delete(self, key: str, namespace: str = "default") -> None:
+        self._memory_cache.delete(key, namespace=namespace)
+        if self.shared_cache is not None and namespace in self.shared_namespaces:
+            self.shared_cache.delete(namespace, key)
+        if namespace in self.persistent_namespaces:
+            self.disk_cache.delete(namespace, key)
+    
+    async def compact(self) -> Dict[str, int]:
+        """Compact the disk tier and save the access log on the io pool"""
+        # Snapshot on the loop, where accesses are recorded; merge and write on the io pool
+        await executor_service.run("io", self.access_log.write, self.access_log.snapshot())
+        return await executor_service.run("io", self.disk_cache.compact)
+    
+    def close(self) -> None:
+        """Write queued disk entries, close the database and save the access log"""
+        self.disk_cache.close()
+        self.access_log.save()
+    
+    def register_warmer(self, kind: str, warmer: Callable[[Any], Any]) -> None:
+        """Recompute access log entries of kind from their recipe during warm_up (sync or async)"""
+        self._warmers[kind] = warmer
+    
+    async def warm_up(self, top_n: int = 50, pause: float = 0.01) -> Dict[str, Any]:
+        """
+        Replay the top_n hottest access log entries through their warmers.
+        
+        Runs at low priority: one entry at a time, synchronous warmers on the
+        io pool, with a pause between entries so live requests come first.
+        """
+        started = time.time()
+        report = {"candidates": 0, "warmed": 0, "failed": 0, "skipped": 0}
+        for record in self.access_log.top(top_n):
+            report["candidates"] += 1
+            warmer = self._warmers.get(record.kind)
+            if warmer is None:
+                report["skipped"] += 1
+                continue
+            try:
+                if inspect.iscoroutinefunction(warmer):
+                    await warmer(record.recipe)
+                else:
+                    await executor_service.run("io", warmer, record.recipe)
+            except Exception as e:
+                self.logger.debug(f"Warming {record.kind} entry {record.key} failed: {e}")
+                report["failed"] += 1
+                continue
+            self.access_log.mark_warmed(record.kind, record.key)
+            report["warmed"] += 1
+            await asyncio.sleep(pause)
+        report["duration"] = time.time() - started
+        return report
+    
+    def cached_config_load(self, config_path: str) -> Mapping[str, Any]:
+        """
+        Cache configuration loading with file change detection.
+        Layer files of the loaded config service are served from its
+        snapshot without touching the file; other files are re-read when
+        their mtime changes.
+        """
+        self.access_log.record("config", config_path, {"path": config_path})
+        layer = config_service.layer(config_path)
+        if layer is not None:
+            return layer
+        return self._load_config(config_path)
+    
+    def _warm_config(self, recipe: Dict[str, Any]) -> None:
+        # Layer files are already parsed into the config snapshot by the time warm_up runs
+        if config_service.layer(recipe["path"]) is None:
+            self._load_config(recipe["path"])
+    
+    def _load_config(self, config_path: str) -> Dict[str, Any]:
         config_file = Path(config_path)
         
         if not config_file.exists():
+            self._memory_cache.delete(config_path, namespace="config")
             return {}
         
+        # Keyed by path so a changed file replaces its previous entry
         file_mtime = config_file.stat().st_mtime
-        cache_key = f"config_{config_path}_{file_mtime}"
-        
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
+        cached = self._memory_cache.get(config_path, namespace="config")
+        if cached is not None and cached[0] == file_mtime:
+            return cached[1]
         
         # Load and cache configuration
         with open(config_file, 'r') as f:
             if config_path.endswith('.json'):
                 config_data = json.load(f)
             else:  # YAML
-                import yaml
-                config_data = yaml.safe_load(f)
+                config_data = require_module(yaml, "pyyaml", "YAML configuration").safe_load(f)
         
-        self._memory_cache[cache_key] = config_data
-        self._cache_timestamps[cache_key] = time.time()
+        self._memory_cache.set(config_path, (file_mtime, config_data), namespace="config")
         
         return config_data
     
-    @lru_cache(maxsize=500)
     def cached_plugin_metadata(self, plugin_path: str) -> Dict[str, Any]:
         """Cache plugin metadata for faster loading"""
+        self.access_log.record("plugin", plugin_path, {"path": plugin_path})
+        return self._load_plugin_metadata(plugin_path)
+    
+    def _load_plugin_metadata(self, plugin_path: str) -> Dict[str, Any]:
         plugin_file = Path(plugin_path)
         
         if not plugin_file.exists():
+            self._memory_cache.delete(plugin_path, namespace="plugin")
             return {}
         
+        stat = plugin_file.stat()
+        cached = self._memory_cache.get(plugin_path, namespace="plugin")
+        if cached is not None and cached['modified'] == stat.st_mtime:
+            return cached
+        
         # Extract plugin metadata (simplified)
         metadata = {
             'name': plugin_file.stem,
             'path': str(plugin_file),
-            'size': plugin_file.stat().st_size,
-            'modified': plugin_file.stat().st_mtime
+            'size': stat.st_size,
+            'modified': stat.st_mtime
         }
+        self._memory_cache.set(plugin_path, metadata, namespace="plugin")
         
         return metadata
     
-    def cache_decorator(self, ttl: int = 300):
-        """Decorator for caching function results"""
+    def cache_decorator(self, ttl: int = 300, namespace: str = "default",
+                        stale_while_revalidate: float = 0.0, refresh_ahead: float = 0.0):
+        """
+        Decorator for caching function results; coroutine functions get async_cache_decorator.
+        
+        Results are fresh for ttl seconds and served stale for a further
+        stale_while_revalidate seconds while a refresh runs on the io pool.
+        Hot keys are refreshed during the last refresh_ahead fraction of ttl.
+        
+        Every argument is part of the key, including self for methods, so
+        the classes of decorated methods must define __cache_key__ (see
+        cache_keys.make_key). Calls whose arguments cannot be keyed run
+        uncached, with a warning logged the first time for each function.
+        """
         def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                return self.async_cache_decorator(
+                    ttl=ttl, namespace=namespace,
+                    stale_while_revalidate=stale_while_revalidate, refresh_ahead=refresh_ahead
+                )(func)
+            policy = FreshnessPolicy(ttl, stale_while_revalidate, refresh_ahead)
+            
             @wraps(func)
             def wrapper(*args, **kwargs):
-                cache_key = f"{func.__name__}_{self.cache_key(*args, **kwargs)}"
+                cache_key = self._decorated_key(func, args, kwargs)
+                if cache_key is None:
+                    return func(*args, **kwargs)
+                
+                def refresh():
+                    self._store_stamped(namespace, cache_key, func(*args, **kwargs), policy)
                 
-                # Check if cached and not expired
-                if (cache_key in self._memory_cache and 
-                    cache_key in self._cache_timestamps and
-                    time.time() - self._cache_timestamps[cache_key] < ttl):
-                    return self._memory_cache[cache_key]
+                # Expired entries read as misses
+                cached = self._lookup_stamped(namespace, cache_key, policy, refresh)
+                if cached is not _MISSING:
+                    return cached
                 
                 # Execute function and cache result
                 result = func(*args, **kwargs)
-                self._memory_cache[cache_key] = result
-                self._cache_timestamps[cache_key] = time.time()
+                self._store_stamped(namespace, cache_key, result, policy)
                 
                 return result
             return wrapper
         return decorator
     
+    def async_cache_decorator(self, ttl: int = 300, namespace: str = "default",
+                              stale_while_revalidate: float = 0.0, refresh_ahead: float = 0.0):
+        """
+        Decorator for caching awaited results of coroutine functions.
+        
+        Concurrent misses on the same key share a single call, and stale or
+        nearly expired hot entries are refreshed as tracked background tasks
+        (see cache_decorator for the TTL parameters). Callers may pass
+        cache_bypass=True to skip the cache or cache_ttl to override the soft
+        TTL of the stored result; neither is forwarded to the wrapped function.
+        """
+        def decorator(func):
+            policy = FreshnessPolicy(ttl, stale_while_revalidate, refresh_ahead)
+            
+            @wraps(func)
+            async def wrapper(*args, cache_bypass: bool = False, cache_ttl: Optional[float] = None, **kwargs):
+                if cache_bypass:
+                    self._metrics["bypassed"] += 1
+                    return await func(*args, **kwargs)
+                
+                call_policy = policy if cache_ttl is None else dataclasses.replace(policy, ttl=cache_ttl)
+                cache_key = self._decorated_key(func, args, kwargs)
+                if cache_key is None:
+                    return await func(*args, **kwargs)
+                
+                async def refresh():
+                    await self._compute_single_flight(namespace, cache_key, lambda: func(*args, **kwargs), call_policy)
+                
+                stamped = await self.aget(cache_key, namespace=namespace, default=_MISSING)
+                cached = self._use_stamped(namespace, cache_key, stamped, call_policy, refresh)
+                if cached is not _MISSING:
+                    self._metrics["async_hits"] += 1
+                    return cached
+                
+                pending = self._inflight.get((namespace, cache_key))
+                if pending is not None:
+                    self._metrics["coalesced"] += 1
+                    return await self._await_flight(pending)
+                
+                self._metrics["async_misses"] += 1
+                return await self._compute_single_flight(
+                    namespace, cache_key, lambda: func(*args, **kwargs), call_policy
+                )
+            return wrapper
+        return decorator
+    
+    def _decorated_key(self, func, args, kwargs) -> Optional[str]:
+        """Cache key of a decorated call, or None when its arguments cannot be keyed"""
+        try:
+            return f"{func.__module__}.{func.__qualname__}_{self.cache_key(*args, **kwargs)}"
+        except TypeError as e:
+            self._metrics["unkeyable"] += 1
+            # Warned once per function: an uncached method is a silent slowdown otherwise
+            if func not in self._unkeyable_funcs:
+                self._unkeyable_funcs.add(func)
+                self.logger.warning(f"Not caching {func.__module__}.{func.__qualname__}: {e}")
+            else:
+                self.logger.debug(f"Not caching {func.__qualname__}: {e}")
+            return None
+    
+    async def _compute_single_flight(self, namespace: str, cache_key: str, compute,
+                                     policy: FreshnessPolicy) -> Any:
+        """Run compute() once for all concurrent callers of cache_key and return its outcome"""
+        flight = self._inflight.get((namespace, cache_key))
+        if flight is None:
+            flight = self._start_flight(namespace, cache_key, compute, policy)
+        return await self._await_flight(flight)
+    
+    def _start_flight(self, namespace: str, cache_key: str, compute, policy: FreshnessPolicy) -> asyncio.Task:
+        """Run compute() as tracked request work: a cancelled caller leaves it running and shutdown drains it"""
+        async def fill():
+            try:
+                result = await compute()
+            except Exception as e:
+                # Returned rather than raised: each caller re-raises it, the task itself succeeded
+                return _Failure(e)
+            self._store_stamped(namespace, cache_key, result, policy)
+            return result
+        
+        ident = (namespace, cache_key)
+        flight = task_tracker.spawn(fill(), kind="request", name=f"cache_fill:{cache_key}")
+        self._inflight[ident] = flight
+        
+        def finished(task):
+            if self._inflight.get(ident) is task:
+                del self._inflight[ident]
+        flight.add_done_callback(finished)
+        return flight
+    
+    @staticmethod
+    async def _await_flight(flight: asyncio.Task) -> Any:
+        outcome = await asyncio.shield(flight)
+        if isinstance(outcome, _Failure):
+            raise outcome.error
+        return outcome
+    
+    def _lookup_stamped(self, namespace: str, cache_key: str, policy: FreshnessPolicy, refresh) -> Any:
+        """Return a cached result, scheduling refresh() when it is stale or due ahead; _MISSING on a miss"""
+        stamped = self.get(cache_key, namespace=namespace, default=_MISSING)
+        return self._use_stamped(namespace, cache_key, stamped, policy, refresh)
+    
+    def _use_stamped(self, namespace: str, cache_key: str, stamped: Any, policy: FreshnessPolicy, refresh) -> Any:
+        """The value of a looked-up StampedValue per its freshness state; _MISSING if missing or expired"""
+        if not isinstance(stamped, StampedValue):
+            return _MISSING
+        
+        now = time.time()
+        stamped.accesses += 1
+        state = stamped.state(policy, now)
+        if state == EXPIRED:
+            return _MISSING
+        if state != FRESH:
+            self._metrics["stale_hits" if state == STALE else "refresh_ahead"] += 1
+            self._refresher.schedule((namespace, cache_key), refresh)
+        return stamped.value
+    
+    def _store_stamped(self, namespace: str, cache_key: str, value: Any, policy: FreshnessPolicy) -> None:
+        self.set(cache_key, StampedValue.stamp(value, policy), namespace=namespace, ttl=policy.hard_ttl)
+    
     def clear_expired_cache(self, max_age: int = 3600):
-        """Clear expired cache entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, timestamp in self._cache_timestamps.items()
-            if current_time - timestamp > max_age
-        ]
-        
-        for key in expired_keys:
-            self._memory_cache.pop(key, None)
-            self._cache_timestamps.pop(key, None)
-        
-        return len(expired_keys)
+        """Clear expired cache entries from the memory tier"""
+        return self._memory_cache.expire(max_age)
+    
+    def trim_memory_cache(self, keep_fraction: float = 0.5) -> int:
+        """Evict in-memory entries in eviction-policy order, keeping keep_fraction of them"""
+        return self._memory_cache.trim(keep_fraction)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit ratio, evictions and stored bytes of both tiers, plus decorator, refresh and warmup counters"""
+        return {
+            "memory": self._memory_cache.get_metrics(),
+            "disk": self.disk_cache.get_metrics(),
+            "async": {**self._metrics, "inflight": len(self._inflight)},
+            "refresh": self._refresher.get_metrics(),
+            "shared": self.shared_cache.get_metrics() if self.shared_cache is not None else None,
+            "access_log": self.access_log.get_metrics()
+        }
 
-# Global cache manager instance
-cache_manager = VPACacheManager()
+# Global cache manager instance, constructed on first access
+cache_manager = container.register(
+    "cache_manager", VPACacheManager, on_stop=lambda manager: manager.close(),
+    depends_on=("executor_service",)
+)
@@ -0,0 +1,412 @@
+"""
+VPA Config Service
+Layered configuration loaded once into an immutable snapshot, watched via inotify (polling fallback) and swapped atomically.
+Target: Hot-path configuration reads are attribute lookups with no file I/O.
+"""
+
+import os
+import sys
+import json
+import time
+import ctypes
+import ctypes.util
+import struct
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Dict, Any, Iterable, Iterator, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+
+from .container import container
+from .events import event_bus
+from .executors import executor_service
+from .lazy_import import optional_module, require_module
+
+# Optional dependency for YAML configuration files, loaded on first use
+yaml = optional_module("yaml")
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ConfigLayer:
+    """A configuration file, merged at the root or under section."""
+    path: str
+    section: Optional[str] = None
+
+
+DEFAULT_LAYERS = (
+    ConfigLayer("default.yaml"),
+    ConfigLayer("audio.yaml", section="audio"),
+    ConfigLayer("ui_settings.json", section="ui"),
+    ConfigLayer("voice_settings.json", section="voice"),
+)
+
+
+def load_config_file(path) -> Dict[str, Any]:
+    """Parse a JSON or YAML file; empty files are empty configurations."""
+    text = Path(path).read_text(encoding="utf-8")
+    if not text.strip():
+        return {}
+    if str(path).endswith(".json"):
+        data = json.loads(text)
+    else:
+        data = require_module(yaml, "pyyaml", "YAML configuration").safe_load(text)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not contain a mapping")
+    return data
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ConfigSnapshot(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, ConfigSnapshot):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """
+    Immutable view of merged configuration.
+
+    Sections are reachable as attributes or items (snapshot.audio.voice_speed,
+    snapshot["audio"]["voice_speed"]) and by dotted path via get_path().
+    Nested mappings are snapshots and lists are tuples.
+    """
+
+    __slots__ = ("_data", "version", "loaded_at")
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, version: int = 0,
+                 loaded_at: Optional[float] = None):
+        object.__setattr__(self, "_data", {key: _freeze(value) for key, value in (data or {}).items()})
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "loaded_at", time.time() if loaded_at is None else loaded_at)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, {self.to_dict()!r})"
+
+    def get_path(self, path: str, default: Any = None) -> Any:
+        """Look up a dotted path such as 'audio.voice_speed'."""
+        node: Any = self
+        for part in path.split("."):
+            if not isinstance(node, ConfigSnapshot):
+                return default
+            node = node._data.get(part, _MISSING)
+            if node is _MISSING:
+                return default
+        return node
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mutable deep copy of the configuration."""
+        return {key: _thaw(value) for key, value in self._data.items()}
+
+
+def merge_layers(layers: Sequence[Tuple[Optional[str], Dict[str, Any]]]) -> Dict[str, Any]:
+    """Deep-merge layer data in order; later layers override earlier ones."""
+    def merge(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+        for key, value in source.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                merge(target[key], value)
+            elif isinstance(value, dict):
+                target[key] = {}
+                merge(target[key], value)
+            else:
+                target[key] = value
+
+    merged: Dict[str, Any] = {}
+    for section, data in layers:
+        merge(merged, {section: data} if section else data)
+    return merged
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Dotted-path diff of two configurations: added, removed and changed leaf keys."""
+    diff: Dict[str, Dict[str, Any]] = {"added": {}, "removed": {}, "changed": {}}
+
+    def walk(prefix: str, before: Any, after: Any) -> None:
+        # Sections that appear or disappear are reported leaf by leaf
+        if before is _MISSING and isinstance(after, dict):
+            before = {}
+        elif after is _MISSING and isinstance(before, dict):
+            after = {}
+        if isinstance(before, dict) and isinstance(after, dict):
+            for key in before.keys() | after.keys():
+                path = f"{prefix}.{key}" if prefix else key
+                walk(path, before.get(key, _MISSING), after.get(key, _MISSING))
+        elif before is _MISSING:
+            diff["added"][prefix] = after
+        elif after is _MISSING:
+            diff["removed"][prefix] = before
+        elif before != after:
+            diff["changed"][prefix] = {"old": before, "new": after}
+
+    walk("", old, new)
+    return diff
+
+
+# inotify(7) event masks for directory watches
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Non-blocking inotify descriptor watching directories for file changes."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.fd = fd
+        self._directories: Dict[int, Path] = {}
+
+    def add_directory(self, path: Path) -> None:
+        # Watch the directory: editors often replace files by rename
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        self._directories[wd] = path
+
+    def read_paths(self) -> Set[Path]:
+        """Drain pending events; returns the paths they name."""
+        paths = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset < len(buffer):
+                wd, _, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                directory = self._directories.get(wd)
+                if directory is not None and name:
+                    paths.add(directory / os.fsdecode(name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ConfigService:
+    """
+    Owns the application's configuration snapshot.
+
+    All layers are parsed once into a merged, immutable ConfigSnapshot.
+    watch() reloads files that changed on disk (inotify on Linux, stat
+    polling elsewhere), swaps in a new snapshot and emits config_changed
+    with a dotted-path diff. Readers hold on to whichever snapshot they
+    looked up; it never changes underneath them.
+    """
+
+    def __init__(self, config_dir: str = "config", layers: Sequence[ConfigLayer] = DEFAULT_LAYERS,
+                 poll_interval: float = 2.0, debounce: float = 0.1, use_inotify: bool = True,
+                 access_log=None):
+        self.logger = logging.getLogger(__name__)
+        # Optional CacheAccessLog; parsed layer files are recorded as "config" accesses
+        self.access_log = access_log
+        self.config_dir = Path(config_dir).absolute()
+        self.layers = list(layers)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self._paths = [self.config_dir / layer.path for layer in self.layers]
+        self._snapshot = ConfigSnapshot()
+        self._signatures: Dict[Path, Optional[Tuple[int, int]]] = {}
+        self._layer_data: Dict[Path, Dict[str, Any]] = {}
+        self._layer_snapshots: Dict[Path, ConfigSnapshot] = {}
+        self._reload_lock = threading.Lock()
+        self._metrics = {
+            "reloads": 0,
+            "changes": 0,
+            "reload_errors": 0,
+            "watch_mode": None
+        }
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Dotted-path lookup in the current snapshot."""
+        return self._snapshot.get_path(path, default)
+
+    def layer(self, path) -> Optional[ConfigSnapshot]:
+        """
+        Parsed contents of one layer file as of the last reload, or None
+        when path is not a layer or nothing has been loaded yet.
+        """
+        return self._layer_snapshots.get(Path(path).absolute())
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self) -> ConfigSnapshot:
+        """Parse every layer and install the first snapshot."""
+        self.reload(force=True)
+        return self._snapshot
+
+    async def aload(self) -> ConfigSnapshot:
+        """load() on the io pool, recording the parsed files from the event loop."""
+        snapshot = await executor_service.run("io", self.load)
+        self._record_loads(str(path) for path in self._paths if self._signatures.get(path) is not None)
+        return snapshot
+
+    def _record_loads(self, files: Iterable[str]) -> None:
+        if self.access_log is None:
+            return
+        for file in files:
+            self.access_log.record("config", file, {"path": file})
+
+    def reload(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Re-parse layers whose files changed and swap in a new snapshot.
+        Returns the change description, or None if nothing changed. A file
+        that fails to parse keeps its previous contents.
+        """
+        with self._reload_lock:
+            files = []
+            for path in self._paths:
+                signature = self._signature(path)
+                if not force and path in self._signatures and signature == self._signatures[path]:
+                    continue
+                self._signatures[path] = signature
+                try:
+                    data = load_config_file(path) if signature is not None else {}
+                except Exception as e:
+                    self._metrics["reload_errors"] += 1
+                    self.logger.error(f"Keeping previous configuration for {path}: {e}")
+                    continue
+                self._layer_data[path] = data
+                self._layer_snapshots[path] = ConfigSnapshot(data)
+                files.append(str(path))
+
+            self._metrics["reloads"] += 1
+            if not files:
+                return None
+
+            previous = self._snapshot
+            merged = merge_layers([
+                (layer.section, self._layer_data.get(path, {})) for layer, path in zip(self.layers, self._paths)
+            ])
+            diff = diff_config(previous.to_dict(), merged)
+            if previous.version and not any(diff.values()):
+                return None
+
+            self._snapshot = ConfigSnapshot(merged, version=previous.version + 1)
+            if previous.version:
+                self._metrics["changes"] += 1
+            return {"version": self._snapshot.version, "files": files, **diff}
+
+    async def refresh(self) -> Optional[Dict[str, Any]]:
+        """Reload on the io pool and emit config_changed if the configuration changed."""
+        change = await executor_service.run("io", self.reload)
+        if change is not None:
+            self._record_loads(change["files"])
+        if change is not None and change["version"] > 1:
+            change["keys"] = sorted({*change["added"], *change["removed"], *change["changed"]})
+            await event_bus.emit_async("config_changed", change, source="config_service")
+        return change
+
+    def _open_inotify(self) -> Optional[_Inotify]:
+        if not (self.use_inotify and sys.platform.startswith("linux")):
+            return None
+        try:
+            watcher = _Inotify()
+        except (OSError, AttributeError) as e:
+            self.logger.debug(f"inotify unavailable, polling instead: {e}")
+            return None
+        try:
+            for directory in {path.parent for path in self._paths}:
+                watcher.add_directory(directory)
+        except OSError as e:
+            self.logger.debug(f"Cannot watch configuration directory, polling instead: {e}")
+            watcher.close()
+            return None
+        return watcher
+
+    async def watch(self) -> None:
+        """Reload whenever a layer file changes; run under the task supervisor."""
+        watcher = self._open_inotify()
+        if watcher is None:
+            self._metrics["watch_mode"] = "polling"
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                await self.refresh()
+
+        self._metrics["watch_mode"] = "inotify"
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        watched = set(self._paths)
+        loop.add_reader(watcher.fd, ready.set)
+        try:
+            while True:
+                await ready.wait()
+                # Coalesce the burst of events a single save produces
+                await asyncio.sleep(self.debounce)
+                ready.clear()
+                if watcher.read_paths() & watched:
+                    await self.refresh()
+        finally:
+            loop.remove_reader(watcher.fd)
+            watcher.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._metrics,
+            "version": self._snapshot.version,
+            "files": [str(path) for path in self._paths if self._signatures.get(path) is not None]
+        }
+
+
+def _build_config_service() -> ConfigService:
+    # Imported here: the cache manager itself reads layer files through this service
+    from .cache_manager import cache_manager
+    return ConfigService(access_log=cache_manager.access_log)
+
+
+# Global configuration service, constructed on first access
+config_service = container.register("config_service", _build_config_service)
@@ -0,0 +1,214 @@
+"""
+VPA Service Container
+Lazy construction of application-wide components with explicit lifecycle hooks.
+Target: Importing vpa.core builds nothing; components are created on first use.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator, Tuple
+from dataclasses import dataclass
+
+
+@dataclass
+class _Registration:
+    """Factory and lifecycle hooks for a single component."""
+    name: str
+    factory: Callable[[], Any]
+    on_start: Optional[Callable[[Any], Any]] = None
+    on_stop: Optional[Callable[[Any], Any]] = None
+    depends_on: Tuple[str, ...] = ()
+    instance: Any = None
+    initialized: bool = False
+    started: bool = False
+
+
+class LazyServiceProxy:
+    """
+    Module-level stand-in for a container component.
+    Attribute access constructs the component on first use and forwards to it,
+    as do truth tests, len(), iteration and membership tests. isinstance() and
+    identity checks see the proxy; callers that need the component itself
+    use container.get(name).
+    """
+
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: "ServiceContainer", name: str):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._container.get(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._container.get(self._name), attr, value)
+
+    # Implicit special-method lookups bypass __getattr__, so the common ones are forwarded explicitly
+    def __bool__(self) -> bool:
+        return bool(self._container.get(self._name))
+
+    def __len__(self) -> int:
+        return len(self._container.get(self._name))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._container.get(self._name))
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._container.get(self._name)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self._container.is_initialized(self._name) else "lazy"
+        return f"<LazyServiceProxy {self._name} ({state})>"
+
+
+class ServiceContainer:
+    """
+    Registry of lazily constructed singletons.
+    Components are built on first access and started explicitly. At stop,
+    a component is stopped before the components it declares in depends_on;
+    otherwise stops run in reverse construction order.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._registrations: Dict[str, _Registration] = {}
+        self._construction_order: List[str] = []
+        self._constructing: List[str] = []
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 on_start: Optional[Callable[[Any], Any]] = None,
+                 on_stop: Optional[Callable[[Any], Any]] = None,
+                 depends_on: Iterable[str] = ()) -> LazyServiceProxy:
+        """
+        Register a component factory and return its lazy module-level proxy.
+        depends_on names the components it uses at runtime, which stay up until it has stopped.
+        """
+        with self._lock:
+            self._registrations[name] = _Registration(name, factory, on_start, on_stop, tuple(depends_on))
+        return LazyServiceProxy(self, name)
+
+    def proxy(self, name: str) -> LazyServiceProxy:
+        """Return a lazy proxy for a registered component."""
+        if name not in self._registrations:
+            raise KeyError(f"Service '{name}' is not registered")
+        return LazyServiceProxy(self, name)
+
+    def get(self, name: str) -> Any:
+        """Return the component, constructing it on first access."""
+        registration = self._registrations.get(name)
+        if registration is None:
+            raise KeyError(f"Service '{name}' is not registered")
+        if registration.initialized:
+            return registration.instance
+
+        with self._lock:
+            if registration.initialized:
+                return registration.instance
+            if name in self._constructing:
+                cycle = " -> ".join(self._constructing + [name])
+                raise RuntimeError(f"Circular service construction: {cycle}")
+
+            self._constructing.append(name)
+            try:
+                registration.instance = registration.factory()
+            finally:
+                self._constructing.pop()
+
+            registration.initialized = True
+            self._construction_order.append(name)
+            self.logger.debug(f"Service '{name}' constructed on first use")
+            return registration.instance
+
+    def override(self, name: str, instance: Any) -> None:
+        """Replace a component instance, e.g. with a test double."""
+        with self._lock:
+            registration = self._registrations[name]
+            registration.instance = instance
+            registration.initialized = True
+            if name not in self._construction_order:
+                self._construction_order.append(name)
+
+    def is_initialized(self, name: str) -> bool:
+        """Whether the component has been constructed."""
+        registration = self._registrations.get(name)
+        return bool(registration and registration.initialized)
+
+    def initialized_services(self) -> List[str]:
+        """Names of constructed components in construction order."""
+        return list(self._construction_order)
+
+    async def start(self, *names: str) -> None:
+        """Construct the named components (all when none given) and run their start hooks."""
+        for name in names or list(self._registrations):
+            registration = self._registrations[name]
+            instance = self.get(name)
+            if registration.started:
+                continue
+            if registration.on_start:
+                await self._call_hook(registration.on_start, instance)
+            registration.started = True
+
+    def stop_order(self) -> List[str]:
+        """Constructed components in stop order: consumers before the components they depend on."""
+        constructed = list(reversed(self._construction_order))
+        order: List[str] = []
+        visiting = set()
+
+        def visit(name: str) -> None:
+            # A dependency cycle falls back to reverse construction order
+            if name in order or name in visiting:
+                return
+            visiting.add(name)
+            for consumer in constructed:
+                if name in self._registrations[consumer].depends_on:
+                    visit(consumer)
+            order.append(name)
+
+        for name in constructed:
+            visit(name)
+        return order
+
+    async def stop(self) -> None:
+        """Run stop hooks for constructed components, consumers first."""
+        for name in self.stop_order():
+            registration = self._registrations[name]
+            if registration.on_stop is None or not registration.initialized:
+                continue
+            try:
+                await self._call_hook(registration.on_stop, registration.instance)
+            except Exception as e:
+                self.logger.error(f"Stop hook for service '{name}' failed: {e}")
+            registration.started = False
+
+    def reset(self, name: str) -> None:
+        """Forget a constructed instance so the next access builds a fresh one."""
+        with self._lock:
+            registration = self._registrations[name]
+            registration.instance = None
+            registration.initialized = False
+            registration.started = False
+            if name in self._construction_order:
+                self._construction_order.remove(name)
+
+    @staticmethod
+    async def _call_hook(hook: Callable[[Any], Any], instance: Any) -> None:
+        result = hook(instance)
+        if asyncio.iscoroutine(result):
+            await result
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get construction and lifecycle state of every registered component."""
+        return {
+            name: {
+                "initialized": registration.initialized,
+                "started": registration.started
+            }
+            for name, registration in self._registrations.items()
+        }
+
+
+# Global service container for application-wide components
+container = ServiceContainer()
@@ -0,0 +1,356 @@
+"""
+VPA Disk Cache
+Persistent SQLite (WAL) cache tier with checksums, TTL metadata, size-bounded eviction and batched background writes.
+Target: Warm LLM and TTS caches across restarts without blocking the event loop on disk writes.
+"""
+
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, NamedTuple
+from dataclasses import dataclass
+
+from .executors import executor_service
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    checksum TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+
+_NOT_PENDING = object()
+
+
+class DiskHit(NamedTuple):
+    value: Any
+    expires_at: Optional[float]
+    hits: int
+
+
+@dataclass
+class _PendingWrite:
+    value: Any
+    blob: bytes
+    checksum: str
+    created_at: float
+    expires_at: Optional[float]
+
+
+def checksum(blob: bytes) -> str:
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded persistent cache in a single SQLite database.
+
+    Writes, deletes and access-time updates are queued and applied in
+    batches on the shared io pool; reads see queued writes immediately.
+    get() reads on the calling thread; async callers use aget().
+    Every value is stored with a checksum that is verified on read, and
+    entries past their TTL read as misses. When the database exceeds
+    max_bytes the least recently accessed entries are evicted down to
+    90% of the budget. The stored byte total is summed once and then kept
+    up to date by each batch, so the budget check does not scan the table;
+    compaction re-sums it.
+    """
+
+    def __init__(self, path, max_bytes: int = 256 * 1024 * 1024, pool: str = "io"):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.pool = pool
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Optional[_PendingWrite]] = {}
+        self._in_flight: Dict[Tuple[str, str], Optional[_PendingWrite]] = {}
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._flush_scheduled = False
+        self._write_lock = threading.Lock()
+        self._stored_bytes: Optional[int] = None
+        self._metrics = {
+            "reads": 0,
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "corrupted": 0,
+            "writes": 0,
+            "deletes": 0,
+            "batches": 0,
+            "evictions": 0,
+            "compactions": 0,
+            "stored_bytes": 0
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; the database is created on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                # auto_vacuum only takes effect before the first table exists
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.executescript(_SCHEMA)
+                self._schema_ready = True
+            self._connections.append(connection)
+        self._local.connection = connection
+        return connection
+
+    def get(self, namespace: str, key: str) -> Optional[DiskHit]:
+        """Read an entry, verifying TTL and checksum; None on a miss."""
+        self._metrics["reads"] += 1
+        ident = (namespace, key)
+        with self._pending_lock:
+            pending = self._pending.get(ident, _NOT_PENDING)
+            if pending is _NOT_PENDING:
+                # Batch being written by the flusher but not yet committed
+                pending = self._in_flight.get(ident, _NOT_PENDING)
+        if pending is not _NOT_PENDING:
+            if pending is None or (pending.expires_at is not None and pending.expires_at <= time.time()):
+                self._metrics["misses"] += 1
+                return None
+            self._metrics["hits"] += 1
+            return DiskHit(pending.value, pending.expires_at, 1)
+
+        row = self._connection().execute(
+            "SELECT value, checksum, expires_at, hits FROM entries WHERE namespace = ? AND key = ?",
+            ident
+        ).fetchone()
+        if row is None:
+            self._metrics["misses"] += 1
+            return None
+
+        blob, stored_checksum, expires_at, hits = row
+        if expires_at is not None and expires_at <= time.time():
+            self._metrics["expired"] += 1
+            self._metrics["misses"] += 1
+            self._enqueue(ident, None)
+            return None
+
+        try:
+            if checksum(blob) != stored_checksum:
+                raise ValueError("checksum mismatch")
+            value = pickle.loads(blob)
+        except Exception as e:
+            self.logger.warning(f"Dropping corrupt disk cache entry {namespace}/{key}: {e}")
+            self._metrics["corrupted"] += 1
+            self._metrics["misses"] += 1
+            self._enqueue(ident, None)
+            return None
+
+        self._metrics["hits"] += 1
+        with self._pending_lock:
+            self._touched[ident] = time.time()
+        self._schedule_flush()
+        return DiskHit(value, expires_at, hits + 1)
+
+    async def aget(self, namespace: str, key: str) -> Optional[DiskHit]:
+        """get() for async callers: the SQLite read runs on the io pool instead of the event loop."""
+        return await executor_service.run(self.pool, self.get, namespace, key)
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Queue a write; returns False if the value cannot be serialized."""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.debug(f"Not persisting {namespace}/{key}: {e}")
+            return False
+        if len(blob) > self.max_bytes:
+            return False
+
+        now = time.time()
+        self._enqueue((namespace, key), _PendingWrite(
+            value, blob, checksum(blob), now, now + ttl if ttl is not None else None
+        ))
+        return True
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._enqueue((namespace, key), None)
+
+    def _enqueue(self, ident: Tuple[str, str], write: Optional[_PendingWrite]) -> None:
+        with self._pending_lock:
+            self._pending[ident] = write
+            self._touched.pop(ident, None)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        with self._pending_lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            executor_service.submit(self.pool, self._flush_in_background)
+        except RuntimeError:
+            # Pools are shut down (process exit); write through instead
+            self._flush_in_background()
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error(f"Disk cache flush failed: {e}")
+        finally:
+            with self._pending_lock:
+                self._flush_scheduled = False
+                more = bool(self._pending or self._touched)
+            if more:
+                self._schedule_flush()
+
+    def flush(self) -> int:
+        """Apply all queued writes in batches; returns the number of entries written or deleted."""
+        applied = 0
+        with self._write_lock:
+            while True:
+                with self._pending_lock:
+                    pending, self._pending = self._pending, {}
+                    touched, self._touched = self._touched, {}
+                    self._in_flight = pending
+                if not pending and not touched:
+                    return applied
+                try:
+                    self._write_batch(pending, touched)
+                finally:
+                    with self._pending_lock:
+                        self._in_flight = {}
+                applied += len(pending)
+
+    def _write_batch(self, pending: Dict[Tuple[str, str], Optional[_PendingWrite]],
+                     touched: Dict[Tuple[str, str], float]) -> None:
+        connection = self._connection()
+        writes = [(ns, key, w.blob, w.checksum, len(w.blob), w.created_at, w.expires_at, w.created_at)
+                  for (ns, key), w in pending.items() if w is not None]
+        deletes = [ident for ident, w in pending.items() if w is None]
+        try:
+            with connection:
+                if self._stored_bytes is None:
+                    self._stored_bytes = self._sum_sizes(connection)
+                if pending:
+                    # Bytes of the rows this batch replaces or deletes
+                    self._stored_bytes -= sum(self._stored_size(connection, ident) for ident in pending)
+                    self._stored_bytes += sum(len(w.blob) for w in pending.values() if w is not None)
+                if writes:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO entries "
+                        "(namespace, key, value, checksum, size, created_at, expires_at, accessed_at, hits) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)", writes)
+                if deletes:
+                    connection.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", deletes)
+                if touched:
+                    connection.executemany(
+                        "UPDATE entries SET accessed_at = ?, hits = hits + 1 WHERE namespace = ? AND key = ?",
+                        [(at, ns, key) for (ns, key), at in touched.items()])
+                self._evict_over_budget(connection)
+        except Exception:
+            # Re-sum on the next batch rather than trust a total from a rolled back one
+            self._stored_bytes = None
+            raise
+
+        self._metrics["writes"] += len(writes)
+        self._metrics["deletes"] += len(deletes)
+        self._metrics["batches"] += 1
+
+    @staticmethod
+    def _sum_sizes(connection: sqlite3.Connection) -> int:
+        return connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _stored_size(connection: sqlite3.Connection, ident: Tuple[str, str]) -> int:
+        row = connection.execute("SELECT size FROM entries WHERE namespace = ? AND key = ?", ident).fetchone()
+        return row[0] if row else 0
+
+    def _evict_over_budget(self, connection: sqlite3.Connection) -> int:
+        total = self._stored_bytes
+        evicted = 0
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            victims = []
+            for rowid, size in connection.execute("SELECT rowid, size FROM entries ORDER BY accessed_at"):
+                if total <= target:
+                    break
+                victims.append((rowid,))
+                total -= size
+            connection.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+            evicted = len(victims)
+            self._metrics["evictions"] += evicted
+        self._stored_bytes = total
+        self._metrics["stored_bytes"] = total
+        return evicted
+
+    def compact(self) -> Dict[str, int]:
+        """Drop expired entries, enforce the size bound and return freed pages to the filesystem."""
+        self.flush()
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                expired = connection.execute(
+                    "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+                ).rowcount
+                # Re-sum so rows changed by other processes are accounted for
+                self._stored_bytes = self._sum_sizes(connection)
+                evicted = self._evict_over_budget(connection)
+            connection.execute("PRAGMA incremental_vacuum")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._metrics["expired"] += expired
+        self._metrics["compactions"] += 1
+        return {"expired": expired, "evicted": evicted}
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        self.flush()
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                if namespace is None:
+                    connection.execute("DELETE FROM entries")
+                else:
+                    connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+                self._stored_bytes = self._sum_sizes(connection)
+                self._evict_over_budget(connection)
+
+    def close(self) -> None:
+        """Write queued entries and close every connection."""
+        try:
+            self.flush()
+        finally:
+            with self._schema_lock:
+                connections, self._connections = self._connections, []
+            for connection in connections:
+                connection.close()
+            self._local = threading.local()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        reads = self._metrics["hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "pending_writes": pending,
+            "hit_ratio": self._metrics["hits"] / reads if reads else 0.0,
+            "max_bytes": self.max_bytes,
+            "path": str(self.path)
+        }
+
@@ -6,13 +6,20 @@ Target: <10ms event dispatch time with performance monitoring.
 
 import asyncio
 import time
-import psutil
 import logging
 from typing import Dict, Any, List, Callable, Optional, Union
 from functools import wraps
 from dataclasses import dataclass
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
+
+from .container import container
+from .tasks import task_tracker
+from .executors import executor_service, InstrumentedPool
+from .lazy_import import lazy_module
+from .tracing import startup_tracer
+
+# psutil is only needed once metrics are sampled
+psutil = lazy_module("psutil")
 
 
 class PerformanceMonitor:
@@ -62,11 +69,12 @@ class EventBus:
     Supports event-driven communication patterns with zero direct coupling.
     """
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, executor: Optional[InstrumentedPool] = None):
         self.logger = logging.getLogger(__name__)
         self._callbacks: Dict[str, List[Callable]] = {}
         self._async_callbacks: Dict[str, List[Callable]] = {}
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Sync callbacks share the io pool rather than owning threads
+        self._executor = executor or executor_service.pool("io")
         self._event_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
         self._metrics = {
             "events_dispatched": 0,
@@ -108,11 +116,12 @@ class EventBus:
         start_time = time.perf_counter()
         
         try:
-            # Dispatch to sync callbacks
-            await self._dispatch_sync_callbacks(event)
-            
-            # Dispatch to async callbacks
-            await self._dispatch_async_callbacks(event)
+            with startup_tracer.span(f"event:{event.name}", category="events"):
+                # Dispatch to sync callbacks
+                await self._dispatch_sync_callbacks(event)
+                
+                # Dispatch to async callbacks
+                await self._dispatch_async_callbacks(event)
             
             # Update performance metrics
             dispatch_time = time.perf_counter() - start_time
@@ -128,7 +137,7 @@ class EventBus:
             return
         
         # Check if thread pool executor is still available
-        if self._executor._shutdown:
+        if self._executor.closed:
             # Fallback to direct execution if executor is shutdown
             for callback in self._callbacks[event.name]:
                 try:
@@ -191,8 +200,13 @@ class EventBus:
         
         # Try to schedule async dispatch if event loop is running
         try:
-            asyncio.create_task(self.dispatch(event))
+            loop = asyncio.get_running_loop()
         except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            task_tracker.spawn(self.dispatch(event), kind="event", name=f"event:{event_name}")
+        else:
             # No event loop running - emit without async processing
             self.logger.debug(f"No event loop for async dispatch of {event_name} - using sync callbacks only")
             # Process sync callbacks immediately in current thread
@@ -216,24 +230,34 @@ class EventBus:
         
         await self.dispatch(event)
     
-    def get_metrics(self) -> Dict[str, Any]:
-        """Get performance metrics for monitoring."""
-        memory_info = PerformanceMonitor.monitor_memory_usage()
-        return {
+    def get_metrics(self, include_memory: bool = True) -> Dict[str, Any]:
+        """Get performance metrics for monitoring; include_memory samples the process."""
+        metrics = {
             **self._metrics,
-            "memory_usage_mb": memory_info["memory_mb"],
-            "memory_percent": memory_info["memory_percent"],
             "callback_count": sum(len(callbacks) for callbacks in self._callbacks.values()),
             "async_callback_count": sum(len(callbacks) for callbacks in self._async_callbacks.values())
         }
+        if include_memory:
+            memory_info = PerformanceMonitor.monitor_memory_usage()
+            metrics["memory_usage_mb"] = memory_info["memory_mb"]
+            metrics["memory_percent"] = memory_info["memory_percent"]
+        return metrics
+    
+    def get_executor_load(self) -> Dict[str, int]:
+        """Queued and running work in the callback thread pool."""
+        return self._executor.get_load()
+    
+    def shrink_executor(self) -> int:
+        """Release idle callback threads; the pool respawns them on demand."""
+        return self._executor.shrink()
     
     def cleanup(self) -> None:
         """Clean up resources to prevent memory leaks."""
         self._callbacks.clear()
         self._async_callbacks.clear()
-        self._executor.shutdown(wait=True)
+        # The shared pool belongs to the executor service, which shuts it down after the bus
         self.logger.info("EventBus cleanup completed")
 
 
-# Global event bus instance for application-wide use
-event_bus = EventBus()
\ No newline at end of file
+# Global event bus instance for application-wide use, constructed on first access
+event_bus = container.register("event_bus", EventBus, on_stop=lambda bus: bus.cleanup())
\ No newline at end of file
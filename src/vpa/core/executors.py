@@ -0,0 +1,427 @@
+"""
+VPA Executor Service
+Shared named thread pools (io, cpu, blocking-plugin) with queueing histograms, saturation alerts and adaptive sizing.
+Target: One observable set of threads instead of a private pool per component.
+"""
+
+import os
+import time
+import bisect
+import asyncio
+import logging
+import weakref
+import functools
+import threading
+from typing import Dict, Any, List, Optional, Callable, Iterable
+from dataclasses import dataclass, asdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from .container import container
+
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+RUN_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class Histogram:
+    """Fixed-bucket histogram; bounds are inclusive upper edges plus an overflow bucket."""
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> float:
+        """Upper edge of the bucket holding the percentile (the maximum for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = percentile / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["overflow"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": buckets
+        }
+
+
+@dataclass
+class PoolConfig:
+    """
+    Size limits and tuning targets of one named pool.
+    The pool grows while queueing delay (p95) stays above target_wait_ms and
+    shrinks towards min_workers once it has stayed well below it for
+    idle_windows_to_shrink consecutive windows. A pool is saturated once p95
+    wait or queue depth reaches its saturation threshold.
+    """
+    name: str
+    workers: int = 4
+    min_workers: int = 1
+    max_workers: int = 16
+    adaptive: bool = True
+    target_wait_ms: float = 10.0
+    saturation_wait_ms: float = 250.0
+    saturation_queue_depth: int = 64
+    idle_windows_to_shrink: int = 5
+
+
+def default_pool_configs() -> Dict[str, PoolConfig]:
+    cpus = os.cpu_count() or 1
+    return {
+        "io": PoolConfig("io", workers=4, min_workers=2, max_workers=32),
+        # More CPU threads than cores only adds GIL contention
+        "cpu": PoolConfig("cpu", workers=cpus, min_workers=1, max_workers=cpus, adaptive=False),
+        "blocking-plugin": PoolConfig("blocking-plugin", workers=2, min_workers=1, max_workers=8,
+                                      target_wait_ms=25.0, saturation_wait_ms=1000.0)
+    }
+
+
+# Pools alive in this process; a forked child restarts them with no threads
+_live_pools: "weakref.WeakSet[InstrumentedPool]" = weakref.WeakSet()
+
+
+def _reset_pools_after_fork() -> None:
+    for pool in list(_live_pools):
+        pool._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class InstrumentedPool(Executor):
+    """
+    A thread pool that records queue depth at submission, queueing delay
+    and run time of every work item. The underlying ThreadPoolExecutor is
+    replaced on resize and when idle threads are released, so callers keep
+    this object; the replaced executor finishes its queued work and exits.
+    """
+
+    def __init__(self, config: PoolConfig, on_alert: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.workers = max(config.min_workers, min(config.workers, config.max_workers))
+        self._on_alert = on_alert
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = 0
+        self._generation = 0
+        with self._lock:
+            self._executor = self._new_executor()
+        self._queued = 0
+        self._active = 0
+        self._window_waits: List[float] = []
+        self._window_peak_depth = 0
+        self._idle_windows = 0
+        self.saturated = False
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.run_ms = Histogram(RUN_BUCKETS_MS)
+        self.queue_depth = Histogram(DEPTH_BUCKETS)
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "saturation_events": 0,
+            "grown": 0,
+            "shrunk": 0,
+            "threads_released": 0
+        }
+        _live_pools.add(self)
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        """
+        A fresh executor sized to self.workers; threads are counted per executor as they start.
+        Called with self._lock held.
+        """
+        self._generation += 1
+        self._threads = 0
+        generation = self._generation
+
+        def thread_started():
+            with self._lock:
+                if self._generation == generation:
+                    self._threads += 1
+
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"vpa-{self.config.name}",
+                                  initializer=thread_started)
+
+    def _replace_executor(self) -> int:
+        """Swap in a fresh executor; returns the threads the old one had started."""
+        # Swapped under the lock submit() holds, so no submission reaches the retired executor
+        with self._lock:
+            if self._closed:
+                return 0
+            executor, released = self._executor, self._threads
+            self._executor = self._new_executor()
+        executor.shutdown(wait=False)
+        return released
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                wait_ms = (started - submitted) * 1000
+                self.wait_ms.observe(wait_ms)
+                self._window_waits.append(wait_ms)
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._metrics["failed" if failed else "completed"] += 1
+                    self.run_ms.observe((time.perf_counter() - started) * 1000)
+
+        with self._lock:
+            self._queued += 1
+            depth = self._queued
+            try:
+                future = self._executor.submit(run)
+            except RuntimeError:
+                self._queued -= 1
+                raise
+            self._metrics["submitted"] += 1
+            self.queue_depth.observe(depth - 1)
+            self._window_peak_depth = max(self._window_peak_depth, depth)
+        future.add_done_callback(self._on_done)
+
+        if depth >= self.config.saturation_queue_depth:
+            self._set_saturated(True, depth=depth)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._metrics["cancelled"] += 1
+
+    def _set_saturated(self, saturated: bool, **data) -> None:
+        with self._lock:
+            if saturated == self.saturated:
+                return
+            self.saturated = saturated
+            if saturated:
+                self._metrics["saturation_events"] += 1
+
+        payload = {"pool": self.name, "workers": self.workers, "queued": self._queued, **data}
+        if saturated:
+            self.logger.warning(f"Executor pool '{self.name}' saturated: {payload}")
+        else:
+            self.logger.info(f"Executor pool '{self.name}' recovered")
+        if self._on_alert is not None:
+            self._on_alert("executor_saturated" if saturated else "executor_recovered", payload)
+
+    def evaluate(self) -> Dict[str, Any]:
+        """
+        Close the current observation window: update saturation state and,
+        for adaptive pools, resize from the window's p95 queueing delay.
+        """
+        with self._lock:
+            waits, self._window_waits = sorted(self._window_waits), []
+            peak_depth, self._window_peak_depth = self._window_peak_depth, self._queued
+            queued = self._queued
+
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        config = self.config
+        self._set_saturated(p95 >= config.saturation_wait_ms or queued >= config.saturation_queue_depth,
+                            p95_wait_ms=p95)
+
+        action = None
+        if config.adaptive:
+            idle = p95 < config.target_wait_ms / 4 and peak_depth <= 1
+            self._idle_windows = self._idle_windows + 1 if idle else 0
+            workers = self.workers
+            if p95 > config.target_wait_ms and workers < config.max_workers:
+                # Grow by half again so a sustained backlog is absorbed in a few windows
+                if self.resize(workers + max(1, workers // 2)) != workers:
+                    action = "grow"
+            elif self._idle_windows >= config.idle_windows_to_shrink and workers > config.min_workers:
+                # Only a sustained lull shrinks the pool; each resize replaces the executor
+                self._idle_windows = 0
+                if self.resize(workers - 1) != workers:
+                    action = "shrink"
+
+        return {"pool": self.name, "p95_wait_ms": p95, "peak_queue_depth": peak_depth,
+                "workers": self.workers, "action": action}
+
+    def resize(self, workers: int) -> int:
+        """Set the worker limit within the configured bounds; surplus idle threads are released."""
+        workers = max(self.config.min_workers, min(workers, self.config.max_workers))
+        if workers == self.workers:
+            return workers
+
+        grew = workers > self.workers
+        self.logger.debug(f"Resizing executor pool '{self.name}' {self.workers} -> {workers}")
+        self.workers = workers
+        self._metrics["grown" if grew else "shrunk"] += 1
+        if not self._closed:
+            # Executors have a fixed size; work already queued finishes on the old one
+            self._metrics["threads_released"] += self._replace_executor()
+        return workers
+
+    def shrink(self) -> int:
+        """Release idle threads by swapping in a fresh executor; new threads start on demand."""
+        with self._lock:
+            busy = self._queued or self._active
+            threads = self._threads
+        if self._closed or busy or not threads:
+            return 0
+
+        released = self._replace_executor()
+        self._metrics["threads_released"] += released
+        return released
+
+    def _reset_after_fork(self) -> None:
+        # The child inherits the parent's bookkeeping but none of its worker threads
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._window_waits = []
+        self._idle_windows = 0
+        if not self._closed:
+            with self._lock:
+                self._executor = self._new_executor()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+        executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def get_load(self) -> Dict[str, int]:
+        """Current limit, live threads, queued and running work items."""
+        return {
+            "max_workers": self.workers,
+            "threads": self._threads,
+            "queued": self._queued,
+            "active": self._active
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._metrics,
+                **self.get_load(),
+                "saturated": self.saturated,
+                "config": asdict(self.config),
+                "wait_ms": self.wait_ms.to_dict(),
+                "run_ms": self.run_ms.to_dict(),
+                "queue_depth": self.queue_depth.to_dict()
+            }
+
+
+class ExecutorService:
+    """
+    Named, shared thread pools for blocking work.
+
+    Components ask for a pool by purpose ("io", "cpu", "blocking-plugin")
+    rather than creating their own. Saturation changes are emitted as
+    executor_saturated / executor_recovered events.
+    """
+
+    def __init__(self, configs: Optional[Dict[str, PoolConfig]] = None, tune_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.configs = configs or default_pool_configs()
+        self.tune_interval = tune_interval
+        self._pools: Dict[str, InstrumentedPool] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config: PoolConfig) -> None:
+        """Add or replace a pool's configuration; an existing pool is resized to match."""
+        self.configs[config.name] = config
+        pool = self._pools.get(config.name)
+        if pool is not None:
+            pool.config = config
+            pool.resize(config.workers)
+
+    def pool(self, name: str) -> InstrumentedPool:
+        """Return the named pool, creating it on first use."""
+        pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+        if name not in self.configs:
+            raise KeyError(f"Executor pool '{name}' is not configured")
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = InstrumentedPool(self.configs[name], on_alert=self._alert)
+            return self._pools[name]
+
+    def submit(self, pool: str, fn: Callable, *args, **kwargs) -> Future:
+        return self.pool(pool).submit(fn, *args, **kwargs)
+
+    async def run(self, pool: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the named pool and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool(pool), functools.partial(fn, *args, **kwargs)
+        )
+
+    def _alert(self, event_name: str, data: Dict[str, Any]) -> None:
+        # The event bus dispatches on these pools, so it is looked up rather than imported
+        if container.is_initialized("event_bus"):
+            container.get("event_bus").emit(event_name, data)
+
+    def evaluate(self) -> List[Dict[str, Any]]:
+        """Close the observation window of every pool and apply adaptive sizing."""
+        return [pool.evaluate() for pool in list(self._pools.values())]
+
+    async def tune_loop(self) -> None:
+        """Periodically evaluate pools; run under the task supervisor."""
+        while True:
+            await asyncio.sleep(self.tune_interval)
+            for result in self.evaluate():
+                if result["action"]:
+                    self.logger.debug(f"Executor pool '{result['pool']}' {result['action']} to "
+                                     f"{result['workers']} workers (p95 wait {result['p95_wait_ms']:.1f}ms)")
+
+    def shrink(self) -> int:
+        """Release idle threads in every pool."""
+        return sum(pool.shrink() for pool in list(self._pools.values()))
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True) -> None:
+        for pool in list(self._pools.values()):
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {name: pool.get_metrics() for name, pool in self._pools.items()}
+
+
+# Global executor service instance
+executor_service = container.register(
+    "executor_service", ExecutorService, on_stop=lambda service: service.shutdown()
+)
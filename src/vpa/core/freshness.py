@@ -0,0 +1,160 @@
+"""
+VPA Cache Freshness
+Soft/hard TTL stamps, stale-while-revalidate and access-rate driven refresh-ahead for cached values.
+Target: Requests after expiry are served from cache while a bounded number of refreshes run in the background.
+"""
+
+import time
+import inspect
+import logging
+import threading
+from typing import Dict, Any, Callable, Hashable, Optional, Set
+from dataclasses import dataclass
+
+from .tasks import task_tracker
+from .executors import executor_service
+
+
+FRESH = "fresh"
+REFRESH_AHEAD = "refresh_ahead"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    """
+    How long a cached value is served and when it is recomputed.
+
+    ttl: soft TTL; seconds a value is served as fresh.
+    stale_while_revalidate: seconds past ttl during which the stale value is
+        returned immediately while a background refresh runs. The hard TTL
+        is ttl + stale_while_revalidate.
+    refresh_ahead: fraction of ttl at the end of the fresh window in which
+        hot keys are refreshed before they go stale.
+    hot_access_rate: accesses per second from which a key counts as hot.
+    """
+    ttl: float = 300.0
+    stale_while_revalidate: float = 0.0
+    refresh_ahead: float = 0.0
+    hot_access_rate: float = 0.1
+
+    @property
+    def hard_ttl(self) -> float:
+        return self.ttl + self.stale_while_revalidate
+
+    def classify(self, stored_at: float, soft_expires_at: float, hard_expires_at: float,
+                 accesses: int, now: Optional[float] = None) -> str:
+        """Classify a value as fresh, due for refresh-ahead, stale or expired."""
+        now = time.time() if now is None else now
+        if now >= hard_expires_at:
+            return EXPIRED
+        if now >= soft_expires_at:
+            return STALE
+        if self.refresh_ahead > 0 and now >= soft_expires_at - (soft_expires_at - stored_at) * self.refresh_ahead:
+            # Hot keys only: accesses per second since the value was stored
+            if accesses / max(now - stored_at, 1e-3) >= self.hot_access_rate:
+                return REFRESH_AHEAD
+        return FRESH
+
+
+@dataclass
+class StampedValue:
+    """Cached value with its soft and hard expiry and access count."""
+    value: Any
+    stored_at: float
+    soft_expires_at: float
+    hard_expires_at: float
+    accesses: int = 0
+
+    @classmethod
+    def stamp(cls, value: Any, policy: FreshnessPolicy, now: Optional[float] = None) -> "StampedValue":
+        now = time.time() if now is None else now
+        return cls(value, now, now + policy.ttl, now + policy.hard_ttl)
+
+    def state(self, policy: FreshnessPolicy, now: Optional[float] = None) -> str:
+        return policy.classify(self.stored_at, self.soft_expires_at, self.hard_expires_at, self.accesses, now)
+
+
+class BackgroundRefresher:
+    """
+    Runs cache refreshes in the background with bounded concurrency.
+
+    Each key has at most one refresh in flight. When max_concurrent refreshes
+    are already running further requests are shed; the caller keeps serving
+    the cached value and the next access asks again. Coroutine functions run
+    as tracked tasks on the running loop, plain callables on the io pool.
+    """
+
+    def __init__(self, max_concurrent: int = 4, pool: str = "io"):
+        self.logger = logging.getLogger(__name__)
+        self.max_concurrent = max_concurrent
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._inflight: Set[Hashable] = set()
+        self._metrics = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "shed": 0
+        }
+
+    def schedule(self, key: Hashable, refresh: Callable[[], Any]) -> bool:
+        """Start refresh() for key unless one is running or the bound is reached."""
+        with self._lock:
+            if key in self._inflight:
+                return False
+            if len(self._inflight) >= self.max_concurrent:
+                self._metrics["shed"] += 1
+                return False
+            self._inflight.add(key)
+            self._metrics["scheduled"] += 1
+
+        coro = None
+        try:
+            if inspect.iscoroutinefunction(refresh):
+                coro = self._run_async(key, refresh)
+                task_tracker.spawn(coro, kind="background", name=f"cache_refresh:{key}")
+            else:
+                executor_service.submit(self.pool, self._run_sync, key, refresh)
+        except RuntimeError as e:
+            if coro is not None:
+                coro.close()
+            # No running loop or pools shut down; the stale value stays in place
+            self.logger.debug(f"Could not schedule refresh for {key}: {e}")
+            self._finish(key, failed=True)
+            return False
+        return True
+
+    async def _run_async(self, key: Hashable, refresh: Callable[[], Any]) -> None:
+        failed = False
+        try:
+            await refresh()
+        except Exception as e:
+            failed = True
+            self.logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._finish(key, failed)
+
+    def _run_sync(self, key: Hashable, refresh: Callable[[], Any]) -> None:
+        failed = False
+        try:
+            refresh()
+        except Exception as e:
+            failed = True
+            self.logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._finish(key, failed)
+
+    def _finish(self, key: Hashable, failed: bool) -> None:
+        with self._lock:
+            self._inflight.discard(key)
+            self._metrics["failed" if failed else "completed"] += 1
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._inflight
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._metrics, "inflight": len(self._inflight), "max_concurrent": self.max_concurrent}
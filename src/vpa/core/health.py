@@ -0,0 +1,340 @@
+"""
+VPA Health Probes
+Named health probes run concurrently with per-probe deadlines, cached results and local liveness/readiness endpoints.
+Target: Health checks that never block each other and let an orchestrator route around a degraded instance.
+"""
+
+import time
+import shutil
+import asyncio
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
+from dataclasses import dataclass, field, asdict
+
+from .container import container
+from .executors import executor_service
+from .http import HTTPError, read_http_request, send_http_response
+
+ProbeOutcome = Tuple["HealthStatus", str, Dict[str, Any]]
+
+
+class HealthStatus(Enum):
+    PASS = "pass"
+    WARN = "warn"
+    FAIL = "fail"
+
+
+@dataclass
+class HealthProbe:
+    """
+    A named check returning (status, detail, data).
+
+    check may be a coroutine function or a plain function; plain functions
+    run on the shared io pool so the deadline applies to them too.
+    liveness probes decide /livez; every probe contributes to /readyz, and
+    a failing critical probe makes the instance not ready.
+    """
+    name: str
+    check: Callable[[], Any]
+    timeout: float = 1.0
+    cache_ttl: float = 5.0
+    liveness: bool = False
+    critical: bool = True
+
+
+@dataclass
+class ProbeResult:
+    name: str
+    status: HealthStatus
+    detail: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+    duration_ms: float = 0.0
+    checked_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["status"] = self.status.value
+        return result
+
+
+@dataclass
+class HealthReport:
+    """Combined result of a probe run."""
+    status: HealthStatus
+    probes: Dict[str, ProbeResult]
+
+    @property
+    def ok(self) -> bool:
+        return self.status != HealthStatus.FAIL
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status.value,
+            "probes": {name: result.to_dict() for name, result in self.probes.items()}
+        }
+
+
+class HealthRegistry:
+    """
+    Registry of health probes.
+    Probes run concurrently; each result is cached for the probe's
+    cache_ttl and concurrent requests for the same probe share one run.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._probes: Dict[str, HealthProbe] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._metrics = {
+            "probe_runs": 0,
+            "cache_hits": 0,
+            "timeouts": 0,
+            "failures": 0
+        }
+
+    def register(self, probe: HealthProbe) -> None:
+        """Add or replace a probe."""
+        self._probes[probe.name] = probe
+        self._results.pop(probe.name, None)
+
+    def unregister(self, name: str) -> None:
+        self._probes.pop(name, None)
+        self._results.pop(name, None)
+
+    @property
+    def probe_names(self) -> List[str]:
+        return list(self._probes)
+
+    async def run(self, names: Optional[Iterable[str]] = None, force: bool = False) -> HealthReport:
+        """Run the named probes (all by default) concurrently and combine their results."""
+        selected = [self._probes[name] for name in (names if names is not None else self._probes)]
+        results = await asyncio.gather(*(self._get_result(probe, force) for probe in selected))
+
+        status = HealthStatus.PASS
+        for probe, result in zip(selected, results):
+            if result.status == HealthStatus.FAIL and probe.critical:
+                status = HealthStatus.FAIL
+            elif result.status != HealthStatus.PASS and status == HealthStatus.PASS:
+                status = HealthStatus.WARN
+        return HealthReport(status, {result.name: result for result in results})
+
+    async def liveness(self) -> HealthReport:
+        """Whether the process is alive and its event loop responsive."""
+        return await self.run([name for name, probe in self._probes.items() if probe.liveness])
+
+    async def readiness(self) -> HealthReport:
+        """Whether the instance should receive traffic."""
+        return await self.run()
+
+    async def _get_result(self, probe: HealthProbe, force: bool) -> ProbeResult:
+        cached = self._results.get(probe.name)
+        if not force and cached and time.monotonic() - cached.checked_at < probe.cache_ttl:
+            self._metrics["cache_hits"] += 1
+            return cached
+
+        task = self._inflight.get(probe.name)
+        if task is None:
+            task = asyncio.create_task(self._execute(probe))
+            self._inflight[probe.name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(probe.name, None))
+        # A caller going away must not cancel the run other callers share
+        return await asyncio.shield(task)
+
+    async def _execute(self, probe: HealthProbe) -> ProbeResult:
+        started = time.perf_counter()
+        self._metrics["probe_runs"] += 1
+        try:
+            if asyncio.iscoroutinefunction(probe.check):
+                pending = probe.check()
+            else:
+                pending = executor_service.run("io", probe.check)
+            status, detail, data = await asyncio.wait_for(pending, timeout=probe.timeout)
+        except asyncio.TimeoutError:
+            self._metrics["timeouts"] += 1
+            status, detail, data = HealthStatus.FAIL, f"timed out after {probe.timeout}s", {}
+        except Exception as e:
+            status, detail, data = HealthStatus.FAIL, f"probe error: {e}", {}
+
+        if status == HealthStatus.FAIL:
+            self._metrics["failures"] += 1
+            self.logger.warning(f"Health probe '{probe.name}' failed: {detail}")
+
+        result = ProbeResult(probe.name, status, detail, data,
+                             duration_ms=(time.perf_counter() - started) * 1000,
+                             checked_at=time.monotonic())
+        self._results[probe.name] = result
+        return result
+
+    def last_results(self) -> Dict[str, Dict[str, Any]]:
+        """Most recent result of every probe without running anything."""
+        return {name: result.to_dict() for name, result in self._results.items()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._metrics, "probes": len(self._probes)}
+
+
+def _grade(value: float, warn_at: float, fail_at: float) -> HealthStatus:
+    if value >= fail_at:
+        return HealthStatus.FAIL
+    if value >= warn_at:
+        return HealthStatus.WARN
+    return HealthStatus.PASS
+
+
+def event_loop_lag_probe(warn_ms: float = 50.0, fail_ms: float = 500.0, interval: float = 0.05) -> HealthProbe:
+    """How late a timer due interval seconds from now fires on the event loop."""
+    async def check() -> ProbeOutcome:
+        loop = asyncio.get_running_loop()
+        fired = loop.create_future()
+        due = loop.time() + interval
+        # Drift past the due time covers every callback that ran before the timer, not just one
+        handle = loop.call_later(interval, lambda: fired.done() or fired.set_result(loop.time()))
+        try:
+            lag_ms = max(0.0, (await fired - due) * 1000)
+        finally:
+            handle.cancel()
+        return _grade(lag_ms, warn_ms, fail_ms), f"{lag_ms:.1f}ms", {"lag_ms": lag_ms}
+
+    return HealthProbe("event_loop_lag", check, liveness=True, cache_ttl=1.0)
+
+
+def executor_saturation_probe(executors, warn_ratio: float = 1.0, fail_ratio: float = 10.0) -> HealthProbe:
+    """Queued work items per worker in the most backed-up shared pool."""
+    async def check() -> ProbeOutcome:
+        pools = executors.get_metrics()
+        loads = {name: metrics["queued"] / max(metrics["max_workers"], 1) for name, metrics in pools.items()}
+        saturated = [name for name, metrics in pools.items() if metrics["saturated"]]
+        worst = max(loads, key=loads.get, default=None)
+        ratio = loads[worst] if worst else 0.0
+        status = _grade(ratio, warn_ratio, fail_ratio)
+        if saturated and status == HealthStatus.PASS:
+            status = HealthStatus.WARN
+        detail = f"{worst}: {ratio:.1f} queued per worker" if worst else "no pools in use"
+        return status, detail, {"queued_per_worker": loads, "saturated": saturated}
+
+    return HealthProbe("executor_saturation", check)
+
+
+def plugin_errors_probe(plugin_manager, window_seconds: float = 60.0,
+                        warn_count: int = 1, fail_count: int = 10) -> HealthProbe:
+    """Plugin load and processing failures within a sliding window."""
+    async def check() -> ProbeOutcome:
+        errors = plugin_manager.recent_error_count(window_seconds)
+        return (_grade(errors, warn_count, fail_count), f"{errors} errors in {window_seconds:.0f}s",
+                {"recent_errors": errors})
+
+    # Plugin trouble degrades answers but the assistant can still serve
+    return HealthProbe("plugin_errors", check, critical=False)
+
+
+def audio_backend_probe(audio_system, expected_voices: int = 13) -> HealthProbe:
+    """Voice catalog integrity and synthesis failures since the previous run."""
+    last_errors = {"count": 0}
+
+    async def check() -> ProbeOutcome:
+        enabled = sum(1 for voice in audio_system.voice_profiles.values() if voice.enabled)
+        errors = audio_system.get_metrics()["synthesis_errors"]
+        new_errors, last_errors["count"] = errors - last_errors["count"], errors
+        data = {"enabled_voices": enabled, "new_synthesis_errors": new_errors}
+
+        if enabled == 0 or audio_system.current_voice is None:
+            return HealthStatus.FAIL, "no usable voice", data
+        if enabled < expected_voices or new_errors:
+            return HealthStatus.WARN, f"{enabled}/{expected_voices} voices, {new_errors} new errors", data
+        return HealthStatus.PASS, f"{enabled} voices", data
+
+    return HealthProbe("audio_backend", check, critical=False)
+
+
+def disk_space_probe(paths: Iterable[str], warn_free_mb: float = 500.0,
+                     fail_free_mb: float = 50.0) -> HealthProbe:
+    """Free space on the filesystems holding logs and caches."""
+    paths = list(paths)
+
+    def check() -> ProbeOutcome:
+        free = {}
+        for path in paths:
+            target = Path(path)
+            while not target.exists() and target != target.parent:
+                target = target.parent
+            free[path] = shutil.disk_usage(target).free / 1024 / 1024
+
+        lowest = min(free.values()) if free else float("inf")
+        # Less free space is worse, so grade the shortfall
+        status = _grade(-lowest, -warn_free_mb, -fail_free_mb)
+        return status, f"{lowest:.0f}MB free", {"free_mb": free}
+
+    return HealthProbe("disk_space", check, cache_ttl=30.0)
+
+
+def supervised_tasks_probe(supervisor) -> HealthProbe:
+    """Supervised background tasks that gave up or are backing off after a failure."""
+    async def check() -> ProbeOutcome:
+        status = supervisor.get_status()
+        failed = [name for name, task in status.items() if task["state"] == "failed"]
+        backing_off = [name for name, task in status.items() if task["state"] == "backoff"]
+        data = {"failed": failed, "backoff": backing_off, "supervised": len(status)}
+        if failed:
+            return HealthStatus.FAIL, f"failed: {', '.join(failed)}", data
+        if backing_off:
+            return HealthStatus.WARN, f"restarting: {', '.join(backing_off)}", data
+        return HealthStatus.PASS, f"{len(status)} supervised tasks", data
+
+    return HealthProbe("supervised_tasks", check, cache_ttl=1.0)
+
+
+class HealthServer:
+    """
+    Local HTTP endpoint for orchestrators.
+    GET /livez and /readyz return 200 or 503 with the probe report.
+    """
+
+    def __init__(self, registry: "HealthRegistry" = None, host: str = "127.0.0.1", port: int = 8766):
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry or health_registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Health endpoints on http://{self.host}:{self.port}/livez and /readyz")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await asyncio.wait_for(read_http_request(reader, 0), timeout=5.0)
+            except HTTPError as e:
+                await send_http_response(writer, e.status, {"error": str(e)})
+                return
+            if request is None:
+                return
+
+            if request.method != "GET":
+                await send_http_response(writer, 405, {"error": "use GET"})
+            elif request.path == "/livez":
+                report = await self.registry.liveness()
+                await send_http_response(writer, 200 if report.ok else 503, report.to_dict())
+            elif request.path == "/readyz":
+                report = await self.registry.readiness()
+                await send_http_response(writer, 200 if report.ok else 503, report.to_dict())
+            else:
+                await send_http_response(writer, 404, {"error": "not found"})
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+
+# Global health probe registry instance
+health_registry = container.register("health_registry", HealthRegistry)
@@ -0,0 +1,80 @@
+"""
+VPA HTTP Helpers
+Minimal HTTP/1.1 request parsing and JSON responses for the local endpoints.
+Target: Shared by the request server and the health endpoint without either importing the other.
+"""
+
+import json
+import asyncio
+from typing import Dict, Any, Optional
+from dataclasses import dataclass
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"
+}
+
+
+@dataclass
+class HTTPRequest:
+    """Minimal parsed HTTP/1.1 request."""
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes = b""
+
+
+class HTTPError(Exception):
+    """Request rejected with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_http_request(reader: asyncio.StreamReader, max_body: int) -> Optional[HTTPRequest]:
+    """Read one HTTP request; returns None when the peer closed the connection, even mid-body."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "request head too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    raw_length = headers.get("content-length", "0") or "0"
+    if not raw_length.isdigit():
+        raise HTTPError(400, "invalid content-length")
+    length = int(raw_length)
+    if length > max_body:
+        raise HTTPError(413, "request body too large")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        # Closed before sending the body its Content-Length announced
+        return None
+    return HTTPRequest(method.upper(), path, headers, body)
+
+
+async def send_http_response(writer: asyncio.StreamWriter, status: int, payload: Any,
+                             headers: Optional[Dict[str, str]] = None) -> None:
+    """Write a complete JSON HTTP response and close the exchange."""
+    body = json.dumps(payload, default=str).encode()
+    head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close"]
+    head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
@@ -0,0 +1,160 @@
+"""
+VPA Import Profiler
+Parses `python -X importtime` output into a per-module tree report.
+Target: Make per-module import cost visible and comparable across changes.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S.*?)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    """Import cost of a single module; times are microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    children: List["ImportRecord"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "module": self.module,
+            "self_us": self.self_us,
+            "cumulative_us": self.cumulative_us,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+
+@dataclass
+class ImportProfile:
+    """Parsed import tree for one interpreter run."""
+    roots: List[ImportRecord]
+
+    def iter_records(self) -> List[ImportRecord]:
+        """All records in depth-first order."""
+        records: List[ImportRecord] = []
+        stack = list(reversed(self.roots))
+        while stack:
+            record = stack.pop()
+            records.append(record)
+            stack.extend(reversed(record.children))
+        return records
+
+    @property
+    def total_us(self) -> int:
+        return sum(root.cumulative_us for root in self.roots)
+
+    def find(self, module: str) -> Optional[ImportRecord]:
+        """Return the record for a module, if it was imported."""
+        for record in self.iter_records():
+            if record.module == module:
+                return record
+        return None
+
+    def slowest(self, count: int = 10) -> List[ImportRecord]:
+        """Modules with the highest self time."""
+        return sorted(self.iter_records(), key=lambda r: r.self_us, reverse=True)[:count]
+
+    def report(self, min_cumulative_us: int = 1000, max_depth: int = 8) -> str:
+        """Render the tree, hiding subtrees cheaper than min_cumulative_us."""
+        lines = [f"{'cumulative':>12} {'self':>10}  module", "-" * 60]
+
+        def render(record: ImportRecord, level: int) -> None:
+            if record.cumulative_us < min_cumulative_us or level > max_depth:
+                return
+            lines.append(f"{record.cumulative_us / 1000:>10.1f}ms {record.self_us / 1000:>8.1f}ms  "
+                         f"{'  ' * level}{record.module}")
+            for child in sorted(record.children, key=lambda c: c.cumulative_us, reverse=True):
+                render(child, level + 1)
+
+        for root in sorted(self.roots, key=lambda r: r.cumulative_us, reverse=True):
+            render(root, 0)
+        lines.append("-" * 60)
+        lines.append(f"{self.total_us / 1000:>10.1f}ms total")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_us": self.total_us,
+            "modules": [root.to_dict() for root in self.roots]
+        }
+
+
+def parse_importtime(output: str) -> ImportProfile:
+    """
+    Parse -X importtime stderr output.
+    Lines arrive in post-order: children are printed before their parent,
+    with two spaces of indentation per nesting level.
+    """
+    pending: Dict[int, List[ImportRecord]] = {}
+    roots: List[ImportRecord] = []
+
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = max(0, (len(indent) - 1) // 2)
+        record = ImportRecord(module, int(self_us), int(cumulative_us), depth)
+        record.children = pending.pop(depth + 1, [])
+
+        if depth == 0:
+            roots.append(record)
+        else:
+            pending.setdefault(depth, []).append(record)
+
+    # Orphans only remain when the output was truncated
+    for depth in sorted(pending):
+        roots.extend(pending[depth])
+
+    return ImportProfile(roots)
+
+
+def profile_imports(module: str, python: str = sys.executable,
+                    extra_path: Optional[str] = None, cwd: Optional[str] = None) -> ImportProfile:
+    """Import a module in a fresh interpreter with -X importtime and parse the result."""
+    env = dict(os.environ)
+    if extra_path:
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [extra_path, env.get("PYTHONPATH")]))
+
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=cwd
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    return parse_importtime(result.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: python -m vpa.core.importtime <module>."""
+    parser = argparse.ArgumentParser(description="Per-module import time report")
+    parser.add_argument("module", help="module to import, e.g. vpa.core.app")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="hide subtrees cheaper than this")
+    parser.add_argument("--depth", type=int, default=8, help="maximum tree depth to show")
+    parser.add_argument("--json", action="store_true", help="emit the full tree as JSON")
+    args = parser.parse_args(argv)
+
+    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    profile = profile_imports(args.module, extra_path=src_dir)
+
+    if args.json:
+        print(json.dumps(profile.to_dict(), indent=2))
+    else:
+        print(profile.report(min_cumulative_us=int(args.min_ms * 1000), max_depth=args.depth))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+VPA Lazy Imports
+Deferred module loading and PEP 562 lazy package attributes.
+Target: Optional and heavy dependencies load only when first used.
+"""
+
+import sys
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
+
+
+def lazy_module(name: str) -> ModuleType:
+    """
+    Return a module whose body executes on first attribute access.
+    Raises ImportError immediately when the module cannot be found.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named '{name}'")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def optional_module(name: str) -> Optional[ModuleType]:
+    """Lazily load an optional dependency, returning None when it is not installed."""
+    try:
+        return lazy_module(name)
+    except ImportError:
+        return None
+
+
+def require_module(module: Optional[ModuleType], name: str, purpose: str) -> ModuleType:
+    """Return an optional module or raise a helpful ImportError when it is missing."""
+    if module is None:
+        raise ImportError(f"'{name}' is required for {purpose}; install it with 'pip install {name}'")
+    return module
+
+
+def attach_lazy(package_name: str, attributes: Dict[str, str]
+                ) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """
+    Build PEP 562 module hooks exposing attributes from submodules on demand.
+
+    attributes maps an exported name to the submodule (relative to the
+    package) that defines it. Returns (__getattr__, __dir__, __all__).
+    """
+    exported = sorted(attributes)
+
+    def __getattr__(name: str) -> Any:
+        submodule = attributes.get(name)
+        if submodule is None:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+
+        module = importlib.import_module(f"{package_name}.{submodule}")
+        value = getattr(module, name)
+        # Cache on the package so later lookups skip this hook
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(exported) | set(vars(sys.modules[package_name])))
+
+    return __getattr__, __dir__, list(exported)
+
+
+def lazy_attributes(*groups: Tuple[str, Iterable[str]]) -> Dict[str, str]:
+    """
+    Build an attribute map from (submodule, names) groups.
+
+    A name may not match a submodule: once that submodule is imported the
+    import system binds it on the package, so the name would refer to the
+    module or the attribute depending on import order.
+    """
+    groups = [(submodule, list(names)) for submodule, names in groups]
+    submodules = {submodule for submodule, _ in groups}
+    attributes: Dict[str, str] = {}
+    for submodule, names in groups:
+        for name in names:
+            if name in submodules:
+                raise ValueError(f"Lazy attribute '{name}' would shadow the '{name}' submodule")
+            attributes[name] = submodule
+    return attributes
@@ -0,0 +1,453 @@
+"""
+VPA Memory Cache
+Byte-bounded in-memory cache tier with LRU, LFU or W-TinyLFU eviction and per-namespace quotas.
+Target: Cache memory stays within a fixed budget however long the process runs.
+"""
+
+import sys
+import time
+import logging
+import threading
+from enum import Enum
+from typing import Dict, Any, Optional, Hashable
+from dataclasses import dataclass
+from collections import OrderedDict
+
+# Namespace budgets (bytes) used when none are configured
+DEFAULT_NAMESPACE_QUOTAS = {
+    "config": 4 * 1024 * 1024,
+    "plugin": 8 * 1024 * 1024,
+    "llm": 32 * 1024 * 1024,
+    "tts": 16 * 1024 * 1024
+}
+
+_MISSING = object()
+
+
+class EvictionPolicy(Enum):
+    LRU = "lru"
+    LFU = "lfu"
+    TINY_LFU = "w-tinylfu"
+
+    @classmethod
+    def parse(cls, value) -> "EvictionPolicy":
+        if isinstance(value, cls):
+            return value
+        return cls(str(value).lower())
+
+
+def estimate_size(value: Any, max_objects: int = 10000) -> int:
+    """
+    Approximate deep size in bytes of a cached value: the object plus the
+    containers, mappings and instance attributes reachable from it.
+    """
+    seen = set()
+    pending = [value]
+    total = 0
+    while pending and len(seen) < max_objects:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 64)
+
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            pending.append(vars(obj))
+    return total
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    created_at: float
+    expires_at: Optional[float] = None
+
+
+class _FrequencySketch:
+    """
+    Count-min sketch of access frequency with 4-bit saturating counters.
+    All counters are halved after sample_size increments so popularity ages out.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+        self.sample_size = width * 10
+        self.additions = 0
+
+    def _indexes(self, key: Hashable):
+        h = hash(key)
+        for row in range(self.depth):
+            yield row, hash((h, row)) % self.width
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in self._indexes(key):
+            if self.rows[row][index] < 15:
+                self.rows[row][index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.rows = [[count >> 1 for count in row] for row in self.rows]
+            self.additions //= 2
+
+    def frequency(self, key: Hashable) -> int:
+        return min(self.rows[row][index] for row, index in self._indexes(key))
+
+
+class _LRUOrder:
+    """Evicts the least recently used entry."""
+
+    def __init__(self, capacity: int):
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def record_access(self, key: Hashable) -> None:
+        pass
+
+    def on_hit(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        self._order.move_to_end(key)
+
+    def on_insert(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        self._order[key] = None
+
+    def on_remove(self, key: Hashable, size: int) -> None:
+        self._order.pop(key, None)
+
+    def select_victim(self, entries: Dict[Hashable, _Entry], admission: bool = True) -> Hashable:
+        return next(iter(self._order))
+
+
+class _LFUOrder:
+    """
+    Evicts the least frequently used entry, least recently used among ties.
+    Entries sit in per-frequency buckets so hits and evictions are O(1).
+    """
+
+    def __init__(self, capacity: int):
+        self._frequency: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_frequency = 0
+
+    def record_access(self, key: Hashable) -> None:
+        pass
+
+    def _unlink(self, key: Hashable) -> int:
+        frequency = self._frequency.pop(key)
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+        return frequency
+
+    def _link(self, key: Hashable, frequency: int) -> None:
+        self._frequency[key] = frequency
+        self._buckets.setdefault(frequency, OrderedDict())[key] = None
+
+    def on_hit(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        frequency = self._unlink(key)
+        self._link(key, frequency + 1)
+        if frequency == self._min_frequency and frequency not in self._buckets:
+            self._min_frequency = frequency + 1
+
+    def on_insert(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        self._link(key, 1)
+        self._min_frequency = 1
+
+    def on_remove(self, key: Hashable, size: int) -> None:
+        if key in self._frequency:
+            self._unlink(key)
+
+    def select_victim(self, entries: Dict[Hashable, _Entry], admission: bool = True) -> Hashable:
+        if self._min_frequency not in self._buckets:
+            # Only after removals emptied the lowest bucket; few distinct frequencies exist
+            self._min_frequency = min(self._buckets)
+        return next(iter(self._buckets[self._min_frequency]))
+
+
+class _TinyLFUOrder:
+    """
+    W-TinyLFU: new entries enter a small LRU window (1% of the budget);
+    entries leaving the window compete with the main region's probation
+    victim and are admitted only if the frequency sketch rates them higher.
+    The main region is a segmented LRU (20% probation, 80% protected).
+    """
+
+    def __init__(self, capacity: int):
+        self.window_capacity = max(1, capacity // 100)
+        self.protected_capacity = int((capacity - self.window_capacity) * 0.8)
+        self.sketch = _FrequencySketch()
+        self._segments = {name: OrderedDict() for name in ("window", "probation", "protected")}
+        self._bytes = {name: 0 for name in self._segments}
+        self._segment_of: Dict[Hashable, str] = {}
+
+    def record_access(self, key: Hashable) -> None:
+        self.sketch.increment(key)
+
+    def _move(self, key: Hashable, target: str, entries: Dict[Hashable, _Entry]) -> None:
+        size = entries[key].size
+        source = self._segment_of[key]
+        del self._segments[source][key]
+        self._bytes[source] -= size
+        self._segments[target][key] = None
+        self._bytes[target] += size
+        self._segment_of[key] = target
+
+    def on_hit(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        segment = self._segment_of[key]
+        if segment != "probation":
+            self._segments[segment].move_to_end(key)
+            return
+        self._move(key, "protected", entries)
+        # Demote protected overflow back to probation
+        while self._bytes["protected"] > self.protected_capacity and len(self._segments["protected"]) > 1:
+            self._move(next(iter(self._segments["protected"])), "probation", entries)
+
+    def on_insert(self, key: Hashable, entries: Dict[Hashable, _Entry]) -> None:
+        window = self._segments["window"]
+        window[key] = None
+        self._bytes["window"] += entries[key].size
+        self._segment_of[key] = "window"
+        # Entries leaving the window join probation as admission candidates
+        while self._bytes["window"] > self.window_capacity and len(window) > 1:
+            self._move(next(iter(window)), "probation", entries)
+
+    def on_remove(self, key: Hashable, size: int) -> None:
+        segment = self._segment_of.pop(key, None)
+        if segment is not None:
+            del self._segments[segment][key]
+            self._bytes[segment] -= size
+
+    def select_victim(self, entries: Dict[Hashable, _Entry], admission: bool = True) -> Hashable:
+        window, probation, protected = (self._segments[name] for name in ("window", "probation", "protected"))
+
+        if admission and len(probation) > 1:
+            # Newest probation entry (the latest to leave the window) against the oldest
+            candidate, victim = next(reversed(probation)), next(iter(probation))
+            if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+                return victim
+            return candidate
+
+        for segment in (probation, window, protected):
+            if segment:
+                return next(iter(segment))
+        raise KeyError("cache is empty")
+
+
+_ORDERS = {
+    EvictionPolicy.LRU: _LRUOrder,
+    EvictionPolicy.LFU: _LFUOrder,
+    EvictionPolicy.TINY_LFU: _TinyLFUOrder
+}
+
+
+@dataclass
+class _NamespaceStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejections: int = 0
+    expirations: int = 0
+
+
+class _Namespace:
+    """Entries of one namespace, its eviction order and its byte quota."""
+
+    def __init__(self, name: str, capacity: int, policy: EvictionPolicy):
+        self.name = name
+        self.capacity = capacity
+        self.entries: Dict[Hashable, _Entry] = {}
+        self.bytes = 0
+        self.order = _ORDERS[policy](capacity)
+        self.stats = _NamespaceStats()
+
+    def remove(self, key: Hashable) -> Optional[_Entry]:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.order.on_remove(key, entry.size)
+        self.bytes -= entry.size
+        return entry
+
+    def evict_one(self, admission: bool = True) -> Hashable:
+        victim = self.order.select_victim(self.entries, admission)
+        self.remove(victim)
+        self.stats.evictions += 1
+        return victim
+
+
+class BoundedMemoryCache:
+    """
+    In-memory cache bounded by estimated bytes.
+
+    Each namespace (config, plugin, llm, tts, ...) has its own eviction
+    order and optional byte quota; all namespaces together stay within
+    max_bytes. Namespaces without a quota are bounded by max_bytes alone.
+    Values larger than their namespace's budget are not cached.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 policy: EvictionPolicy = EvictionPolicy.TINY_LFU,
+                 namespace_quotas: Optional[Dict[str, int]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = max_bytes
+        self.policy = EvictionPolicy.parse(policy)
+        self.namespace_quotas = dict(DEFAULT_NAMESPACE_QUOTAS if namespace_quotas is None else namespace_quotas)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def _namespace(self, name: str) -> _Namespace:
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            capacity = min(self.namespace_quotas.get(name, self.max_bytes), self.max_bytes)
+            namespace = self._namespaces[name] = _Namespace(name, capacity, self.policy)
+        return namespace
+
+    def get(self, key: Hashable, default: Any = None, namespace: str = "default") -> Any:
+        with self._lock:
+            space = self._namespace(namespace)
+            space.order.record_access(key)
+            entry = space.entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+                self._remove(space, key)
+                space.stats.expirations += 1
+                entry = None
+            if entry is None:
+                space.stats.misses += 1
+                return default
+            space.stats.hits += 1
+            space.order.on_hit(key, space.entries)
+            return entry.value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: Hashable, value: Any, namespace: str = "default",
+            ttl: Optional[float] = None, size: Optional[int] = None) -> bool:
+        """Store a value; returns False if it could not be admitted."""
+        size = estimate_size(value) if size is None else size
+        now = time.time()
+        with self._lock:
+            space = self._namespace(namespace)
+            self._remove(space, key)
+            if size > space.capacity:
+                space.stats.rejections += 1
+                return False
+
+            space.entries[key] = _Entry(value, size, now, now + ttl if ttl is not None else None)
+            space.bytes += size
+            self._bytes += size
+            space.order.record_access(key)
+            space.order.on_insert(key, space.entries)
+
+            while space.bytes > space.capacity:
+                self._evict(space)
+            while self._bytes > self.max_bytes:
+                self._evict(max(self._namespaces.values(), key=lambda ns: ns.bytes / max(ns.capacity, 1)))
+            if key not in space.entries:
+                space.stats.rejections += 1
+                return False
+            return True
+
+    def _evict(self, space: _Namespace, admission: bool = True) -> None:
+        before = space.bytes
+        space.evict_one(admission)
+        self._bytes -= before - space.bytes
+
+    def _remove(self, space: _Namespace, key: Hashable) -> bool:
+        entry = space.remove(key)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        return True
+
+    def delete(self, key: Hashable, namespace: str = "default") -> bool:
+        with self._lock:
+            return self._remove(self._namespace(namespace), key)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Drop every entry (of one namespace); returns the number removed."""
+        with self._lock:
+            targets = [self._namespace(namespace)] if namespace else list(self._namespaces.values())
+            removed = 0
+            for space in targets:
+                for key in list(space.entries):
+                    self._remove(space, key)
+                    removed += 1
+            return removed
+
+    def expire(self, max_age: Optional[float] = None) -> int:
+        """Drop entries past their TTL or, with max_age, older than max_age seconds."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for space in self._namespaces.values():
+                for key, entry in list(space.entries.items()):
+                    expired = entry.expires_at is not None and entry.expires_at <= now
+                    if expired or (max_age is not None and now - entry.created_at > max_age):
+                        self._remove(space, key)
+                        space.stats.expirations += 1
+                        removed += 1
+        return removed
+
+    def trim(self, keep_fraction: float = 0.5) -> int:
+        """Evict in policy order until each namespace keeps keep_fraction of its entries."""
+        removed = 0
+        with self._lock:
+            for space in self._namespaces.values():
+                keep = int(len(space.entries) * keep_fraction)
+                while len(space.entries) > keep:
+                    self._evict(space, admission=False)
+                    removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(space.entries) for space in self._namespaces.values())
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hit ratio, evictions and resident bytes, overall and per namespace."""
+        with self._lock:
+            namespaces = {}
+            totals = _NamespaceStats()
+            for name, space in self._namespaces.items():
+                stats = space.stats
+                lookups = stats.hits + stats.misses
+                namespaces[name] = {
+                    "entries": len(space.entries),
+                    "resident_bytes": space.bytes,
+                    "quota_bytes": space.capacity,
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "hit_ratio": stats.hits / lookups if lookups else 0.0,
+                    "evictions": stats.evictions,
+                    "rejections": stats.rejections,
+                    "expirations": stats.expirations
+                }
+                for counter in ("hits", "misses", "evictions", "rejections", "expirations"):
+                    setattr(totals, counter, getattr(totals, counter) + getattr(stats, counter))
+
+            lookups = totals.hits + totals.misses
+            return {
+                "policy": self.policy.value,
+                "max_bytes": self.max_bytes,
+                "resident_bytes": self._bytes,
+                "entries": len(self),
+                "hits": totals.hits,
+                "misses": totals.misses,
+                "hit_ratio": totals.hits / lookups if lookups else 0.0,
+                "evictions": totals.evictions,
+                "rejections": totals.rejections,
+                "expirations": totals.expirations,
+                "namespaces": namespaces
+            }
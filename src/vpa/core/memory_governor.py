@@ -0,0 +1,311 @@
+"""
+VPA Memory Governor
+Frequent low-cost RSS sampling with ordered, measured reclaim steps under memory pressure.
+Target: Act on memory pressure before the 2GB target is missed instead of only logging it.
+"""
+
+import gc
+import os
+import time
+import ctypes
+import ctypes.util
+import asyncio
+import logging
+from enum import Enum
+from typing import Dict, Any, List, Optional, Callable
+from dataclasses import dataclass, field, asdict
+from collections import deque
+
+from .container import container
+from .events import event_bus
+from .lazy_import import lazy_module
+from .supervisor import task_supervisor
+
+# psutil is only the fallback where /proc/self/statm is unavailable
+psutil = lazy_module("psutil")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class MemoryPressure(Enum):
+    NONE = 0
+    MODERATE = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+@dataclass
+class MemoryThresholds:
+    """RSS levels (MB) at which each pressure level starts."""
+    moderate_mb: float = 1024.0
+    high_mb: float = 1536.0
+    critical_mb: float = 2048.0
+
+    def level_for(self, rss_mb: float) -> MemoryPressure:
+        if rss_mb >= self.critical_mb:
+            return MemoryPressure.CRITICAL
+        if rss_mb >= self.high_mb:
+            return MemoryPressure.HIGH
+        if rss_mb >= self.moderate_mb:
+            return MemoryPressure.MODERATE
+        return MemoryPressure.NONE
+
+
+@dataclass
+class ReclaimStep:
+    """
+    A registered reclaim callback.
+    The callback receives the current pressure level and returns the number
+    of items it released (or None).
+    """
+    name: str
+    callback: Callable[[MemoryPressure], Optional[int]]
+    min_level: MemoryPressure = MemoryPressure.MODERATE
+
+
+@dataclass
+class StepResult:
+    name: str
+    freed_bytes: int
+    items: Optional[int]
+    duration_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class ReclaimReport:
+    level: str
+    rss_before_mb: float
+    rss_after_mb: float
+    steps: List[StepResult] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def freed_bytes(self) -> int:
+        return sum(step.freed_bytes for step in self.steps)
+
+
+def read_rss_bytes() -> int:
+    """Resident set size of this process; one small read on Linux."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return psutil.Process().memory_info().rss
+
+
+def _load_malloc_trim() -> Optional[Callable[[int], int]]:
+    """glibc malloc_trim returns freed heap pages to the OS; absent elsewhere."""
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return None
+    try:
+        return getattr(ctypes.CDLL(libc_name), "malloc_trim", None)
+    except OSError:
+        return None
+
+
+class MemoryGovernor:
+    """
+    Samples RSS every sample_interval seconds and, when a pressure threshold
+    is crossed, runs registered reclaim steps in order. Steps stop as soon as
+    RSS falls below the moderate threshold. Each step's effect is measured as
+    the RSS delta across it.
+    """
+
+    def __init__(self, thresholds: Optional[MemoryThresholds] = None,
+                 sample_interval: float = 1.0, reclaim_cooldown: float = 10.0):
+        self.logger = logging.getLogger(__name__)
+        self.thresholds = thresholds or MemoryThresholds()
+        self.sample_interval = sample_interval
+        self.reclaim_cooldown = reclaim_cooldown
+        self.rss_bytes = 0
+        self.pressure = MemoryPressure.NONE
+        self._steps: List[ReclaimStep] = []
+        self._reports: deque = deque(maxlen=50)
+        self._last_reclaim = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._malloc_trim = _load_malloc_trim()
+        self._metrics = {
+            "samples": 0,
+            "reclaims": 0,
+            "total_freed_bytes": 0,
+            "peak_rss_mb": 0.0
+        }
+
+    @property
+    def rss_mb(self) -> float:
+        return self.rss_bytes / 1024 / 1024
+
+    def register_step(self, name: str, callback: Callable[[MemoryPressure], Optional[int]],
+                      min_level: MemoryPressure = MemoryPressure.MODERATE) -> None:
+        """Append a reclaim step; steps run in registration order."""
+        self._steps.append(ReclaimStep(name, callback, min_level))
+
+    def register_default_steps(self) -> None:
+        """
+        Register reclaim steps for the core components: cache tiers, idle
+        plugins, executor pools and finally the garbage collector.
+        Components that were never constructed are skipped rather than built.
+        """
+        self.register_step("trim_caches", self._trim_caches)
+        self.register_step("unload_idle_plugins", self._unload_idle_plugins)
+        self.register_step("shrink_executors", self._shrink_executors, MemoryPressure.HIGH)
+        self.register_step("garbage_collect", self._garbage_collect)
+
+    def sample(self) -> float:
+        """Refresh the RSS sample and pressure level; returns RSS in MB."""
+        self.rss_bytes = read_rss_bytes()
+        self._metrics["samples"] += 1
+        self._metrics["peak_rss_mb"] = max(self._metrics["peak_rss_mb"], self.rss_mb)
+
+        level = self.thresholds.level_for(self.rss_mb)
+        if level != self.pressure:
+            previous, self.pressure = self.pressure, level
+            log = self.logger.warning if level.value > previous.value else self.logger.info
+            log(f"Memory pressure {previous.name} -> {level.name} at {self.rss_mb:.1f}MB")
+            event_bus.emit("memory_pressure", {
+                "level": level.name.lower(),
+                "previous_level": previous.name.lower(),
+                "rss_mb": self.rss_mb
+            })
+        return self.rss_mb
+
+    def check(self) -> Optional[ReclaimReport]:
+        """Sample and reclaim if under pressure and outside the cooldown."""
+        self.sample()
+        if self.pressure == MemoryPressure.NONE:
+            return None
+        if time.monotonic() - self._last_reclaim < self.reclaim_cooldown:
+            return None
+        return self.reclaim()
+
+    def reclaim(self, level: Optional[MemoryPressure] = None) -> ReclaimReport:
+        """Run reclaim steps for the given (default: current) pressure level."""
+        level = level or self.pressure
+        self._last_reclaim = time.monotonic()
+        rss_before = read_rss_bytes()
+        report = ReclaimReport(level.name.lower(), rss_before / 1024 / 1024, 0.0)
+
+        current = rss_before
+        for step in self._steps:
+            if level.value < step.min_level.value:
+                continue
+            if report.steps and current / 1024 / 1024 < self.thresholds.moderate_mb:
+                break
+
+            started = time.perf_counter()
+            items, error = None, None
+            try:
+                items = step.callback(level)
+            except Exception as e:
+                error = str(e)
+                self.logger.error(f"Reclaim step '{step.name}' failed: {e}")
+
+            after = read_rss_bytes()
+            report.steps.append(StepResult(
+                name=step.name,
+                freed_bytes=max(0, current - after),
+                items=items,
+                duration_ms=(time.perf_counter() - started) * 1000,
+                error=error
+            ))
+            current = after
+
+        self.rss_bytes = current
+        report.rss_after_mb = current / 1024 / 1024
+        self._reports.append(report)
+        self._metrics["reclaims"] += 1
+        self._metrics["total_freed_bytes"] += report.freed_bytes
+
+        summary = ", ".join(f"{s.name}={s.freed_bytes / 1024 / 1024:.1f}MB" for s in report.steps)
+        self.logger.info(f"Memory reclaim at {report.level} pressure: "
+                         f"{report.rss_before_mb:.1f}MB -> {report.rss_after_mb:.1f}MB ({summary})")
+        event_bus.emit("memory_reclaimed", asdict(report))
+        return report
+
+    @staticmethod
+    def keep_fraction(level: MemoryPressure) -> float:
+        """Share of cache entries a tier keeps at each pressure level."""
+        return {
+            MemoryPressure.NONE: 1.0,
+            MemoryPressure.MODERATE: 0.5,
+            MemoryPressure.HIGH: 0.25,
+            MemoryPressure.CRITICAL: 0.0
+        }[level]
+
+    def _trim_caches(self, level: MemoryPressure) -> int:
+        keep = self.keep_fraction(level)
+        removed = 0
+        if container.is_initialized("cache_manager"):
+            removed += container.get("cache_manager").trim_memory_cache(keep)
+        if container.is_initialized("response_optimizer"):
+            removed += container.get("response_optimizer").trim_cache(keep)
+        if container.is_initialized("plugin_manager"):
+            removed += container.get("plugin_manager").trim_result_cache(keep)
+        return removed
+
+    def _unload_idle_plugins(self, level: MemoryPressure) -> int:
+        if not container.is_initialized("plugin_manager"):
+            return 0
+        manager = container.get("plugin_manager")
+        return len(manager.evict_idle_plugins(rss_threshold_mb=self.thresholds.moderate_mb,
+                                              rss_mb=read_rss_bytes() / 1024 / 1024))
+
+    def _shrink_executors(self, level: MemoryPressure) -> int:
+        if not container.is_initialized("executor_service"):
+            return 0
+        return container.get("executor_service").shrink()
+
+    def _garbage_collect(self, level: MemoryPressure) -> int:
+        # Young generations are cheap; full collections only once pressure is high
+        generation = 1 if level == MemoryPressure.MODERATE else 2
+        collected = gc.collect(generation)
+        if level.value >= MemoryPressure.HIGH.value and self._malloc_trim is not None:
+            self._malloc_trim(0)
+        return collected
+
+    def start(self) -> None:
+        """Start the background sampling loop under the task supervisor."""
+        if self._task is None or self._task.done():
+            self._task = task_supervisor.supervise("memory_governor", self._run).task
+
+    async def stop(self) -> None:
+        """Stop the background sampling loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Memory governor check failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get sampling, pressure and per-step reclaim results."""
+        last = self._reports[-1] if self._reports else None
+        return {
+            **self._metrics,
+            "rss_mb": self.rss_mb,
+            "pressure": self.pressure.name.lower(),
+            "thresholds_mb": asdict(self.thresholds),
+            "steps": [step.name for step in self._steps],
+            "last_reclaim": asdict(last) if last else None
+        }
+
+
+def _create_memory_governor() -> MemoryGovernor:
+    governor = MemoryGovernor()
+    governor.register_default_steps()
+    return governor
+
+
+# Global memory governor instance, constructed on first access
+memory_governor = container.register(
+    "memory_governor", _create_memory_governor, on_stop=lambda governor: governor.stop(),
+    depends_on=("cache_manager", "response_optimizer", "plugin_manager", "executor_service")
+)
@@ -4,12 +4,18 @@ Monitors and reports performance metrics for optimization validation
 """
 
 import time
-import psutil
 import asyncio
 from typing import Dict, Any, List
 from dataclasses import dataclass, asdict
 from collections import deque
 
+from .container import container
+from .lazy_import import lazy_module
+from .supervisor import task_supervisor
+
+# psutil is only needed once a monitor samples the process
+psutil = lazy_module("psutil")
+
 @dataclass
 class PerformanceMetric:
     """Single performance measurement"""
@@ -48,6 +54,12 @@ class VPAPerformanceMonitor:
             self.metrics_history.append(metric)
             await asyncio.sleep(interval)
     
+    def start(self, interval: float = 1.0) -> asyncio.Task:
+        """Run start_monitoring under the task supervisor so failures are logged and restarted"""
+        return task_supervisor.supervise(
+            "performance_monitor", lambda: self.start_monitoring(interval)
+        ).task
+    
     def stop_monitoring(self):
         """Stop performance monitoring"""
         self._monitoring = False
@@ -120,5 +132,8 @@ class VPAPerformanceMonitor:
         
         return filename
 
-# Global performance monitor
-performance_monitor = VPAPerformanceMonitor()
+# Global performance monitor, constructed on first access
+performance_monitor = container.register(
+    "performance_monitor", VPAPerformanceMonitor,
+    on_stop=lambda monitor: monitor.stop_monitoring()
+)
@@ -0,0 +1,227 @@
+"""
+VPA Plugin Result Cache
+Declarative memoization of Plugin.process results with single-flight deduplication.
+Target: Identical normalized requests within a plugin's TTL never re-execute process().
+"""
+
+import copy
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, NamedTuple
+from dataclasses import dataclass
+from collections import OrderedDict
+
+from .tasks import task_tracker
+
+
+@dataclass(frozen=True)
+class PluginCachePolicy:
+    """
+    Cacheability declared by a plugin for its process() results.
+
+    ttl: seconds a result is served as fresh.
+    context_keys: context entries that participate in the cache key; all
+        other context is ignored when matching requests.
+    stale_while_revalidate: seconds past ttl during which the stale result is
+        returned immediately while a background refresh runs.
+    """
+    ttl: float = 60.0
+    context_keys: Tuple[str, ...] = ()
+    stale_while_revalidate: float = 0.0
+
+
+@dataclass
+class _CachedResult:
+    """Single memoized plugin result."""
+    result: Dict[str, Any]
+    stored_at: float
+    policy: PluginCachePolicy
+
+
+class _Failure(NamedTuple):
+    """Exception raised by a single-flight computation, re-raised in each of its callers."""
+    error: Exception
+
+
+@dataclass
+class _PluginCacheStats:
+    """Per-plugin cache counters."""
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+
+
+class PluginResultCache:
+    """
+    Bounded LRU cache for plugin results.
+    Concurrent identical misses share a single process() call, and a failed
+    call is reported to on_error once however many callers it fails. Every
+    caller gets its own shallow copy of a result: replacing or adding its
+    top-level keys never changes the cached result, but nested dicts and
+    lists are still shared between callers and must not be edited in place.
+    """
+
+    def __init__(self, max_entries: int = 512,
+                 on_error: Optional[Callable[[str, Exception], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.on_error = on_error
+        self._entries: "OrderedDict[Tuple[str, str, str], _CachedResult]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self._stats: Dict[str, _PluginCacheStats] = {}
+
+    @staticmethod
+    def normalize_input(user_input: str) -> str:
+        """Normalize user input so trivially different phrasings share a key."""
+        return " ".join(user_input.lower().split())
+
+    def make_key(self, plugin_name: str, user_input: str, context: Dict[str, Any],
+                 policy: PluginCachePolicy) -> Tuple[str, str, str]:
+        """Build the cache key from plugin, normalized input and selected context."""
+        selected = {key: context.get(key) for key in policy.context_keys}
+        context_part = json.dumps(selected, sort_keys=True, default=str)
+        return (plugin_name, self.normalize_input(user_input), context_part)
+
+    async def get_or_compute(self, plugin_name: str, user_input: str, context: Dict[str, Any],
+                             policy: PluginCachePolicy,
+                             compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return a cached result or compute it once for all concurrent callers."""
+        key = self.make_key(plugin_name, user_input, context, policy)
+        stats = self._stats.setdefault(plugin_name, _PluginCacheStats())
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < entry.policy.ttl:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return copy.copy(entry.result)
+            if age < entry.policy.ttl + entry.policy.stale_while_revalidate:
+                self._entries.move_to_end(key)
+                stats.stale_hits += 1
+                if key not in self._inflight:
+                    stats.refreshes += 1
+                    self._start_refresh(key, policy, compute)
+                return copy.copy(entry.result)
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            stats.coalesced += 1
+            # A background refresh a request now waits on is drained, not cancelled, at shutdown
+            task_tracker.promote(pending, "request")
+            return await self._await_flight(pending)
+
+        stats.misses += 1
+        return await self._compute_and_store(key, policy, compute)
+
+    async def _compute_and_store(self, key: Tuple[str, str, str], policy: PluginCachePolicy,
+                                 compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run compute() as the single flight for key and return its outcome."""
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._start_flight(key, policy, compute)
+        else:
+            task_tracker.promote(flight, "request")
+        return await self._await_flight(flight)
+
+    def _start_flight(self, key: Tuple[str, str, str], policy: PluginCachePolicy,
+                      compute: Callable[[], Awaitable[Dict[str, Any]]], kind: str = "request") -> asyncio.Task:
+        """
+        Run compute() as a tracked task registered before it starts, so callers join it.
+        Flights callers wait on are request work, which a shutdown drain waits for.
+        A flight dropped by invalidate() still answers its callers but stores nothing.
+        """
+        async def fill():
+            try:
+                result = await compute()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(key[0], e)
+                # Returned rather than raised: callers re-raise it, the task itself succeeded
+                return _Failure(e)
+            if self._inflight.get(key) is asyncio.current_task():
+                self._store(key, result, policy)
+            return result
+
+        flight = task_tracker.spawn(fill(), kind=kind, name=f"plugin_cache:{key[0]}")
+        self._inflight[key] = flight
+
+        def finished(task: asyncio.Task) -> None:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        flight.add_done_callback(finished)
+        return flight
+
+    @staticmethod
+    async def _await_flight(flight: asyncio.Task) -> Dict[str, Any]:
+        # Shielded, so a cancelled caller does not cancel the flight for the others
+        outcome = await asyncio.shield(flight)
+        if isinstance(outcome, _Failure):
+            raise outcome.error
+        return copy.copy(outcome)
+
+    def _start_refresh(self, key: Tuple[str, str, str], policy: PluginCachePolicy,
+                       compute: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """Revalidate a stale entry in the background."""
+        flight = self._start_flight(key, policy, compute, kind="background")
+
+        def report(task: asyncio.Task) -> None:
+            if not task.cancelled() and isinstance(task.result(), _Failure):
+                self.logger.warning(f"Background refresh failed for plugin '{key[0]}': {task.result().error}")
+        flight.add_done_callback(report)
+
+    def _store(self, key: Tuple[str, str, str], result: Dict[str, Any],
+               policy: PluginCachePolicy) -> None:
+        """Insert a copy of a result, evicting the least recently used entries past the bound."""
+        self._entries[key] = _CachedResult(result=copy.copy(result), stored_at=time.monotonic(), policy=policy)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats.setdefault(evicted_key[0], _PluginCacheStats()).evictions += 1
+
+    def invalidate(self, plugin_name: Optional[str] = None) -> int:
+        """
+        Drop cached results for one plugin, or all plugins when no name is given.
+        Flights still running for them are detached, so their results are not stored.
+        """
+        keys = [key for key in self._entries if plugin_name is None or key[0] == plugin_name]
+        for key in keys:
+            del self._entries[key]
+        for key in [key for key in self._inflight if plugin_name is None or key[0] == plugin_name]:
+            del self._inflight[key]
+        return len(keys)
+
+    def trim(self, keep_fraction: float = 0.5) -> int:
+        """Evict least recently used entries until keep_fraction of them remain."""
+        removed = len(self._entries) - int(len(self._entries) * keep_fraction)
+        for _ in range(removed):
+            key, _ = self._entries.popitem(last=False)
+            self._stats.setdefault(key[0], _PluginCacheStats()).evictions += 1
+        return removed
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache size and per-plugin hit/miss metrics."""
+        per_plugin = {}
+        for plugin_name, stats in self._stats.items():
+            lookups = stats.hits + stats.stale_hits + stats.misses + stats.coalesced
+            per_plugin[plugin_name] = {
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "stale_hits": stats.stale_hits,
+                "coalesced": stats.coalesced,
+                "refreshes": stats.refreshes,
+                "evictions": stats.evictions,
+                "hit_ratio": (stats.hits + stats.stale_hits + stats.coalesced) / max(lookups, 1)
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "plugins": per_plugin
+        }
@@ -0,0 +1,172 @@
+"""
+VPA Plugin Usage Profile
+Persisted per-plugin usage frequency and time-of-day statistics.
+Target: Drive background preloading of likely plugins and LRU eviction of idle ones.
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Dict, Any, List, Optional, Iterable
+from dataclasses import dataclass, field, asdict
+
+from .access_log import file_lock
+
+
+@dataclass
+class PluginUsageRecord:
+    """Usage statistics for a single plugin."""
+    hits: int = 0
+    last_used: float = 0.0
+    hourly_hits: List[int] = field(default_factory=lambda: [0] * 24)
+
+
+class PluginUsageProfile:
+    """
+    Usage profile persisted alongside the plugin discovery cache.
+    Scores combine overall frequency with the share of use at the current hour.
+
+    Worker processes save to the same file: a save merges the hits recorded
+    since the previous save into the file's records under a file lock and
+    replaces the file atomically, then adopts the merged records.
+    """
+
+    def __init__(self, profile_file: str = "plugin_usage.json"):
+        self.logger = logging.getLogger(__name__)
+        self.profile_file = profile_file
+        self.profile_version = "1.0"
+        self.records: Dict[str, PluginUsageRecord] = {}
+        self._unsaved: Dict[str, PluginUsageRecord] = {}
+
+    def record(self, plugin_name: str, timestamp: Optional[float] = None) -> None:
+        """Record one use of a plugin."""
+        timestamp = timestamp or time.time()
+        hour = time.localtime(timestamp).tm_hour
+        for records in (self.records, self._unsaved):
+            record = records.setdefault(plugin_name, PluginUsageRecord())
+            record.hits += 1
+            record.last_used = max(record.last_used, timestamp)
+            record.hourly_hits[hour] += 1
+
+    def score(self, plugin_name: str, hour: Optional[int] = None) -> float:
+        """Likelihood score for a plugin being needed at the given hour."""
+        record = self.records.get(plugin_name)
+        if not record or record.hits == 0:
+            return 0.0
+
+        hour = time.localtime().tm_hour if hour is None else hour
+        # Blend the hour and its neighbours so sparse profiles still rank sensibly
+        nearby = sum(record.hourly_hits[(hour + offset) % 24] for offset in (-1, 0, 1))
+        return record.hits * (1.0 + nearby / record.hits)
+
+    def likely_plugins(self, candidates: Iterable[str], limit: int,
+                       hour: Optional[int] = None) -> List[str]:
+        """Return up to limit candidates with a positive score, most likely first."""
+        scored = [(self.score(name, hour), name) for name in candidates]
+        scored = [item for item in scored if item[0] > 0]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [name for _, name in scored[:limit]]
+
+    def least_recently_used(self, candidates: Iterable[str], min_idle_seconds: float = 0.0) -> List[str]:
+        """Return candidates idle for at least min_idle_seconds, least recently used first."""
+        now = time.time()
+        idle = []
+        for name in candidates:
+            record = self.records.get(name)
+            last_used = record.last_used if record else 0.0
+            if now - last_used >= min_idle_seconds:
+                idle.append((last_used, name))
+        idle.sort()
+        return [name for _, name in idle]
+
+    def _read_file(self) -> Optional[Dict[str, PluginUsageRecord]]:
+        """Records in the profile file; None if it is missing or from another version."""
+        if not os.path.exists(self.profile_file):
+            return None
+
+        with open(self.profile_file, 'r') as f:
+            profile_data = json.load(f)
+
+        if profile_data.get("version") != self.profile_version:
+            return None
+
+        records = {}
+        for name, record_data in profile_data.get("plugins", {}).items():
+            record = PluginUsageRecord(**record_data)
+            if len(record.hourly_hits) == 24:
+                records[name] = record
+        return records
+
+    def _saved_part(self, plugin_name: str) -> PluginUsageRecord:
+        """The plugin's record without the hits recorded since the last save."""
+        record = self.records[plugin_name]
+        delta = self._unsaved.get(plugin_name)
+        if delta is None:
+            return PluginUsageRecord(record.hits, record.last_used, list(record.hourly_hits))
+        return PluginUsageRecord(
+            record.hits - delta.hits, record.last_used,
+            [a - b for a, b in zip(record.hourly_hits, delta.hourly_hits)]
+        )
+
+    def load(self) -> bool:
+        """Load the persisted profile."""
+        try:
+            records = self._read_file()
+        except Exception as e:
+            self.logger.debug(f"Failed to load plugin usage profile: {e}")
+            return False
+        if records is None:
+            return False
+
+        self.records.update(records)
+        self._unsaved.clear()
+        return True
+
+    def save(self) -> None:
+        """Merge the hits recorded since the last save into the persisted profile."""
+        if not self._unsaved:
+            return
+
+        try:
+            with file_lock(self.profile_file):
+                try:
+                    merged = self._read_file()
+                except ValueError as e:
+                    self.logger.warning(f"Replacing unreadable plugin usage profile: {e}")
+                    merged = None
+                if merged is None:
+                    # Nothing to merge into: start from what this process had saved or loaded
+                    merged = {name: self._saved_part(name) for name in self.records}
+
+                for name, delta in self._unsaved.items():
+                    record = merged.setdefault(name, PluginUsageRecord())
+                    record.hits += delta.hits
+                    record.last_used = max(record.last_used, delta.last_used)
+                    record.hourly_hits = [a + b for a, b in zip(record.hourly_hits, delta.hourly_hits)]
+
+                profile_data = {
+                    "version": self.profile_version,
+                    "saved_at": time.time(),
+                    "plugins": {name: asdict(record) for name, record in merged.items()}
+                }
+
+                # Written aside and renamed, so a crash mid-write never corrupts the profile
+                temp_file = f"{self.profile_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'w') as f:
+                    json.dump(profile_data, f)
+                os.replace(temp_file, self.profile_file)
+
+            # Other processes' usage now counts here too
+            self.records = merged
+            self._unsaved = {}
+
+        except Exception as e:
+            self.logger.warning(f"Failed to save plugin usage profile: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get usage profile summary."""
+        return {
+            "tracked_plugins": len(self.records),
+            "total_hits": sum(record.hits for record in self.records.values())
+        }
@@ -5,6 +5,7 @@ Target: Startup time optimization with cached plugin discovery.
 """
 
 import os
+import re
 import time
 import json
 import logging
@@ -12,12 +13,19 @@ import asyncio
 import importlib
 import importlib.util
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Type, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Type, Union, AsyncIterator, Iterable
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
 
+from .container import container
+from .cache_manager import cache_manager
 from .events import PerformanceMonitor, event_bus
+from .executors import executor_service
+from .plugin_cache import PluginCachePolicy, PluginResultCache
+from .plugin_usage import PluginUsageProfile
+from .tasks import task_tracker
+from .tracing import startup_tracer
 
 
 @dataclass
@@ -32,6 +40,7 @@ class PluginMetadata:
     load_time: Optional[float] = None
     enabled: bool = True
     priority: int = 0
+    keywords: List[str] = field(default_factory=list)  # routes input to the plugin before it is loaded
 
 
 class Plugin(ABC):
@@ -65,6 +74,20 @@ class Plugin(ABC):
         """Process the user input and return a response."""
         pass
     
+    async def process_stream(self, user_input: str, context: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield partial results as they become available.
+        
+        Partial results carry incremental output under "text". The default
+        yields the complete process() result once; plugins override this to
+        reduce time-to-first-output.
+        """
+        yield await self.process(user_input, context)
+    
+    @property
+    def cache_policy(self) -> Optional[PluginCachePolicy]:
+        """Declared cacheability of process() results; None disables caching."""
+        return None
+    
     def initialize(self) -> None:
         """Initialize plugin - called during load."""
         pass
@@ -80,22 +103,37 @@ class PluginManager:
     Maintains compartmentalized addon isolation with zero direct coupling.
     """
     
-    def __init__(self, plugin_paths: List[str] = None):
+    def __init__(self, plugin_paths: List[str] = None, lazy_loading: bool = False, access_log=None):
         self.logger = logging.getLogger(__name__)
+        # Optional CacheAccessLog; metadata loads are recorded as "plugin" accesses
+        self.access_log = access_log
         self.plugin_paths = plugin_paths or ["src/plugins", "plugins"]
         self.plugins: Dict[str, Plugin] = {}
         self.plugin_metadata: Dict[str, PluginMetadata] = {}
+        self._loading: Dict[str, asyncio.Task] = {}  # single-flight loads by plugin name
         self.plugin_cache_file = "plugin_cache.json"
-        self.cache_version = "1.0"
-        self._load_executor = ThreadPoolExecutor(max_workers=4)
+        self.cache_version = "1.1"
+        self._result_cache = PluginResultCache(on_error=self.record_plugin_error)
+        self.usage_profile = PluginUsageProfile()
+        self._usage_profile_loaded = False
+        self.lazy_loading = lazy_loading  # Load on first use / usage-driven preload only
+        self.preload_limit = 5
+        self.max_route_loads = 2  # unloaded plugins a single find_handlers() call may load
+        self.min_idle_seconds = 300.0
+        self.evictions_per_pass = 1
         self._metrics = {
             "plugins_discovered": 0,
             "plugins_loaded": 0,
             "cache_hits": 0,
             "cache_misses": 0,
             "total_load_time": 0.0,
-            "average_load_time": 0.0
+            "average_load_time": 0.0,
+            "plugins_preloaded": 0,
+            "plugins_evicted": 0,
+            "plugin_errors": 0
         }
+        self._error_times: deque = deque(maxlen=100)
+        self._failed_loads: set = set()  # not retried by routing until the next discovery
         
         # Subscribe to cleanup event
         event_bus.subscribe("app_shutdown", self.cleanup_all_plugins)
@@ -106,19 +144,26 @@ class PluginManager:
         start_time = time.perf_counter()
         
         try:
-            # Try to load from cache first
-            if use_cache and await self._load_from_cache():
-                self._metrics["cache_hits"] += 1
-                self.logger.info("Plugins loaded from cache successfully")
-                return
-            
-            self._metrics["cache_misses"] += 1
-            
-            # Discover plugins from file system
-            await self._discover_from_filesystem()
-            
-            # Save to cache for next startup
-            await self._save_to_cache()
+            with startup_tracer.span("plugin_discovery", category="plugins", use_cache=use_cache):
+                # Loaded at startup only: a reload would drop hits recorded since the last save
+                if not self._usage_profile_loaded:
+                    self.usage_profile.load()
+                    self._usage_profile_loaded = True
+                self._failed_loads.clear()
+                
+                # Try to load from cache first
+                if use_cache and await self._load_from_cache():
+                    self._metrics["cache_hits"] += 1
+                    self.logger.info("Plugins loaded from cache successfully")
+                    return
+                
+                self._metrics["cache_misses"] += 1
+                
+                # Discover plugins from file system
+                await self._discover_from_filesystem()
+                
+                # Save to cache for next startup
+                await self._save_to_cache()
             
             discovery_time = time.perf_counter() - start_time
             self.logger.info(f"Plugin discovery completed in {discovery_time:.3f}s")
@@ -156,14 +201,23 @@ class PluginManager:
             metadata = await self._extract_plugin_metadata(plugin_file)
             if metadata:
                 self.plugin_metadata[metadata.name] = metadata
+                self._record_metadata_load(metadata)
                 return metadata
         except Exception as e:
             self.logger.warning(f"Failed to process plugin file {plugin_file}: {e}")
         
         return None
     
+    def _record_metadata_load(self, metadata: PluginMetadata) -> None:
+        if self.access_log is not None:
+            self.access_log.record("plugin", metadata.file_path, {"path": metadata.file_path})
+    
     async def _extract_plugin_metadata(self, plugin_file: Path) -> Optional[PluginMetadata]:
-        """Extract metadata from plugin file."""
+        """Extract metadata from plugin file; plugin module code runs on the blocking-plugin pool."""
+        return await executor_service.run("blocking-plugin", self._read_plugin_metadata, plugin_file)
+    
+    def _read_plugin_metadata(self, plugin_file: Path) -> Optional[PluginMetadata]:
+        """Import a plugin file and read metadata from its plugin class."""
         try:
             # Load module spec
             spec = importlib.util.spec_from_file_location("plugin_temp", plugin_file)
@@ -191,7 +245,8 @@ class PluginManager:
                         dependencies=getattr(instance, 'dependencies', []),
                         file_path=str(plugin_file),
                         enabled=True,
-                        priority=getattr(instance, 'priority', 0)
+                        priority=getattr(instance, 'priority', 0),
+                        keywords=[keyword.lower() for keyword in getattr(instance, 'keywords', [])]
                     )
         
         except Exception as e:
@@ -208,38 +263,40 @@ class PluginManager:
         if plugin_name not in self.plugin_metadata:
             self.logger.warning(f"Plugin '{plugin_name}' not found in metadata")
             return None
-        
+
+        # Routing, preloading and explicit loads may race; they share one import
+        flight = self._loading.get(plugin_name)
+        if flight is None:
+            flight = self._start_load(plugin_name)
+        # Shielded, so a cancelled caller does not cancel the load for the others
+        return await asyncio.shield(flight)
+
+    def _start_load(self, plugin_name: str) -> asyncio.Task:
+        """Run the load of plugin_name as a tracked task registered before it starts."""
+        async def load():
+            with startup_tracer.span(f"plugin_load:{plugin_name}", category="plugins"):
+                return await self._load_plugin_module(plugin_name)
+
+        flight = task_tracker.spawn(load(), kind="request", name=f"plugin_load:{plugin_name}")
+        self._loading[plugin_name] = flight
+
+        def finished(task: asyncio.Task) -> None:
+            if self._loading.get(plugin_name) is task:
+                del self._loading[plugin_name]
+        flight.add_done_callback(finished)
+        return flight
+    
+    async def _load_plugin_module(self, plugin_name: str) -> Optional[Plugin]:
+        """Import, instantiate and initialize a discovered plugin."""
         start_time = time.perf_counter()
         
         try:
             metadata = self.plugin_metadata[plugin_name]
             
-            # Load the plugin module
-            spec = importlib.util.spec_from_file_location(
-                plugin_name, metadata.file_path
+            # Module execution and initialize() block, so keep them off the event loop
+            plugin_instance = await executor_service.run(
+                "blocking-plugin", self._import_plugin, plugin_name, metadata
             )
-            if not spec or not spec.loader:
-                raise ImportError(f"Could not load plugin spec: {metadata.file_path}")
-            
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Find and instantiate plugin class
-            plugin_instance = None
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if (isinstance(attr, type) and 
-                    issubclass(attr, Plugin) and 
-                    attr != Plugin):
-                    
-                    plugin_instance = attr()
-                    break
-            
-            if not plugin_instance:
-                raise ValueError(f"No Plugin class found in {metadata.file_path}")
-            
-            # Initialize plugin
-            plugin_instance.initialize()
             
             # Store plugin
             self.plugins[plugin_name] = plugin_instance
@@ -260,8 +317,39 @@ class PluginManager:
             
         except Exception as e:
             self.logger.error(f"Failed to load plugin '{plugin_name}': {e}")
+            self.record_plugin_error(plugin_name, e)
+            event_bus.emit("plugin_load_failed", {"plugin_name": plugin_name, "error": str(e)})
             return None
     
+    @staticmethod
+    def _import_plugin(plugin_name: str, metadata: PluginMetadata) -> Plugin:
+        """Execute the plugin module, then instantiate and initialize its plugin class."""
+        spec = importlib.util.spec_from_file_location(
+            plugin_name, metadata.file_path
+        )
+        if not spec or not spec.loader:
+            raise ImportError(f"Could not load plugin spec: {metadata.file_path}")
+        
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        
+        # Find and instantiate plugin class
+        plugin_instance = None
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if (isinstance(attr, type) and 
+                issubclass(attr, Plugin) and 
+                attr != Plugin):
+                
+                plugin_instance = attr()
+                break
+        
+        if not plugin_instance:
+            raise ValueError(f"No Plugin class found in {metadata.file_path}")
+        
+        plugin_instance.initialize()
+        return plugin_instance
+    
     async def load_all_plugins(self) -> None:
         """Load all discovered plugins in parallel."""
         start_time = time.perf_counter()
@@ -331,6 +419,7 @@ class PluginManager:
                 if (os.path.exists(metadata.file_path) and 
                     os.path.getmtime(metadata.file_path) <= cache_data.get("cache_time", 0)):
                     self.plugin_metadata[metadata.name] = metadata
+                    self._record_metadata_load(metadata)
             
             return len(self.plugin_metadata) > 0
             
@@ -366,20 +455,223 @@ class PluginManager:
         return list(self.plugins.values())
     
     async def find_handlers(self, user_input: str, context: Dict[str, Any]) -> List[Plugin]:
-        """Find all plugins that can handle the given input."""
-        handlers = []
+        """
+        Find all loaded plugins that can handle the given input.
+        
+        When none can, at most max_route_loads enabled plugins that are not
+        loaded (never used under lazy loading, or evicted under memory
+        pressure) are loaded until one of them matches. Candidates come from
+        discovered metadata, never from loading plugins to ask them: plugins
+        whose keywords occur in the input, then plugins without declared
+        keywords that the usage profile has seen. Input no candidate fits
+        gets no handler.
+        """
+        handlers = self._matching_handlers(self.plugins.values(), user_input, context)
+        
+        if not handlers:
+            for plugin_name in self._routing_candidates(user_input)[:self.max_route_loads]:
+                plugin = await self.load_plugin(plugin_name)
+                if plugin is None:
+                    self._failed_loads.add(plugin_name)
+                    continue
+                handlers = self._matching_handlers([plugin], user_input, context)
+                if handlers:
+                    break
         
-        for plugin in self.plugins.values():
+        # Sort by priority if available
+        handlers.sort(key=lambda p: getattr(p, 'priority', 0), reverse=True)
+        return handlers
+    
+    def _routing_candidates(self, user_input: str) -> List[str]:
+        """Unloaded plugins worth loading for user_input, most likely first."""
+        words = set(re.findall(r"\w+", user_input.lower()))
+        unloaded = [
+            metadata for name, metadata in self.plugin_metadata.items()
+            if metadata.enabled and name not in self.plugins and name not in self._failed_loads
+        ]
+        
+        def ranked(matches: Iterable[PluginMetadata]) -> List[str]:
+            ordered = sorted(
+                matches,
+                key=lambda metadata: (self.usage_profile.score(metadata.name), metadata.priority),
+                reverse=True
+            )
+            return [metadata.name for metadata in ordered]
+        
+        by_keyword = ranked(
+            metadata for metadata in unloaded
+            if any(keyword in words for keyword in metadata.keywords)
+        )
+        by_usage = ranked(
+            metadata for metadata in unloaded
+            if not metadata.keywords and self.usage_profile.score(metadata.name) > 0
+        )
+        return by_keyword + by_usage
+    
+    def _matching_handlers(self, plugins: Iterable[Plugin], user_input: str,
+                           context: Dict[str, Any]) -> List[Plugin]:
+        handlers = []
+        for plugin in plugins:
             try:
                 if plugin.can_handle(user_input, context):
                     handlers.append(plugin)
             except Exception as e:
                 self.logger.warning(f"Error checking handler {plugin.name}: {e}")
-        
-        # Sort by priority if available
-        handlers.sort(key=lambda p: getattr(p, 'priority', 0), reverse=True)
         return handlers
     
+    async def _resolve_plugin(self, plugin: Union[str, Plugin]) -> Plugin:
+        """Resolve a plugin, loading it on first use, and record the usage."""
+        instance = plugin
+        if isinstance(plugin, str):
+            instance = self.plugins.get(plugin)
+            if instance is None and plugin in self.plugin_metadata:
+                instance = await self.load_plugin(plugin)
+        if instance is None:
+            raise KeyError(f"Plugin '{plugin}' is not loaded")
+        
+        self.usage_profile.record(instance.name)
+        return instance
+    
+    async def preload_likely_plugins(self, limit: Optional[int] = None) -> List[str]:
+        """Load the plugins the usage profile expects to be needed soon."""
+        candidates = [
+            name for name, metadata in self.plugin_metadata.items()
+            if metadata.enabled and name not in self.plugins
+        ]
+        likely = self.usage_profile.likely_plugins(candidates, limit or self.preload_limit)
+        
+        preloaded = []
+        for plugin_name in likely:
+            if await self.load_plugin(plugin_name):
+                preloaded.append(plugin_name)
+                # Yield between loads so preloading never monopolizes the loop
+                await asyncio.sleep(0)
+        
+        self._metrics["plugins_preloaded"] += len(preloaded)
+        if preloaded:
+            self.logger.info(f"Preloaded likely plugins: {', '.join(preloaded)}")
+        return preloaded
+    
+    def evict_idle_plugins(self, rss_threshold_mb: float, rss_mb: Optional[float] = None) -> List[str]:
+        """
+        Unload least recently used idle plugins while RSS exceeds the threshold.
+
+        RSS is sampled once per pass, or taken from rss_mb when the caller
+        already has a sample, and a pass unloads at most evictions_per_pass
+        plugins; callers such as the memory governor re-check on their next pass.
+        """
+        if rss_mb is None:
+            rss_mb = PerformanceMonitor.monitor_memory_usage()["memory_mb"]
+        if rss_mb <= rss_threshold_mb:
+            return []
+        
+        evicted = []
+        idle = self.usage_profile.least_recently_used(self.plugins.keys(), self.min_idle_seconds)
+        for plugin_name in idle:
+            if len(evicted) >= self.evictions_per_pass:
+                break
+            if self.unload_plugin(plugin_name):
+                evicted.append(plugin_name)
+        
+        self._metrics["plugins_evicted"] += len(evicted)
+        if evicted:
+            self.logger.info(f"Evicted idle plugins under memory pressure: {', '.join(evicted)}")
+        return evicted
+    
+    def record_plugin_error(self, plugin_name: str, error: Exception) -> None:
+        """Count a plugin load or processing failure."""
+        self._metrics["plugin_errors"] += 1
+        self._error_times.append(time.monotonic())
+    
+    def recent_error_count(self, window_seconds: float = 60.0) -> int:
+        """Plugin failures within the last window_seconds."""
+        cutoff = time.monotonic() - window_seconds
+        return sum(1 for error_time in self._error_times if error_time >= cutoff)
+    
+    def trim_result_cache(self, keep_fraction: float = 0.5) -> int:
+        """Evict least recently used cached plugin results."""
+        return self._result_cache.trim(keep_fraction)
+    
+    async def process(self, plugin: Union[str, Plugin], user_input: str,
+                      context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Process input with a plugin, memoizing results per its cache policy.
+        
+        Failures are counted once per plugin call. For cached plugins the
+        result cache counts them, so callers coalesced onto one failed call
+        all see the error but add a single plugin error.
+        """
+        instance = await self._resolve_plugin(plugin)
+        
+        context = context or {}
+        policy = instance.cache_policy
+        if policy is None or policy.ttl <= 0:
+            try:
+                return await instance.process(user_input, context)
+            except Exception as e:
+                self.record_plugin_error(instance.name, e)
+                raise
+        
+        return await self._result_cache.get_or_compute(
+            instance.name, user_input, context, policy,
+            lambda: instance.process(user_input, context)
+        )
+    
+    async def process_stream(self, plugin: Union[str, Plugin], user_input: str,
+                             context: Optional[Dict[str, Any]] = None,
+                             max_buffered: int = 16) -> AsyncIterator[Dict[str, Any]]:
+        """Stream partial plugin results through a bounded buffer.
+        
+        The plugin runs ahead of the consumer by at most max_buffered chunks.
+        Each chunk is also emitted as a plugin_stream_chunk event so UI
+        consumers can render output as soon as it is produced.
+        """
+        instance = await self._resolve_plugin(plugin)
+        
+        context = context or {}
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered))
+        end_of_stream = object()
+        
+        async def produce() -> None:
+            try:
+                async for chunk in instance.process_stream(user_input, context):
+                    await buffer.put(chunk)
+            except Exception as e:
+                self.record_plugin_error(instance.name, e)
+                await buffer.put(end_of_stream)
+                raise
+            await buffer.put(end_of_stream)
+        
+        producer = asyncio.create_task(produce())
+        sequence = 0
+        try:
+            while True:
+                chunk = await buffer.get()
+                if chunk is end_of_stream:
+                    break
+                event_bus.emit("plugin_stream_chunk", {
+                    "plugin_name": instance.name,
+                    "sequence": sequence,
+                    "chunk": chunk
+                })
+                sequence += 1
+                yield chunk
+            
+            # Surface producer errors to the consumer
+            await producer
+            event_bus.emit("plugin_stream_complete", {
+                "plugin_name": instance.name,
+                "chunks": sequence
+            })
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Get plugin result cache hit/miss metrics."""
+        return self._result_cache.get_metrics()
+    
     def unload_plugin(self, plugin_name: str) -> bool:
         """Unload a specific plugin."""
         if plugin_name not in self.plugins:
@@ -389,6 +681,7 @@ class PluginManager:
             plugin = self.plugins[plugin_name]
             plugin.cleanup()
             del self.plugins[plugin_name]
+            self._result_cache.invalidate(plugin_name)
             
             # Emit unload event - handle sync context safely
             try:
@@ -409,20 +702,25 @@ class PluginManager:
         for plugin_name in list(self.plugins.keys()):
             self.unload_plugin(plugin_name)
         
-        self._load_executor.shutdown(wait=True)
+        self.usage_profile.save()
         self.logger.info("All plugins cleaned up")
     
-    def get_metrics(self) -> Dict[str, Any]:
-        """Get plugin manager performance metrics."""
-        memory_info = PerformanceMonitor.monitor_memory_usage()
-        return {
+    def get_metrics(self, include_memory: bool = True) -> Dict[str, Any]:
+        """Get plugin manager performance metrics; include_memory samples the process."""
+        metrics = {
             **self._metrics,
-            "memory_usage_mb": memory_info["memory_mb"],
             "available_plugins": len(self.plugin_metadata),
             "loaded_plugins": len(self.plugins),
-            "plugin_paths": self.plugin_paths
+            "plugin_paths": self.plugin_paths,
+            "result_cache": self._result_cache.get_metrics(),
+            "usage_profile": self.usage_profile.get_metrics()
         }
+        if include_memory:
+            metrics["memory_usage_mb"] = PerformanceMonitor.monitor_memory_usage()["memory_mb"]
+        return metrics
 
 
-# Global plugin manager instance
-plugin_manager = PluginManager()
\ No newline at end of file
+# Global plugin manager instance, constructed on first access
+plugin_manager = container.register(
+    "plugin_manager", lambda: PluginManager(access_log=cache_manager.access_log)
+)
\ No newline at end of file
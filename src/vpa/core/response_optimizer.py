@@ -8,7 +8,42 @@ import time
 import json
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
-from collections import deque
+from collections import OrderedDict, defaultdict
+
+from .container import container
+from .cache_keys import make_key
+from .cache_manager import cache_manager
+from .config_service import config_service
+from .freshness import FreshnessPolicy, BackgroundRefresher, FRESH, STALE, EXPIRED
+from .batching import MicroBatcher
+
+# Bump whenever response_fields() changes, so entries persisted under an older schema are never read
+RESPONSE_KEY_VERSION = 2
+# Request fields that do not affect the response; every other field is part of the key
+NON_RESPONSE_FIELDS = frozenset({'request_id', 'stream', 'timeout', 'priority', 'metadata', 'user'})
+RESPONSE_FIELD_DEFAULTS = {'model': 'default', 'max_tokens': 100}
+RESPONSE_NAMESPACE = "llm_response"
+# Request fields carrying conversation state; requests with any of them are never written to the access log
+CONVERSATION_FIELDS = frozenset({'context', 'messages', 'history'})
+
+
+def response_fields(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Every response-affecting field of request with defaults filled in.
+    
+    Covers the prompt, model and sampling parameters as well as the system
+    prompt and conversation context. Unset (None) fields match omitted ones,
+    and the prompt's whitespace is collapsed; its case is kept because it can
+    change the answer.
+    """
+    fields = dict(RESPONSE_FIELD_DEFAULTS)
+    fields.update(
+        (name, value) for name, value in request.items()
+        if name not in NON_RESPONSE_FIELDS and value is not None
+    )
+    fields['prompt'] = ' '.join(str(fields.get('prompt', '')).split())
+    return fields
+
 
 @dataclass
 class ResponseCache:
@@ -17,90 +52,175 @@ class ResponseCache:
     timestamp: float
     hit_count: int = 0
     
+    def state(self, policy: FreshnessPolicy, now: Optional[float] = None) -> str:
+        """Fresh, due for refresh-ahead, stale or expired under policy"""
+        return policy.classify(
+            self.timestamp, self.timestamp + policy.ttl, self.timestamp + policy.hard_ttl, self.hit_count, now
+        )
+    
+class SimulatedLLMBackend:
+    """Local stand-in for a batched LLM endpoint: fixed call overhead plus a cost per request"""
+    
+    def __init__(self, call_latency: float = 0.01, per_request_latency: float = 0.002):
+        self.call_latency = call_latency
+        self.per_request_latency = per_request_latency
+        self.calls = 0
+    
+    async def complete_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.calls += 1
+        await asyncio.sleep(self.call_latency + self.per_request_latency * len(requests))
+        return [
+            {'text': f"Optimized response for: {request.get('prompt', 'unknown')}", 'optimized': True}
+            for request in requests
+        ]
+    
 class VPAResponseOptimizer:
     """
     Response optimization strategies:
     - LLM response caching
-    - Request batching for similar queries
+    - Micro-batching: concurrent requests share one backend call per window
     - Connection pooling
     - Intelligent prefetching
+    - Stale-while-revalidate and refresh-ahead of hot responses
+    - Optional shared-memory tier so worker processes reuse each other's responses
+    - Frequent prompts recorded in a cache access log for warmup after restarts
+    - Versioned, process-stable keys with a bounded memory tier over an optional persistent store
+    
+    Prompt recording is opt-in (record_prompts): a recorded request is the
+    recipe its warmer replays, so its prompt, system prompt and sampling
+    parameters are stored in plaintext in the access log file, by default
+    cache/access_log.json. Requests carrying conversation state
+    (CONVERSATION_FIELDS) are never recorded. Cached responses themselves
+    are stored under hashed keys in the disk tier, cache/cache.db.
     """
     
-    def __init__(self, cache_ttl: int = 3600):
+    def __init__(self, cache_ttl: int = 3600, stale_while_revalidate: float = 300.0,
+                 refresh_ahead: float = 0.1, max_concurrent_refreshes: int = 4, access_log=None,
+                 backend=None, max_batch_size: int = 5, batch_timeout: float = 0.1,
+                 max_cached_responses: int = 1024, store=None, record_prompts: bool = False):
         self.cache_ttl = cache_ttl
-        self._response_cache: Dict[str, ResponseCache] = {}
-        self._request_queue: deque = deque()
-        self._batch_size = 5
-        self._batch_timeout = 0.1  # 100ms
+        self.access_log = access_log
+        self.record_prompts = record_prompts
+        self.freshness = FreshnessPolicy(cache_ttl, stale_while_revalidate, refresh_ahead)
+        self._refresher = BackgroundRefresher(max_concurrent=max_concurrent_refreshes)
+        self._stale_hits = 0
+        self._refresh_ahead_hits = 0
+        self._shared_cache = None
+        self._shared_hits = 0
+        # Persistent tier with the DiskCache aget/put interface, checked after the shared tier
+        self.store = store
+        self._store_hits = 0
+        self.max_cached_responses = max_cached_responses
+        # Least recently used first
+        self._response_cache: Dict[str, ResponseCache] = OrderedDict()
+        self._model_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        # Backends take a list of requests and return their responses in order
+        self.backend = backend or SimulatedLLMBackend()
+        self._batcher = MicroBatcher(
+            self.backend.complete_batch, max_batch_size=max_batch_size, max_wait=batch_timeout, name="llm_batch"
+        )
         
     def cache_key_for_request(self, request: Dict[str, Any]) -> str:
         """Generate cache key for LLM request"""
-        # Normalize request for consistent caching
-        normalized = {
-            'prompt': request.get('prompt', '').strip().lower(),
-            'model': request.get('model', 'default'),
-            'max_tokens': request.get('max_tokens', 100)
-        }
-        return str(hash(str(sorted(normalized.items()))))
+        # Stable across processes and restarts, so workers and the persistent store can share entries
+        return make_key(RESPONSE_NAMESPACE, RESPONSE_KEY_VERSION, response_fields(request))
+    
+    def attach_shared_cache(self, shared_cache) -> None:
+        """Share responses with other processes through a SharedMemoryCache owned by the caller"""
+        self._shared_cache = shared_cache
     
     async def optimized_llm_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Optimized LLM request with caching and batching"""
-        cache_key = self.cache_key_for_request(request)
+        fields = response_fields(request)
+        cache_key = make_key(RESPONSE_NAMESPACE, RESPONSE_KEY_VERSION, fields)
+        if self.record_prompts and self.access_log is not None and CONVERSATION_FIELDS.isdisjoint(fields):
+            self.access_log.record("llm_prompt", cache_key, fields)
+        model_stats = self._model_stats[str(fields['model'])]
         
-        # Check cache first
-        if cache_key in self._response_cache:
-            cache_entry = self._response_cache[cache_key]
-            if time.time() - cache_entry.timestamp < self.cache_ttl:
-                cache_entry.hit_count += 1
+        # Check cache first; stale and nearly expired hot entries are served while they refresh
+        cache_entry = await self._lookup_entry(cache_key)
+        if cache_entry is not None:
+            cache_entry.hit_count += 1
+            state = cache_entry.state(self.freshness)
+            if state != EXPIRED:
+                model_stats['hits'] += 1
+                if state != FRESH:
+                    if state == STALE:
+                        self._stale_hits += 1
+                    else:
+                        self._refresh_ahead_hits += 1
+                    self._schedule_refresh(cache_key, request)
                 return {
                     'response': cache_entry.response,
                     'cached': True,
+                    'stale': state == STALE,
                     'cache_hit_count': cache_entry.hit_count
                 }
         
-        # Simulate LLM request (replace with actual implementation)
-        start_time = time.time()
-        
-        # Batch similar requests for efficiency
-        await self._add_to_batch(request)
+        model_stats['misses'] += 1
+        return await self._fetch_and_cache(cache_key, request)
+    
+    async def _lookup_entry(self, cache_key: str) -> Optional[ResponseCache]:
+        """Find a response in memory, then the shared tier, then the persistent store (read on the io pool)"""
+        cache_entry = self._response_cache.get(cache_key)
+        if cache_entry is not None:
+            self._response_cache.move_to_end(cache_key)
+            return cache_entry
         
-        # Simulate processing time
-        await asyncio.sleep(0.01)  # 10ms simulated processing
+        if self._shared_cache is not None:
+            shared = self._shared_cache.get(RESPONSE_NAMESPACE, cache_key)
+            if shared is not None:
+                self._shared_hits += 1
+                return self._remember(cache_key, ResponseCache(*shared.value))
         
-        response = {
-            'text': f"Optimized response for: {request.get('prompt', 'unknown')}",
-            'processing_time': time.time() - start_time,
-            'optimized': True
-        }
-        
-        # Cache the response
-        self._response_cache[cache_key] = ResponseCache(
-            response=response,
-            timestamp=time.time()
-        )
+        if self.store is not None:
+            stored = await self.store.aget(RESPONSE_NAMESPACE, cache_key)
+            if stored is not None:
+                self._store_hits += 1
+                return self._remember(cache_key, ResponseCache(*stored.value))
+        return None
+    
+    def _remember(self, cache_key: str, cache_entry: ResponseCache) -> ResponseCache:
+        """Add to the memory tier, evicting the least recently used responses over the bound"""
+        self._response_cache[cache_key] = cache_entry
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > self.max_cached_responses:
+            self._response_cache.popitem(last=False)
+        return cache_entry
+    
+    async def warm_request(self, request: Dict[str, Any]) -> bool:
+        """Fetch and cache a response unless a usable one is cached; True if it was fetched"""
+        cache_key = self.cache_key_for_request(request)
+        cache_entry = await self._lookup_entry(cache_key)
+        if cache_entry is not None and cache_entry.state(self.freshness) != EXPIRED:
+            return False
+        await self._fetch_and_cache(cache_key, request)
+        return True
+    
+    def _schedule_refresh(self, cache_key: str, request: Dict[str, Any]) -> None:
+        async def refresh():
+            await self._fetch_and_cache(cache_key, request)
         
-        return response
+        self._refresher.schedule(cache_key, refresh)
     
-    async def _add_to_batch(self, request: Dict[str, Any]):
-        """Add request to batch for processing optimization"""
-        self._request_queue.append(request)
+    async def _fetch_and_cache(self, cache_key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the LLM request and cache its response"""
+        start_time = time.time()
         
-        # Process batch if full or timeout reached
-        if len(self._request_queue) >= self._batch_size:
-            await self._process_batch()
-    
-    async def _process_batch(self):
-        """Process batched requests for improved efficiency"""
-        if not self._request_queue:
-            return
+        # Concurrent requests share one backend call per batch window
+        result = await self._batcher.submit(request)
+        response = {**result, 'processing_time': time.time() - start_time}
         
-        batch = []
-        while self._request_queue and len(batch) < self._batch_size:
-            batch.append(self._request_queue.popleft())
+        # Cache the response
+        cache_entry = self._remember(cache_key, ResponseCache(response=response, timestamp=time.time()))
+        if self._shared_cache is not None:
+            self._shared_cache.set(RESPONSE_NAMESPACE, cache_key, (response, cache_entry.timestamp),
+                                   ttl=self.freshness.hard_ttl)
+        if self.store is not None:
+            self.store.put(RESPONSE_NAMESPACE, cache_key, (response, cache_entry.timestamp),
+                           ttl=self.freshness.hard_ttl)
         
-        # Simulate batch processing (more efficient than individual requests)
-        if len(batch) > 1:
-            await asyncio.sleep(0.005 * len(batch))  # Batch efficiency
+        return response
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get caching performance statistics"""
@@ -111,21 +231,56 @@ class VPAResponseOptimizer:
             'total_cached_responses': total_entries,
             'total_cache_hits': total_hits,
             'cache_hit_ratio': total_hits / max(total_entries, 1),
-            'queue_size': len(self._request_queue)
+            'stale_hits': self._stale_hits,
+            'refresh_ahead_hits': self._refresh_ahead_hits,
+            'shared_hits': self._shared_hits,
+            'store_hits': self._store_hits,
+            'key_version': RESPONSE_KEY_VERSION,
+            'by_model': {
+                model: {**stats, 'hit_ratio': stats['hits'] / max(stats['hits'] + stats['misses'], 1)}
+                for model, stats in self._model_stats.items()
+            },
+            'refresh': self._refresher.get_metrics(),
+            'queue_size': self._batcher.pending,
+            'batching': self._batcher.get_metrics()
         }
     
     def clear_expired_cache(self):
-        """Clear expired response cache entries"""
+        """Clear response cache entries past their hard TTL"""
         current_time = time.time()
         expired_keys = [
             key for key, entry in self._response_cache.items()
-            if current_time - entry.timestamp > self.cache_ttl
+            if current_time - entry.timestamp > self.freshness.hard_ttl
         ]
         
         for key in expired_keys:
             del self._response_cache[key]
         
         return len(expired_keys)
+    
+    def trim_cache(self, keep_fraction: float = 0.5) -> int:
+        """Drop expired responses, then the least-hit ones until keep_fraction remain"""
+        removed = self.clear_expired_cache()
+        keep = int(len(self._response_cache) * keep_fraction)
+        least_useful = sorted(
+            self._response_cache,
+            key=lambda key: (self._response_cache[key].hit_count, self._response_cache[key].timestamp)
+        )
+        
+        for key in least_useful[:len(least_useful) - keep]:
+            del self._response_cache[key]
+        
+        return removed + len(least_useful) - keep
+
+def _create_response_optimizer() -> VPAResponseOptimizer:
+    # With llm.record_prompts set, frequent prompts go to the cache manager's access
+    # log for its warm_up; responses persist in its disk tier across restarts
+    optimizer = VPAResponseOptimizer(
+        access_log=cache_manager.access_log, store=cache_manager.disk_cache,
+        record_prompts=bool(config_service.get("llm.record_prompts", False))
+    )
+    cache_manager.register_warmer("llm_prompt", optimizer.warm_request)
+    return optimizer
 
-# Global response optimizer
-response_optimizer = VPAResponseOptimizer()
+# Global response optimizer, constructed on first access
+response_optimizer = container.register("response_optimizer", _create_response_optimizer)
@@ -0,0 +1,417 @@
+"""
+VPA Assistant Server
+Local asyncio front end serving utterances over a Unix domain socket and localhost HTTP.
+Target: One measurable serving path from request to streamed plugin and TTS output.
+"""
+
+import os
+import math
+import json
+import socket
+import time
+import uuid
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+from dataclasses import dataclass
+from collections import deque
+
+from .plugins import plugin_manager as default_plugin_manager
+from .admission import AdmissionController, AdmissionRejected, RequestClass
+from .vpa_logging import CorrelationContext
+from .tasks import task_tracker
+from .http import HTTPRequest, HTTPError, read_http_request, send_http_response
+
+
+@dataclass
+class ServerConfig:
+    """Listening endpoints and limits for the assistant server."""
+    http_host: str = "127.0.0.1"
+    http_port: Optional[int] = 8765
+    unix_socket_path: Optional[str] = None
+    max_concurrency: int = 8
+    max_request_bytes: int = 64 * 1024
+    request_timeout: float = 30.0
+    stream_buffer: int = 16
+
+
+def parse_utterance_request(raw: bytes) -> Dict[str, Any]:
+    """Decode an utterance request; raises ValueError naming what is malformed."""
+    try:
+        request = json.loads(raw)
+    except ValueError:
+        raise ValueError("request must be JSON")
+    if not isinstance(request, dict) or not isinstance(request.get("text"), str):
+        raise ValueError("request must be a JSON object with string 'text'")
+    if request.get("context") is not None and not isinstance(request["context"], dict):
+        raise ValueError("'context' must be a JSON object")
+    return request
+
+
+class AssistantServer:
+    """
+    Serves utterances through plugin_manager.find_handlers/process_stream,
+    optionally speaking the output through the audio system.
+
+    Unix socket: newline-delimited JSON requests, NDJSON event responses.
+    HTTP: POST /v1/utterances streams NDJSON over chunked transfer encoding;
+    GET /v1/metrics returns serving metrics.
+    """
+
+    def __init__(self, config: Optional[ServerConfig] = None, plugin_manager=None, audio_system=None,
+                 admission: Optional[AdmissionController] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config or ServerConfig()
+        self.plugin_manager = plugin_manager or default_plugin_manager
+        self._audio_system = audio_system
+        self.admission = admission or AdmissionController(self.config.max_concurrency)
+        self._servers: List[asyncio.AbstractServer] = []
+        self._latencies_ms: deque = deque(maxlen=1000)
+        self._first_output_ms: deque = deque(maxlen=1000)
+        self.http_port: Optional[int] = None
+        self._owns_unix_path = False
+        self._metrics = {
+            "requests_total": 0,
+            "requests_completed": 0,
+            "requests_failed": 0,
+            "requests_rejected": 0,
+            "requests_degraded": 0,
+            "in_flight": 0
+        }
+
+    @property
+    def audio_system(self):
+        """Audio system used for spoken responses, resolved on first use."""
+        if self._audio_system is None:
+            from audio.voice_system import audio_system
+            self._audio_system = audio_system
+        return self._audio_system
+
+    async def start(self, http_socket: Optional[socket.socket] = None,
+                    unix_socket: Optional[socket.socket] = None) -> None:
+        """
+        Start listening on the configured endpoints.
+        Pre-bound listening sockets (e.g. shared by forked workers) are used
+        instead of binding the configured addresses.
+        """
+        self.admission.start()
+        if http_socket is not None or self.config.http_port is not None:
+            if http_socket is not None:
+                server = await asyncio.start_server(
+                    self._handle_http_connection, sock=http_socket,
+                    limit=self.config.max_request_bytes
+                )
+            else:
+                server = await asyncio.start_server(
+                    self._handle_http_connection, self.config.http_host, self.config.http_port,
+                    limit=self.config.max_request_bytes
+                )
+            self._servers.append(server)
+            self.http_port = server.sockets[0].getsockname()[1]
+            self.logger.info(f"Assistant HTTP endpoint on http://{self.config.http_host}:{self.http_port}")
+
+        if unix_socket is not None:
+            server = await asyncio.start_unix_server(
+                self._handle_unix_connection, sock=unix_socket,
+                limit=self.config.max_request_bytes
+            )
+            self._servers.append(server)
+        elif self.config.unix_socket_path:
+            if not hasattr(asyncio, "start_unix_server"):
+                self.logger.warning("Unix domain sockets are not supported on this platform")
+            else:
+                if os.path.exists(self.config.unix_socket_path):
+                    os.unlink(self.config.unix_socket_path)
+                server = await asyncio.start_unix_server(
+                    self._handle_unix_connection, self.config.unix_socket_path,
+                    limit=self.config.max_request_bytes
+                )
+                self._servers.append(server)
+                self._owns_unix_path = True
+                self.logger.info(f"Assistant socket on {self.config.unix_socket_path}")
+
+    async def stop(self) -> None:
+        """Stop accepting connections and close the listeners."""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        await self.admission.stop()
+
+        if self._owns_unix_path and os.path.exists(self.config.unix_socket_path):
+            os.unlink(self.config.unix_socket_path)
+        self._owns_unix_path = False
+
+    async def handle_utterance(self, text: str, context: Optional[Dict[str, Any]] = None,
+                               speak: bool = False, request_id: Optional[str] = None,
+                               request_class: Any = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Serve one utterance, yielding response events as they are produced:
+        accepted, chunk (plugin output), speech (TTS result), then done or error.
+        Requests shed by admission control yield a single rejected event.
+        """
+        request_id = request_id or uuid.uuid4().hex
+        request_class = RequestClass.parse(request_class)
+        context = dict(context or {})
+        context.setdefault("request_id", request_id)
+        received = time.perf_counter()
+        first_output = None
+        self._metrics["requests_total"] += 1
+
+        with CorrelationContext(request_id):
+            if not task_tracker.accepting:
+                self._metrics["requests_rejected"] += 1
+                yield {"type": "rejected", "request_id": request_id, "reason": "shutting down",
+                       "retry_after": self.admission.policy.retry_after}
+                return
+
+            try:
+                ticket = await self.admission.acquire(request_class)
+            except AdmissionRejected as e:
+                self._metrics["requests_rejected"] += 1
+                yield {"type": "rejected", "request_id": request_id, "reason": e.reason,
+                       "retry_after": e.retry_after}
+                return
+
+            if ticket.degraded:
+                self._metrics["requests_degraded"] += 1
+            self._metrics["in_flight"] += 1
+            try:
+                yield {"type": "accepted", "request_id": request_id, "request_class": request_class.name.lower(),
+                       "degraded": ticket.degraded, "queued_ms": ticket.queued_ms}
+
+                handlers = await self.plugin_manager.find_handlers(text, context)
+                if not handlers:
+                    self._metrics["requests_completed"] += 1
+                    yield {"type": "done", "request_id": request_id, "handled": False,
+                           "latency_ms": (time.perf_counter() - received) * 1000}
+                    return
+
+                plugin = handlers[0]
+                if ticket.degraded:
+                    pipeline = self._run_degraded(plugin, text, context)
+                else:
+                    pipeline = self._run_pipeline(plugin, text, context, speak)
+                async for kind, payload in pipeline:
+                    if first_output is None:
+                        first_output = time.perf_counter()
+                        self._first_output_ms.append((first_output - received) * 1000)
+                    yield {"type": kind, "request_id": request_id, "plugin": plugin.name, "data": payload}
+
+                latency_ms = (time.perf_counter() - received) * 1000
+                self._latencies_ms.append(latency_ms)
+                self._metrics["requests_completed"] += 1
+                yield {"type": "done", "request_id": request_id, "handled": True,
+                       "plugin": plugin.name, "latency_ms": latency_ms}
+
+            except Exception as e:
+                self._metrics["requests_failed"] += 1
+                self.logger.error(f"Request {request_id} failed: {e}")
+                yield {"type": "error", "request_id": request_id, "error": str(e)}
+
+            finally:
+                self._metrics["in_flight"] -= 1
+                self.admission.release(ticket)
+
+    async def _run_degraded(self, plugin, text: str, context: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Degraded service: no TTS, one memoized process() call so cached results are reused."""
+        yield "chunk", await self.plugin_manager.process(plugin, text, context)
+
+    async def _run_pipeline(self, plugin, text: str, context: Dict[str, Any],
+                            speak: bool) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream plugin chunks and, when speaking, TTS results as they complete."""
+        if not speak:
+            async for chunk in self.plugin_manager.process_stream(
+                    plugin, text, context, max_buffered=self.config.stream_buffer):
+                yield "chunk", chunk
+            return
+
+        end = object()
+        output: asyncio.Queue = asyncio.Queue(maxsize=self.config.stream_buffer)
+        speech_input: asyncio.Queue = asyncio.Queue(maxsize=self.config.stream_buffer)
+
+        async def speech_chunks():
+            while True:
+                chunk = await speech_input.get()
+                if chunk is end:
+                    return
+                yield chunk
+
+        async def run_plugin():
+            async for chunk in self.plugin_manager.process_stream(
+                    plugin, text, context, max_buffered=self.config.stream_buffer):
+                await output.put(("chunk", chunk))
+                await speech_input.put(chunk)
+            await speech_input.put(end)
+
+        async def run_speech():
+            async for result in self.audio_system.synthesize_stream(speech_chunks()):
+                await output.put(("speech", result))
+
+        async def run_all():
+            # The first stage to fail cancels the other, which would otherwise
+            # block on a queue nobody drains (TaskGroup semantics, kept to 3.9).
+            # Stages never outlive this tracked runner.
+            stages = [asyncio.create_task(run_plugin()), asyncio.create_task(run_speech())]
+            try:
+                done, _ = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+                for stage in done:
+                    stage.result()
+            finally:
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                await output.put((None, end))
+
+        runner = task_tracker.spawn(run_all(), kind="request")
+        try:
+            while True:
+                kind, payload = await output.get()
+                if payload is end:
+                    break
+                yield kind, payload
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+    async def _handle_unix_connection(self, reader: asyncio.StreamReader,
+                                      writer: asyncio.StreamWriter) -> None:
+        """Serve newline-delimited JSON requests on one socket connection."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._write_line(writer, {"type": "error", "error": "request too large"})
+                    break
+                if not line:
+                    break
+
+                try:
+                    request = parse_utterance_request(line)
+                except ValueError as e:
+                    await self._write_line(writer, {"type": "error", "error": f"invalid request: {e}"})
+                    continue
+
+                # Each request is tracked work; an idle connection is not
+                await task_tracker.spawn(self._serve_unix_request(request, writer), kind="request")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_unix_request(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        events = self.handle_utterance(
+            request["text"], request.get("context"), bool(request.get("speak", False)),
+            request.get("request_id"), request.get("class"))
+        try:
+            async for event in events:
+                await self._write_line(writer, event)
+        finally:
+            # Close in this task so request context and limits unwind here
+            await events.aclose()
+
+    async def _write_line(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        writer.write(json.dumps(payload, default=str).encode() + b"\n")
+        await writer.drain()
+
+    async def _handle_http_connection(self, reader: asyncio.StreamReader,
+                                      writer: asyncio.StreamWriter) -> None:
+        """Serve a single HTTP request per connection."""
+        try:
+            try:
+                request = await asyncio.wait_for(
+                    read_http_request(reader, self.config.max_request_bytes),
+                    timeout=self.config.request_timeout
+                )
+            except HTTPError as e:
+                await send_http_response(writer, e.status, {"error": str(e)})
+                return
+            if request is None:
+                return
+            task_tracker.track(asyncio.current_task(), "request")
+
+            if request.path == "/v1/metrics":
+                await send_http_response(writer, 200, self.get_metrics())
+            elif request.path == "/v1/utterances":
+                if request.method != "POST":
+                    await send_http_response(writer, 405, {"error": "use POST"})
+                    return
+                await self._serve_http_utterance(request, writer)
+            else:
+                await send_http_response(writer, 404, {"error": "not found"})
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_http_utterance(self, request: HTTPRequest, writer: asyncio.StreamWriter) -> None:
+        """Stream utterance events as chunked NDJSON."""
+        try:
+            payload = parse_utterance_request(request.body or b"{}")
+        except ValueError as e:
+            await send_http_response(writer, 400, {"error": str(e)})
+            return
+
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        request_class = payload.get("class") or request.headers.get("x-request-class")
+        events = self.handle_utterance(
+            payload["text"], payload.get("context"), bool(payload.get("speak", False)), request_id, request_class)
+        try:
+            # The admission outcome decides the status line
+            first = await events.__anext__()
+            if first["type"] == "rejected":
+                await send_http_response(writer, 503, first, {
+                    "Retry-After": str(math.ceil(first["retry_after"])),
+                    "X-Request-ID": request_id
+                })
+                return
+
+            writer.write((
+                "HTTP/1.1 200 OK\r\n"
+                "Content-Type: application/x-ndjson\r\n"
+                "Transfer-Encoding: chunked\r\n"
+                f"X-Request-ID: {request_id}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode())
+            await self._write_chunk(writer, first)
+            async for event in events:
+                await self._write_chunk(writer, event)
+        finally:
+            await events.aclose()
+
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, default=str).encode() + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _percentile(samples: deque, percentile: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get serving throughput and latency metrics."""
+        return {
+            **self._metrics,
+            "max_concurrency": self.config.max_concurrency,
+            "latency_ms": {
+                "p50": self._percentile(self._latencies_ms, 50),
+                "p95": self._percentile(self._latencies_ms, 95),
+                "p99": self._percentile(self._latencies_ms, 99)
+            },
+            "first_output_ms": {
+                "p50": self._percentile(self._first_output_ms, 50),
+                "p95": self._percentile(self._first_output_ms, 95)
+            },
+            "admission": self.admission.get_metrics()
+        }
@@ -0,0 +1,243 @@
+"""
+VPA Service Registry
+Dependency-graph startup orchestration with concurrent service start.
+Target: Startup time bounded by the critical path instead of the sum of all services.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple, Union
+from dataclasses import dataclass
+from enum import Enum
+
+from .tracing import startup_tracer
+
+
+class ServiceStatus(Enum):
+    """Lifecycle status of a registered service."""
+    PENDING = "pending"
+    STARTING = "starting"
+    READY = "ready"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+@dataclass
+class ServiceSpec:
+    """
+    Declaration of a startup service.
+
+    start: coroutine function; returning False or raising marks the service failed.
+    dependencies: services that must be ready before this one starts.
+    readiness_probe: optional check polled after start until it reports True.
+    critical: a critical failure aborts startup; others degrade gracefully.
+    timeout: seconds allowed for start plus readiness.
+    """
+    name: str
+    start: Callable[[], Awaitable[Any]]
+    dependencies: Tuple[str, ...] = ()
+    readiness_probe: Optional[Callable[[], Union[bool, Awaitable[bool]]]] = None
+    critical: bool = True
+    timeout: float = 5.0
+
+
+@dataclass
+class ServiceResult:
+    """Outcome of starting a single service."""
+    name: str
+    status: ServiceStatus = ServiceStatus.PENDING
+    started_at: float = 0.0
+    ready_at: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.ready_at - self.started_at)
+
+
+class ServiceStartupError(RuntimeError):
+    """Raised when a critical service fails to start."""
+
+    def __init__(self, service_name: str, reason: str):
+        super().__init__(f"Critical service '{service_name}' failed: {reason}")
+        self.service_name = service_name
+        self.reason = reason
+
+
+class ServiceRegistry:
+    """
+    Registry of startup services forming a dependency graph.
+    Independent services start concurrently; ordering applies only along declared edges.
+    """
+
+    def __init__(self, readiness_poll_interval: float = 0.01):
+        self.logger = logging.getLogger(__name__)
+        self.services: Dict[str, ServiceSpec] = {}
+        self.results: Dict[str, ServiceResult] = {}
+        self._readiness_poll_interval = readiness_poll_interval
+        self._startup_started_at = 0.0
+        self._startup_duration = 0.0
+
+    def register(self, spec: ServiceSpec) -> ServiceSpec:
+        """Register a service; later registrations replace earlier ones by name."""
+        self.services[spec.name] = spec
+        return spec
+
+    def validate(self) -> List[str]:
+        """Check the graph and return a topological start order."""
+        for spec in self.services.values():
+            for dependency in spec.dependencies:
+                if dependency not in self.services:
+                    raise ValueError(f"Service '{spec.name}' depends on unknown service '{dependency}'")
+
+        order: List[str] = []
+        visiting: set = set()
+        visited: set = set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                cycle = " -> ".join(path + [name])
+                raise ValueError(f"Service dependency cycle: {cycle}")
+            visiting.add(name)
+            for dependency in self.services[name].dependencies:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.services:
+            visit(name, [])
+        return order
+
+    async def start_all(self) -> Dict[str, ServiceResult]:
+        """Start every service as soon as its dependencies are ready."""
+        self.validate()
+        self._startup_started_at = time.perf_counter()
+        self.results = {name: ServiceResult(name) for name in self.services}
+        loop = asyncio.get_running_loop()
+        done_signals = {name: loop.create_future() for name in self.services}
+
+        tasks = [
+            asyncio.create_task(self._run_service(spec, done_signals), name=f"service:{spec.name}")
+            for spec in self.services.values()
+        ]
+
+        try:
+            pending = set(tasks)
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for task in finished:
+                    error = task.exception()
+                    if error is not None:
+                        # Fail fast: a critical service failed
+                        raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for name, result in self.results.items():
+                if result.status in (ServiceStatus.PENDING, ServiceStatus.STARTING):
+                    result.status = ServiceStatus.SKIPPED
+                    result.error = result.error or "startup aborted"
+            self._startup_duration = time.perf_counter() - self._startup_started_at
+
+        return self.results
+
+    async def _run_service(self, spec: ServiceSpec, done_signals: Dict[str, asyncio.Future]) -> None:
+        """Wait for dependencies, then start and probe a single service."""
+        result = self.results[spec.name]
+        try:
+            if spec.dependencies:
+                await asyncio.gather(*(asyncio.shield(done_signals[dep]) for dep in spec.dependencies))
+                blocked = [dep for dep in spec.dependencies
+                           if self.results[dep].status != ServiceStatus.READY]
+                if blocked:
+                    result.status = ServiceStatus.SKIPPED
+                    result.error = f"dependencies not ready: {', '.join(blocked)}"
+                    self.logger.warning(f"Service '{spec.name}' skipped - {result.error}")
+                    if spec.critical:
+                        raise ServiceStartupError(spec.name, result.error)
+                    return
+
+            result.status = ServiceStatus.STARTING
+            result.started_at = time.perf_counter()
+            try:
+                with startup_tracer.span(f"service:{spec.name}", category="service",
+                                         critical=spec.critical):
+                    await asyncio.wait_for(self._start_and_probe(spec), timeout=spec.timeout)
+            except asyncio.TimeoutError:
+                result.error = f"timed out after {spec.timeout:.1f}s"
+            except Exception as e:
+                result.error = str(e) or type(e).__name__
+            result.ready_at = time.perf_counter()
+
+            if result.error is None:
+                result.status = ServiceStatus.READY
+                self.logger.debug(f"Service '{spec.name}' ready in {result.duration:.3f}s")
+                return
+
+            result.status = ServiceStatus.FAILED
+            if spec.critical:
+                self.logger.error(f"Critical service '{spec.name}' failed: {result.error}")
+                raise ServiceStartupError(spec.name, result.error)
+            self.logger.warning(f"Service '{spec.name}' failed - continuing degraded: {result.error}")
+
+        finally:
+            if not done_signals[spec.name].done():
+                done_signals[spec.name].set_result(result.status)
+
+    async def _start_and_probe(self, spec: ServiceSpec) -> None:
+        """Run the start coroutine and poll the readiness probe."""
+        started = await spec.start()
+        if started is False:
+            raise RuntimeError("start reported failure")
+
+        if spec.readiness_probe is None:
+            return
+
+        while True:
+            ready = spec.readiness_probe()
+            if asyncio.iscoroutine(ready):
+                ready = await ready
+            if ready:
+                return
+            await asyncio.sleep(self._readiness_poll_interval)
+
+    def critical_path(self) -> List[str]:
+        """Return the dependency chain that finished last during startup."""
+        if not self.results:
+            return []
+
+        ready = {name: r for name, r in self.results.items() if r.status == ServiceStatus.READY}
+        if not ready:
+            return []
+
+        path = [max(ready.values(), key=lambda r: r.ready_at).name]
+        while True:
+            dependencies = [dep for dep in self.services[path[-1]].dependencies if dep in ready]
+            if not dependencies:
+                break
+            path.append(max(dependencies, key=lambda dep: ready[dep].ready_at))
+        return list(reversed(path))
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get per-service startup status and timing."""
+        return {
+            "startup_duration": self._startup_duration,
+            "critical_path": self.critical_path(),
+            "services": {
+                name: {
+                    "status": result.status.value,
+                    "critical": self.services[name].critical if name in self.services else False,
+                    "dependencies": list(self.services[name].dependencies) if name in self.services else [],
+                    "start_offset": max(0.0, result.started_at - self._startup_started_at) if result.started_at else None,
+                    "duration": result.duration,
+                    "error": result.error
+                }
+                for name, result in self.results.items()
+            }
+        }
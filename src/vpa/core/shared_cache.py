@@ -0,0 +1,282 @@
+"""
+VPA Shared Cache
+Fixed-size hash table in a memory-mapped file shared by every process on the host, with lock-striped buckets.
+Target: Worker processes share cached LLM responses instead of each holding and recomputing its own copy.
+"""
+
+import os
+import mmap
+import time
+import zlib
+import pickle
+import struct
+import hashlib
+import logging
+import threading
+import weakref
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no byte-range locks for cross-process striping
+    fcntl = None
+
+SHARED_CACHE_SUPPORTED = fcntl is not None
+
+_MAGIC = b"VPASHC01"
+# magic, slot size, slot count, stripe count
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 64
+# state, flags, digest, stored_at, expires_at, accessed_at, payload length
+_SLOT = struct.Struct("<BB2x16sdddI")
+_ACCESSED_AT = struct.Struct("<d")
+_ACCESSED_AT_OFFSET = 36
+
+_EMPTY = 0
+_USED = 1
+_DELETED = 2
+
+_COMPRESSED = 0x01
+_COMPRESS_ABOVE = 512
+
+_live_caches: "weakref.WeakSet[SharedMemoryCache]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork() -> None:
+    # A thread that held a stripe lock during fork does not exist in the child
+    for cache in list(_live_caches):
+        cache._thread_locks = [threading.Lock() for _ in range(cache.stripes)]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+class SharedHit(NamedTuple):
+    value: Any
+    expires_at: Optional[float]
+
+
+class SharedMemoryCache:
+    """
+    Cross-process cache in a fixed-size memory-mapped file.
+
+    The file holds a header and equally sized slots. Slots are split into
+    stripes; a key hashes to one stripe and probes a short window of slots
+    inside it, so a single stripe lock (a thread lock plus an fcntl byte-range
+    lock on the file) guards every slot the key can occupy. When the window
+    is full the least recently accessed slot is overwritten. Values are
+    pickled and zlib-compressed when that shrinks them; values that do not
+    fit a slot are not cached. Processes opening an existing file adopt its
+    geometry, so every worker on the host sees the same table.
+    """
+
+    def __init__(self, path, size_bytes: int = 64 * 1024 * 1024, slot_size: int = 4096,
+                 stripes: int = 64, probe_limit: int = 16):
+        if not SHARED_CACHE_SUPPORTED:
+            raise RuntimeError("The shared cache requires fcntl byte-range locks")
+
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self.slot_size, self.slots, self.stripes = self._attach_or_create(size_bytes, slot_size, stripes)
+            self._mm = mmap.mmap(self._fd, _HEADER_SIZE + self.slots * self.slot_size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self.slots_per_stripe = self.slots // self.stripes
+        self.probe_limit = min(probe_limit, self.slots_per_stripe)
+        self.max_value_bytes = self.slot_size - _SLOT.size
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+        self._closed = False
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "rejections": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+        _live_caches.add(self)
+
+    def _attach_or_create(self, size_bytes: int, slot_size: int, stripes: int) -> Tuple[int, int, int]:
+        """Adopt the geometry of a valid existing table, or initialize a new one."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if len(header) == _HEADER.size:
+                magic, existing_slot_size, existing_slots, existing_stripes = _HEADER.unpack(header)
+                expected = _HEADER_SIZE + existing_slots * existing_slot_size
+                if magic == _MAGIC and existing_stripes and os.fstat(self._fd).st_size == expected:
+                    return existing_slot_size, existing_slots, existing_stripes
+
+            slots = max(stripes, (size_bytes - _HEADER_SIZE) // slot_size // stripes * stripes)
+            # Truncating first zeroes every slot, marking them empty
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, _HEADER_SIZE + slots * slot_size)
+            os.pwrite(self._fd, _HEADER.pack(_MAGIC, slot_size, slots, stripes), 0)
+            return slot_size, slots, stripes
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    @staticmethod
+    def _digest(namespace: str, key: str) -> bytes:
+        return hashlib.blake2b(f"{namespace}\0{key}".encode(), digest_size=16).digest()
+
+    def _window(self, digest: bytes) -> Tuple[int, Iterator[int]]:
+        """Stripe of a key and the offsets of the slots it may occupy."""
+        code = int.from_bytes(digest[:8], "little")
+        stripe = code % self.stripes
+        start = (code >> 16) % self.slots_per_stripe
+        base = stripe * self.slots_per_stripe
+        offsets = (
+            _HEADER_SIZE + (base + (start + i) % self.slots_per_stripe) * self.slot_size
+            for i in range(self.probe_limit)
+        )
+        return stripe, offsets
+
+    @contextmanager
+    def _locked(self, stripe: int):
+        # fcntl locks exclude other processes, the thread lock other threads
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 1 + stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 1 + stripe)
+
+    def get(self, namespace: str, key: str) -> Optional[SharedHit]:
+        """Look up an entry; None on a miss or after expiry."""
+        digest = self._digest(namespace, key)
+        stripe, offsets = self._window(digest)
+        payload = None
+        now = time.time()
+        with self._locked(stripe):
+            for offset in offsets:
+                state, flags, slot_digest, _, expires_at, _, length = _SLOT.unpack_from(self._mm, offset)
+                if state == _EMPTY:
+                    break
+                if state != _USED or slot_digest != digest:
+                    continue
+                if expires_at and expires_at <= now:
+                    self._mm[offset] = _DELETED
+                    self._metrics["expirations"] += 1
+                    break
+                start = offset + _SLOT.size
+                payload = self._mm[start:start + length]
+                # Refresh accessed_at in place for eviction order
+                _ACCESSED_AT.pack_into(self._mm, offset + _ACCESSED_AT_OFFSET, now)
+                break
+
+        if payload is None:
+            self._metrics["misses"] += 1
+            return None
+        try:
+            value = pickle.loads(zlib.decompress(payload) if flags & _COMPRESSED else payload)
+        except Exception as e:
+            self.logger.warning(f"Dropping undecodable shared cache entry {namespace}/{key}: {e}")
+            self.delete(namespace, key)
+            self._metrics["misses"] += 1
+            return None
+        self._metrics["hits"] += 1
+        return SharedHit(value, expires_at or None)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value; returns False if it cannot be serialized or does not fit a slot."""
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.debug(f"Not sharing {namespace}/{key}: {e}")
+            self._metrics["rejections"] += 1
+            return False
+        flags = 0
+        if len(payload) > _COMPRESS_ABOVE:
+            compressed = zlib.compress(payload, 1)
+            if len(compressed) < len(payload):
+                payload, flags = compressed, _COMPRESSED
+        if len(payload) > self.max_value_bytes:
+            self._metrics["rejections"] += 1
+            return False
+
+        digest = self._digest(namespace, key)
+        stripe, offsets = self._window(digest)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else 0.0
+        with self._locked(stripe):
+            target = free = oldest = None
+            oldest_access = float("inf")
+            for offset in offsets:
+                state, _, slot_digest, _, slot_expires, accessed_at, _ = _SLOT.unpack_from(self._mm, offset)
+                if state == _USED and slot_digest == digest:
+                    target = offset
+                    break
+                if state == _EMPTY or state == _DELETED or (slot_expires and slot_expires <= now):
+                    if free is None:
+                        free = offset
+                    if state == _EMPTY:
+                        break
+                elif accessed_at < oldest_access:
+                    oldest, oldest_access = offset, accessed_at
+            if target is None:
+                target = free
+            if target is None:
+                target = oldest
+                self._metrics["evictions"] += 1
+
+            start = target + _SLOT.size
+            self._mm[start:start + len(payload)] = payload
+            _SLOT.pack_into(self._mm, target, _USED, flags, digest, now, expires_at, now, len(payload))
+        self._metrics["writes"] += 1
+        return True
+
+    def delete(self, namespace: str, key: str) -> bool:
+        digest = self._digest(namespace, key)
+        stripe, offsets = self._window(digest)
+        with self._locked(stripe):
+            for offset in offsets:
+                state, _, slot_digest, *_ = _SLOT.unpack_from(self._mm, offset)
+                if state == _EMPTY:
+                    return False
+                if state == _USED and slot_digest == digest:
+                    self._mm[offset] = _DELETED
+                    return True
+        return False
+
+    def clear(self) -> None:
+        """Empty every slot, one stripe at a time."""
+        for stripe in range(self.stripes):
+            with self._locked(stripe):
+                first = stripe * self.slots_per_stripe
+                for slot in range(first, first + self.slots_per_stripe):
+                    self._mm[_HEADER_SIZE + slot * self.slot_size] = _EMPTY
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        _live_caches.discard(self)
+        self._mm.close()
+        os.close(self._fd)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-process hit counters and host-wide occupancy."""
+        used = 0
+        if not self._closed:
+            used = sum(
+                1 for slot in range(self.slots)
+                if self._mm[_HEADER_SIZE + slot * self.slot_size] == _USED
+            )
+        lookups = self._metrics["hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "hit_ratio": self._metrics["hits"] / lookups if lookups else 0.0,
+            "slots": self.slots,
+            "used_slots": used,
+            "slot_size": self.slot_size,
+            "stripes": self.stripes,
+            "path": str(self.path)
+        }
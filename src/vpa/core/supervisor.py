@@ -0,0 +1,239 @@
+"""
+VPA Task Supervisor
+Supervised long-running background tasks with restart policies, backoff and CPU/wall-time accounting.
+Target: No background loop dies silently; every loop's health and cost is visible.
+"""
+
+import time
+import asyncio
+import logging
+from enum import Enum
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from dataclasses import dataclass
+
+from .container import container
+from .events import event_bus
+from .tasks import task_tracker
+
+
+class RestartPolicy(Enum):
+    NEVER = "never"
+    ON_FAILURE = "on_failure"
+    ALWAYS = "always"
+
+
+class TaskState(Enum):
+    RUNNING = "running"
+    BACKOFF = "backoff"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STOPPED = "stopped"
+
+
+@dataclass
+class TaskAccounting:
+    """CPU and wall time spent by one supervised task across restarts."""
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    steps: int = 0
+
+
+class _AccountedAwaitable:
+    """
+    Drives a coroutine step by step, charging the thread CPU time of each
+    step to the task. Time spent suspended on the event loop is not charged.
+    """
+
+    def __init__(self, coro: Awaitable, accounting: TaskAccounting):
+        self._coro = coro
+        self._accounting = accounting
+
+    def __await__(self):
+        coro, accounting = self._coro, self._accounting
+        value, error = None, None
+        while True:
+            started = time.thread_time()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                accounting.cpu_time += time.thread_time() - started
+                accounting.steps += 1
+
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+@dataclass
+class SupervisedTask:
+    """Specification and live state of one supervised task."""
+    name: str
+    factory: Callable[[], Awaitable]
+    restart: RestartPolicy = RestartPolicy.ON_FAILURE
+    backoff_initial: float = 1.0
+    backoff_max: float = 60.0
+    max_restarts: Optional[int] = None
+    healthy_after: float = 60.0
+    state: TaskState = TaskState.RUNNING
+    restarts: int = 0
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    started_at: float = 0.0
+    task: Optional[asyncio.Task] = None
+
+    def __post_init__(self):
+        self.accounting = TaskAccounting()
+
+
+class TaskSupervisor:
+    """
+    Runs background coroutines under restart policies.
+
+    Failures are logged with their traceback and emitted as
+    background_task_failed events; restarts back off exponentially unless
+    the task had been running for healthy_after seconds. Supervised tasks
+    are tracked as background work, so the shutdown drain cancels them.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._tasks: Dict[str, SupervisedTask] = {}
+
+    def supervise(self, name: str, factory: Callable[[], Awaitable],
+                  restart: RestartPolicy = RestartPolicy.ON_FAILURE,
+                  backoff_initial: float = 1.0, backoff_max: float = 60.0,
+                  max_restarts: Optional[int] = None, healthy_after: float = 60.0) -> SupervisedTask:
+        """
+        Start factory() as a supervised task; factory is called again for each restart.
+        A task with the same name that is still running is returned unchanged.
+        """
+        existing = self._tasks.get(name)
+        if existing and existing.task and not existing.task.done():
+            return existing
+
+        supervised = SupervisedTask(name, factory, restart, backoff_initial, backoff_max,
+                                    max_restarts, healthy_after)
+        self._tasks[name] = supervised
+        supervised.task = task_tracker.spawn(self._run(supervised), kind="background",
+                                             name=f"supervised:{name}")
+        return supervised
+
+    async def _run(self, supervised: SupervisedTask) -> None:
+        accounting = supervised.accounting
+        while True:
+            supervised.state = TaskState.RUNNING
+            supervised.started_at = time.monotonic()
+            try:
+                await _AccountedAwaitable(supervised.factory(), accounting)
+                failed = False
+            except asyncio.CancelledError:
+                supervised.state = TaskState.STOPPED
+                raise
+            except Exception as e:
+                failed = True
+                supervised.last_error = f"{type(e).__name__}: {e}"
+                self.logger.error(f"Background task '{supervised.name}' failed", exc_info=True)
+                event_bus.emit("background_task_failed", {
+                    "task": supervised.name,
+                    "error": supervised.last_error,
+                    "restarts": supervised.restarts
+                })
+            finally:
+                accounting.wall_time += time.monotonic() - supervised.started_at
+
+            if not self._should_restart(supervised, failed):
+                supervised.state = TaskState.FAILED if failed else TaskState.COMPLETED
+                return
+
+            ran_for = time.monotonic() - supervised.started_at
+            if failed and ran_for < supervised.healthy_after:
+                supervised.consecutive_failures += 1
+            else:
+                supervised.consecutive_failures = 0
+
+            delay = 0.0
+            if supervised.consecutive_failures:
+                delay = min(supervised.backoff_max,
+                            supervised.backoff_initial * 2 ** (supervised.consecutive_failures - 1))
+            supervised.state = TaskState.BACKOFF
+            supervised.restarts += 1
+            self.logger.info(f"Restarting background task '{supervised.name}' in {delay:.1f}s "
+                             f"(restart {supervised.restarts})")
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                supervised.state = TaskState.STOPPED
+                raise
+
+    @staticmethod
+    def _should_restart(supervised: SupervisedTask, failed: bool) -> bool:
+        if supervised.restart == RestartPolicy.NEVER:
+            return False
+        if supervised.restart == RestartPolicy.ON_FAILURE and not failed:
+            return False
+        return supervised.max_restarts is None or supervised.restarts < supervised.max_restarts
+
+    async def stop(self, name: str, remove: bool = False) -> None:
+        """Cancel one supervised task and wait for it to finish; remove also drops its entry."""
+        supervised = self._tasks.get(name)
+        if supervised and supervised.task and not supervised.task.done():
+            supervised.task.cancel()
+            await asyncio.gather(supervised.task, return_exceptions=True)
+        if remove and self._tasks.get(name) is supervised:
+            self._tasks.pop(name, None)
+
+    def remove_finished(self) -> List[str]:
+        """Drop the entries of completed, failed and stopped tasks; returns their names."""
+        finished = [
+            name for name, supervised in self._tasks.items()
+            if supervised.task is None or supervised.task.done()
+        ]
+        for name in finished:
+            del self._tasks[name]
+        return finished
+
+    async def stop_all(self) -> None:
+        """Cancel every supervised task."""
+        for name in list(self._tasks):
+            await self.stop(name)
+
+    def get_task(self, name: str) -> Optional[SupervisedTask]:
+        return self._tasks.get(name)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """State, health, restarts and CPU/wall-time accounting of every supervised task."""
+        now = time.monotonic()
+        status = {}
+        for name, supervised in self._tasks.items():
+            accounting = supervised.accounting
+            wall_time = accounting.wall_time
+            if supervised.state == TaskState.RUNNING:
+                wall_time += now - supervised.started_at
+            status[name] = {
+                "state": supervised.state.value,
+                "healthy": supervised.state in (TaskState.RUNNING, TaskState.COMPLETED),
+                "restart_policy": supervised.restart.value,
+                "restarts": supervised.restarts,
+                "last_error": supervised.last_error,
+                "uptime": now - supervised.started_at if supervised.state == TaskState.RUNNING else 0.0,
+                "wall_time": wall_time,
+                "cpu_time": accounting.cpu_time,
+                "cpu_percent": 100.0 * accounting.cpu_time / wall_time if wall_time > 0 else 0.0,
+                "steps": accounting.steps
+            }
+        return status
+
+
+# Global task supervisor instance
+task_supervisor = container.register(
+    "task_supervisor", TaskSupervisor, on_stop=lambda supervisor: supervisor.stop_all()
+)
@@ -0,0 +1,211 @@
+"""
+VPA Task Tracker
+Registry of in-flight asyncio tasks by kind with a deadline-bounded drain for shutdown.
+Target: Shutdown finishes in-flight requests, TTS and events instead of dropping them mid-flight.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Coroutine, Iterable
+from dataclasses import dataclass, field
+
+from .container import container
+
+# Kinds cancelled as soon as draining starts rather than waited for
+BACKGROUND_KINDS = ("background",)
+
+
+@dataclass
+class DrainReport:
+    """
+    Outcome of a drain: tasks finished within the deadline, background tasks
+    cancelled by design, and work abandoned because it missed the deadline.
+    """
+    completed: Dict[str, int] = field(default_factory=dict)
+    abandoned: Dict[str, int] = field(default_factory=dict)
+    cancelled: Dict[str, int] = field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def completed_total(self) -> int:
+        return sum(self.completed.values())
+
+    @property
+    def abandoned_total(self) -> int:
+        return sum(self.abandoned.values())
+
+    @property
+    def cancelled_total(self) -> int:
+        return sum(self.cancelled.values())
+
+    def merge(self, other: "DrainReport") -> "DrainReport":
+        merged = DrainReport(dict(self.completed), dict(self.abandoned), dict(self.cancelled),
+                             self.duration + other.duration)
+        for target, source in ((merged.completed, other.completed), (merged.abandoned, other.abandoned),
+                               (merged.cancelled, other.cancelled)):
+            for kind, count in source.items():
+                target[kind] = target.get(kind, 0) + count
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "completed": dict(self.completed),
+            "abandoned": dict(self.abandoned),
+            "cancelled": dict(self.cancelled),
+            "completed_total": self.completed_total,
+            "abandoned_total": self.abandoned_total,
+            "cancelled_total": self.cancelled_total,
+            "duration": self.duration
+        }
+
+
+class TaskTracker:
+    """
+    Tracks fire-and-forget tasks so shutdown can wait for them.
+
+    Work is grouped by kind (request, event, background, ...). Once
+    draining starts, `accepting` is False and request entry points should
+    turn new work away; tasks already running are given until the drain
+    deadline to finish and are cancelled after it.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._tasks: Dict[asyncio.Task, str] = {}
+        self._draining_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metrics = {
+            "spawned": 0,
+            "finished": 0,
+            "failed": 0,
+            "drains": 0
+        }
+
+    def spawn(self, coro: Coroutine, kind: str = "task", name: Optional[str] = None) -> asyncio.Task:
+        """Create a task on the running loop and track it."""
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        return self.track(task, kind)
+
+    def track(self, task: asyncio.Task, kind: str = "task") -> asyncio.Task:
+        """Track an existing task, e.g. a connection handler."""
+        if task in self._tasks:
+            return task
+        self._tasks[task] = kind
+        self._metrics["spawned"] += 1
+        task.add_done_callback(self._on_done)
+        return task
+
+    def promote(self, task: asyncio.Task, kind: str = "request") -> None:
+        """Re-tag a tracked task, e.g. a background refresh a request has started waiting on."""
+        if task in self._tasks:
+            self._tasks[task] = kind
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+        self._metrics["finished"] += 1
+        if not task.cancelled() and task.exception() is not None:
+            self._metrics["failed"] += 1
+            self.logger.error(f"Tracked task {task.get_name()} failed: {task.exception()}")
+
+    @property
+    def accepting(self) -> bool:
+        """False while draining; a drain ends with the event loop it started on."""
+        return self._draining_loop is None or self._draining_loop.is_closed()
+
+    def _prune_closed_loops(self) -> None:
+        # Tasks of a loop that was closed without finishing them can never complete
+        for task in [task for task in self._tasks if task.get_loop().is_closed()]:
+            self._tasks.pop(task, None)
+
+    def in_flight(self, kind: Optional[str] = None) -> int:
+        """Number of unfinished tracked tasks, optionally of one kind."""
+        return sum(1 for task_kind in self._tasks.values() if kind is None or task_kind == kind)
+
+    def begin_drain(self) -> None:
+        """Stop admitting new work on the running event loop."""
+        if self.accepting:
+            self._draining_loop = asyncio.get_running_loop()
+            self._prune_closed_loops()
+            self.logger.info(f"Draining {self.in_flight()} in-flight tasks")
+
+    def resume(self) -> None:
+        """Accept work again without waiting for the loop to close."""
+        self._draining_loop = None
+
+    async def drain(self, timeout: float = 10.0,
+                    cancel_kinds: Iterable[str] = BACKGROUND_KINDS) -> DrainReport:
+        """
+        Wait up to timeout seconds for tracked tasks, then cancel the rest.
+        Tasks of cancel_kinds are cancelled immediately and reported as
+        cancelled rather than abandoned; tasks spawned while draining (e.g.
+        events emitted by finishing requests) are waited for too. The calling
+        task is never waited for.
+        """
+        self.begin_drain()
+        self._metrics["drains"] += 1
+        started = time.monotonic()
+        deadline = started + timeout
+        report = DrainReport()
+        loop = asyncio.get_running_loop()
+        current = asyncio.current_task()
+        cancel_kinds = set(cancel_kinds)
+
+        def drainable():
+            return {task: kind for task, kind in self._tasks.items()
+                    if task is not current and task.get_loop() is loop}
+
+        while True:
+            pending = drainable()
+            # Including background tasks started while draining, e.g. a supervised restart
+            background = [task for task, kind in pending.items() if kind in cancel_kinds and not task.done()]
+            if background:
+                await self._cancel(background, report.cancelled)
+                continue
+            if not pending:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self._cancel(list(pending), report.abandoned)
+                break
+
+            done, _ = await asyncio.wait(pending, timeout=remaining)
+            for task in done:
+                kind = pending[task]
+                if task.cancelled():
+                    counts = report.cancelled if kind in cancel_kinds else report.abandoned
+                    counts[kind] = counts.get(kind, 0) + 1
+                else:
+                    report.completed[kind] = report.completed.get(kind, 0) + 1
+
+        report.duration = time.monotonic() - started
+        self.logger.info(f"Drain finished in {report.duration:.2f}s: "
+                         f"{report.completed_total} completed, {report.cancelled_total} background cancelled, "
+                         f"{report.abandoned_total} abandoned")
+        return report
+
+    async def _cancel(self, tasks: Iterable[asyncio.Task], counts: Dict[str, int]) -> None:
+        tasks = [task for task in tasks if not task.done()]
+        kinds = {task: self._tasks.get(task, "task") for task in tasks}
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            kind = kinds[task]
+            counts[kind] = counts.get(kind, 0) + 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        self._prune_closed_loops()
+        by_kind: Dict[str, int] = {}
+        for kind in self._tasks.values():
+            by_kind[kind] = by_kind.get(kind, 0) + 1
+        return {
+            **self._metrics,
+            "accepting": self.accepting,
+            "in_flight": len(self._tasks),
+            "in_flight_by_kind": by_kind
+        }
+
+
+# Global task tracker instance
+task_tracker = container.register("task_tracker", TaskTracker)
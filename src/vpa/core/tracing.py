@@ -0,0 +1,255 @@
+"""
+VPA Startup Tracing
+Span tree recording for startup with Chrome trace / Perfetto JSON export.
+Target: Break a startup regression down to the import, phase or function responsible.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Iterator
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Innermost open span for the current task/thread
+_current_span: ContextVar[Optional[int]] = ContextVar('vpa_current_span', default=None)
+
+
+@dataclass
+class TraceSpan:
+    """Single completed span; times are nanoseconds since the tracer epoch."""
+    span_id: int
+    name: str
+    category: str
+    start_ns: int
+    duration_ns: int
+    parent_id: Optional[int] = None
+    lane: int = 0
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class StartupTracer:
+    """
+    Records nested spans while active and exports them as Chrome trace JSON.
+    Concurrent asyncio tasks are placed on separate lanes so overlapping
+    spans render correctly in chrome://tracing and Perfetto.
+
+    Tracers start inactive; the process entry point calls start(), and
+    recording ends with stop() once the process is ready or at the deadline
+    given to start(), whichever comes first.
+    """
+
+    def __init__(self, max_spans: int = 100000):
+        self.logger = logging.getLogger(__name__)
+        self.max_spans = max_spans
+        self.spans: List[TraceSpan] = []
+        self.active = False
+        self.dropped_spans = 0
+        self._epoch_ns = time.perf_counter_ns()
+        self._deadline_ns: Optional[int] = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._lanes: Dict[Any, int] = {}
+        self._lane_names: Dict[int, str] = {}
+        self._profile_threshold_ns = 0
+        self._profile_state = threading.local()
+        self._profiling = False
+
+    def _now_ns(self) -> int:
+        return time.perf_counter_ns() - self._epoch_ns
+
+    def _allocate_id(self) -> int:
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+            return span_id
+
+    def _current_lane(self) -> int:
+        """Lane per asyncio task, or per thread outside the event loop."""
+        task = None
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            pass
+
+        key = ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = len(self._lanes) + 1
+                self._lanes[key] = lane
+                self._lane_names[lane] = (task.get_name() if task is not None
+                                          else threading.current_thread().name)
+            return lane
+
+    def _recording(self) -> bool:
+        if not self.active:
+            return False
+        if self._deadline_ns is not None and self._now_ns() > self._deadline_ns:
+            self.logger.info("Startup tracing deadline reached; recording stopped")
+            self.stop()
+            return False
+        return True
+
+    def _append(self, span: TraceSpan) -> None:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped_spans += 1
+                return
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "startup", **args) -> Iterator[Optional[int]]:
+        """Record the enclosed block as a span nested under the current span."""
+        if not self._recording():
+            yield None
+            return
+
+        span_id = self._allocate_id()
+        parent_id = _current_span.get()
+        lane = self._current_lane()
+        token = _current_span.set(span_id)
+        start_ns = self._now_ns()
+        try:
+            yield span_id
+        finally:
+            duration_ns = self._now_ns() - start_ns
+            _current_span.reset(token)
+            self._append(TraceSpan(span_id, name, category, start_ns, duration_ns,
+                                   parent_id, lane, args))
+
+    def record_span(self, name: str, start_perf: float, end_perf: float,
+                    category: str = "startup", **args) -> None:
+        """Record an already measured interval given perf_counter() seconds."""
+        if not self._recording():
+            return
+
+        start_ns = int(start_perf * 1e9) - self._epoch_ns
+        duration_ns = max(0, int((end_perf - start_perf) * 1e9))
+        self._append(TraceSpan(self._allocate_id(), name, category, start_ns, duration_ns,
+                               _current_span.get(), self._current_lane(), args))
+
+    def start(self, deadline: Optional[float] = 60.0) -> None:
+        """Discard collected spans and record until stop() or for at most deadline seconds."""
+        self.reset()
+        self._deadline_ns = int(deadline * 1e9) if deadline is not None else None
+        self.active = True
+
+    def stop(self) -> None:
+        """Stop recording; collected spans remain available for export."""
+        self.stop_profiling()
+        self.active = False
+
+    def reset(self) -> None:
+        """Discard collected spans; recording stays on or off as it was."""
+        with self._lock:
+            self.spans = []
+            self.dropped_spans = 0
+            self._lanes.clear()
+            self._lane_names.clear()
+        self._epoch_ns = time.perf_counter_ns()
+
+    def start_profiling(self, min_duration_ms: float = 1.0) -> None:
+        """Capture every Python function call slower than min_duration_ms via sys.setprofile."""
+        self._profile_threshold_ns = int(min_duration_ms * 1e6)
+        self._profiling = True
+        threading.setprofile(self._profile_callback)
+        sys.setprofile(self._profile_callback)
+
+    def stop_profiling(self) -> None:
+        """Remove the profiling hook."""
+        if not self._profiling:
+            return
+        self._profiling = False
+        sys.setprofile(None)
+        threading.setprofile(None)
+
+    def _profile_callback(self, frame, event: str, arg: Any) -> None:
+        """sys.setprofile hook recording slow Python-level calls."""
+        if event == "call":
+            stack = getattr(self._profile_state, "stack", None)
+            if stack is None:
+                stack = self._profile_state.stack = []
+            stack.append((frame, time.perf_counter_ns()))
+        elif event == "return":
+            stack = getattr(self._profile_state, "stack", None)
+            if not stack:
+                return
+            call_frame, start = stack.pop()
+            if call_frame is not frame:
+                # Frames entered before profiling started; resynchronize
+                stack.clear()
+                return
+            duration_ns = time.perf_counter_ns() - start
+            if duration_ns >= self._profile_threshold_ns and self._recording():
+                code = frame.f_code
+                self._append(TraceSpan(
+                    self._allocate_id(), code.co_name, "profile",
+                    start - self._epoch_ns, duration_ns, None,
+                    self._current_lane(),
+                    {"file": code.co_filename, "line": code.co_firstlineno}
+                ))
+
+    def span_tree(self) -> List[Dict[str, Any]]:
+        """Return recorded spans as a nested tree ordered by start time."""
+        nodes = {
+            span.span_id: {
+                "name": span.name,
+                "category": span.category,
+                "start_ms": span.start_ns / 1e6,
+                "duration_ms": span.duration_ns / 1e6,
+                "args": span.args,
+                "children": []
+            }
+            for span in self.spans
+        }
+        roots = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            parent = nodes.get(span.parent_id) if span.parent_id is not None else None
+            (parent["children"] if parent else roots).append(nodes[span.span_id])
+        return roots
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Build a Chrome trace event document (loadable in Perfetto)."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "vpa"}}
+        ]
+        for lane, lane_name in self._lane_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                           "args": {"name": lane_name}})
+
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_ns / 1000.0,
+                "dur": span.duration_ns / 1000.0,
+                "pid": pid,
+                "tid": span.lane,
+                "args": {**span.args, "span_id": span.span_id, "parent_id": span.parent_id}
+            })
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped_spans}
+        }
+
+    def export_chrome_trace(self, filename: str = "startup_trace.json") -> str:
+        """Write the trace to a Chrome trace JSON file."""
+        with open(filename, 'w') as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+        self.logger.info(f"Startup trace exported to {filename} ({len(self.spans)} spans)")
+        return filename
+
+
+# Global startup tracer; the entry point starts it, and it records until the process reports ready
+startup_tracer = StartupTracer()
@@ -0,0 +1,552 @@
+"""
+VPA Worker Supervisor
+Pre-fork multi-process serving: shared initialization once, N workers on shared listening sockets.
+Target: Use every core for plugin processing while keeping shared state copy-on-write.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import errno
+import select
+import signal
+import socket
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from dataclasses import dataclass, field
+
+from .container import container
+from .server import AssistantServer, ServerConfig
+from .tasks import task_tracker
+from .supervisor import task_supervisor
+from .tracing import startup_tracer
+from .lazy_import import lazy_module
+
+# psutil is only needed once worker memory is checked
+psutil = lazy_module("psutil")
+
+FORK_SUPPORTED = hasattr(os, "fork")
+
+
+@dataclass
+class WorkerConfig:
+    """Process count and recycling limits for the worker supervisor."""
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    # Limit on a worker's unique memory (USS); shared copy-on-write pages are not counted
+    max_uss_mb: Optional[float] = 500.0
+    metrics_interval: float = 1.0
+    # Seconds between aggregated serving metrics log lines; None disables them
+    metrics_log_interval: Optional[float] = 60.0
+    poll_interval: float = 0.5
+    shutdown_timeout: float = 10.0
+    # Seconds a stopping worker gives in-flight requests; below shutdown_timeout so it ends before SIGKILL
+    drain_timeout: float = 8.0
+    restart_backoff: float = 0.5
+    max_restart_backoff: float = 30.0
+    min_healthy_uptime: float = 10.0
+    # Seconds between a worker's usage-profile and access-log saves (and slot 0's disk cache compaction)
+    maintenance_interval: float = 30.0
+    # Size of the host-wide shared cache tier; None keeps caches per process
+    shared_cache_bytes: Optional[int] = None
+    shared_cache_path: str = "cache/shared.cache"
+
+
+@dataclass
+class WorkerState:
+    """Supervisor-side view of one worker slot."""
+    slot: int
+    pid: Optional[int] = None
+    started_at: float = 0.0
+    metrics_fd: Optional[int] = None
+    restarts: int = 0
+    consecutive_failures: int = 0
+    restart_at: float = 0.0
+    last_exit: Optional[str] = None
+    uss_mb: float = 0.0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    buffer: bytes = b""
+
+
+class WorkerSupervisor:
+    """
+    Forks assistant server workers after shared initialization.
+
+    Plugins (unless the plugin manager loads lazily) and the voice catalog
+    are loaded in the supervisor before forking, so workers share them
+    copy-on-write. Workers accept connections
+    from listening sockets bound once by the supervisor. Crashed workers and
+    workers over the memory limit are replaced. The limit applies to a worker's
+    USS, the memory only it uses: RSS would also count the copy-on-write pages
+    it still shares with the supervisor, so every worker would look as large
+    as the whole preloaded state. Each worker reports its serving
+    metrics to the supervisor over a pipe, and the supervisor logs the
+    aggregate every metrics_log_interval seconds.
+
+    Workers do not run VPAApplication, so each starts the background work
+    that still applies per process: its own memory governor, and periodic
+    saves of its usage profile and access log, merged into the shared files.
+    The disk cache file is shared too, so only slot 0 compacts it. The
+    /livez and /readyz health endpoint is single-process only.
+    """
+
+    def __init__(self, server_config: Optional[ServerConfig] = None,
+                 worker_config: Optional[WorkerConfig] = None,
+                 plugin_manager=None, audio_system=None,
+                 prepare: Optional[Callable[[], Awaitable[None]]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.server_config = server_config or ServerConfig()
+        self.worker_config = worker_config or WorkerConfig()
+        self._plugin_manager = plugin_manager
+        self._audio_system = audio_system
+        self._prepare = prepare or self._prepare_shared_state
+        self._workers: Dict[int, WorkerState] = {}
+        self._http_socket: Optional[socket.socket] = None
+        self._unix_socket: Optional[socket.socket] = None
+        self._running = False
+        self._last_metrics_log = 0.0
+        self.shared_cache = None
+        self.http_port: Optional[int] = None
+        self._metrics = {
+            "workers_started": 0,
+            "workers_restarted": 0,
+            "crash_restarts": 0,
+            "memory_restarts": 0,
+            "prepare_time": 0.0
+        }
+
+    @property
+    def plugin_manager(self):
+        if self._plugin_manager is None:
+            from .plugins import plugin_manager
+            self._plugin_manager = plugin_manager
+        return self._plugin_manager
+
+    @property
+    def audio_system(self):
+        if self._audio_system is None:
+            from audio.voice_system import audio_system
+            self._audio_system = audio_system
+        return self._audio_system
+
+    async def _prepare_shared_state(self) -> None:
+        """Load state every worker needs before forking."""
+        await self.plugin_manager.discover_plugins()
+        # Routing only reaches loaded plugins, so load them once here rather than per worker
+        if not self.plugin_manager.lazy_loading:
+            await self.plugin_manager.load_all_plugins()
+        self.audio_system.verify_voice_catalog()
+
+        # Loading ran on pool threads; release them so they are not running at the fork
+        if container.is_initialized("executor_service"):
+            container.get("executor_service").shrink()
+
+    def start(self) -> None:
+        """Run shared initialization, bind the listening sockets and fork the workers."""
+        if not FORK_SUPPORTED:
+            raise RuntimeError("Pre-fork workers require os.fork; use run() for single-process serving")
+
+        prepare_start = time.perf_counter()
+        asyncio.run(self._prepare())
+        self._metrics["prepare_time"] = time.perf_counter() - prepare_start
+
+        self._bind_sockets()
+        self._attach_shared_cache()
+
+        if threading.active_count() > 1:
+            self.logger.warning(f"{threading.active_count() - 1} extra threads running before fork; "
+                                "thread pools should be created in the workers")
+
+        # Startup ends at the fork; workers inherit a stopped tracer and never record spans
+        startup_tracer.stop()
+
+        # Keep shared objects out of GC scans so collections do not dirty shared pages
+        gc.collect()
+        gc.freeze()
+
+        self._running = True
+        for slot in range(self.worker_config.workers):
+            self._workers[slot] = WorkerState(slot)
+            self._spawn(self._workers[slot])
+
+        self.logger.info(f"Supervisor started {self.worker_config.workers} workers "
+                         f"after {self._metrics['prepare_time']:.3f}s shared initialization")
+
+    def _attach_shared_cache(self) -> None:
+        """Map the shared cache tier before forking so every worker inherits it."""
+        if self.worker_config.shared_cache_bytes is None:
+            return
+        from .shared_cache import SharedMemoryCache
+        from .cache_manager import cache_manager
+        from .response_optimizer import response_optimizer
+
+        self.shared_cache = SharedMemoryCache(self.worker_config.shared_cache_path,
+                                              size_bytes=self.worker_config.shared_cache_bytes)
+        cache_manager.attach_shared_cache(self.shared_cache)
+        response_optimizer.attach_shared_cache(self.shared_cache)
+
+    def _bind_sockets(self) -> None:
+        config = self.server_config
+        if config.http_port is not None:
+            self._http_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._http_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._http_socket.bind((config.http_host, config.http_port))
+            self._http_socket.listen(socket.SOMAXCONN)
+            self._http_socket.setblocking(False)
+            self.http_port = self._http_socket.getsockname()[1]
+
+        if config.unix_socket_path and hasattr(socket, "AF_UNIX"):
+            if os.path.exists(config.unix_socket_path):
+                os.unlink(config.unix_socket_path)
+            self._unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._unix_socket.bind(config.unix_socket_path)
+            self._unix_socket.listen(socket.SOMAXCONN)
+            self._unix_socket.setblocking(False)
+
+    def _spawn(self, worker: WorkerState) -> None:
+        read_fd, write_fd = os.pipe()
+        # Until the child installs its own handler it runs the parent's, which may ignore
+        # SIGTERM; keep it pending instead so an early recycle is not lost
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTERM})
+        try:
+            pid = os.fork()
+        except OSError:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+            raise
+        if pid != 0:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+
+        if pid == 0:
+            os.close(read_fd)
+            for other in self._workers.values():
+                if other.metrics_fd is not None:
+                    os.close(other.metrics_fd)
+            self._run_worker(worker.slot, write_fd)
+
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        worker.pid = pid
+        worker.metrics_fd = read_fd
+        worker.started_at = time.monotonic()
+        worker.metrics = {}
+        worker.buffer = b""
+        worker.uss_mb = 0.0
+        self._metrics["workers_started"] += 1
+        self.logger.info(f"Worker {worker.slot} started with pid {pid}")
+
+    def _run_worker(self, slot: int, metrics_fd: int) -> None:
+        """Worker process body; never returns."""
+        exit_code = 0
+        try:
+            # Ctrl-C reaches the whole process group; only the supervisor acts on it
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+            asyncio.run(self._serve_worker(slot, metrics_fd))
+        except BaseException as e:
+            self.logger.error(f"Worker {slot} failed: {e}")
+            exit_code = 1
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(exit_code)
+
+    async def _serve_worker(self, slot: int, metrics_fd: int) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, stopping.set)
+
+        server = AssistantServer(self.server_config, self.plugin_manager, self.audio_system)
+        await server.start(http_socket=self._http_socket, unix_socket=self._unix_socket)
+        self._start_worker_loops(slot)
+        process = psutil.Process()
+
+        try:
+            while not stopping.is_set():
+                report = {
+                    "slot": slot,
+                    "pid": os.getpid(),
+                    "uss_mb": process.memory_full_info().uss / 1024 / 1024,
+                    "server": server.get_metrics()
+                }
+                try:
+                    os.write(metrics_fd, json.dumps(report, default=str).encode() + b"\n")
+                except BlockingIOError:
+                    pass
+                except BrokenPipeError:
+                    break
+
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=self.worker_config.metrics_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Finish in-flight requests, as the single-process shutdown does, before the listeners close
+            task_tracker.begin_drain()
+            report = await task_tracker.drain(self.worker_config.drain_timeout)
+            if report.abandoned_total:
+                self.logger.warning(f"Worker {slot} abandoned {report.abandoned_total} tasks at shutdown")
+            await server.stop()
+            # Merged into the shared profile file, so no worker overwrites another's usage
+            self.plugin_manager.usage_profile.save()
+            # Stops the worker's loops and saves its access log, as the single-process shutdown does
+            await container.stop()
+            os.close(metrics_fd)
+
+    def _start_worker_loops(self, slot: int) -> None:
+        """Start the background loops a worker needs in place of VPAApplication's."""
+        from .memory_governor import memory_governor
+
+        # Each worker has its own heap and caches, so each governs its own memory
+        memory_governor.start()
+        task_supervisor.supervise("worker_maintenance", lambda: self._maintenance_loop(slot))
+
+    async def _maintenance_loop(self, slot: int) -> None:
+        """Periodically save this worker's usage profile and access log."""
+        while True:
+            await asyncio.sleep(self.worker_config.maintenance_interval)
+            self.plugin_manager.usage_profile.save()
+            if not container.is_initialized("cache_manager"):
+                continue
+            manager = container.get("cache_manager")
+            if slot == 0:
+                # Saves the access log too; one worker compacts the shared disk cache for all
+                await manager.compact()
+            else:
+                await container.get("executor_service").run(
+                    "io", manager.access_log.write, manager.access_log.snapshot())
+
+    def poll(self) -> None:
+        """One supervision pass: collect metrics, reap exits, recycle and restart workers."""
+        self._read_metrics()
+        self._reap()
+        self._enforce_memory_limit()
+
+        now = time.monotonic()
+        if self._running:
+            for worker in self._workers.values():
+                if worker.pid is None and now >= worker.restart_at:
+                    self._spawn(worker)
+
+        interval = self.worker_config.metrics_log_interval
+        if self._running and interval is not None and now - self._last_metrics_log >= interval:
+            self._last_metrics_log = now
+            self._log_metrics()
+
+    def _log_metrics(self) -> None:
+        metrics = self.get_metrics()
+        requests = metrics["requests"]
+        self.logger.info(f"Workers {metrics['workers_alive']}/{metrics['workers_configured']} alive, "
+                         f"{metrics['total_uss_mb']:.1f}MB USS: {requests['requests_completed']} requests "
+                         f"completed, {requests['requests_failed']} failed, {requests['in_flight']} in flight, "
+                         f"worst worker p95 {metrics['worst_worker_p95_ms']:.1f}ms")
+
+    def _read_metrics(self) -> None:
+        readable = [w.metrics_fd for w in self._workers.values() if w.metrics_fd is not None]
+        if not readable:
+            return
+        ready, _, _ = select.select(readable, [], [], 0)
+
+        for worker in self._workers.values():
+            if worker.metrics_fd not in ready:
+                continue
+            try:
+                data = os.read(worker.metrics_fd, 65536)
+            except BlockingIOError:
+                continue
+            worker.buffer += data
+            *lines, worker.buffer = worker.buffer.split(b"\n")
+            for line in lines[-1:]:
+                try:
+                    worker.metrics = json.loads(line)
+                    worker.uss_mb = worker.metrics.get("uss_mb", worker.uss_mb)
+                except ValueError:
+                    self.logger.debug(f"Malformed metrics from worker {worker.slot}")
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker = next((w for w in self._workers.values() if w.pid == pid), None)
+            if worker is None:
+                continue
+            self._worker_exited(worker, status)
+
+    def _worker_exited(self, worker: WorkerState, status: int) -> None:
+        if os.WIFSIGNALED(status):
+            worker.last_exit = f"signal {os.WTERMSIG(status)}"
+        else:
+            worker.last_exit = f"exit {os.WEXITSTATUS(status)}"
+
+        if worker.metrics_fd is not None:
+            os.close(worker.metrics_fd)
+        worker.pid = None
+        worker.metrics_fd = None
+
+        if not self._running:
+            return
+
+        recycled = worker.restart_at == -1
+        uptime = time.monotonic() - worker.started_at
+        if recycled or uptime >= self.worker_config.min_healthy_uptime:
+            worker.consecutive_failures = 0
+        else:
+            worker.consecutive_failures += 1
+        if not recycled:
+            self._metrics["crash_restarts"] += 1
+            self.logger.warning(f"Worker {worker.slot} exited ({worker.last_exit}) after {uptime:.1f}s")
+
+        backoff = 0.0
+        if worker.consecutive_failures:
+            backoff = min(self.worker_config.max_restart_backoff,
+                          self.worker_config.restart_backoff * 2 ** (worker.consecutive_failures - 1))
+        worker.restart_at = time.monotonic() + backoff
+        worker.restarts += 1
+        self._metrics["workers_restarted"] += 1
+
+    def _enforce_memory_limit(self) -> None:
+        limit = self.worker_config.max_uss_mb
+        if limit is None:
+            return
+
+        for worker in self._workers.values():
+            if worker.pid is None or worker.restart_at == -1:
+                continue
+            try:
+                worker.uss_mb = psutil.Process(worker.pid).memory_full_info().uss / 1024 / 1024
+            except psutil.Error:
+                continue
+            if worker.uss_mb > limit:
+                self.logger.warning(f"Worker {worker.slot} USS {worker.uss_mb:.1f}MB over "
+                                    f"{limit:.1f}MB limit; recycling")
+                self._metrics["memory_restarts"] += 1
+                # Marks a deliberate recycle so the restart is not counted as a crash
+                worker.restart_at = -1
+                self._signal(worker.pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                raise
+
+    def run(self) -> int:
+        """Serve until SIGINT/SIGTERM; falls back to one in-process server without fork."""
+        if not FORK_SUPPORTED:
+            self.logger.warning("os.fork unavailable; serving from a single process")
+            return asyncio.run(self._serve_single_process())
+
+        stop_requested = threading.Event()
+        previous = {
+            signum: signal.signal(signum, lambda *_: stop_requested.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.start()
+            while not stop_requested.is_set():
+                self.poll()
+                stop_requested.wait(self.worker_config.poll_interval)
+        finally:
+            self.stop()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        return 0
+
+    async def _serve_single_process(self) -> int:
+        await self._prepare()
+        server = AssistantServer(self.server_config, self.plugin_manager, self.audio_system)
+        await server.start()
+        self.http_port = server.http_port
+        self._start_worker_loops(0)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+            self.plugin_manager.usage_profile.save()
+            await container.stop()
+        return 0
+
+    def stop(self) -> None:
+        """Terminate all workers, waiting up to shutdown_timeout before killing them."""
+        self._running = False
+        for worker in self._workers.values():
+            if worker.pid is not None:
+                self._signal(worker.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.worker_config.shutdown_timeout
+        while any(w.pid is not None for w in self._workers.values()):
+            self._read_metrics()
+            self._reap()
+            if time.monotonic() >= deadline:
+                for worker in self._workers.values():
+                    if worker.pid is not None:
+                        self.logger.warning(f"Worker {worker.slot} did not stop; killing")
+                        self._signal(worker.pid, signal.SIGKILL)
+                        _, status = os.waitpid(worker.pid, 0)
+                        self._worker_exited(worker, status)
+                break
+            time.sleep(0.05)
+
+        for sock in (self._http_socket, self._unix_socket):
+            if sock is not None:
+                sock.close()
+        self._http_socket = self._unix_socket = None
+
+        if self.server_config.unix_socket_path and os.path.exists(self.server_config.unix_socket_path):
+            os.unlink(self.server_config.unix_socket_path)
+
+        if self.shared_cache is not None:
+            self.shared_cache.close()
+            self.shared_cache = None
+
+        if FORK_SUPPORTED:
+            gc.unfreeze()
+        self.logger.info("Supervisor stopped all workers")
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of currently running workers."""
+        return [w.pid for w in self._workers.values() if w.pid is not None]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Supervisor counters plus serving metrics aggregated across workers."""
+        totals = {"requests_total": 0, "requests_completed": 0, "requests_failed": 0, "in_flight": 0}
+        p95 = []
+        for worker in self._workers.values():
+            server_metrics = worker.metrics.get("server", {})
+            for key in totals:
+                totals[key] += server_metrics.get(key, 0)
+            if server_metrics.get("requests_completed"):
+                p95.append(server_metrics["latency_ms"]["p95"])
+
+        return {
+            **self._metrics,
+            "workers_configured": self.worker_config.workers,
+            "workers_alive": len(self.worker_pids()),
+            "total_uss_mb": sum(w.uss_mb for w in self._workers.values() if w.pid is not None),
+            "requests": totals,
+            "shared_cache": self.shared_cache.get_metrics() if self.shared_cache is not None else None,
+            # Per-worker percentiles cannot be merged exactly; the worst worker bounds the tail
+            "worst_worker_p95_ms": max(p95) if p95 else 0.0,
+            "workers": {
+                worker.slot: {
+                    "pid": worker.pid,
+                    "uss_mb": worker.uss_mb,
+                    "restarts": worker.restarts,
+                    "last_exit": worker.last_exit,
+                    "requests_completed": worker.metrics.get("server", {}).get("requests_completed", 0)
+                }
+                for worker in self._workers.values()
+            }
+        }
@@ -0,0 +1,136 @@
+"""
+Tests for admission control and load shedding.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.admission import (
+    AdmissionController, AdmissionPolicy, AdmissionDecision, AdmissionRejected,
+    RequestClass, StrainLevel
+)
+from vpa.core.supervisor import task_supervisor
+from vpa.core.tasks import task_tracker
+
+
+class TestAdmissionController:
+    """Test strain evaluation, decisions and priority queueing."""
+
+    def test_strain_levels_from_signals(self):
+        controller = AdmissionController()
+
+        assert controller.observe(rss_mb=100, cpu_percent=10, loop_lag_ms=0) == StrainLevel.NORMAL
+        assert controller.observe(rss_mb=1600) == StrainLevel.ELEVATED
+        assert controller.observe(cpu_percent=99) == StrainLevel.CRITICAL
+        assert controller.observe(rss_mb=100, cpu_percent=10) == StrainLevel.NORMAL
+
+        metrics = controller.get_metrics()
+        assert metrics["strain_changes"] == 3
+        assert metrics["strain_level"] == "normal"
+
+    def test_decisions_follow_priority(self):
+        controller = AdmissionController()
+
+        controller.observe(loop_lag_ms=120)
+        assert controller.decide(RequestClass.INTERACTIVE) == AdmissionDecision.ADMIT
+        assert controller.decide(RequestClass.STANDARD) == AdmissionDecision.DEGRADE
+        assert controller.decide(RequestClass.BACKGROUND) == AdmissionDecision.REJECT
+
+        controller.observe(rss_mb=4096)
+        assert controller.decide(RequestClass.INTERACTIVE) == AdmissionDecision.DEGRADE
+        assert controller.decide(RequestClass.STANDARD) == AdmissionDecision.REJECT
+
+    def test_parse_request_class(self):
+        assert RequestClass.parse("interactive") == RequestClass.INTERACTIVE
+        assert RequestClass.parse(None) == RequestClass.STANDARD
+        assert RequestClass.parse("bogus") == RequestClass.STANDARD
+
+    @pytest.mark.asyncio
+    async def test_reject_raises_with_retry_after(self):
+        controller = AdmissionController()
+        controller.observe(cpu_percent=100)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire(RequestClass.BACKGROUND)
+
+        assert excinfo.value.retry_after == controller.policy.retry_after
+        assert controller.get_metrics()["decisions"]["background"]["reject"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_serves_higher_priority_first(self):
+        controller = AdmissionController(max_concurrency=1)
+        holder = await controller.acquire(RequestClass.STANDARD)
+        order = []
+
+        async def request(request_class):
+            ticket = await controller.acquire(request_class)
+            order.append(request_class)
+            controller.release(ticket)
+
+        background = asyncio.create_task(request(RequestClass.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request(RequestClass.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert controller.signals.queue_depth == 2
+
+        controller.release(holder)
+        await asyncio.gather(background, interactive)
+
+        assert order == [RequestClass.INTERACTIVE, RequestClass.BACKGROUND]
+        assert controller.signals.in_flight == 0
+        assert controller.get_metrics()["decisions"]["interactive"]["queue"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_deadline_and_depth_limits(self):
+        policy = AdmissionPolicy()
+        policy.queue_timeout[RequestClass.STANDARD] = 0.05
+        policy.max_queue_depth[RequestClass.BACKGROUND] = 0
+        controller = AdmissionController(max_concurrency=1, policy=policy)
+        holder = await controller.acquire()
+
+        with pytest.raises(AdmissionRejected, match="deadline"):
+            await controller.acquire(RequestClass.STANDARD)
+        with pytest.raises(AdmissionRejected, match="queue full"):
+            await controller.acquire(RequestClass.BACKGROUND)
+
+        controller.release(holder)
+        assert controller.signals.in_flight == 0
+        assert controller.signals.queue_depth == 0
+        assert controller.get_metrics()["queue_timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        controller = AdmissionController(max_concurrency=1)
+        holder = await controller.acquire()
+
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        controller.release(holder)
+        assert controller.signals.in_flight == 0
+        ticket = await asyncio.wait_for(controller.acquire(), timeout=1)
+        controller.release(ticket)
+
+    @pytest.mark.asyncio
+    async def test_background_sampling_measures_process(self):
+        controller = AdmissionController(sample_interval=0.01)
+        controller.start()
+        sampler = controller._sampler
+        # Supervised and tracked, so the shutdown drain cancels it with the other loops
+        assert task_tracker.get_metrics()["in_flight_by_kind"].get("background", 0) >= 1
+        assert controller._sampler_name in task_supervisor.get_status()
+        await asyncio.sleep(0.05)
+        await controller.stop()
+
+        assert sampler.cancelled()
+        # A stopped controller leaves no entry behind
+        assert controller._sampler_name not in task_supervisor.get_status()
+        assert AdmissionController()._sampler_name != controller._sampler_name
+        assert controller.signals.rss_mb > 0
+        assert controller.signals.sampled_at > 0
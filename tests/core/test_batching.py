@@ -0,0 +1,136 @@
+"""
+Tests for micro-batching and its use by the response optimizer.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.batching import MicroBatcher
+from vpa.core.tasks import TaskTracker
+from vpa.core.response_optimizer import VPAResponseOptimizer, SimulatedLLMBackend
+
+
+class RecordingBackend:
+    """Echo backend that remembers each batch it was called with."""
+
+    def __init__(self, fail_item=None):
+        self.batches = []
+        self.fail_item = fail_item
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(0)
+        return [ValueError(item) if item == self.fail_item else item * 10 for item in items]
+
+
+class TestMicroBatcher:
+    """Test window closing, fan-out and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_full_window_dispatches_without_waiting_for_deadline(self):
+        backend = RecordingBackend()
+        batcher = MicroBatcher(backend, max_batch_size=3, max_wait=10.0)
+
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(6))), timeout=1.0)
+
+        assert results == [0, 10, 20, 30, 40, 50]
+        assert backend.batches == [[0, 1, 2], [3, 4, 5]]
+        metrics = batcher.get_metrics()
+        assert metrics["size_flushes"] == 2 and metrics["deadline_flushes"] == 0
+        assert metrics["batch_size"]["max"] == 3
+
+    @pytest.mark.asyncio
+    async def test_partial_window_closes_at_deadline(self):
+        backend = RecordingBackend()
+        batcher = MicroBatcher(backend, max_batch_size=10, max_wait=0.02)
+
+        results = await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2)), timeout=1.0)
+
+        assert results == [10, 20]
+        assert backend.batches == [[1, 2]]
+        assert batcher.get_metrics()["deadline_flushes"] == 1
+        assert batcher.get_metrics()["latency_ms"]["max"] >= 20
+        assert batcher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_item_and_batch_failures_reach_callers(self):
+        batcher = MicroBatcher(RecordingBackend(fail_item=2), max_batch_size=2, max_wait=0.01)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert results[0] == 10 and isinstance(results[1], ValueError)
+
+        async def broken(items):
+            raise ConnectionError("backend down")
+
+        failing = MicroBatcher(broken, max_batch_size=2, max_wait=0.01)
+        results = await asyncio.gather(failing.submit(1), failing.submit(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert all(isinstance(result.__cause__, ConnectionError) for result in results)
+        assert results[0] is not results[1]
+        assert failing.get_metrics()["failed_batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_callers_are_left_out_of_the_batch(self):
+        backend = RecordingBackend()
+        batcher = MicroBatcher(backend, max_batch_size=10, max_wait=0.02)
+        abandoned = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+
+        assert await batcher.submit(2) == 20
+        assert backend.batches == [[2]]
+        assert batcher.get_metrics()["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_dispatched_batches(self):
+        async def slow(items):
+            await asyncio.sleep(0.1)
+            return items
+
+        tracker = TaskTracker()
+        batcher = MicroBatcher(slow, max_batch_size=1, max_wait=0.01)
+        with patch("vpa.core.batching.task_tracker", tracker):
+            caller = asyncio.ensure_future(batcher.submit(1))
+            await asyncio.sleep(0)
+            report = await tracker.drain(timeout=2.0)
+
+        assert await asyncio.wait_for(caller, timeout=1.0) == 1
+        assert report.completed == {"request": 1} and report.abandoned == {}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_dispatch_cancels_its_callers(self):
+        started = asyncio.Event()
+
+        async def hang(items):
+            started.set()
+            await asyncio.sleep(10)
+
+        tracker = TaskTracker()
+        batcher = MicroBatcher(hang, max_batch_size=1, max_wait=0.01)
+        with patch("vpa.core.batching.task_tracker", tracker):
+            caller = asyncio.ensure_future(batcher.submit(1))
+            await started.wait()
+            await tracker.drain(timeout=0.01)
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1.0)
+
+
+class TestOptimizerBatching:
+    """Test that concurrent optimizer requests share backend calls."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_backend_calls(self):
+        backend = SimulatedLLMBackend(call_latency=0.001, per_request_latency=0)
+        optimizer = VPAResponseOptimizer(backend=backend, max_batch_size=4, batch_timeout=0.01)
+
+        responses = await asyncio.gather(*(optimizer.optimized_llm_request({"prompt": f"q{i}"}) for i in range(8)))
+
+        assert [response["text"] for response in responses] == [f"Optimized response for: q{i}" for i in range(8)]
+        assert backend.calls == 2
+        stats = optimizer.get_cache_stats()["batching"]
+        assert stats["batches"] == 2 and stats["mean_batch_size"] == 4
@@ -0,0 +1,142 @@
+"""
+Tests for canonical cache key generation.
+"""
+
+import pytest
+import enum
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.cache_keys import make_key, canonical_bytes, benchmark
+from vpa.core.cache_manager import VPACacheManager
+
+
+@dataclass
+class Voice:
+    voice_id: str
+    rate: int
+
+
+class Color(enum.Enum):
+    RED = 1
+    BLUE = 2
+
+
+class Opaque:
+    """repr() omits state, as with most plain classes."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return "Opaque()"
+
+
+class Keyed(Opaque):
+    def __cache_key__(self):
+        return {"value": self.value}
+
+
+class TestCanonicalKeys:
+    """Test determinism and discrimination of the key encoder."""
+
+    def test_dict_and_set_order_do_not_matter(self):
+        assert make_key({"a": 1, "b": [1, 2]}) == make_key({"b": [1, 2], "a": 1})
+        assert make_key({1: "x", "1": "y"}) == make_key({"1": "y", 1: "x"})
+        assert make_key({"z", "a", "m"}) == make_key({"m", "z", "a"})
+        assert make_key(x=1, y=2) == make_key(y=2, x=1)
+
+    def test_types_are_distinguished(self):
+        keys = {make_key(value) for value in (1, 1.0, True, "1", b"1", (1,), [1], None)}
+        assert len(keys) == 8
+        assert make_key({1: "x"}) != make_key({"1": "x"})
+        assert make_key("ab", "c") != make_key("a", "bc")
+        assert make_key(1, x=2) != make_key(1, 2)
+
+    def test_fast_path_keeps_distinctions(self):
+        # Short primitives key by repr(), lists and str-keyed dicts by sorted JSON
+        assert make_key([{"a": 1, "b": 2.5}]) == make_key([{"b": 2.5, "a": 1}])
+        assert make_key({"a": [1]}) != make_key({"a": (1,)})
+        assert make_key({"a": 1}) != make_key({"a": True}) != make_key({"a": "1"})
+        assert make_key(["x"]) != make_key(("x",)) != make_key("x")
+        assert make_key("a", b=None) != make_key("a", None)
+        long_text = "x" * 1000
+        assert make_key(long_text) == make_key("x" * 1000) != make_key(long_text + "x")
+
+    def test_dataclasses_and_enums_use_their_state(self):
+        assert make_key(Voice("v1", 200)) == make_key(Voice("v1", 200))
+        assert make_key(Voice("v1", 200)) != make_key(Voice("v1", 180))
+        assert make_key(Color.RED) != make_key(Color.BLUE)
+        assert make_key(Color.RED) != make_key(1)
+
+    def test_objects_opt_in_with_cache_key(self):
+        assert make_key(Keyed(1)) == make_key(Keyed(1))
+        assert make_key(Keyed(1)) != make_key(Keyed(2))
+        # Without the hook there is no trustworthy state to key on
+        with pytest.raises(TypeError, match="__cache_key__"):
+            make_key(Opaque(1))
+
+    def test_numpy_arrays_encode_dtype_shape_and_data(self):
+        numpy = pytest.importorskip("numpy")
+        array = numpy.arange(6, dtype=numpy.int32).reshape(2, 3)
+
+        assert make_key(array) == make_key(array.copy())
+        assert make_key(array) != make_key(array.reshape(3, 2))
+        assert make_key(array) != make_key(array.astype(numpy.int64))
+        assert make_key(array.T) == make_key(numpy.ascontiguousarray(array.T))
+
+    def test_encoding_is_stable(self):
+        # Keys persist in the disk tier, so the encoding must not drift between runs
+        assert canonical_bytes(("a", 1)) == b"t\x02\x00\x00\x00\x00\x00\x00\x00s\x01\x00\x00\x00\x00\x00\x00\x00ai\x01\x00\x00\x00\x00\x00\x00\x00\x01"
+        assert make_key(10 ** 5000) != make_key(10 ** 5000 + 1)
+
+    def test_cache_manager_uses_canonical_keys(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+
+        assert manager.cache_key({"a": 1, "b": 2}) == make_key({"b": 2, "a": 1})
+
+    def test_decorated_methods_of_unkeyable_objects_run_uncached(self, tmp_path, caplog):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+
+        class Speaker:
+            def __init__(self, name):
+                self.name = name
+
+            @manager.cache_decorator(ttl=60, namespace="llm")
+            def greet(self):
+                return f"hello from {self.name}"
+
+        class KeyedSpeaker(Speaker):
+            def __cache_key__(self):
+                return self.name
+
+            @manager.cache_decorator(ttl=60, namespace="llm")
+            def greet(self):
+                return f"hi from {self.name}"
+
+        # Short-lived instances reuse each other's id(); each must still get its own answer
+        with caplog.at_level("WARNING", logger="vpa.core.cache_manager"):
+            assert Speaker("alice").greet() == "hello from alice"
+            assert Speaker("bob").greet() == "hello from bob"
+        assert manager.get_metrics()["async"]["unkeyable"] == 2
+        # Running uncached is reported once per function, not silently
+        warnings = [record for record in caplog.records if "Not caching" in record.getMessage()]
+        assert len(warnings) == 1 and "Speaker.greet" in warnings[0].getMessage()
+
+        assert KeyedSpeaker("alice").greet() == "hi from alice"
+        assert KeyedSpeaker("bob").greet() == "hi from bob"
+        assert manager.get_metrics()["async"]["unkeyable"] == 2
+        manager.close()
+        # Only the keyed calls reached the persistent tier
+        assert manager.disk_cache.get_metrics()["writes"] == 2
+
+    def test_benchmark_reports_both_encoders(self):
+        results = benchmark(iterations=2)
+
+        assert set(results) == {"small", "nested", "large_bytes", "large_text"}
+        for row in results.values():
+            assert row["canonical_keys_per_second"] > 0
+            assert row["legacy_keys_per_second"] > 0
@@ -0,0 +1,212 @@
+"""
+Tests for the cache access log and startup warmup.
+"""
+
+import pytest
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.access_log import CacheAccessLog
+from vpa.core.cache_manager import VPACacheManager
+from vpa.core.response_optimizer import VPAResponseOptimizer
+from vpa.core.config_service import ConfigService
+from vpa.core.plugins import PluginManager
+
+PLUGIN_SOURCE = """
+from vpa.core.plugins import Plugin
+
+
+class EchoPlugin(Plugin):
+    name = "echo"
+    version = "1.0.0"
+    description = "Echo"
+
+    def can_handle(self, user_input, context):
+        return True
+
+    async def process(self, user_input, context):
+        return {"text": user_input}
+"""
+
+
+class TestCacheAccessLog:
+    """Test sampling, ranking and persistence of the log."""
+
+    def test_sampling_bounds_and_ranking(self, tmp_path):
+        log = CacheAccessLog(str(tmp_path / "log.json"), sample_rate=1.0, max_entries=10)
+        for i in range(20):
+            for _ in range(i):
+                log.record("config", f"k{i}", {"path": f"k{i}"})
+
+        assert len(log.records) <= 10
+        assert [record.key for record in log.top(3)] == ["k19", "k18", "k17"]
+
+        unsampled = CacheAccessLog(str(tmp_path / "none.json"), sample_rate=0.0)
+        unsampled.record("config", "k", {})
+        assert unsampled.records == {}
+        assert unsampled.get_metrics()["accesses"] == 1
+
+    def test_old_accesses_decay(self, tmp_path):
+        log = CacheAccessLog(str(tmp_path / "log.json"), sample_rate=1.0, half_life=3600)
+        for _ in range(4):
+            log.record("llm_prompt", "old", {}, timestamp=time.time() - 3 * 3600)
+        log.record("llm_prompt", "new", {})
+
+        assert [record.key for record in log.top(2)] == ["new", "old"]
+
+    def test_round_trip_and_warmup_hit_ratio(self, tmp_path):
+        path = str(tmp_path / "log.json")
+        log = CacheAccessLog(path, sample_rate=1.0)
+        log.record("plugin", "a.py", {"path": "a.py"})
+        log.save()
+        assert json.loads(Path(path).read_text())["version"] == "1.0"
+
+        restored = CacheAccessLog(path, sample_rate=0.0)
+        assert restored.load()
+        assert restored.top(1)[0].recipe == {"path": "a.py"}
+
+        restored.mark_warmed("plugin", "a.py")
+        restored.mark_warmed("plugin", "b.py")
+        restored.record("plugin", "a.py", {})
+        restored.record("plugin", "a.py", {})
+        assert restored.get_metrics()["warmup_hit_ratio"] == 0.5
+
+    def test_processes_saving_one_file_merge_their_counts(self, tmp_path):
+        path = str(tmp_path / "log.json")
+        first = CacheAccessLog(path, sample_rate=1.0)
+        second = CacheAccessLog(path, sample_rate=1.0)
+        for _ in range(3):
+            first.record("config", "shared", {"path": "shared"})
+        first.record("config", "first_only", {"path": "first_only"})
+        second.record("config", "shared", {"path": "shared"})
+        second.record("plugin", "second_only", {"path": "second_only"})
+
+        first.save()
+        second.save()
+        # Nothing changed since the last save, so saving again adds nothing
+        first.save()
+
+        merged = CacheAccessLog(path)
+        assert merged.load()
+        hits = {record.key: record.hits for record in merged.records.values()}
+        assert hits == {"shared": 4, "first_only": 1, "second_only": 1}
+        # Saves replace the file atomically, leaving no temporary files behind
+        assert sorted(entry.name for entry in tmp_path.iterdir()) == ["log.json", "log.json.lock"]
+
+    def test_snapshot_is_isolated_from_later_accesses(self, tmp_path):
+        path = str(tmp_path / "log.json")
+        log = CacheAccessLog(path, sample_rate=1.0, max_entries=10)
+        log.record("config", "a", {"path": "a"})
+        changes = log.snapshot()
+
+        # Recording and pruning continue while the snapshot is written elsewhere
+        for i in range(50):
+            log.record("config", f"k{i}", {"path": f"k{i}"})
+        log.write(changes)
+
+        restored = CacheAccessLog(path)
+        restored.load()
+        assert list(restored.records) == [("config", "a")]
+
+    def test_unreadable_file_is_replaced(self, tmp_path):
+        path = tmp_path / "log.json"
+        path.write_text('{"version": "1.0", "records": [')
+        log = CacheAccessLog(str(path), sample_rate=1.0)
+        assert not log.load()
+
+        log.record("config", "a", {"path": "a"})
+        log.save()
+        assert json.loads(path.read_text())["records"][0]["key"] == "a"
+
+
+class TestWarmUp:
+    """Test replaying recorded entries through the cache manager."""
+
+    @pytest.mark.asyncio
+    async def test_restart_replays_hot_config_and_prompts(self, tmp_path):
+        config_file = tmp_path / "settings.json"
+        config_file.write_text(json.dumps({"theme": "dark"}))
+        cache_dir = str(tmp_path / "cache")
+
+        before = VPACacheManager(cache_dir=cache_dir, access_sample_rate=1.0)
+        optimizer = VPAResponseOptimizer(access_log=before.access_log, record_prompts=True)
+        before.cached_config_load(str(config_file))
+        await optimizer.optimized_llm_request({"prompt": "Weather today?"})
+        before.close()
+
+        after = VPACacheManager(cache_dir=cache_dir, access_sample_rate=1.0)
+        warm_optimizer = VPAResponseOptimizer(access_log=after.access_log, record_prompts=True)
+        after.register_warmer("llm_prompt", warm_optimizer.warm_request)
+        report = await after.warm_up(top_n=10, pause=0)
+
+        assert report["warmed"] == 2 and report["failed"] == 0
+        assert after._memory_cache.get(str(config_file), namespace="config")[1] == {"theme": "dark"}
+        response = await warm_optimizer.optimized_llm_request({"prompt": "Weather today?"})
+        assert response["cached"] is True
+        assert after.get_metrics()["access_log"]["warmup_hit_ratio"] == 0.5
+        after.close()
+
+    @pytest.mark.asyncio
+    async def test_prompts_are_recorded_only_when_enabled_and_without_conversation(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"), access_sample_rate=1.0)
+        await VPAResponseOptimizer(access_log=manager.access_log).optimized_llm_request({"prompt": "secret"})
+        assert manager.access_log.records == {}
+
+        optimizer = VPAResponseOptimizer(access_log=manager.access_log, record_prompts=True)
+        await optimizer.optimized_llm_request({"prompt": "private", "context": {"turns": ["my address"]}})
+        await optimizer.optimized_llm_request({"prompt": "Weather today?"})
+        manager.close()
+
+        saved = (tmp_path / "cache" / "access_log.json").read_text()
+        assert "Weather today?" in saved
+        assert "secret" not in saved and "private" not in saved and "my address" not in saved
+
+    @pytest.mark.asyncio
+    async def test_config_and_plugin_loads_are_recorded_where_they_happen(self, tmp_path):
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        (config_dir / "ui_settings.json").write_text(json.dumps({"theme": "dark"}))
+        plugin_dir = tmp_path / "plugins"
+        plugin_dir.mkdir()
+        (plugin_dir / "echo.py").write_text(PLUGIN_SOURCE)
+        cache_dir = str(tmp_path / "cache")
+
+        before = VPACacheManager(cache_dir=cache_dir, access_sample_rate=1.0)
+        await ConfigService(config_dir=str(config_dir), access_log=before.access_log).aload()
+        manager = PluginManager(plugin_paths=[str(plugin_dir)], access_log=before.access_log)
+        manager.plugin_cache_file = str(tmp_path / "plugin_cache.json")
+        await manager.discover_plugins(use_cache=False)
+        manager.cleanup_all_plugins()
+        before.close()
+
+        after = VPACacheManager(cache_dir=cache_dir, access_sample_rate=1.0)
+        assert {(record.kind, record.key) for record in after.access_log.top(10)} == {
+            ("config", str(config_dir / "ui_settings.json")),
+            ("plugin", str(plugin_dir / "echo.py"))
+        }
+        report = await after.warm_up(pause=0)
+
+        assert report["warmed"] == 2 and report["failed"] == 0
+        assert after._memory_cache.get(str(plugin_dir / "echo.py"), namespace="plugin")["name"] == "echo"
+        after.close()
+
+    @pytest.mark.asyncio
+    async def test_failing_and_unknown_warmers_do_not_stop_warmup(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"), access_sample_rate=1.0)
+        manager.access_log.record("broken", "a", {})
+        manager.access_log.record("unknown", "b", {})
+        manager.access_log.record("plugin", str(tmp_path / "p.py"), {"path": str(tmp_path / "p.py")})
+
+        def broken(recipe):
+            raise ValueError("cannot recompute")
+
+        manager.register_warmer("broken", broken)
+        report = await manager.warm_up(pause=0)
+
+        assert report["candidates"] == 3
+        assert (report["warmed"], report["failed"], report["skipped"]) == (1, 1, 1)
+        manager.close()
@@ -0,0 +1,149 @@
+"""
+Tests for the configuration snapshot service.
+"""
+
+import pytest
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.config_service import (
+    ConfigService, ConfigSnapshot, ConfigLayer, merge_layers, diff_config
+)
+from vpa.core.events import event_bus
+from vpa.core.cache_manager import VPACacheManager
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    (tmp_path / "default.yaml").write_text("llm:\n  model: small\n  temperature: 0.7\nlogging: info\n")
+    (tmp_path / "audio.yaml").write_text("")
+    (tmp_path / "ui_settings.json").write_text(json.dumps({"appearance": {"theme": "dark"}}))
+    return tmp_path
+
+
+def rewrite(path, content):
+    # Bump mtime explicitly so coarse filesystem timestamps still register a change
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+class TestConfigSnapshot:
+    """Test the immutable merged view."""
+
+    def test_attribute_item_and_path_access(self):
+        snapshot = ConfigSnapshot({"audio": {"voice_speed": 1.0, "devices": [{"name": "mic"}]}}, version=3)
+
+        assert snapshot.audio.voice_speed == 1.0
+        assert snapshot["audio"]["devices"][0].name == "mic"
+        assert snapshot.get_path("audio.voice_speed") == 1.0
+        assert snapshot.get_path("audio.missing.deeper", "fallback") == "fallback"
+        assert snapshot.to_dict() == {"audio": {"voice_speed": 1.0, "devices": [{"name": "mic"}]}}
+
+    def test_snapshot_is_immutable(self):
+        snapshot = ConfigSnapshot({"audio": {"voice_speed": 1.0}})
+
+        with pytest.raises(AttributeError):
+            snapshot.audio = {}
+        with pytest.raises(TypeError):
+            snapshot["audio"] = {}
+
+    def test_merge_and_diff(self):
+        merged = merge_layers([(None, {"a": {"b": 1, "c": 2}}), ("ui", {"theme": "dark"}), (None, {"a": {"c": 3}})])
+        assert merged == {"a": {"b": 1, "c": 3}, "ui": {"theme": "dark"}}
+
+        diff = diff_config(merged, {"a": {"b": 1, "c": 4, "d": 5}})
+        assert diff == {"added": {"a.d": 5}, "removed": {"ui.theme": "dark"},
+                        "changed": {"a.c": {"old": 3, "new": 4}}}
+
+
+class TestConfigService:
+    """Test loading, reloading and watching configuration layers."""
+
+    def test_load_merges_layers_into_sections(self, config_dir):
+        service = ConfigService(config_dir=str(config_dir))
+        snapshot = service.load()
+
+        assert snapshot.version == 1
+        assert snapshot.llm.model == "small"
+        assert snapshot.ui.appearance.theme == "dark"
+        assert service.get("voice.current_voice", "none") == "none"
+
+    def test_reload_swaps_snapshot_and_reports_diff(self, config_dir):
+        service = ConfigService(config_dir=str(config_dir))
+        first = service.load()
+        assert service.reload() is None
+
+        rewrite(config_dir / "default.yaml", "llm:\n  model: large\n  temperature: 0.7\n")
+        change = service.reload()
+
+        assert change["changed"] == {"llm.model": {"old": "small", "new": "large"}}
+        assert change["removed"] == {"logging": "info"}
+        assert service.snapshot.version == 2
+        assert first.llm.model == "small"
+
+    def test_parse_errors_keep_previous_configuration(self, config_dir):
+        service = ConfigService(config_dir=str(config_dir))
+        service.load()
+
+        rewrite(config_dir / "ui_settings.json", "{not json")
+
+        assert service.reload() is None
+        assert service.snapshot.ui.appearance.theme == "dark"
+        assert service.get_metrics()["reload_errors"] == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    async def test_watch_emits_config_changed(self, config_dir, use_inotify):
+        service = ConfigService(config_dir=str(config_dir), poll_interval=0.02, debounce=0.01,
+                                use_inotify=use_inotify)
+        service.load()
+        received = asyncio.Queue()
+
+        async def on_change(event):
+            await received.put(event.data)
+
+        event_bus.subscribe("config_changed", on_change, async_callback=True)
+        watcher = asyncio.create_task(service.watch())
+        try:
+            await asyncio.sleep(0.05)
+            rewrite(config_dir / "audio.yaml", "voice_speed: 1.5\n")
+            change = await asyncio.wait_for(received.get(), timeout=5)
+        finally:
+            watcher.cancel()
+            event_bus.unsubscribe("config_changed", on_change)
+
+        assert change["keys"] == ["audio.voice_speed"]
+        assert service.snapshot.audio.voice_speed == 1.5
+        if not use_inotify:
+            assert service.get_metrics()["watch_mode"] == "polling"
+
+    def test_layer_files_are_served_from_the_snapshot(self, config_dir, tmp_path):
+        service = ConfigService(config_dir=str(config_dir))
+        assert service.layer(config_dir / "ui_settings.json") is None
+        service.load()
+
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        with patch("vpa.core.cache_manager.config_service", service), \
+                patch.object(Path, "stat", side_effect=AssertionError("layer files are not stat()ed")):
+            layer = manager.cached_config_load(str(config_dir / "ui_settings.json"))
+        assert layer.appearance.theme == "dark"
+
+        rewrite(config_dir / "ui_settings.json", json.dumps({"appearance": {"theme": "light"}}))
+        service.reload()
+        with patch("vpa.core.cache_manager.config_service", service):
+            assert manager.cached_config_load(str(config_dir / "ui_settings.json")).appearance.theme == "light"
+
+    def test_custom_layers(self, tmp_path):
+        (tmp_path / "base.json").write_text(json.dumps({"a": 1, "b": {"c": 2}}))
+        (tmp_path / "local.json").write_text(json.dumps({"b": {"c": 3}}))
+        service = ConfigService(config_dir=str(tmp_path),
+                                layers=[ConfigLayer("base.json"), ConfigLayer("local.json")])
+
+        assert service.load().to_dict() == {"a": 1, "b": {"c": 3}}
@@ -0,0 +1,144 @@
+"""
+Tests for the lazy service container and the import-time budget.
+"""
+
+import pytest
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from vpa.core.container import ServiceContainer
+from vpa.core.importtime import profile_imports
+
+# Importing the core package must stay cheap: public names resolve lazily
+IMPORT_BUDGET_MS = 100.0
+
+
+class Component:
+    """Component recording its lifecycle."""
+
+    instances = 0
+
+    def __init__(self):
+        Component.instances += 1
+        self.started = False
+        self.stopped = False
+        self.value = 42
+
+
+class TestServiceContainer:
+    """Test ServiceContainer lazy construction and lifecycle."""
+
+    def setup_method(self):
+        Component.instances = 0
+        self.container = ServiceContainer()
+
+    def test_construction_deferred_until_access(self):
+        proxy = self.container.register("component", Component)
+        assert Component.instances == 0
+        assert not self.container.is_initialized("component")
+
+        assert proxy.value == 42
+        proxy.value = 7
+        assert self.container.get("component").value == 7
+        assert Component.instances == 1
+
+    def test_proxy_forwards_container_protocols(self):
+        proxy = self.container.register("items", lambda: ["a", "b"])
+        empty = self.container.register("empty", list)
+
+        assert proxy and not empty
+        assert len(proxy) == 2
+        assert list(proxy) == ["a", "b"]
+        assert "a" in proxy
+        assert isinstance(self.container.get("items"), list)
+
+    @pytest.mark.asyncio
+    async def test_lifecycle_hooks(self):
+        async def stop(component):
+            component.stopped = True
+
+        self.container.register("component", Component,
+                                on_start=lambda c: setattr(c, "started", True), on_stop=stop)
+        await self.container.start("component")
+        component = self.container.get("component")
+        assert component.started
+
+        await self.container.stop()
+        assert component.stopped
+
+    @pytest.mark.asyncio
+    async def test_stop_skips_unconstructed(self):
+        stopped = []
+        self.container.register("unused", Component, on_stop=lambda c: stopped.append(c))
+        await self.container.stop()
+        assert stopped == []
+        assert Component.instances == 0
+
+    @pytest.mark.asyncio
+    async def test_consumers_stop_before_their_dependencies(self):
+        stopped = []
+        for name in ("bus", "pool", "app", "governor", "cache"):
+            self.container.register(name, Component, on_stop=lambda c, name=name: stopped.append(name),
+                                    depends_on={"app": ("bus", "pool", "governor", "cache"),
+                                                "cache": ("pool",)}.get(name, ()))
+        # Built lazily after the app that uses them
+        for name in ("bus", "pool", "app", "governor", "cache"):
+            self.container.get(name)
+
+        await self.container.stop()
+
+        assert stopped[0] == "app"
+        assert stopped.index("cache") < stopped.index("pool")
+        assert sorted(stopped) == ["app", "bus", "cache", "governor", "pool"]
+
+    def test_dependency_cycle_still_stops_everything(self):
+        self.container.register("a", Component, depends_on=("b",))
+        self.container.register("b", Component, depends_on=("a",))
+        self.container.get("a")
+        self.container.get("b")
+        assert sorted(self.container.stop_order()) == ["a", "b"]
+
+    def test_construction_order_tracked(self):
+        self.container.register("a", Component)
+        self.container.register("b", lambda: self.container.get("a") and Component())
+        self.container.get("b")
+        assert self.container.initialized_services() == ["a", "b"]
+
+    def test_circular_construction_detected(self):
+        self.container.register("a", lambda: self.container.get("b"))
+        self.container.register("b", lambda: self.container.get("a"))
+        with pytest.raises(RuntimeError):
+            self.container.get("a")
+
+
+def test_core_import_time_budget(tmp_path):
+    """`import vpa.core`, as measured by -X importtime, stays under budget and defers its submodules."""
+    profile = profile_imports("vpa.core", extra_path=str(SRC_DIR), cwd=str(tmp_path))
+
+    record = profile.find("vpa.core")
+    assert record is not None
+    assert record.cumulative_us / 1000 < IMPORT_BUDGET_MS, profile.report()
+    assert profile.find("vpa.core.app") is None
+    assert profile.find("vpa.core.container") is None
+
+
+def test_core_imports_construct_nothing(tmp_path):
+    """Importing the core modules builds no services and touches no files."""
+    script = (
+        "import vpa.core.app, vpa.core.events, vpa.core.plugins, vpa.core.cache_manager\n"
+        "import vpa.core.response_optimizer, vpa.core.performance_monitor, audio.voice_system\n"
+        "from vpa.core.container import container\n"
+        "print(','.join(container.initialized_services()))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+    assert result.stdout.strip() == ""
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,172 @@
+"""
+Tests for the persistent disk cache tier.
+"""
+
+import pytest
+import sqlite3
+import time
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.disk_cache import DiskCache
+from vpa.core.cache_manager import VPACacheManager
+from audio.voice_system import AudioSystem
+
+
+def wait_for_flush(cache, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while cache.get_metrics()["pending_writes"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cache.flush()
+
+
+class TestDiskCache:
+    """Test persistence, integrity checks and bounds."""
+
+    def test_entries_survive_reopen(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db")
+        cache.put("llm", "greeting", {"text": "hello"})
+        assert cache.get("llm", "greeting").value == {"text": "hello"}
+        cache.close()
+
+        reopened = DiskCache(tmp_path / "cache.db")
+        hit = reopened.get("llm", "greeting")
+        assert hit.value == {"text": "hello"}
+        assert hit.hits == 1
+        assert reopened.get("tts", "greeting") is None
+        journal = sqlite3.connect(str(tmp_path / "cache.db")).execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal == "wal"
+        reopened.close()
+
+    def test_writes_are_batched_in_background(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db")
+        for i in range(50):
+            cache.put("llm", f"k{i}", i)
+        wait_for_flush(cache)
+
+        metrics = cache.get_metrics()
+        assert metrics["writes"] == 50
+        assert metrics["batches"] < 50
+        cache.close()
+
+    def test_expired_and_corrupt_entries_read_as_misses(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db")
+        cache.put("llm", "stale", "old", ttl=-1)
+        cache.put("llm", "damaged", "value")
+        cache.flush()
+        connection = sqlite3.connect(str(tmp_path / "cache.db"))
+        with connection:
+            connection.execute("UPDATE entries SET value = ? WHERE key = 'damaged'", (b"garbage",))
+        connection.close()
+
+        assert cache.get("llm", "stale") is None
+        assert cache.get("llm", "damaged") is None
+        metrics = cache.get_metrics()
+        assert metrics["expired"] == 1
+        assert metrics["corrupted"] == 1
+        cache.close()
+
+    def test_size_bound_evicts_least_recently_accessed(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db", max_bytes=2000)
+        payload = "x" * 400
+        for i in range(3):
+            cache.put("tts", f"k{i}", payload)
+            cache.flush()
+            time.sleep(0.01)
+        cache.get("tts", "k0")
+        cache.flush()
+        for i in range(3, 6):
+            cache.put("tts", f"k{i}", payload)
+            cache.flush()
+
+        metrics = cache.get_metrics()
+        assert metrics["evictions"] >= 1
+        assert metrics["stored_bytes"] <= 2000
+        assert cache.get("tts", "k0") is not None
+        assert cache.get("tts", "k1") is None
+        cache.close()
+
+    def test_stored_bytes_are_tracked_without_rescanning(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db")
+        with patch.object(DiskCache, "_sum_sizes", wraps=DiskCache._sum_sizes) as sum_sizes:
+            cache.put("tts", "a", "x" * 100)
+            cache.put("tts", "b", "y" * 200)
+            cache.flush()
+            cache.put("tts", "a", "x" * 300)
+            cache.delete("tts", "b")
+            cache.delete("tts", "missing")
+            wait_for_flush(cache)
+
+        actual = cache._connection().execute("SELECT SUM(size) FROM entries").fetchone()[0]
+        assert cache.get_metrics()["stored_bytes"] == actual
+        # The total is summed for the first batch only
+        assert sum_sizes.call_count == 1
+        cache.close()
+
+    def test_compaction_drops_expired_entries(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.db")
+        cache.put("llm", "short", 1, ttl=-1)
+        cache.put("llm", "long", 2, ttl=60)
+
+        assert cache.compact() == {"expired": 1, "evicted": 0}
+        assert cache.get("llm", "long").value == 2
+        cache.close()
+
+
+class TestCacheManagerTiers:
+    """Test the memory and disk tiers together."""
+
+    def test_cold_start_reads_from_disk_and_promotes_hot_entries(self, tmp_path):
+        first = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        first.set("prompt", {"text": "answer"}, namespace="llm", ttl=60)
+        first.set("scratch", 1)
+        first.close()
+
+        restarted = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        assert restarted.get("scratch") is None
+        assert restarted.get("prompt", namespace="llm") == {"text": "answer"}
+        restarted.disk_cache.flush()
+        assert restarted.get_metrics()["memory"]["entries"] == 0
+
+        restarted.get("prompt", namespace="llm")
+        assert restarted.get_metrics()["memory"]["namespaces"]["llm"]["entries"] == 1
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_async_reads_run_on_the_io_pool(self, tmp_path):
+        first = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        first.set("prompt", {"text": "answer"}, namespace="llm", ttl=60)
+        first.close()
+
+        restarted = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        read_threads = []
+        read = restarted.disk_cache.get
+
+        def record_thread(*args):
+            read_threads.append(threading.current_thread().name)
+            return read(*args)
+
+        with patch.object(restarted.disk_cache, "get", side_effect=record_thread):
+            assert await restarted.aget("prompt", namespace="llm") == {"text": "answer"}
+            assert await restarted.aget("missing", namespace="llm", default=0) == 0
+            assert await restarted.aget("scratch") is None
+
+        assert len(read_threads) == 2
+        assert all(name.startswith("vpa-io") for name in read_threads)
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_tts_results_are_reused(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        audio = AudioSystem(synthesis_cache=manager)
+
+        first = await audio.synthesize_speech("Hello there.")
+        second = await audio.synthesize_speech("Hello there.")
+
+        assert first["synthesis_data"] == second["synthesis_data"]
+        assert audio.get_metrics()["synthesis_cache_hits"] == 1
+        manager.close()
@@ -0,0 +1,170 @@
+"""
+Tests for the shared executor service.
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.executors import ExecutorService, PoolConfig, Histogram
+from vpa.core.health import executor_saturation_probe, HealthStatus
+from vpa.core.events import EventBus
+
+
+class TestHistogram:
+    """Test fixed-bucket histograms."""
+
+    def test_percentiles_use_bucket_edges(self):
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 0.5, 5, 50, 500):
+            histogram.observe(value)
+
+        assert histogram.count == 5
+        assert histogram.percentile(40) == 1
+        assert histogram.percentile(60) == 10
+        assert histogram.percentile(100) == 500
+        assert histogram.to_dict()["buckets"] == {"le_1": 2, "le_10": 1, "le_100": 1, "overflow": 1}
+
+
+class TestExecutorService:
+    """Test named pools, instrumentation and adaptive sizing."""
+
+    def setup_method(self):
+        self.service = ExecutorService({
+            "io": PoolConfig("io", workers=1, min_workers=1, max_workers=4, target_wait_ms=5.0,
+                             saturation_wait_ms=10_000, saturation_queue_depth=3),
+            "cpu": PoolConfig("cpu", workers=2, adaptive=False)
+        })
+
+    def teardown_method(self):
+        self.service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_records_wait_and_run_time(self):
+        result = await self.service.run("cpu", sum, [1, 2, 3])
+
+        metrics = self.service.get_metrics()["cpu"]
+        assert result == 6
+        assert metrics["submitted"] == metrics["completed"] == 1
+        assert metrics["wait_ms"]["count"] == 1
+        assert metrics["run_ms"]["count"] == 1
+        assert self.service.pool("cpu") is self.service.pool("cpu")
+
+    def test_unknown_pool_is_rejected(self):
+        with pytest.raises(KeyError):
+            self.service.pool("gpu")
+
+    def test_queueing_delay_grows_pool(self):
+        release = threading.Event()
+        pool = self.service.pool("io")
+        futures = [pool.submit(release.wait) for _ in range(2)]
+        time.sleep(0.02)
+        release.set()
+        for future in futures:
+            future.result(timeout=1)
+
+        result = pool.evaluate()
+
+        assert result["action"] == "grow"
+        assert pool.workers == 2
+        assert pool.get_metrics()["grown"] == 1
+
+    def test_idle_pool_shrinks_after_sustained_idle_windows(self):
+        pool = self.service.pool("io")
+        pool.resize(3)
+        pool.submit(lambda: None).result(timeout=1)
+        idle_windows = pool.config.idle_windows_to_shrink
+
+        # A lull shorter than idle_windows_to_shrink keeps the executor in place
+        executor = pool._executor
+        assert [pool.evaluate()["action"] for _ in range(idle_windows - 1)] == [None] * (idle_windows - 1)
+        assert pool._executor is executor
+
+        assert pool.evaluate()["action"] == "shrink"
+        assert pool.workers == 2
+        for _ in range(idle_windows):
+            pool.evaluate()
+        assert pool.workers == 1
+        assert all(pool.evaluate()["action"] is None for _ in range(idle_windows))
+        assert pool.get_metrics()["shrunk"] == 2
+
+    def test_submit_never_reaches_a_replaced_executor(self):
+        pool = self.service.pool("io")
+        pool.config.saturation_queue_depth = 100_000
+        stop = threading.Event()
+        errors = []
+
+        def churn():
+            while not stop.is_set():
+                pool.resize(4 if pool.workers < 4 else 1)
+
+        def submit_many():
+            for _ in range(2000):
+                try:
+                    pool.submit(int)
+                except RuntimeError as e:
+                    errors.append(e)
+
+        resizer = threading.Thread(target=churn)
+        submitters = [threading.Thread(target=submit_many) for _ in range(4)]
+        resizer.start()
+        for thread in submitters:
+            thread.start()
+        for thread in submitters:
+            thread.join()
+        stop.set()
+        resizer.join()
+        assert errors == []
+
+    def test_resize_takes_effect_while_busy(self):
+        pool = self.service.pool("io")
+        release = threading.Event()
+        running = pool.submit(release.wait, 1)
+
+        # Three items that only finish together need three threads
+        barrier = threading.Barrier(3)
+        pool.resize(3)
+        together = [pool.submit(barrier.wait, 1) for _ in range(3)]
+        for future in together:
+            future.result(timeout=2)
+        assert pool.get_load()["threads"] == 3
+
+        # Work submitted before the resize still finishes
+        release.set()
+        assert running.result(timeout=1) is True
+        assert pool.get_metrics()["completed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_saturation_alert_and_probe(self):
+        bus = EventBus(executor=self.service.pool("cpu"))
+        alerts = []
+        self.service._alert = lambda name, data: alerts.append((name, data["pool"]))
+        pool = self.service.pool("io")
+        pool._on_alert = self.service._alert
+
+        release = threading.Event()
+        futures = [pool.submit(release.wait) for _ in range(4)]
+        probe_status = (await executor_saturation_probe(self.service).check())[0]
+        release.set()
+        for future in futures:
+            future.result(timeout=1)
+        pool.evaluate()
+
+        assert alerts == [("executor_saturated", "io"), ("executor_recovered", "io")]
+        assert probe_status == HealthStatus.WARN
+        assert pool.get_metrics()["saturation_events"] == 1
+        bus.cleanup()
+
+    def test_shrink_releases_idle_threads(self):
+        pool = self.service.pool("cpu")
+        pool.submit(lambda: None).result(timeout=1)
+
+        assert pool.get_load()["threads"] == 1
+        assert self.service.shrink() == 1
+        assert pool.get_load()["threads"] == 0
+        assert pool.submit(lambda: 42).result(timeout=1) == 42
@@ -0,0 +1,136 @@
+"""
+Tests for soft/hard TTLs, stale-while-revalidate and refresh-ahead.
+"""
+
+import pytest
+import asyncio
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.freshness import (
+    FreshnessPolicy, StampedValue, BackgroundRefresher, FRESH, REFRESH_AHEAD, STALE, EXPIRED
+)
+from vpa.core.cache_manager import VPACacheManager
+from vpa.core.response_optimizer import VPAResponseOptimizer, ResponseCache
+
+
+class TestFreshnessPolicy:
+    """Test classification of stamped values."""
+
+    def test_states_follow_soft_and_hard_ttl(self):
+        policy = FreshnessPolicy(ttl=100, stale_while_revalidate=50, refresh_ahead=0.2, hot_access_rate=0.1)
+        stamped = StampedValue.stamp("v", policy, now=0.0)
+
+        assert stamped.state(policy, now=10) == FRESH
+        assert stamped.state(policy, now=90) == FRESH
+        stamped.accesses = 20
+        assert stamped.state(policy, now=90) == REFRESH_AHEAD
+        assert stamped.state(policy, now=120) == STALE
+        assert stamped.state(policy, now=150) == EXPIRED
+
+    @pytest.mark.asyncio
+    async def test_refresher_bounds_concurrency_and_dedupes_keys(self):
+        refresher = BackgroundRefresher(max_concurrent=2)
+        release = asyncio.Event()
+
+        async def refresh():
+            await release.wait()
+
+        assert refresher.schedule("a", refresh)
+        assert not refresher.schedule("a", refresh)
+        assert refresher.schedule("b", refresh)
+        assert not refresher.schedule("c", refresh)
+
+        release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        metrics = refresher.get_metrics()
+        assert metrics["shed"] == 1
+        assert metrics["completed"] == 2
+        assert metrics["inflight"] == 0
+
+
+class TestStaleWhileRevalidate:
+    """Test the cache manager decorators and the response optimizer."""
+
+    @pytest.mark.asyncio
+    async def test_async_decorator_serves_stale_while_refreshing(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        version = [0]
+
+        @manager.async_cache_decorator(ttl=0.05, stale_while_revalidate=60)
+        async def fetch():
+            version[0] += 1
+            await asyncio.sleep(0.01)
+            return version[0]
+
+        assert await fetch() == 1
+        await asyncio.sleep(0.06)
+
+        assert await fetch() == 1
+        await asyncio.sleep(0.05)
+        assert await fetch() == 2
+        metrics = manager.get_metrics()
+        assert metrics["async"]["stale_hits"] == 1
+        assert metrics["refresh"]["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hot_keys_refresh_ahead_of_expiry(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator(ttl=0.2, refresh_ahead=0.5)
+        async def fetch():
+            calls.append(time.monotonic())
+            return len(calls)
+
+        await fetch()
+        for _ in range(5):
+            await fetch()
+        await asyncio.sleep(0.12)
+        assert await fetch() == 1
+        await asyncio.sleep(0.01)
+
+        assert len(calls) == 2
+        assert manager.get_metrics()["async"]["refresh_ahead"] == 1
+
+    def test_sync_decorator_refreshes_on_the_io_pool(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        version = [0]
+
+        @manager.cache_decorator(ttl=0.05, stale_while_revalidate=60)
+        def lookup():
+            version[0] += 1
+            return version[0]
+
+        assert lookup() == 1
+        time.sleep(0.06)
+        assert lookup() == 1
+
+        deadline = time.monotonic() + 2
+        while manager.get_metrics()["refresh"]["completed"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert lookup() == 2
+
+    @pytest.mark.asyncio
+    async def test_response_optimizer_serves_stale_responses(self):
+        optimizer = VPAResponseOptimizer(cache_ttl=60, stale_while_revalidate=60, batch_timeout=0.001)
+        request = {"prompt": "hello"}
+        key = optimizer.cache_key_for_request(request)
+        optimizer._response_cache[key] = ResponseCache({"text": "old"}, time.time() - 90)
+
+        result = await optimizer.optimized_llm_request(request)
+        assert result["stale"] is True
+        assert result["response"] == {"text": "old"}
+
+        await asyncio.sleep(0.05)
+        fresh = await optimizer.optimized_llm_request(request)
+        assert fresh["stale"] is False
+        assert fresh["response"]["text"] == "Optimized response for: hello"
+        assert optimizer.get_cache_stats()["stale_hits"] == 1
+
+        optimizer._response_cache[key] = ResponseCache({"text": "ancient"}, time.time() - 200)
+        assert "cached" not in await optimizer.optimized_llm_request(request)
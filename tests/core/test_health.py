@@ -0,0 +1,221 @@
+"""
+Tests for the health probe registry and endpoints.
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import time
+import sys
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.health import (
+    HealthRegistry, HealthProbe, HealthStatus, HealthServer,
+    event_loop_lag_probe, executor_saturation_probe, plugin_errors_probe,
+    audio_backend_probe, disk_space_probe
+)
+from vpa.core.executors import ExecutorService
+from vpa.core.plugins import PluginManager
+from audio.voice_system import AudioSystem
+
+
+def static_probe(name, status, **kwargs):
+    async def check():
+        return status, name, {}
+    return HealthProbe(name, check, **kwargs)
+
+
+async def http_get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+class TestHealthRegistry:
+    """Test concurrent, deadlined and cached probe runs."""
+
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently(self):
+        registry = HealthRegistry()
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return HealthStatus.PASS, "slow", {}
+
+        for i in range(5):
+            registry.register(HealthProbe(f"slow{i}", slow))
+
+        started = time.perf_counter()
+        report = await registry.run()
+
+        assert time.perf_counter() - started < 0.3
+        assert report.status == HealthStatus.PASS
+        assert len(report.probes) == 5
+
+    @pytest.mark.asyncio
+    async def test_deadline_fails_probe(self):
+        registry = HealthRegistry()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        registry.register(HealthProbe("hang", hang, timeout=0.05))
+        report = await registry.run()
+
+        assert report.status == HealthStatus.FAIL
+        assert "timed out" in report.probes["hang"].detail
+        assert registry.get_metrics()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_and_shared(self):
+        registry = HealthRegistry()
+        calls = []
+
+        async def counted():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return HealthStatus.PASS, "ok", {}
+
+        registry.register(HealthProbe("counted", counted, cache_ttl=60))
+        await asyncio.gather(registry.run(), registry.run(), registry.run())
+        await registry.run()
+        await registry.run(force=True)
+
+        assert len(calls) == 2
+        assert registry.get_metrics()["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_critical_failure_only_warns(self):
+        registry = HealthRegistry()
+        registry.register(static_probe("ok", HealthStatus.PASS))
+        registry.register(static_probe("optional", HealthStatus.FAIL, critical=False))
+
+        report = await registry.run()
+
+        assert report.status == HealthStatus.WARN
+        assert report.ok
+
+    @pytest.mark.asyncio
+    async def test_sync_probe_and_errors(self):
+        registry = HealthRegistry()
+
+        def broken():
+            raise RuntimeError("disk gone")
+
+        registry.register(HealthProbe("broken", broken))
+        report = await registry.run()
+
+        assert report.probes["broken"].status == HealthStatus.FAIL
+        assert "disk gone" in report.probes["broken"].detail
+
+
+class TestBuiltinProbes:
+    """Test the built-in component probes."""
+
+    @pytest.mark.asyncio
+    async def test_component_probes_pass_when_idle(self, tmp_path):
+        manager = PluginManager()
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+        executors = ExecutorService()
+        registry = HealthRegistry()
+        for probe in (event_loop_lag_probe(), executor_saturation_probe(executors),
+                      plugin_errors_probe(manager), audio_backend_probe(AudioSystem()),
+                      disk_space_probe([str(tmp_path / "logs")], warn_free_mb=0, fail_free_mb=0)):
+            registry.register(probe)
+
+        report = await registry.run()
+
+        assert {name: r.status for name, r in report.probes.items()} == {
+            name: HealthStatus.PASS for name in registry.probe_names
+        }
+        executors.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag_measures_timer_drift(self):
+        probe = event_loop_lag_probe(warn_ms=20, fail_ms=1000, interval=0.01)
+        loop = asyncio.get_running_loop()
+        # A callback hogging the loop after the timer was armed delays it
+        loop.call_soon(lambda: loop.call_soon(time.sleep, 0.06))
+
+        status, _, data = await probe.check()
+
+        assert status == HealthStatus.WARN
+        assert data["lag_ms"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_plugin_errors_degrade(self, tmp_path):
+        manager = PluginManager()
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+        for _ in range(3):
+            manager.record_plugin_error("weather", RuntimeError("api down"))
+
+        registry = HealthRegistry()
+        registry.register(plugin_errors_probe(manager, fail_count=3))
+        report = await registry.run()
+
+        assert report.probes["plugin_errors"].status == HealthStatus.FAIL
+        assert report.status == HealthStatus.WARN
+
+    @pytest.mark.asyncio
+    async def test_disk_space_fails_below_threshold(self, tmp_path):
+        registry = HealthRegistry()
+        registry.register(disk_space_probe([str(tmp_path)], warn_free_mb=1e12, fail_free_mb=1e12))
+
+        report = await registry.run()
+
+        assert report.probes["disk_space"].status == HealthStatus.FAIL
+
+
+class TestHealthServer:
+    """Test /livez and /readyz endpoints."""
+
+    @pytest_asyncio.fixture
+    async def endpoint(self):
+        registry = HealthRegistry()
+        registry.register(event_loop_lag_probe())
+        server = HealthServer(registry, port=0)
+        await server.start()
+        yield server, registry
+        await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_live_and_ready(self, endpoint):
+        server, registry = endpoint
+
+        status, body = await http_get(server.port, "/livez")
+        assert status == 200
+        assert body["probes"]["event_loop_lag"]["status"] == "pass"
+
+        registry.register(static_probe("startup_phase", HealthStatus.FAIL, cache_ttl=0))
+        status, body = await http_get(server.port, "/readyz")
+        assert status == 503
+        assert body["status"] == "fail"
+
+        status, _ = await http_get(server.port, "/livez")
+        assert status == 200
+
+    @pytest.mark.asyncio
+    async def test_unknown_path(self, endpoint):
+        server, _ = endpoint
+        status, _ = await http_get(server.port, "/nope")
+        assert status == 404
+
+    def test_importing_health_leaves_the_request_stack_unloaded(self):
+        src = Path(__file__).parent.parent.parent / "src"
+        script = (
+            f"import sys; sys.path.insert(0, {str(src)!r}); "
+            "import vpa.core.health; "
+            "print(sorted(m for m in ('vpa.core.server', 'vpa.core.plugins', 'vpa.core.admission') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "[]"
@@ -0,0 +1,106 @@
+"""
+Tests for the import-time profiler and lazy import helpers.
+"""
+
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from vpa.core.importtime import parse_importtime, profile_imports
+from vpa.core.lazy_import import lazy_module, lazy_attributes, optional_module, require_module
+
+SAMPLE_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |       _leaf
+import time:       200 |        300 |     child_a
+import time:        50 |         50 |     child_b
+import time:      1000 |       1350 |   parent
+import time:        10 |       1360 | root
+import time:         5 |          5 | other_root
+"""
+
+
+class TestImportTimeParser:
+    """Test -X importtime parsing."""
+
+    def test_builds_tree_from_post_order_output(self):
+        profile = parse_importtime(SAMPLE_OUTPUT)
+
+        assert [root.module for root in profile.roots] == ["root", "other_root"]
+        parent = profile.roots[0].children[0]
+        assert parent.module == "parent"
+        assert [child.module for child in parent.children] == ["child_a", "child_b"]
+        assert parent.children[0].children[0].module == "_leaf"
+        assert profile.total_us == 1365
+
+    def test_slowest_and_report(self):
+        profile = parse_importtime(SAMPLE_OUTPUT)
+
+        assert profile.slowest(1)[0].module == "parent"
+        report = profile.report(min_cumulative_us=100)
+        assert "child_a" in report
+        assert "child_b" not in report
+
+    def test_profile_real_import(self):
+        profile = profile_imports("vpa.core.container", extra_path=str(SRC_DIR))
+        record = profile.find("vpa.core.container")
+        assert record is not None
+        assert record.cumulative_us > 0
+
+
+class TestLazyImports:
+    """Test lazy module and package attribute loading."""
+
+    def test_lazy_package_attributes(self):
+        import vpa.core
+
+        assert "EventBus" in dir(vpa.core)
+        from vpa.core import ServiceRegistry
+        from vpa.core.services import ServiceRegistry as direct
+        assert ServiceRegistry is direct
+
+        with pytest.raises(AttributeError):
+            vpa.core.does_not_exist
+
+    def test_lazy_module_defers_execution(self, tmp_path, monkeypatch):
+        (tmp_path / "lazy_probe_state.py").write_text("executions = 0\n")
+        (tmp_path / "lazy_probe_module.py").write_text(
+            "import lazy_probe_state\nlazy_probe_state.executions += 1\nLOADED = True\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "lazy_probe_module", raising=False)
+        monkeypatch.delitem(sys.modules, "lazy_probe_state", raising=False)
+        import lazy_probe_state
+
+        module = lazy_module("lazy_probe_module")
+        assert lazy_probe_state.executions == 0
+        assert module.LOADED is True
+        assert lazy_probe_state.executions == 1
+        module.LOADED
+        assert lazy_probe_state.executions == 1
+
+    def test_package_attributes_never_shadow_submodules(self):
+        # The outcome must not depend on which import runs first
+        script = (
+            f"import sys; sys.path.insert(0, {str(SRC_DIR)!r})\n"
+            "import types, vpa.core{first}\n"
+            "import vpa.core.cache_manager, vpa.core.app\n"
+            "assert isinstance(vpa.core.cache_manager, types.ModuleType)\n"
+            "assert isinstance(vpa.core.app, types.ModuleType)\n"
+        )
+        for first in ("", "; getattr(vpa.core, 'cache_manager', None); getattr(vpa.core, 'app', None)",
+                      "; vpa.core.VPACacheManager; vpa.core.VPAApplication"):
+            subprocess.run([sys.executable, "-c", script.format(first=first)], check=True)
+
+        with pytest.raises(ValueError, match="shadow"):
+            lazy_attributes(("app", ["VPAApplication", "app"]))
+
+    def test_optional_module_missing(self):
+        missing = optional_module("vpa_definitely_missing_module")
+        assert missing is None
+        with pytest.raises(ImportError):
+            require_module(missing, "vpa_definitely_missing_module", "testing")
@@ -0,0 +1,272 @@
+"""
+Tests for the bounded memory cache tier and the cache manager built on it.
+"""
+
+import pytest
+import json
+import asyncio
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.memory_cache import BoundedMemoryCache, EvictionPolicy, estimate_size
+from vpa.core.cache_manager import VPACacheManager
+from vpa.core.tasks import TaskTracker
+
+
+def fill(cache, keys, namespace="default", size=100):
+    for key in keys:
+        cache.set(key, key, namespace=namespace, size=size)
+
+
+class TestBoundedMemoryCache:
+    """Test byte budgets, eviction policies and quotas."""
+
+    def test_estimate_size_counts_nested_values(self):
+        flat = estimate_size("x" * 1000)
+        nested = estimate_size({"a": ["x" * 1000, "y" * 1000]})
+
+        assert flat >= 1000
+        assert nested > 2000
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = BoundedMemoryCache(max_bytes=300, policy=EvictionPolicy.LRU, namespace_quotas={})
+        fill(cache, ["a", "b", "c"])
+        cache.get("a")
+        fill(cache, ["d"])
+
+        assert "b" not in cache
+        assert all(key in cache for key in ("a", "c", "d"))
+        assert cache.resident_bytes == 300
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = BoundedMemoryCache(max_bytes=300, policy="lfu", namespace_quotas={})
+        fill(cache, ["a", "b", "c"])
+        for _ in range(3):
+            cache.get("a")
+            cache.get("c")
+        fill(cache, ["d"])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "a" and cache.get("c") == "c"
+
+    def test_tinylfu_keeps_hot_entries_through_a_scan(self):
+        cache = BoundedMemoryCache(max_bytes=10_000, policy=EvictionPolicy.TINY_LFU, namespace_quotas={})
+        hot = [f"hot{i}" for i in range(20)]
+        fill(cache, hot)
+        for _ in range(5):
+            for key in hot:
+                cache.get(key)
+
+        # A one-off scan far larger than the cache
+        fill(cache, [f"scan{i}" for i in range(500)])
+
+        assert sum(1 for key in hot if key in cache) >= 18
+        assert cache.resident_bytes <= 10_000
+
+    def test_namespace_quota_bounds_one_namespace(self):
+        cache = BoundedMemoryCache(max_bytes=10_000, policy="lru", namespace_quotas={"config": 200})
+        fill(cache, ["a", "b", "c"], namespace="config")
+        fill(cache, ["x", "y", "z"], namespace="llm")
+
+        metrics = cache.get_metrics()
+        assert metrics["namespaces"]["config"]["resident_bytes"] == 200
+        assert metrics["namespaces"]["config"]["evictions"] == 1
+        assert metrics["namespaces"]["llm"]["entries"] == 3
+        assert cache.get("a", namespace="llm") is None
+
+    def test_oversized_values_are_rejected(self):
+        cache = BoundedMemoryCache(max_bytes=100, policy="lru", namespace_quotas={})
+
+        assert cache.set("big", "x", size=500) is False
+        assert cache.get_metrics()["rejections"] == 1
+        assert len(cache) == 0
+
+    def test_ttl_and_metrics(self):
+        cache = BoundedMemoryCache(policy="lru")
+        cache.set("fresh", 1)
+        cache.set("stale", 2, ttl=-1)
+
+        assert cache.get("fresh") == 1
+        assert cache.get("stale") is None
+        metrics = cache.get_metrics()
+        assert metrics["hits"] == 1 and metrics["misses"] == 1
+        assert metrics["hit_ratio"] == 0.5
+        assert metrics["expirations"] == 1
+
+
+class TestCacheManagerMemoryTier:
+    """Test the cache manager's use of the bounded tier."""
+
+    def test_config_reload_replaces_previous_entry(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        config = tmp_path / "settings.json"
+        for version in range(5):
+            config.write_text(json.dumps({"version": version}))
+            os.utime(config, (version, version))
+            assert manager.cached_config_load(str(config)) == {"version": version}
+
+        assert manager.cached_config_load(str(config)) == {"version": 4}
+        memory = manager.get_metrics()["memory"]
+        assert memory["namespaces"]["config"]["entries"] == 1
+        assert memory["namespaces"]["config"]["hits"] >= 1
+
+    def test_cache_decorator_respects_ttl(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.cache_decorator(ttl=300)
+        def lookup(value):
+            calls.append(value)
+            return value * 2
+
+        @manager.cache_decorator(ttl=-1)
+        def uncached(value):
+            calls.append(value)
+            return value
+
+        assert lookup(2) == lookup(2) == 4
+        uncached(1)
+        uncached(1)
+        assert calls == [2, 1, 1]
+
+
+class TestAsyncCacheDecorator:
+    """Test caching of coroutine results and single-flight misses."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.cache_decorator(ttl=300)
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        results = await asyncio.gather(*(fetch(3) for _ in range(10)))
+
+        assert results == [6] * 10
+        assert await fetch(3) == 6
+        assert calls == [3]
+        metrics = manager.get_metrics()["async"]
+        assert metrics["async_misses"] == 1
+        assert metrics["coalesced"] == 9
+        assert metrics["async_hits"] == 1
+        assert metrics["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_reach_every_waiter_and_are_not_cached(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator()
+        async def flaky():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            if len(calls) == 1:
+                raise RuntimeError("backend down")
+            return "ok"
+
+        results = await asyncio.gather(flaky(), flaky(), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await flaky() == "ok"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_bypass_and_ttl_override(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator(ttl=300)
+        async def lookup(value):
+            calls.append(value)
+            return value
+
+        await lookup(1, cache_ttl=-1)
+        await lookup(1)
+        await lookup(1)
+        await lookup(1, cache_bypass=True)
+
+        assert calls == [1, 1, 1]
+        assert manager.get_metrics()["async"]["bypassed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_first_caller_does_not_cancel_coalesced_callers(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator(ttl=300)
+        async def slow(value):
+            calls.append(value)
+            await asyncio.sleep(0.02)
+            return value * 10
+
+        first = asyncio.ensure_future(slow(1))
+        second = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 10
+        assert first.cancelled()
+        assert await slow(1) == 10
+        assert calls == [1]
+        assert manager.get_metrics()["async"]["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drain_waits_for_cache_fills(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+
+        @manager.async_cache_decorator(ttl=300)
+        async def slow(value):
+            await asyncio.sleep(0.05)
+            return value * 10
+
+        tracker = TaskTracker()
+        with patch("vpa.core.cache_manager.task_tracker", tracker):
+            caller = asyncio.ensure_future(slow(1))
+            await asyncio.sleep(0)
+            report = await tracker.drain(timeout=2.0)
+
+        assert await caller == 10
+        assert report.abandoned == {}
+
+    @pytest.mark.asyncio
+    async def test_bypass_ignores_cached_results_and_is_not_forwarded(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator(ttl=300)
+        async def lookup(value, **kwargs):
+            calls.append(kwargs)
+            return len(calls)
+
+        assert await lookup(1) == 1
+        assert await lookup(1, cache_bypass=True) == 2
+        # The bypassed result was not stored over the cached one
+        assert await lookup(1) == 1
+        assert calls == [{}, {}]
+
+    @pytest.mark.asyncio
+    async def test_cache_ttl_sets_freshness_of_the_stored_result(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"))
+        calls = []
+
+        @manager.async_cache_decorator(ttl=300)
+        async def lookup(value, **kwargs):
+            calls.append(kwargs)
+            return len(calls)
+
+        assert await lookup("short", cache_ttl=0.02) == 1
+        assert await lookup("short") == 1
+        await asyncio.sleep(0.05)
+        assert await lookup("short") == 2
+        # Recomputed with the decorator's ttl, so it stays fresh
+        await asyncio.sleep(0.05)
+        assert await lookup("short") == 2
+        assert calls == [{}, {}]
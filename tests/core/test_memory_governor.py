@@ -0,0 +1,145 @@
+"""
+Tests for the memory governor and cache trimming hooks.
+"""
+
+import pytest
+import asyncio
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.memory_governor import (
+    MemoryGovernor, MemoryThresholds, MemoryPressure, read_rss_bytes
+)
+from vpa.core.cache_manager import VPACacheManager
+from vpa.core.response_optimizer import VPAResponseOptimizer, ResponseCache
+from vpa.core.plugin_cache import PluginResultCache, PluginCachePolicy
+
+
+def always_under_pressure():
+    return MemoryThresholds(moderate_mb=0, high_mb=1e9, critical_mb=1e9)
+
+
+class TestMemoryGovernor:
+    """Test sampling, pressure levels and ordered reclaim."""
+
+    def test_pressure_levels(self):
+        thresholds = MemoryThresholds(moderate_mb=100, high_mb=200, critical_mb=300)
+
+        assert thresholds.level_for(50) == MemoryPressure.NONE
+        assert thresholds.level_for(150) == MemoryPressure.MODERATE
+        assert thresholds.level_for(250) == MemoryPressure.HIGH
+        assert thresholds.level_for(350) == MemoryPressure.CRITICAL
+
+    def test_sample_reads_rss(self):
+        governor = MemoryGovernor()
+
+        assert governor.sample() > 1
+        assert read_rss_bytes() > 1024 * 1024
+        assert governor.pressure == MemoryPressure.NONE
+
+    def test_steps_run_in_order_by_level(self):
+        governor = MemoryGovernor(always_under_pressure())
+        calls = []
+        governor.register_step("first", lambda level: calls.append("first") or 1)
+        governor.register_step("high_only", lambda level: calls.append("high_only"), MemoryPressure.HIGH)
+        governor.register_step("last", lambda level: calls.append("last") or 2)
+
+        report = governor.reclaim(MemoryPressure.MODERATE)
+
+        assert calls == ["first", "last"]
+        assert [step.name for step in report.steps] == ["first", "last"]
+        assert report.steps[1].items == 2
+
+        calls.clear()
+        governor.reclaim(MemoryPressure.HIGH)
+        assert calls == ["first", "high_only", "last"]
+
+    def test_reports_bytes_freed_per_step(self):
+        governor = MemoryGovernor(always_under_pressure())
+        held = [b"x" * (64 * 1024 * 1024)]
+        governor.register_step("release_blob", lambda level: held.clear() or 1)
+
+        report = governor.reclaim(MemoryPressure.MODERATE)
+
+        assert report.steps[0].freed_bytes > 32 * 1024 * 1024
+        assert governor.get_metrics()["total_freed_bytes"] == report.freed_bytes
+
+    def test_stops_once_below_moderate_threshold(self):
+        governor = MemoryGovernor(MemoryThresholds(moderate_mb=1e9, high_mb=1e9, critical_mb=1e9))
+        calls = []
+        governor.register_step("first", lambda level: calls.append("first"))
+        governor.register_step("second", lambda level: calls.append("second"))
+
+        governor.reclaim(MemoryPressure.HIGH)
+
+        assert calls == ["first"]
+
+    def test_failing_step_is_reported(self):
+        governor = MemoryGovernor(always_under_pressure())
+
+        def broken(level):
+            raise RuntimeError("boom")
+
+        governor.register_step("broken", broken)
+        governor.register_step("after", lambda level: 0)
+
+        report = governor.reclaim(MemoryPressure.MODERATE)
+
+        assert report.steps[0].error == "boom"
+        assert len(report.steps) == 2
+
+    def test_check_respects_cooldown(self):
+        governor = MemoryGovernor(always_under_pressure(), reclaim_cooldown=60)
+        governor.register_default_steps()
+
+        first = governor.check()
+        second = governor.check()
+
+        assert first is not None
+        assert [step.name for step in first.steps] == ["trim_caches", "unload_idle_plugins", "garbage_collect"]
+        assert second is None
+        assert governor.get_metrics()["pressure"] == "moderate"
+
+    @pytest.mark.asyncio
+    async def test_background_loop(self):
+        governor = MemoryGovernor(sample_interval=0.01)
+        governor.start()
+        await asyncio.sleep(0.05)
+        await governor.stop()
+
+        assert governor.get_metrics()["samples"] >= 2
+
+
+class TestCacheTrimming:
+    """Test the reclaim hooks on each cache tier."""
+
+    def test_cache_manager_drops_oldest(self, tmp_path):
+        manager = VPACacheManager(cache_dir=str(tmp_path / "cache"), eviction_policy="lru")
+        for i in range(10):
+            manager._memory_cache.set(f"k{i}", i)
+
+        assert manager.trim_memory_cache(0.3) == 7
+        assert [key for key in (f"k{i}" for i in range(10)) if key in manager._memory_cache] == ["k7", "k8", "k9"]
+
+    def test_response_optimizer_keeps_most_hit(self):
+        optimizer = VPAResponseOptimizer()
+        now = time.time()
+        for i in range(4):
+            optimizer._response_cache[f"r{i}"] = ResponseCache(f"response {i}", now, hit_count=i)
+
+        assert optimizer.trim_cache(0.5) == 2
+        assert sorted(optimizer._response_cache) == ["r2", "r3"]
+
+    @pytest.mark.asyncio
+    async def test_plugin_result_cache_trims_lru(self):
+        cache = PluginResultCache()
+        policy = PluginCachePolicy(ttl=60)
+        for i in range(4):
+            await cache.get_or_compute("p", f"input {i}", {}, policy, lambda i=i: asyncio.sleep(0, {"i": i}))
+
+        assert cache.trim(0.25) == 3
+        assert cache.get_metrics()["entries"] == 1
+        assert cache.get_metrics()["plugins"]["p"]["evictions"] == 3
@@ -0,0 +1,237 @@
+"""
+Tests for declarative plugin result caching in PluginManager.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.plugins import PluginManager, Plugin
+from vpa.core.plugin_cache import PluginCachePolicy
+from vpa.core.tasks import TaskTracker
+
+
+class CountingPlugin(Plugin):
+    """Plugin that counts process() calls."""
+
+    def __init__(self, policy=None, delay=0.0):
+        self.calls = 0
+        self._policy = policy
+        self._delay = delay
+
+    @property
+    def name(self):
+        return "counting"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    @property
+    def description(self):
+        return "Counting plugin"
+
+    @property
+    def cache_policy(self):
+        return self._policy
+
+    def can_handle(self, user_input, context):
+        return True
+
+    async def process(self, user_input, context):
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return {"response": f"call {self.calls}", "city": context.get("city")}
+
+
+class TestPluginResultCache:
+    """Test PluginManager.process memoization."""
+
+    @pytest.fixture(autouse=True)
+    def _manager(self, tmp_path):
+        self.plugin_manager = PluginManager()
+        self.plugin_manager.usage_profile.profile_file = str(tmp_path / "plugin_usage.json")
+
+    def teardown_method(self):
+        self.plugin_manager.cleanup_all_plugins()
+
+    @pytest.mark.asyncio
+    async def test_uncached_plugin_always_processes(self):
+        plugin = CountingPlugin()
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        await self.plugin_manager.process("counting", "weather", {})
+        await self.plugin_manager.process("counting", "weather", {})
+        assert plugin.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_normalized_input_and_context_keys(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60, context_keys=("city",)))
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        first = await self.plugin_manager.process("counting", "Weather  today", {"city": "Paris", "noise": 1})
+        second = await self.plugin_manager.process("counting", "weather today", {"city": "Paris", "noise": 2})
+        third = await self.plugin_manager.process("counting", "weather today", {"city": "Rome"})
+
+        assert first == second
+        assert third["city"] == "Rome"
+        assert plugin.calls == 2
+        stats = self.plugin_manager.get_cache_metrics()["plugins"]["counting"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_single_flight(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.05)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        results = await asyncio.gather(*[
+            self.plugin_manager.process("counting", "search cats", {}) for _ in range(5)
+        ])
+
+        assert plugin.calls == 1
+        assert all(result == results[0] for result in results)
+        assert self.plugin_manager.get_cache_metrics()["plugins"]["counting"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_flight_is_recorded_once(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.05)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        async def fail(user_input, context):
+            plugin.calls += 1
+            await asyncio.sleep(0.05)
+            raise RuntimeError("backend down")
+
+        plugin.process = fail
+        results = await asyncio.gather(*[
+            self.plugin_manager.process("counting", "search cats", {}) for _ in range(5)
+        ], return_exceptions=True)
+
+        assert plugin.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert self.plugin_manager._metrics["plugin_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_callers_get_their_own_copy(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.01)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        coalesced = await asyncio.gather(*[
+            self.plugin_manager.process("counting", "search", {}) for _ in range(2)
+        ])
+        coalesced[0]["served_by"] = "server"
+        hit = await self.plugin_manager.process("counting", "search", {})
+        hit["response"] = "edited"
+
+        assert "served_by" not in coalesced[1]
+        assert await self.plugin_manager.process("counting", "search", {}) == {"response": "call 1", "city": None}
+        assert plugin.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=0.01, stale_while_revalidate=60))
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        first = await self.plugin_manager.process("counting", "calendar", {})
+        await asyncio.sleep(0.02)
+        stale = await self.plugin_manager.process("counting", "calendar", {})
+        assert stale == first
+
+        await asyncio.sleep(0.01)
+        assert plugin.calls == 2
+        fresh = await self.plugin_manager.process("counting", "calendar", {})
+        assert fresh["response"] == "call 2"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_stale_hits_start_one_refresh(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=0.01, stale_while_revalidate=60), delay=0.01)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        first = await self.plugin_manager.process("counting", "calendar", {})
+        await asyncio.sleep(0.02)
+        stale = await asyncio.gather(*[
+            self.plugin_manager.process("counting", "calendar", {}) for _ in range(5)
+        ])
+        assert all(result == first for result in stale)
+
+        await asyncio.sleep(0.05)
+        assert plugin.calls == 2
+        assert self.plugin_manager.get_cache_metrics()["plugins"]["counting"]["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_coalesced_callers(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.02)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        first = asyncio.ensure_future(self.plugin_manager.process("counting", "search", {}))
+        second = asyncio.ensure_future(self.plugin_manager.process("counting", "search", {}))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert (await second)["response"] == "call 1"
+        assert plugin.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drain_waits_for_cached_process_calls(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.05)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        tracker = TaskTracker()
+        with patch("vpa.core.plugin_cache.task_tracker", tracker):
+            caller = asyncio.ensure_future(self.plugin_manager.process("counting", "search", {}))
+            await asyncio.sleep(0)
+            report = await tracker.drain(timeout=2.0)
+
+        assert (await caller)["response"] == "call 1"
+        assert report.completed == {"request": 1} and report.abandoned == {}
+
+    @pytest.mark.asyncio
+    async def test_flight_of_invalidated_plugin_is_not_stored(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60), delay=0.02)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        caller = asyncio.ensure_future(self.plugin_manager.process("counting", "search", {}))
+        await asyncio.sleep(0)
+        self.plugin_manager.unload_plugin("counting")
+
+        # The waiting caller is still answered, but nothing lands in the cache
+        assert (await caller)["response"] == "call 1"
+        assert self.plugin_manager.get_cache_metrics()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_refresh_a_request_joined(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=0.01, stale_while_revalidate=0.02), delay=0.05)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        tracker = TaskTracker()
+        with patch("vpa.core.plugin_cache.task_tracker", tracker):
+            await self.plugin_manager.process("counting", "search", {})
+            await asyncio.sleep(0.015)
+            # Stale hit: starts a background refresh
+            await self.plugin_manager.process("counting", "search", {})
+            await asyncio.sleep(0.02)
+            # Past the stale window: this request joins the refresh still in flight
+            caller = asyncio.ensure_future(self.plugin_manager.process("counting", "search", {}))
+            await asyncio.sleep(0)
+            report = await tracker.drain(timeout=2.0)
+
+        assert (await caller)["response"] == "call 2"
+        assert report.completed == {"request": 1} and report.cancelled == {}
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self):
+        plugin = CountingPlugin(PluginCachePolicy(ttl=60))
+        self.plugin_manager.plugins[plugin.name] = plugin
+        self.plugin_manager._result_cache.max_entries = 2
+
+        for query in ("a", "b", "c"):
+            await self.plugin_manager.process("counting", query, {})
+
+        metrics = self.plugin_manager.get_cache_metrics()
+        assert metrics["entries"] == 2
+        assert metrics["plugins"]["counting"]["evictions"] == 1
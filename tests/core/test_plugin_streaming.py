@@ -0,0 +1,128 @@
+"""
+Tests for streaming plugin responses and incremental TTS.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.plugins import PluginManager, Plugin
+from audio.voice_system import AudioSystem
+
+
+class StreamingPlugin(Plugin):
+    """Plugin yielding partial text results."""
+
+    def __init__(self, parts, fail_after=None):
+        self.parts = parts
+        self.fail_after = fail_after
+        self.produced = 0
+
+    @property
+    def name(self):
+        return "streaming"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    @property
+    def description(self):
+        return "Streaming plugin"
+
+    def can_handle(self, user_input, context):
+        return True
+
+    async def process(self, user_input, context):
+        return {"text": "".join(self.parts)}
+
+    async def process_stream(self, user_input, context):
+        for part in self.parts:
+            if self.fail_after is not None and self.produced >= self.fail_after:
+                raise RuntimeError("stream failed")
+            self.produced += 1
+            yield {"text": part}
+
+
+class SimplePlugin(StreamingPlugin):
+    """Plugin relying on the default single-chunk stream."""
+
+    async def process_stream(self, user_input, context):
+        async for chunk in Plugin.process_stream(self, user_input, context):
+            yield chunk
+
+
+class TestPluginStreaming:
+    """Test PluginManager.process_stream."""
+
+    @pytest.fixture(autouse=True)
+    def _manager(self, tmp_path):
+        self.plugin_manager = PluginManager()
+        self.plugin_manager.usage_profile.profile_file = str(tmp_path / "plugin_usage.json")
+
+    def teardown_method(self):
+        self.plugin_manager.cleanup_all_plugins()
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_partials_in_order(self):
+        plugin = StreamingPlugin(["Hello ", "there. ", "How are you?"])
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        chunks = [chunk async for chunk in self.plugin_manager.process_stream("streaming", "hi")]
+        assert [c["text"] for c in chunks] == ["Hello ", "there. ", "How are you?"]
+
+    @pytest.mark.asyncio
+    async def test_default_stream_wraps_process(self):
+        plugin = SimplePlugin(["complete"])
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        chunks = [chunk async for chunk in self.plugin_manager.process_stream("streaming", "hi")]
+        assert chunks == [{"text": "complete"}]
+
+    @pytest.mark.asyncio
+    async def test_buffer_bounds_producer(self):
+        plugin = StreamingPlugin([str(i) for i in range(20)])
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        stream = self.plugin_manager.process_stream("streaming", "hi", max_buffered=2)
+        await stream.__anext__()
+        await asyncio.sleep(0.01)
+        # One delivered, two buffered, one blocked on put
+        assert plugin.produced <= 4
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_producer_error_reaches_consumer(self):
+        plugin = StreamingPlugin(["a", "b", "c"], fail_after=1)
+        self.plugin_manager.plugins[plugin.name] = plugin
+
+        with pytest.raises(RuntimeError):
+            async for _ in self.plugin_manager.process_stream("streaming", "hi"):
+                pass
+
+
+class TestStreamingSynthesis:
+    """Test AudioSystem.synthesize_stream."""
+
+    @pytest.mark.asyncio
+    async def test_synthesizes_each_sentence(self):
+        audio_system = AudioSystem()
+
+        async def chunks():
+            for part in ["Hi", " there. Second", " sentence! Tail"]:
+                yield {"text": part}
+
+        results = [result async for result in audio_system.synthesize_stream(chunks())]
+        lengths = [result["synthesis_data"]["audio_data"] for result in results]
+        assert all(result["success"] for result in results)
+        assert lengths == ["<audio_data_for_9_chars>", "<audio_data_for_16_chars>",
+                           "<audio_data_for_4_chars>"]
+
+    def test_long_text_without_punctuation_is_flushed(self):
+        audio_system = AudioSystem()
+        sentences, remainder = audio_system._split_complete_sentences("word " * 100)
+        assert sentences
+        assert len(remainder) <= audio_system._max_pending_chars
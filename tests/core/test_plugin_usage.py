@@ -0,0 +1,230 @@
+"""
+Tests for usage-driven plugin preloading and eviction.
+"""
+
+import pytest
+import time
+import asyncio
+import threading
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.plugins import PluginManager, PluginMetadata
+from vpa.core.plugin_usage import PluginUsageProfile
+
+
+class TestPluginUsageProfile:
+    """Test PluginUsageProfile scoring and persistence."""
+
+    def test_time_of_day_ranking(self, tmp_path):
+        profile = PluginUsageProfile(str(tmp_path / "usage.json"))
+        morning = time.mktime((2025, 7, 1, 8, 0, 0, 0, 0, -1))
+        evening = time.mktime((2025, 7, 1, 20, 0, 0, 0, 0, -1))
+        for _ in range(3):
+            profile.record("calendar", morning)
+        for _ in range(4):
+            profile.record("music", evening)
+
+        assert profile.likely_plugins(["calendar", "music", "unused"], limit=5, hour=8) == ["calendar", "music"]
+        assert profile.likely_plugins(["calendar", "music"], limit=1, hour=20) == ["music"]
+
+    def test_persistence_round_trip(self, tmp_path):
+        profile_file = str(tmp_path / "usage.json")
+        profile = PluginUsageProfile(profile_file)
+        profile.record("weather")
+        profile.save()
+
+        restored = PluginUsageProfile(profile_file)
+        assert restored.load()
+        assert restored.records["weather"].hits == 1
+
+    def test_save_replaces_the_file_atomically(self, tmp_path):
+        profile_file = tmp_path / "usage.json"
+        profile = PluginUsageProfile(str(profile_file))
+        profile.record("weather")
+        profile.save()
+
+        profile.record("weather")
+        with patch("vpa.core.plugin_usage.json.dump", side_effect=OSError("disk full")):
+            profile.save()
+
+        # The failed write left the previous profile intact
+        restored = PluginUsageProfile(str(profile_file))
+        assert restored.load()
+        assert restored.records["weather"].hits == 1
+
+    def test_processes_saving_one_file_merge_their_hits(self, tmp_path):
+        profile_file = str(tmp_path / "usage.json")
+        seed = PluginUsageProfile(profile_file)
+        seed.record("weather")
+        seed.save()
+
+        # Two workers forked after loading the same profile
+        first, second = PluginUsageProfile(profile_file), PluginUsageProfile(profile_file)
+        first.load()
+        second.load()
+        first.record("weather")
+        second.record("weather")
+        second.record("search")
+        first.save()
+        second.save()
+
+        restored = PluginUsageProfile(profile_file)
+        assert restored.load()
+        assert restored.records["weather"].hits == 3
+        assert restored.records["search"].hits == 1
+        assert sum(restored.records["weather"].hourly_hits) == 3
+        # A save also picks up what the other processes saved
+        assert second.records["weather"].hits == 3
+
+    def test_least_recently_used_order(self, tmp_path):
+        profile = PluginUsageProfile(str(tmp_path / "usage.json"))
+        profile.record("old", time.time() - 100)
+        profile.record("new", time.time())
+
+        assert profile.least_recently_used(["new", "old", "never"]) == ["never", "old", "new"]
+        assert profile.least_recently_used(["new", "old"], min_idle_seconds=50) == ["old"]
+
+
+class TestUsageDrivenLoading:
+    """Test PluginManager preload and eviction."""
+
+    @pytest.fixture(autouse=True)
+    def _manager(self, tmp_path):
+        self.plugin_manager = PluginManager()
+        self.plugin_manager.usage_profile.profile_file = str(tmp_path / "plugin_usage.json")
+        self.plugin_manager.min_idle_seconds = 0
+        yield
+        self.plugin_manager.cleanup_all_plugins()
+
+    def _add_metadata(self, name):
+        self.plugin_manager.plugin_metadata[name] = PluginMetadata(
+            name=name, version="1.0.0", description="", author="",
+            dependencies=[], file_path=f"/plugins/{name}.py"
+        )
+
+    @pytest.mark.asyncio
+    async def test_preload_loads_likely_plugins(self):
+        for name in ("weather", "search", "unused"):
+            self._add_metadata(name)
+        self.plugin_manager.usage_profile.record("weather")
+        self.plugin_manager.usage_profile.record("search")
+
+        with patch.object(self.plugin_manager, "load_plugin", AsyncMock(return_value=object())) as load_plugin:
+            preloaded = await self.plugin_manager.preload_likely_plugins(limit=1)
+
+        assert len(preloaded) == 1
+        load_plugin.assert_called_once_with(preloaded[0])
+        assert preloaded[0] in ("weather", "search")
+
+    @pytest.mark.asyncio
+    async def test_routing_loads_unloaded_plugins_on_first_match(self):
+        for name, keywords in (("weather", ["weather"]), ("broken", ["find"]), ("search", ["find"])):
+            self._add_metadata(name)
+            self.plugin_manager.plugin_metadata[name].keywords = keywords
+        self.plugin_manager.plugin_metadata["broken"].priority = 3
+        routable = {"weather": Mock(priority=0), "search": Mock(priority=0)}
+        routable["weather"].can_handle.side_effect = lambda text, context: "weather" in text
+        routable["search"].can_handle.side_effect = lambda text, context: True
+
+        async def load(name):
+            plugin = routable.get(name)
+            if plugin is not None:
+                self.plugin_manager.plugins[name] = plugin
+            return plugin
+
+        with patch.object(self.plugin_manager, "load_plugin", AsyncMock(side_effect=load)) as load_plugin:
+            assert await self.plugin_manager.find_handlers("weather today", {}) == [routable["weather"]]
+            assert list(self.plugin_manager.plugins) == ["weather"]
+
+            # Loaded plugins are tried first; the failed load is not retried
+            assert await self.plugin_manager.find_handlers("find cats", {}) == [routable["search"]]
+            handlers = await self.plugin_manager.find_handlers("weather again", {})
+            assert handlers == [routable["weather"], routable["search"]]
+
+        assert [call.args[0] for call in load_plugin.call_args_list] == ["weather", "broken", "search"]
+
+    @pytest.mark.asyncio
+    async def test_unmatched_input_loads_no_unrelated_plugins(self):
+        for index in range(5):
+            self._add_metadata(f"tool{index}")
+            self.plugin_manager.plugin_metadata[f"tool{index}"].keywords = ["tool"]
+        self._add_metadata("unkeyed")
+        self._add_metadata("habitual")
+        self.plugin_manager.usage_profile.record("habitual")
+        declines = Mock(priority=0)
+        declines.can_handle.return_value = False
+
+        with patch.object(self.plugin_manager, "load_plugin", AsyncMock(return_value=declines)) as load_plugin:
+            # No keyword matches: only the plugin with usage history is tried
+            assert await self.plugin_manager.find_handlers("hello there", {}) == []
+            assert [call.args[0] for call in load_plugin.call_args_list] == ["habitual"]
+
+            # Matches beyond max_route_loads are not loaded
+            load_plugin.reset_mock()
+            assert await self.plugin_manager.find_handlers("use a tool", {}) == []
+            assert load_plugin.call_count == self.plugin_manager.max_route_loads
+
+    @pytest.mark.asyncio
+    async def test_rediscovery_keeps_unsaved_usage(self):
+        self.plugin_manager.usage_profile.record("weather")
+        self.plugin_manager.usage_profile.save()
+        self.plugin_manager.usage_profile.records.clear()
+
+        with patch.object(self.plugin_manager, "_load_from_cache", AsyncMock(return_value=True)):
+            await self.plugin_manager.discover_plugins()
+            assert self.plugin_manager.usage_profile.records["weather"].hits == 1
+
+            # Hits recorded after startup survive a rediscovery before the next save
+            self.plugin_manager.usage_profile.record("weather")
+            await self.plugin_manager.discover_plugins()
+
+        assert self.plugin_manager.usage_profile.records["weather"].hits == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_one_import(self):
+        self._add_metadata("weather")
+        plugin = Mock()
+        release = threading.Event()
+
+        def import_plugin(name, metadata):
+            release.wait(5)
+            return plugin
+
+        with patch.object(PluginManager, "_import_plugin", Mock(side_effect=import_plugin)) as import_mock:
+            loads = [asyncio.ensure_future(self.plugin_manager.load_plugin("weather")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            release.set()
+            assert await asyncio.gather(*loads) == [plugin, plugin, plugin]
+
+        import_mock.assert_called_once()
+        assert self.plugin_manager.plugins == {"weather": plugin}
+        assert self.plugin_manager.get_metrics(include_memory=False)["plugins_loaded"] == 1
+
+    def test_eviction_only_above_threshold(self):
+        self.plugin_manager.plugins = {"old": Mock(), "new": Mock()}
+        self.plugin_manager.usage_profile.record("old", time.time() - 100)
+        self.plugin_manager.usage_profile.record("new", time.time())
+
+        below = {"memory_mb": 50.0, "memory_percent": 0.0, "cpu_percent": 0.0}
+        with patch("vpa.core.plugins.PerformanceMonitor.monitor_memory_usage", return_value=below):
+            assert self.plugin_manager.evict_idle_plugins(100) == []
+
+        # One RSS sample per pass; each pass unloads the least recently used first
+        above = {"memory_mb": 150.0, "memory_percent": 0.0, "cpu_percent": 0.0}
+        with patch("vpa.core.plugins.PerformanceMonitor.monitor_memory_usage",
+                   return_value=above) as monitor:
+            assert self.plugin_manager.evict_idle_plugins(100) == ["old"]
+        monitor.assert_called_once()
+
+        assert list(self.plugin_manager.plugins) == ["new"]
+        assert self.plugin_manager.get_metrics()["plugins_evicted"] == 1
+
+        # A caller's own sample is used as is
+        with patch("vpa.core.plugins.PerformanceMonitor.monitor_memory_usage") as monitor:
+            assert self.plugin_manager.evict_idle_plugins(100, rss_mb=90.0) == []
+            assert self.plugin_manager.evict_idle_plugins(100, rss_mb=150.0) == ["new"]
+        monitor.assert_not_called()
@@ -0,0 +1,104 @@
+"""
+Tests for versioned LLM response cache keys and the persistent response store.
+"""
+
+import pytest
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from vpa.core.disk_cache import DiskCache
+from vpa.core.response_optimizer import VPAResponseOptimizer, RESPONSE_KEY_VERSION
+
+
+def fast_optimizer(**kwargs):
+    return VPAResponseOptimizer(batch_timeout=0.001, **kwargs)
+
+
+class TestResponseKeys:
+    """Test which request fields the key schema covers."""
+
+    def test_every_response_affecting_field_changes_the_key(self):
+        key = fast_optimizer().cache_key_for_request
+        base = {"prompt": "Summarize this", "model": "small"}
+        variants = [
+            {**base, "temperature": 0.2},
+            {**base, "system": "Answer in French"},
+            {**base, "messages": [{"role": "user", "content": "earlier turn"}]},
+            {**base, "model": "large"},
+            {**base, "prompt": "summarize this"},
+        ]
+
+        keys = {key(request) for request in [base] + variants}
+        assert len(keys) == len(variants) + 1
+
+    def test_equivalent_requests_share_a_key(self):
+        key = fast_optimizer().cache_key_for_request
+        base = key({"prompt": "Summarize  this"})
+
+        assert key({"prompt": " Summarize this\n", "model": "default", "max_tokens": 100}) == base
+        assert key({"prompt": "Summarize this", "temperature": None, "request_id": "r1"}) == base
+
+    def test_keys_are_stable_across_processes(self):
+        script = (
+            f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+            "from vpa.core.response_optimizer import VPAResponseOptimizer; "
+            "print(VPAResponseOptimizer().cache_key_for_request({'prompt': 'hi', 'stop': {'a', 'b', 'c'}}))"
+        )
+        keys = {
+            subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                           env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+            for seed in ("1", "2")
+        }
+
+        assert len(keys) == 1
+        assert fast_optimizer().cache_key_for_request({'prompt': 'hi', 'stop': {'c', 'b', 'a'}}) in keys
+
+
+class TestResponseStore:
+    """Test the bounded memory tier, persistence and per-model counters."""
+
+    @pytest.mark.asyncio
+    async def test_responses_survive_a_restart(self, tmp_path):
+        store = DiskCache(tmp_path / "responses.db")
+        first = fast_optimizer(store=store)
+        response = await first.optimized_llm_request({"prompt": "Hello", "model": "small"})
+        store.close()
+
+        reopened = DiskCache(tmp_path / "responses.db")
+        restarted = fast_optimizer(store=reopened)
+        result = await restarted.optimized_llm_request({"prompt": "Hello", "model": "small"})
+
+        assert result["cached"] is True
+        assert result["response"] == response
+        stats = restarted.get_cache_stats()
+        assert stats["store_hits"] == 1
+        assert stats["key_version"] == RESPONSE_KEY_VERSION
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded_lru(self):
+        optimizer = fast_optimizer(max_cached_responses=2)
+        for prompt in ("a", "b"):
+            await optimizer.optimized_llm_request({"prompt": prompt})
+        await optimizer.optimized_llm_request({"prompt": "a"})
+        await optimizer.optimized_llm_request({"prompt": "c"})
+
+        assert len(optimizer._response_cache) == 2
+        assert optimizer.cache_key_for_request({"prompt": "b"}) not in optimizer._response_cache
+        assert optimizer.cache_key_for_request({"prompt": "a"}) in optimizer._response_cache
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_counted_per_model(self):
+        optimizer = fast_optimizer()
+        for _ in range(3):
+            await optimizer.optimized_llm_request({"prompt": "q", "model": "small"})
+        await optimizer.optimized_llm_request({"prompt": "q", "model": "large"})
+
+        by_model = optimizer.get_cache_stats()["by_model"]
+        assert by_model["small"] == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3}
+        assert by_model["large"]["misses"] == 1
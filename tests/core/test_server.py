@@ -0,0 +1,256 @@
+"""
+Tests for the local async assistant server.
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.plugins import PluginManager, Plugin
+from vpa.core.server import AssistantServer, ServerConfig
+from vpa.core.tasks import task_tracker
+from audio.voice_system import AudioSystem
+
+
+class EchoPlugin(Plugin):
+    """Plugin streaming the input back in two parts."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def name(self):
+        return "echo"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    @property
+    def description(self):
+        return "Echo plugin"
+
+    def can_handle(self, user_input, context):
+        return user_input.startswith("echo")
+
+    async def process(self, user_input, context):
+        return {"text": user_input}
+
+    async def process_stream(self, user_input, context):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            yield {"text": "You said. "}
+            yield {"text": user_input}
+        finally:
+            self.active -= 1
+
+
+async def http_post(port, path, payload, headers=None):
+    """Send a POST and return (status line, headers, decoded chunked NDJSON events)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    extra = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n{extra}\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+
+    head, _, rest = raw.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    response_headers = {l.split(":", 1)[0].lower(): l.split(":", 1)[1].strip() for l in lines[1:]}
+    if response_headers.get("transfer-encoding") != "chunked":
+        return lines[0], response_headers, [json.loads(rest)]
+    events = []
+    while rest:
+        size_line, _, rest = rest.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            break
+        events.append(json.loads(rest[:size]))
+        rest = rest[size + 2:]
+    return lines[0], response_headers, events
+
+
+class TestAssistantServer:
+    """Test AssistantServer transports and limits."""
+
+    @pytest_asyncio.fixture
+    async def server(self, tmp_path):
+        manager = PluginManager()
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+        manager.plugins["echo"] = EchoPlugin(delay=0.05)
+        server = AssistantServer(
+            ServerConfig(http_port=0, unix_socket_path=str(tmp_path / "vpa.sock"), max_concurrency=2),
+            plugin_manager=manager, audio_system=AudioSystem()
+        )
+        await server.start()
+        yield server
+        await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_http_streams_events_with_request_id(self, server):
+        status, headers, events = await http_post(
+            server.http_port, "/v1/utterances", {"text": "echo hi"}, {"X-Request-ID": "req-1"})
+
+        assert status.startswith("HTTP/1.1 200")
+        assert headers["x-request-id"] == "req-1"
+        assert [e["type"] for e in events] == ["accepted", "chunk", "chunk", "done"]
+        assert all(e["request_id"] == "req-1" for e in events)
+        assert events[-1]["handled"] is True
+
+    @pytest.mark.asyncio
+    async def test_unix_socket_with_speech(self, server):
+        reader, writer = await asyncio.open_unix_connection(server.config.unix_socket_path)
+        writer.write(json.dumps({"text": "echo there", "speak": True}).encode() + b"\n")
+        await writer.drain()
+
+        events = []
+        while not events or events[-1]["type"] not in ("done", "error"):
+            events.append(json.loads(await reader.readline()))
+        writer.close()
+
+        kinds = [e["type"] for e in events]
+        assert kinds.count("chunk") == 2
+        assert kinds.count("speech") == 2
+        assert kinds[-1] == "done"
+
+    @pytest.mark.asyncio
+    async def test_speech_failure_stops_the_plugin_stream(self, server, monkeypatch):
+        echo = server.plugin_manager.plugins["echo"]
+        echo.delay = 0
+
+        async def endless(user_input, context):
+            echo.active += 1
+            try:
+                while True:
+                    yield {"text": "more"}
+                    await asyncio.sleep(0)
+            finally:
+                echo.active -= 1
+
+        async def failing_synthesis(chunks):
+            await chunks.__anext__()
+            raise RuntimeError("tts down")
+            yield
+
+        monkeypatch.setattr(echo, "process_stream", endless)
+        monkeypatch.setattr(server.audio_system, "synthesize_stream", failing_synthesis)
+
+        events = await asyncio.wait_for(
+            self._collect(server.handle_utterance("echo forever", speak=True)), timeout=5)
+
+        assert events[-1] == {**events[-1], "type": "error", "error": "tts down"}
+        assert echo.active == 0
+
+    @staticmethod
+    async def _collect(events):
+        return [event async for event in events]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+    async def test_http_rejects_malformed_content_length(self, server, length):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.http_port)
+        writer.write(f"POST /v1/utterances HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+
+        assert raw.startswith(b"HTTP/1.1 400")
+        assert json.loads(raw.partition(b"\r\n\r\n")[2]) == {"error": "invalid content-length"}
+
+    @pytest.mark.asyncio
+    async def test_http_body_shorter_than_content_length(self, server):
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda loop, context: errors.append(context))
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.http_port)
+            writer.write(b"POST /v1/utterances HTTP/1.1\r\nContent-Length: 100\r\n\r\n{\"text\"")
+            writer.write_eof()
+            raw = await reader.read()
+            writer.close()
+            await asyncio.sleep(0.05)
+        finally:
+            loop.set_exception_handler(None)
+
+        assert raw == b""
+        assert errors == []
+
+    @pytest.mark.asyncio
+    async def test_non_object_context_is_rejected(self, server):
+        status, _, events = await http_post(
+            server.http_port, "/v1/utterances", {"text": "echo hi", "context": "x"})
+        assert status.startswith("HTTP/1.1 400")
+        assert events == [{"error": "'context' must be a JSON object"}]
+
+        reader, writer = await asyncio.open_unix_connection(server.config.unix_socket_path)
+        for request in ({"text": "echo hi", "context": ["x"]}, ["echo hi"], {"text": "echo ok"}):
+            writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        errors = [json.loads(await reader.readline()) for _ in range(2)]
+        # The connection keeps serving after malformed requests
+        following = json.loads(await reader.readline())
+        writer.close()
+
+        assert [e["type"] for e in errors] == ["error", "error"]
+        assert "'context'" in errors[0]["error"]
+        assert following["type"] == "accepted"
+
+    @pytest.mark.asyncio
+    async def test_unhandled_utterance(self, server):
+        events = [e async for e in server.handle_utterance("nobody handles this")]
+        assert events[-1] == {**events[-1], "type": "done", "handled": False}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, server):
+        async def consume():
+            return [e async for e in server.handle_utterance("echo load")]
+
+        await asyncio.gather(*[consume() for _ in range(6)])
+
+        assert server.plugin_manager.plugins["echo"].peak <= 2
+        metrics = server.get_metrics()
+        assert metrics["requests_completed"] == 6
+        assert metrics["in_flight"] == 0
+        assert metrics["latency_ms"]["p95"] > 0
+
+    @pytest.mark.asyncio
+    async def test_degraded_request_skips_speech(self, server):
+        server.admission.observe(loop_lag_ms=200)
+
+        events = [e async for e in server.handle_utterance("echo there", speak=True)]
+
+        assert events[0]["degraded"] is True
+        assert [e["type"] for e in events] == ["accepted", "chunk", "done"]
+        assert server.get_metrics()["requests_degraded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_http_rejects_under_critical_strain(self, server):
+        server.admission.observe(rss_mb=4096)
+
+        status, headers, events = await http_post(
+            server.http_port, "/v1/utterances", {"text": "echo hi", "class": "background"})
+
+        assert status.startswith("HTTP/1.1 503")
+        assert events[0]["type"] == "rejected"
+        assert headers["retry-after"] == "1"
+        assert server.get_metrics()["requests_rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_new_work_while_draining(self, server):
+        task_tracker.begin_drain()
+        try:
+            events = [e async for e in server.handle_utterance("echo late")]
+        finally:
+            task_tracker.resume()
+
+        assert events == [{**events[0], "type": "rejected", "reason": "shutting down"}]
@@ -0,0 +1,101 @@
+"""
+Tests for the dependency-graph service registry.
+"""
+
+import pytest
+import asyncio
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.services import ServiceRegistry, ServiceSpec, ServiceStatus, ServiceStartupError
+
+
+def sleeper(delay, log=None, name=None, result=True):
+    """Build a start coroutine function that sleeps then reports result."""
+    async def start():
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(name)
+        return result
+    return start
+
+
+class TestServiceRegistry:
+    """Test ServiceRegistry orchestration."""
+
+    @pytest.mark.asyncio
+    async def test_independent_services_start_concurrently(self):
+        registry = ServiceRegistry()
+        for name in ("a", "b", "c"):
+            registry.register(ServiceSpec(name, sleeper(0.1)))
+
+        start = time.perf_counter()
+        results = await registry.start_all()
+        elapsed = time.perf_counter() - start
+
+        assert all(r.status == ServiceStatus.READY for r in results.values())
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_dependencies_are_ordered(self):
+        log = []
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("db", sleeper(0.05, log, "db")))
+        registry.register(ServiceSpec("api", sleeper(0.0, log, "api"), dependencies=("db",)))
+
+        await registry.start_all()
+        assert log == ["db", "api"]
+        assert registry.critical_path() == ["db", "api"]
+
+    @pytest.mark.asyncio
+    async def test_non_critical_timeout_degrades(self):
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("core", sleeper(0.0)))
+        registry.register(ServiceSpec("slow", sleeper(1.0), critical=False, timeout=0.05))
+        registry.register(ServiceSpec("extra", sleeper(0.0), dependencies=("slow",), critical=False))
+
+        results = await registry.start_all()
+        assert results["core"].status == ServiceStatus.READY
+        assert results["slow"].status == ServiceStatus.FAILED
+        assert "timed out" in results["slow"].error
+        assert results["extra"].status == ServiceStatus.SKIPPED
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_fails_fast(self):
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("broken", sleeper(0.0, result=False)))
+        registry.register(ServiceSpec("long", sleeper(5.0), critical=False))
+
+        start = time.perf_counter()
+        with pytest.raises(ServiceStartupError) as exc_info:
+            await registry.start_all()
+
+        assert exc_info.value.service_name == "broken"
+        assert time.perf_counter() - start < 1.0
+        assert registry.results["long"].status == ServiceStatus.SKIPPED
+
+    @pytest.mark.asyncio
+    async def test_readiness_probe_polled(self):
+        state = {"checks": 0}
+
+        def probe():
+            state["checks"] += 1
+            return state["checks"] >= 3
+
+        registry = ServiceRegistry(readiness_poll_interval=0.001)
+        registry.register(ServiceSpec("svc", sleeper(0.0), readiness_probe=probe))
+
+        results = await registry.start_all()
+        assert results["svc"].status == ServiceStatus.READY
+        assert state["checks"] == 3
+
+    def test_cycle_detection(self):
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("a", sleeper(0), dependencies=("b",)))
+        registry.register(ServiceSpec("b", sleeper(0), dependencies=("a",)))
+
+        with pytest.raises(ValueError):
+            registry.validate()
@@ -0,0 +1,137 @@
+"""
+Tests for the cross-process shared-memory cache tier.
+"""
+
+import pytest
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.shared_cache import SharedMemoryCache, SHARED_CACHE_SUPPORTED
+from vpa.core.cache_manager import VPACacheManager
+from vpa.core.response_optimizer import VPAResponseOptimizer
+
+pytestmark = pytest.mark.skipif(not SHARED_CACHE_SUPPORTED, reason="requires fcntl")
+
+
+@pytest.fixture
+def shared(tmp_path):
+    cache = SharedMemoryCache(tmp_path / "shared.cache", size_bytes=1024 * 1024, slot_size=1024, stripes=8)
+    yield cache
+    cache.close()
+
+
+def fork_child(fn):
+    """Run fn in a forked process; returns its pid."""
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            fn()
+            code = 0
+        finally:
+            os._exit(code)
+    return pid
+
+
+def exit_code(pid):
+    return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+
+
+class TestSharedMemoryCache:
+    """Test the table itself."""
+
+    def test_round_trip_ttl_and_delete(self, shared):
+        assert shared.set("llm", "a", {"text": "hello"})
+        shared.set("llm", "stale", 1, ttl=-1)
+
+        assert shared.get("llm", "a").value == {"text": "hello"}
+        assert shared.get("tts", "a") is None
+        assert shared.get("llm", "stale") is None
+        assert shared.delete("llm", "a")
+        assert shared.get("llm", "a") is None
+        assert shared.get_metrics()["expirations"] == 1
+
+    def test_values_are_compressed_and_bounded_by_slot_size(self, shared):
+        assert shared.set("llm", "repetitive", "x" * 50_000)
+        assert shared.get("llm", "repetitive").value == "x" * 50_000
+
+        assert not shared.set("llm", "random", os.urandom(5_000))
+        assert shared.get_metrics()["rejections"] == 1
+
+    def test_full_window_evicts_least_recently_accessed(self, tmp_path):
+        cache = SharedMemoryCache(tmp_path / "tiny.cache", size_bytes=64 + 4 * 256, slot_size=256,
+                                  stripes=1, probe_limit=4)
+        for key in "abcd":
+            cache.set("ns", key, key)
+            time.sleep(0.001)
+        cache.get("ns", "a")
+        cache.set("ns", "e", "e")
+
+        assert cache.get("ns", "b") is None
+        assert all(cache.get("ns", key) is not None for key in "acde")
+        assert cache.get_metrics()["evictions"] == 1
+        cache.close()
+
+    def test_processes_share_entries(self, shared, tmp_path):
+        assert exit_code(fork_child(lambda: shared.set("llm", "from_child", os.getpid()))) == 0
+        assert shared.get("llm", "from_child") is not None
+
+        # A separately opened handle adopts the existing geometry
+        other = SharedMemoryCache(tmp_path / "shared.cache", size_bytes=4096, slot_size=128)
+        assert other.slots == shared.slots
+        assert other.get("llm", "from_child").value == shared.get("llm", "from_child").value
+        other.close()
+
+    def test_concurrent_writers_do_not_lose_entries(self, tmp_path):
+        # Large enough that no probe window overflows, so every write must survive
+        shared = SharedMemoryCache(tmp_path / "busy.cache", size_bytes=4 * 1024 * 1024, slot_size=1024, stripes=4)
+
+        def writer(prefix):
+            for i in range(200):
+                assert shared.set("llm", f"{prefix}{i}", i)
+
+        pids = [fork_child(lambda prefix=prefix: writer(prefix)) for prefix in "wxyz"]
+        assert [exit_code(pid) for pid in pids] == [0, 0, 0, 0]
+
+        stored = sum(shared.get("llm", f"{prefix}{i}") is not None for prefix in "wxyz" for i in range(200))
+        assert stored == 800
+        assert shared.get_metrics()["used_slots"] == 800
+        shared.close()
+
+
+class TestSharedTierIntegration:
+    """Test cache manager and response optimizer use of the shared tier."""
+
+    def test_cache_managers_share_llm_entries(self, shared, tmp_path):
+        first = VPACacheManager(cache_dir=str(tmp_path / "one"))
+        second = VPACacheManager(cache_dir=str(tmp_path / "two"))
+        first.attach_shared_cache(shared)
+        second.attach_shared_cache(shared)
+
+        first.set("prompt", "answer", namespace="llm", ttl=60)
+        first.set("local", "value")
+
+        assert second.get("prompt", namespace="llm") == "answer"
+        assert second.get("local") is None
+        assert second.get_metrics()["shared"]["hits"] == 1
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_response_optimizers_share_responses(self, shared):
+        first = VPAResponseOptimizer()
+        second = VPAResponseOptimizer()
+        first.attach_shared_cache(shared)
+        second.attach_shared_cache(shared)
+        request = {"prompt": "Hello"}
+
+        response = await first.optimized_llm_request(request)
+        reused = await second.optimized_llm_request(request)
+
+        assert reused["cached"] is True
+        assert reused["response"] == response
+        assert second.get_cache_stats()["shared_hits"] == 1
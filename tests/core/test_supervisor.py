@@ -0,0 +1,134 @@
+"""
+Tests for supervised background tasks.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.supervisor import TaskSupervisor, RestartPolicy, TaskState
+from vpa.core.health import supervised_tasks_probe, HealthStatus
+
+
+class TestTaskSupervisor:
+    """Test restart policies, backoff and accounting."""
+
+    @pytest.mark.asyncio
+    async def test_failing_task_is_restarted_with_backoff(self):
+        supervisor = TaskSupervisor()
+        runs = []
+
+        async def flaky():
+            runs.append(len(runs))
+            if len(runs) < 3:
+                raise RuntimeError("boom")
+            await asyncio.sleep(10)
+
+        supervisor.supervise("flaky", flaky, backoff_initial=0.01)
+        await asyncio.sleep(0.1)
+
+        status = supervisor.get_status()["flaky"]
+        assert len(runs) == 3
+        assert status["state"] == "running"
+        assert status["restarts"] == 2
+        assert status["last_error"] == "RuntimeError: boom"
+        assert supervisor.get_task("flaky").consecutive_failures == 2
+
+        await supervisor.stop_all()
+        assert supervisor.get_status()["flaky"]["state"] == "stopped"
+
+    @pytest.mark.asyncio
+    async def test_max_restarts_marks_task_failed(self):
+        supervisor = TaskSupervisor()
+
+        async def broken():
+            raise ValueError("bad config")
+
+        supervised = supervisor.supervise("broken", broken, backoff_initial=0.0, max_restarts=2)
+        await supervised.task
+
+        assert supervised.state == TaskState.FAILED
+        assert supervised.restarts == 2
+        assert supervisor.get_status()["broken"]["healthy"] is False
+
+        result = await supervised_tasks_probe(supervisor).check()
+        assert result[0] == HealthStatus.FAIL
+
+    @pytest.mark.asyncio
+    async def test_restart_policies(self):
+        supervisor = TaskSupervisor()
+        runs = {"once": 0, "always": 0}
+
+        async def once():
+            runs["once"] += 1
+
+        async def always():
+            runs["always"] += 1
+
+        first = supervisor.supervise("once", once, restart=RestartPolicy.ON_FAILURE)
+        second = supervisor.supervise("always", always, restart=RestartPolicy.ALWAYS, max_restarts=3)
+        await asyncio.gather(first.task, second.task)
+
+        assert runs == {"once": 1, "always": 4}
+        assert first.state == TaskState.COMPLETED
+        assert supervisor.get_status()["once"]["healthy"] is True
+
+    @pytest.mark.asyncio
+    async def test_cpu_and_wall_time_accounting(self):
+        supervisor = TaskSupervisor()
+
+        async def busy_then_idle():
+            total = 0
+            for i in range(200000):
+                total += i
+            await asyncio.sleep(0.05)
+            return total
+
+        supervised = supervisor.supervise("busy", busy_then_idle, restart=RestartPolicy.NEVER)
+        await supervised.task
+
+        status = supervisor.get_status()["busy"]
+        assert status["cpu_time"] > 0
+        assert status["wall_time"] >= 0.05
+        # Time suspended in sleep is wall time, not CPU time
+        assert status["cpu_time"] < status["wall_time"]
+        assert status["steps"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_supervise_same_name_returns_running_task(self):
+        supervisor = TaskSupervisor()
+
+        async def loop():
+            await asyncio.sleep(10)
+
+        first = supervisor.supervise("loop", loop)
+        second = supervisor.supervise("loop", loop)
+
+        assert first is second
+        await supervisor.stop("loop")
+        assert first.task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_finished_entries_can_be_removed(self):
+        supervisor = TaskSupervisor()
+
+        async def loop():
+            await asyncio.sleep(10)
+
+        async def once():
+            pass
+
+        supervisor.supervise("loop", loop)
+        supervisor.supervise("once", once, restart=RestartPolicy.NEVER)
+        supervisor.supervise("stopped", loop)
+        await asyncio.sleep(0.01)
+        await supervisor.stop("stopped")
+
+        assert sorted(supervisor.remove_finished()) == ["once", "stopped"]
+        assert list(supervisor.get_status()) == ["loop"]
+
+        await supervisor.stop("loop", remove=True)
+        assert supervisor.get_status() == {}
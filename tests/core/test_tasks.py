@@ -0,0 +1,159 @@
+"""
+Tests for tracked tasks and the shutdown drain.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.container import container
+from vpa.core.tasks import TaskTracker, task_tracker
+from vpa.core.app import VPAApplication
+
+
+class TestTaskTracker:
+    """Test tracking and deadline-bounded draining."""
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_in_flight_work(self):
+        tracker = TaskTracker()
+        finished = []
+
+        async def work(delay):
+            await asyncio.sleep(delay)
+            finished.append(delay)
+
+        tracker.spawn(work(0.02), kind="request")
+        tracker.spawn(work(0.01), kind="event")
+        assert tracker.in_flight() == 2
+
+        report = await tracker.drain(timeout=1.0)
+
+        assert sorted(finished) == [0.01, 0.02]
+        assert report.completed == {"request": 1, "event": 1}
+        assert report.abandoned_total == 0
+        assert tracker.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_remaining_work(self):
+        tracker = TaskTracker()
+        slow = tracker.spawn(asyncio.sleep(10), kind="request")
+        tracker.spawn(asyncio.sleep(0), kind="event")
+
+        report = await tracker.drain(timeout=0.05)
+
+        assert slow.cancelled()
+        assert report.completed == {"event": 1}
+        assert report.abandoned == {"request": 1}
+
+    @pytest.mark.asyncio
+    async def test_background_work_is_cancelled_immediately(self):
+        tracker = TaskTracker()
+        loop_task = tracker.spawn(asyncio.sleep(10), kind="background")
+
+        report = await tracker.drain(timeout=5.0)
+
+        assert loop_task.cancelled()
+        assert report.cancelled == {"background": 1}
+        assert report.abandoned == {}
+        assert report.duration < 1.0
+
+    @pytest.mark.asyncio
+    async def test_work_spawned_while_draining_is_awaited(self):
+        tracker = TaskTracker()
+        follow_up_done = []
+
+        async def follow_up():
+            await asyncio.sleep(0.01)
+            follow_up_done.append(True)
+
+        async def request():
+            await asyncio.sleep(0.01)
+            tracker.spawn(follow_up(), kind="event")
+
+        tracker.spawn(request(), kind="request")
+        report = await tracker.drain(timeout=1.0)
+
+        assert follow_up_done == [True]
+        assert report.completed == {"request": 1, "event": 1}
+
+    @pytest.mark.asyncio
+    async def test_accepting_flag(self):
+        tracker = TaskTracker()
+        assert tracker.accepting
+
+        await tracker.drain(timeout=0.1)
+        assert not tracker.accepting
+        assert tracker.get_metrics()["drains"] == 1
+
+        tracker.resume()
+        assert tracker.accepting
+
+    @pytest.mark.asyncio
+    async def test_failed_task_is_counted(self):
+        tracker = TaskTracker()
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        task = tracker.spawn(boom())
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert tracker.get_metrics()["failed"] == 1
+
+
+class TestApplicationDrain:
+    """Test the drain phase of VPAApplication.shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_then_cleans_up(self):
+        application = VPAApplication()
+        application._running = True
+        completed = []
+
+        async def request():
+            await asyncio.sleep(0.05)
+            completed.append(True)
+
+        task_tracker.spawn(request(), kind="request")
+        task_tracker.spawn(asyncio.sleep(10), kind="background")
+
+        with patch.object(container.get("event_bus"), "cleanup") as cleanup, \
+                patch.object(container.get("plugin_manager"), "cleanup_all_plugins"):
+            await application.shutdown()
+
+        assert completed == [True]
+        assert application.last_drain.completed["request"] == 1
+        assert application.last_drain.cancelled["background"] == 1
+        assert application.last_drain.abandoned_total == 0
+        assert cleanup.called
+        assert application.get_status()["last_drain"]["completed_total"] >= 1
+        task_tracker.resume()
+
+    @pytest.mark.asyncio
+    async def test_second_shutdown_waits_for_drain_in_progress(self):
+        application = VPAApplication()
+        application._running = True
+        completed = []
+
+        async def request():
+            await asyncio.sleep(0.05)
+            completed.append(True)
+
+        task_tracker.spawn(request(), kind="request")
+
+        with patch.object(container.get("event_bus"), "cleanup"), \
+                patch.object(container.get("plugin_manager"), "cleanup_all_plugins"):
+            # A signal starts the shutdown; main's own call must not overtake it
+            signal_shutdown = task_tracker.spawn(application.shutdown(), kind="shutdown")
+            await asyncio.sleep(0)
+            await application.shutdown()
+
+            assert completed == [True]
+            assert signal_shutdown.done()
+            assert application.last_drain.completed["request"] == 1
+        task_tracker.resume()
@@ -0,0 +1,121 @@
+"""
+Tests for startup span recording and Chrome trace export.
+"""
+
+import pytest
+import asyncio
+import json
+import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.tracing import StartupTracer
+
+
+class TestStartupTracer:
+    """Test StartupTracer span recording."""
+
+    def test_nested_spans_form_tree(self):
+        tracer = StartupTracer()
+        tracer.start()
+        with tracer.span("startup"):
+            with tracer.span("phase", category="service"):
+                pass
+
+        tree = tracer.span_tree()
+        assert len(tree) == 1
+        assert tree[0]["name"] == "startup"
+        assert tree[0]["children"][0]["name"] == "phase"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_use_separate_lanes(self):
+        tracer = StartupTracer()
+        tracer.start()
+
+        async def service(name):
+            with tracer.span(name):
+                await asyncio.sleep(0.01)
+
+        with tracer.span("startup"):
+            await asyncio.gather(asyncio.create_task(service("a")), asyncio.create_task(service("b")))
+
+        spans = {span.name: span for span in tracer.spans}
+        assert spans["a"].lane != spans["b"].lane
+        assert spans["a"].parent_id == spans["startup"].span_id
+        assert spans["b"].parent_id == spans["startup"].span_id
+
+    def test_inactive_tracer_records_nothing(self):
+        tracer = StartupTracer()
+        with tracer.span("before_start"):
+            pass
+        assert tracer.spans == []
+
+        tracer.start()
+        tracer.stop()
+        with tracer.span("ignored"):
+            pass
+        assert tracer.spans == []
+
+    def test_recording_stops_at_the_deadline(self):
+        tracer = StartupTracer()
+        tracer.start(deadline=0.01)
+        with tracer.span("startup"):
+            pass
+        time.sleep(0.02)
+        for _ in range(100):
+            with tracer.span("event:late", category="events"):
+                pass
+
+        assert [span.name for span in tracer.spans] == ["startup"]
+        assert tracer.active is False
+
+    @pytest.mark.asyncio
+    async def test_global_tracer_ignores_dispatch_until_started(self):
+        from vpa.core.events import EventBus
+        from vpa.core.tracing import startup_tracer
+
+        startup_tracer.stop()
+        startup_tracer.reset()
+        bus = EventBus()
+        for _ in range(50):
+            await bus.emit_async("tick", {})
+
+        assert startup_tracer.spans == []
+
+    def test_chrome_trace_export(self, tmp_path):
+        tracer = StartupTracer()
+        tracer.start()
+        with tracer.span("startup", phase="all"):
+            pass
+
+        filename = tracer.export_chrome_trace(str(tmp_path / "trace.json"))
+        with open(filename) as f:
+            trace = json.load(f)
+
+        complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert complete[0]["name"] == "startup"
+        assert complete[0]["args"]["phase"] == "all"
+        assert {"ts", "dur", "pid", "tid"} <= set(complete[0])
+
+    def test_profile_mode_captures_slow_functions(self):
+        tracer = StartupTracer()
+
+        def slow_function():
+            time.sleep(0.02)
+
+        def fast_function():
+            return 1
+
+        tracer.start()
+        tracer.start_profiling(min_duration_ms=10)
+        try:
+            slow_function()
+            fast_function()
+        finally:
+            tracer.stop_profiling()
+
+        names = {span.name for span in tracer.spans if span.category == "profile"}
+        assert "slow_function" in names
+        assert "fast_function" not in names
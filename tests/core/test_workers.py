@@ -0,0 +1,239 @@
+"""
+Tests for the pre-fork worker supervisor.
+"""
+
+import pytest
+import asyncio
+import json
+import os
+import signal
+import time
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from vpa.core.plugins import PluginManager, Plugin
+from vpa.core.plugin_usage import PluginUsageProfile
+from vpa.core.server import ServerConfig
+from vpa.core.workers import WorkerSupervisor, WorkerConfig, FORK_SUPPORTED
+from audio.voice_system import AudioSystem
+
+pytestmark = pytest.mark.skipif(not FORK_SUPPORTED, reason="requires os.fork")
+
+
+class PidPlugin(Plugin):
+    """Plugin answering with the serving process id."""
+
+    @property
+    def name(self):
+        return "pid"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    @property
+    def description(self):
+        return "Reports the worker pid"
+
+    def can_handle(self, user_input, context):
+        return True
+
+    async def process(self, user_input, context):
+        return {"pid": os.getpid()}
+
+
+class SlowPlugin(PidPlugin):
+    """Plugin that takes long enough to still be running when its worker is stopped."""
+
+    async def process(self, user_input, context):
+        await asyncio.sleep(0.5)
+        return {"pid": os.getpid()}
+
+
+def post_utterance(port, text):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/v1/utterances",
+        data=json.dumps({"text": text}).encode(), method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return [json.loads(line) for line in response.read().splitlines()]
+
+
+def poll_until(supervisor, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        supervisor.poll()
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestWorkerSupervisor:
+    """Test worker forking, restart and metric aggregation."""
+
+    @pytest.fixture
+    def supervisor(self, tmp_path):
+        manager = PluginManager()
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+        prepared = []
+
+        async def prepare():
+            manager.plugins["pid"] = PidPlugin()
+            prepared.append(os.getpid())
+
+        supervisor = WorkerSupervisor(
+            ServerConfig(http_port=0, unix_socket_path=str(tmp_path / "vpa.sock")),
+            WorkerConfig(workers=2, max_uss_mb=None, metrics_interval=0.05,
+                         restart_backoff=0.05, shutdown_timeout=5.0),
+            plugin_manager=manager, audio_system=AudioSystem(), prepare=prepare
+        )
+        supervisor.prepared = prepared
+        yield supervisor
+        supervisor.stop()
+
+    def test_workers_share_socket_and_report_metrics(self, supervisor):
+        supervisor.start()
+
+        assert supervisor.prepared == [os.getpid()]
+        assert len(supervisor.worker_pids()) == 2
+
+        served_by = set()
+        for _ in range(8):
+            events = post_utterance(supervisor.http_port, "hello")
+            assert events[-1]["type"] == "done"
+            served_by.add(events[1]["data"]["pid"])
+        assert served_by <= set(supervisor.worker_pids())
+
+        assert poll_until(supervisor, lambda: supervisor.get_metrics()["requests"]["requests_completed"] == 8)
+        metrics = supervisor.get_metrics()
+        assert metrics["workers_alive"] == 2
+        assert metrics["total_uss_mb"] > 0
+
+    def test_stopped_workers_merge_their_plugin_usage(self, supervisor, tmp_path):
+        supervisor.start()
+        for _ in range(6):
+            assert post_utterance(supervisor.http_port, "hello")[-1]["type"] == "done"
+
+        supervisor.stop()
+
+        profile = PluginUsageProfile(str(tmp_path / "usage.json"))
+        assert profile.load()
+        assert profile.records["pid"].hits == 6
+
+    def test_running_workers_save_their_plugin_usage(self, supervisor, tmp_path):
+        supervisor.worker_config.maintenance_interval = 0.05
+        supervisor.start()
+        for _ in range(4):
+            assert post_utterance(supervisor.http_port, "hello")[-1]["type"] == "done"
+
+        def saved_hits():
+            profile = PluginUsageProfile(str(tmp_path / "usage.json"))
+            return profile.records["pid"].hits if profile.load() and "pid" in profile.records else 0
+
+        # Saved by the workers' maintenance loops, before any worker stops
+        assert poll_until(supervisor, lambda: saved_hits() == 4)
+
+    def test_default_prepare_loads_plugins_before_forking(self, tmp_path, caplog):
+        plugin_dir = tmp_path / "plugins"
+        plugin_dir.mkdir()
+        (plugin_dir / "echo.py").write_text(
+            "from vpa.core.plugins import Plugin\n"
+            "\n"
+            "class EchoPlugin(Plugin):\n"
+            "    name = 'echo'\n"
+            "    version = '1.0.0'\n"
+            "    description = 'Echoes the utterance'\n"
+            "\n"
+            "    def can_handle(self, user_input, context):\n"
+            "        return user_input.startswith('echo')\n"
+            "\n"
+            "    async def process(self, user_input, context):\n"
+            "        return {'text': user_input}\n"
+        )
+        manager = PluginManager(plugin_paths=[str(plugin_dir)])
+        manager.plugin_cache_file = str(tmp_path / "plugin_cache.json")
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+        supervisor = WorkerSupervisor(
+            ServerConfig(http_port=0, unix_socket_path=None),
+            WorkerConfig(workers=1, max_uss_mb=None, metrics_interval=0.05, metrics_log_interval=0,
+                         shutdown_timeout=5.0),
+            plugin_manager=manager, audio_system=AudioSystem()
+        )
+        try:
+            supervisor.start()
+            assert list(manager.plugins) == ["echo"]
+
+            events = post_utterance(supervisor.http_port, "echo hi")
+            assert events[-1] == {**events[-1], "type": "done", "handled": True}
+
+            # The aggregated serving metrics are logged by the supervision loop
+            with caplog.at_level("INFO", logger="vpa.core.workers"):
+                assert poll_until(supervisor, lambda: "1 requests completed" in caplog.text)
+        finally:
+            supervisor.stop()
+
+    def test_crashed_worker_is_restarted(self, supervisor):
+        supervisor.start()
+        victim = supervisor.worker_pids()[0]
+
+        os.kill(victim, signal.SIGKILL)
+
+        assert poll_until(supervisor, lambda: len(supervisor.worker_pids()) == 2
+                          and victim not in supervisor.worker_pids())
+        metrics = supervisor.get_metrics()
+        assert metrics["crash_restarts"] == 1
+        assert post_utterance(supervisor.http_port, "still there")[-1]["type"] == "done"
+
+    def test_worker_over_memory_limit_is_recycled(self, supervisor):
+        supervisor.worker_config.max_uss_mb = 0.001
+        supervisor.start()
+        original = set(supervisor.worker_pids())
+
+        assert poll_until(supervisor, lambda: supervisor.get_metrics()["memory_restarts"] >= 2
+                          and not original & set(supervisor.worker_pids()))
+        assert supervisor.get_metrics()["crash_restarts"] == 0
+
+    def test_stopping_worker_drains_in_flight_requests(self, tmp_path):
+        manager = PluginManager()
+        manager.usage_profile.profile_file = str(tmp_path / "usage.json")
+
+        async def prepare():
+            manager.plugins["pid"] = SlowPlugin()
+
+        supervisor = WorkerSupervisor(
+            ServerConfig(http_port=0, unix_socket_path=None),
+            WorkerConfig(workers=1, max_uss_mb=None, metrics_interval=0.05, shutdown_timeout=5.0,
+                         drain_timeout=4.0),
+            plugin_manager=manager, audio_system=AudioSystem(), prepare=prepare
+        )
+        responses = []
+        try:
+            supervisor.start()
+            worker = supervisor.worker_pids()[0]
+            request = threading.Thread(
+                target=lambda: responses.append(post_utterance(supervisor.http_port, "slow")))
+            request.start()
+            time.sleep(0.2)
+
+            os.kill(worker, signal.SIGTERM)
+            request.join(timeout=5)
+        finally:
+            supervisor.stop()
+
+        assert responses[0][-1]["type"] == "done"
+        assert responses[0][1]["data"]["pid"] == worker
+
+    def test_stop_terminates_workers(self, supervisor):
+        supervisor.start()
+        pids = supervisor.worker_pids()
+
+        supervisor.stop()
+
+        assert supervisor.worker_pids() == []
+        for pid in pids:
+            with pytest.raises(OSError):
+                os.kill(pid, 0)
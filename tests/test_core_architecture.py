@@ -6,6 +6,7 @@ Unit tests for events, plugins, app, and audio systems.
 import pytest
 import asyncio
 import time
+import logging
 from unittest.mock import Mock, patch
 
 # Add src to path
@@ -16,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from vpa.core.events import EventBus, Event, PerformanceMonitor
 from vpa.core.plugins import PluginManager, Plugin, PluginMetadata
 from vpa.core.app import VPAApplication, StartupPhase
+from vpa.core.config_service import ConfigSnapshot
 from audio.voice_system import AudioSystem, VoiceProfile, VoiceQuality
 
 
@@ -209,6 +211,11 @@ class TestVPAApplication:
         assert self.app.state.startup_time > 0
         assert self.app.state.startup_time < 10.0  # Performance target
         
+        # Every declared service does real work; plugins load after the configuration
+        results = self.app.services.results
+        assert set(results) == {"core_systems", "configuration", "plugins"}
+        assert results["plugins"].started_at >= results["configuration"].ready_at
+        
         await self.app.shutdown()
     
     def test_status_reporting(self):
@@ -220,6 +227,20 @@ class TestVPAApplication:
         assert "memory_usage_mb" in status
         assert "performance_targets" in status
     
+    @pytest.mark.asyncio
+    async def test_ui_log_level_follows_config_changes(self):
+        """Test the UI's log level setting is applied when it changes."""
+        root = logging.getLogger()
+        previous = root.level
+        snapshot = ConfigSnapshot({"ui": {"advanced": {"log_level": "WARNING", "debug_mode": False}}}, version=2)
+        try:
+            with patch("vpa.core.app.config_service") as service:
+                service.snapshot = snapshot
+                await self.app._handle_config_change(Mock(data={"keys": ["ui.advanced.log_level"]}))
+            assert root.level == logging.WARNING
+        finally:
+            root.setLevel(previous)
+    
     def test_shutdown_callback(self):
         """Test shutdown callback functionality."""
         callback_called = False
@@ -281,6 +302,24 @@ class TestAudioSystem:
         assert current_voice["voice_id"] == "voice_02"
         assert current_voice["name"] == "David"
     
+    @pytest.mark.asyncio
+    async def test_config_snapshot_applies_voice_settings(self):
+        """Test voice settings follow the configuration snapshot."""
+        snapshot = ConfigSnapshot({
+            "audio": {"sample_rate": 22050},
+            "voice": {"current_voice": "voice_03", "voices": {"voice_03": {"rate": 150, "volume": 0.5}}}
+        }, version=2)
+        with patch("audio.voice_system.config_service") as service:
+            service.snapshot = snapshot
+            await self.audio_system._handle_config_change(Mock(data={"keys": ["ui.appearance.theme"]}))
+            assert self.audio_system.get_current_voice()["voice_id"] == "voice_01"
+
+            await self.audio_system._handle_config_change(Mock(data={"keys": ["voice.current_voice"]}))
+        
+        voice = self.audio_system.voice_profiles["voice_03"]
+        assert self.audio_system.get_current_voice()["voice_id"] == "voice_03"
+        assert (voice.rate, voice.volume, voice.sample_rate) == (150, 0.5, 22050)
+    
     def test_available_voices(self):
         """Test getting available voices."""
         voices = self.audio_system.get_available_voices()